@@ -0,0 +1,36 @@
+"""Adaugă tabela llm_response_cache (cache răspunsuri Claude adresat prin hash).
+
+Revision ID: 008_llm_response_cache
+Revises: 007_iso19650_full
+Create Date: 2026-10-17
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "008_llm_response_cache"
+down_revision: Union[str, None] = "007_iso19650_full"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "llm_response_cache",
+        sa.Column("id", sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column("cache_key", sa.String(64), nullable=False),
+        sa.Column("model", sa.String(100), nullable=False),
+        sa.Column("response_text", sa.Text(), nullable=False),
+        sa.Column("hit_count", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column("last_used_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("expires_at", sa.DateTime(timezone=True), nullable=False),
+    )
+    op.create_index("ix_llm_response_cache_cache_key", "llm_response_cache", ["cache_key"], unique=True)
+    op.create_index("ix_llm_response_cache_last_used_at", "llm_response_cache", ["last_used_at"])
+    op.create_index("ix_llm_response_cache_expires_at", "llm_response_cache", ["expires_at"])
+
+
+def downgrade() -> None:
+    op.drop_table("llm_response_cache")
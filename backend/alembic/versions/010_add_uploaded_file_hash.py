@@ -0,0 +1,27 @@
+"""Adaugă content_sha256 pe uploaded_files (deduplicare + reutilizare summary).
+
+Revision ID: 010_uploaded_file_hash
+Revises: 009_jobs
+Create Date: 2026-10-17
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "010_uploaded_file_hash"
+down_revision: Union[str, None] = "009_jobs"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("uploaded_files", sa.Column("content_sha256", sa.String(64), nullable=True))
+    op.create_index(
+        "ix_uploaded_files_hash_type", "uploaded_files", ["content_sha256", "file_type"]
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_uploaded_files_hash_type", table_name="uploaded_files")
+    op.drop_column("uploaded_files", "content_sha256")
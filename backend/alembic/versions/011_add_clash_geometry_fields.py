@@ -0,0 +1,39 @@
+"""Adaugă pe clash_records câmpurile detecției geometrice (elemente IFC, locație).
+
+Revision ID: 011_clash_geometry
+Revises: 010_uploaded_file_hash
+Create Date: 2026-10-17
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "011_clash_geometry"
+down_revision: Union[str, None] = "010_uploaded_file_hash"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "clash_records",
+        sa.Column("source", sa.String(20), nullable=False, server_default="manual"),
+    )
+    op.add_column("clash_records", sa.Column("element_a_guid", sa.String(64), nullable=True))
+    op.add_column("clash_records", sa.Column("element_b_guid", sa.String(64), nullable=True))
+    op.add_column("clash_records", sa.Column("element_a_type", sa.String(100), nullable=True))
+    op.add_column("clash_records", sa.Column("element_b_type", sa.String(100), nullable=True))
+    op.add_column("clash_records", sa.Column("location_json", sa.JSON(), nullable=True))
+    op.create_index(
+        "ix_clash_records_project_source", "clash_records", ["project_id", "source"]
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_clash_records_project_source", table_name="clash_records")
+    for column in (
+        "location_json", "element_b_type", "element_a_type",
+        "element_b_guid", "element_a_guid", "source",
+    ):
+        op.drop_column("clash_records", column)
@@ -0,0 +1,42 @@
+"""Adaugă tabela clash_runs (revizia analizată la fiecare detecție de clash-uri).
+
+Revision ID: 012_clash_runs
+Revises: 011_clash_geometry
+Create Date: 2026-10-17
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "012_clash_runs"
+down_revision: Union[str, None] = "011_clash_geometry"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "clash_runs",
+        sa.Column("id", sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column(
+            "project_id", sa.Integer(),
+            sa.ForeignKey("projects.id", ondelete="CASCADE"), nullable=False,
+        ),
+        sa.Column(
+            "uploaded_file_id", sa.Integer(),
+            sa.ForeignKey("uploaded_files.id", ondelete="SET NULL"), nullable=True,
+        ),
+        sa.Column("content_sha256", sa.String(64), nullable=False),
+        sa.Column("tolerance_m", sa.Float(), nullable=False),
+        sa.Column("discipline_pairs_json", sa.JSON(), nullable=True),
+        sa.Column("mode", sa.String(20), nullable=False),
+        sa.Column("stats_json", sa.JSON(), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+    )
+    op.create_index("ix_clash_runs_project_id", "clash_runs", ["project_id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_clash_runs_project_id", table_name="clash_runs")
+    op.drop_table("clash_runs")
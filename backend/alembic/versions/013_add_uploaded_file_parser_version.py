@@ -0,0 +1,24 @@
+"""Adaugă parser_version pe uploaded_files (cache summary-uri per versiune de parser).
+
+Revision ID: 013_parser_version
+Revises: 012_clash_runs
+Create Date: 2026-10-17
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "013_parser_version"
+down_revision: Union[str, None] = "012_clash_runs"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Upload-urile existente rămân cu NULL: versiune necunoscută, reindexate la nevoie
+    op.add_column("uploaded_files", sa.Column("parser_version", sa.String(32), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("uploaded_files", "parser_version")
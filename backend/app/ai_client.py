@@ -1,14 +1,23 @@
 """
 ai_client.py — Interfața cu Claude API (Anthropic).
 Funcții pentru generare BEP, Chat Expert BIM și Verificare BEP vs Model.
+
+Fiecare funcție are o variantă sincronă (`call_llm*`, pentru rute `def` și
+servicii rulate în threadpool) și una async (`acall_llm*`, pentru rute
+`async def`), care nu blochează event loop-ul și trece printr-un limitator
+de concurență global + bugete per rută.
 """
 
+import asyncio
 import os
 import json
 import logging
 import re
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
 
-from anthropic import Anthropic
+from anthropic import Anthropic, AsyncAnthropic
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -16,20 +25,180 @@ logger = logging.getLogger(__name__)
 
 # ── Client singleton ──────────────────────────────────────────────────────────
 _client = None
+_async_client = None
+
+
+def _get_api_key() -> str:
+    api_key = os.environ.get("ANTHROPIC_API_KEY")
+    if not api_key:
+        raise RuntimeError("ANTHROPIC_API_KEY nu este setat in variabilele de mediu.")
+    return api_key
+
 
 def _get_client() -> Anthropic:
     global _client
     if _client is None:
-        api_key = os.environ.get("ANTHROPIC_API_KEY")
-        if not api_key:
-            raise RuntimeError("ANTHROPIC_API_KEY nu este setat in variabilele de mediu.")
-        _client = Anthropic(api_key=api_key)
+        _client = Anthropic(api_key=_get_api_key())
     return _client
 
 
+def _get_async_client() -> AsyncAnthropic:
+    global _async_client
+    if _async_client is None:
+        _async_client = AsyncAnthropic(api_key=_get_api_key())
+    return _async_client
+
+
 MODEL = "claude-sonnet-4-6"
 
 
+# ── Limitare concurență (async) ──────────────────────────────────────────────
+# Plafon global de apeluri LLM simultane per proces + bugete per rută, astfel
+# încât o rafală de generări BEP să nu consume toate sloturile disponibile
+# pentru chat/agent. Override: LLM_ROUTE_BUDGETS="bep=2,chat=6".
+
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "8"))
+
+_DEFAULT_ROUTE_BUDGETS: dict[str, int] = {
+    "bep": 2,
+    "verifier": 2,
+    "chat": 4,
+    "agent": 4,
+}
+
+
+def _parse_route_budgets(raw: str | None) -> dict[str, int]:
+    """Parsează LLM_ROUTE_BUDGETS ("ruta=N,ruta=N") peste valorile implicite."""
+    budgets = dict(_DEFAULT_ROUTE_BUDGETS)
+    if not raw:
+        return budgets
+    for part in raw.split(","):
+        name, _, value = part.partition("=")
+        name = name.strip()
+        if not name or not value.strip():
+            continue
+        try:
+            budgets[name] = max(1, int(value))
+        except ValueError:
+            logger.warning(f"LLM_ROUTE_BUDGETS: valoare invalidă pentru '{name}': {value!r}")
+    return budgets
+
+
+class LlmLimiter:
+    """
+    Semafor global + semafoare per rută, cu metrici de coadă.
+
+    Semafoarele sunt (re)create la prima utilizare pe un event loop nou
+    (ex: TestClient pornește câte un loop per client).
+    """
+
+    def __init__(self, max_concurrency: int, route_budgets: dict[str, int]):
+        self.max_concurrency = max(1, max_concurrency)
+        self.route_budgets = route_budgets
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._global: asyncio.Semaphore | None = None
+        self._routes: dict[str, asyncio.Semaphore] = {}
+        self._stats: dict[str, dict] = {}
+
+    def _bind(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop = loop
+            self._global = asyncio.Semaphore(self.max_concurrency)
+            self._routes = {
+                name: asyncio.Semaphore(limit)
+                for name, limit in self.route_budgets.items()
+            }
+
+    def _route_stats(self, route: str) -> dict:
+        if route not in self._stats:
+            self._stats[route] = {
+                "waiting": 0,
+                "in_flight": 0,
+                "completed": 0,
+                "errors": 0,
+                "total_wait_ms": 0,
+                "max_wait_ms": 0,
+            }
+        return self._stats[route]
+
+    @asynccontextmanager
+    async def slot(self, route: str):
+        """Așteaptă un slot (buget rută, apoi global) pe durata apelului LLM."""
+        self._bind()
+        stats = self._route_stats(route)
+        route_sem = self._routes.get(route)
+
+        stats["waiting"] += 1
+        start = time.perf_counter()
+        try:
+            if route_sem is not None:
+                await route_sem.acquire()
+            try:
+                await self._global.acquire()
+            except BaseException:
+                if route_sem is not None:
+                    route_sem.release()
+                raise
+        finally:
+            stats["waiting"] -= 1
+
+        wait_ms = int((time.perf_counter() - start) * 1000)
+        stats["total_wait_ms"] += wait_ms
+        stats["max_wait_ms"] = max(stats["max_wait_ms"], wait_ms)
+        stats["in_flight"] += 1
+        if wait_ms > 1000:
+            logger.info(f"LLM '{route}': așteptat {wait_ms}ms pentru un slot")
+
+        try:
+            yield
+        except BaseException:
+            stats["errors"] += 1
+            raise
+        finally:
+            stats["in_flight"] -= 1
+            stats["completed"] += 1
+            self._global.release()
+            if route_sem is not None:
+                route_sem.release()
+
+    def metrics(self) -> dict:
+        """Snapshot cu adâncimea cozii și apelurile în curs, global și per rută."""
+        routes = {}
+        for name, st in self._stats.items():
+            done = st["completed"]
+            routes[name] = {
+                **st,
+                "budget": self.route_budgets.get(name),
+                "avg_wait_ms": round(st["total_wait_ms"] / done, 1) if done else 0,
+            }
+        return {
+            "max_concurrency": self.max_concurrency,
+            "in_flight": sum(st["in_flight"] for st in self._stats.values()),
+            "queue_depth": sum(st["waiting"] for st in self._stats.values()),
+            "routes": routes,
+        }
+
+
+_limiter = LlmLimiter(
+    LLM_MAX_CONCURRENCY,
+    _parse_route_budgets(os.getenv("LLM_ROUTE_BUDGETS")),
+)
+
+
+def get_llm_metrics() -> dict:
+    """Metrici limitator LLM (adâncime coadă, apeluri în curs, timpi de așteptare)."""
+    return _limiter.metrics()
+
+
+async def _acreate_message(route: str, **kwargs):
+    """Apel `messages.create` async, prin limitatorul de concurență."""
+    client = _get_async_client()
+    async with _limiter.slot(route):
+        return await client.messages.create(**kwargs)
+
+
+
 # ── System prompts ────────────────────────────────────────────────────────────
 
 SYSTEM_PROMPT_BEP_MANAGER = (
@@ -156,29 +325,80 @@ Output:
 warning dacă orice check e warning, pass doar dacă totul e pass)."""
 
 
-# ── Funcții LLM ───────────────────────────────────────────────────────────────
-
-def call_llm(project_context: dict) -> str:
-    """
-    Apelează Claude pentru a genera un BEP complet în Markdown.
-    Primește project_context ca dict, returnează string Markdown.
-    """
-    client = _get_client()
+# ── Construcția cererilor (comună sync/async) ────────────────────────────────
 
+def _bep_request(project_context: dict) -> dict:
     user_message = (
         "Generează un BEP complet pentru acest proiect.\n\n"
         "```json\n"
         f"{json.dumps(project_context, ensure_ascii=False, indent=2)}\n"
         "```"
     )
+    return {
+        "model": MODEL,
+        "max_tokens": 8000,
+        "system": SYSTEM_PROMPT_BEP_MANAGER,
+        "messages": [{"role": "user", "content": user_message}],
+    }
+
+
+def _context_request(
+    system_prompt: str, context: str, question: str, max_tokens: int
+) -> dict:
+    system_with_context = (
+        system_prompt
+        + "\n\n--- CONTEXT ---\n\n"
+        + context
+        + "\n\n--- SFÂRȘIT CONTEXT ---"
+    )
+    return {
+        "model": MODEL,
+        "max_tokens": max_tokens,
+        "system": system_with_context,
+        "messages": [{"role": "user", "content": question}],
+    }
+
+
+def _verifier_request(verification_context: dict) -> dict:
+    user_message = (
+        "Verifică conformitatea BEP vs model pentru acest context.\n\n"
+        "```json\n"
+        f"{json.dumps(verification_context, ensure_ascii=False, indent=2)}\n"
+        "```"
+    )
+    return {
+        "model": MODEL,
+        "max_tokens": 8192,
+        "system": SYSTEM_PROMPT_BEP_VERIFIER,
+        "messages": [{"role": "user", "content": user_message}],
+    }
+
+
+def _parse_verifier_response(response) -> dict:
+    raw = response.content[0].text.strip()
+    result = _extract_verifier_json(raw, response.stop_reason)
+
+    # Validare minimală a structurii
+    if "report_markdown" not in result:
+        result["report_markdown"] = ""
+    if "checks" not in result:
+        result["checks"] = []
+    if "summary" not in result:
+        result["summary"] = _build_summary(result["checks"])
+
+    return result
+
 
+# ── Funcții LLM ───────────────────────────────────────────────────────────────
+
+def call_llm(project_context: dict) -> str:
+    """
+    Apelează Claude pentru a genera un BEP complet în Markdown.
+    Primește project_context ca dict, returnează string Markdown.
+    """
+    client = _get_client()
     try:
-        response = client.messages.create(
-            model=MODEL,
-            max_tokens=8000,
-            system=SYSTEM_PROMPT_BEP_MANAGER,
-            messages=[{"role": "user", "content": user_message}],
-        )
+        response = client.messages.create(**_bep_request(project_context))
         return response.content[0].text.strip()
     except Exception as e:
         logger.error(f"Eroare la apelul Claude pentru BEP: {e}")
@@ -192,20 +412,9 @@ def call_llm_chat_expert(context: str, question: str, *, max_tokens: int = 2048)
     Returnează răspunsul AI.
     """
     client = _get_client()
-
-    system_with_context = (
-        SYSTEM_PROMPT_CHAT_EXPERT
-        + "\n\n--- CONTEXT ---\n\n"
-        + context
-        + "\n\n--- SFÂRȘIT CONTEXT ---"
-    )
-
     try:
         response = client.messages.create(
-            model=MODEL,
-            max_tokens=max_tokens,
-            system=system_with_context,
-            messages=[{"role": "user", "content": question}],
+            **_context_request(SYSTEM_PROMPT_CHAT_EXPERT, context, question, max_tokens)
         )
         return response.content[0].text.strip()
     except Exception as e:
@@ -220,20 +429,9 @@ def call_llm_chat_copilot(context: str, question: str) -> str:
     Returnează răspunsul AI.
     """
     client = _get_client()
-
-    system_with_context = (
-        SYSTEM_PROMPT_CHAT_COPILOT
-        + "\n\n--- CONTEXT ---\n\n"
-        + context
-        + "\n\n--- SFÂRȘIT CONTEXT ---"
-    )
-
     try:
         response = client.messages.create(
-            model=MODEL,
-            max_tokens=4096,
-            system=system_with_context,
-            messages=[{"role": "user", "content": question}],
+            **_context_request(SYSTEM_PROMPT_CHAT_COPILOT, context, question, 4096)
         )
         return response.content[0].text.strip()
     except Exception as e:
@@ -255,36 +453,78 @@ def call_llm_bep_verifier(verification_context: dict) -> dict:
         dict cu cheile: report_markdown, checks, summary
     """
     client = _get_client()
+    try:
+        response = client.messages.create(**_verifier_request(verification_context))
+        return _parse_verifier_response(response)
+    except Exception as e:
+        logger.error(f"Eroare la apelul Claude pentru BEP Verifier: {e}")
+        raise RuntimeError(f"Eroare verificare BEP: {e}") from e
 
-    user_message = (
-        "Verifică conformitatea BEP vs model pentru acest context.\n\n"
-        "```json\n"
-        f"{json.dumps(verification_context, ensure_ascii=False, indent=2)}\n"
-        "```"
-    )
 
+# ── Funcții LLM async (nu blochează event loop-ul) ────────────────────────────
+
+async def acall_llm(project_context: dict) -> str:
+    """Varianta async a `call_llm` (ruta "bep")."""
     try:
-        response = client.messages.create(
-            model=MODEL,
-            max_tokens=8192,
-            system=SYSTEM_PROMPT_BEP_VERIFIER,
-            messages=[{"role": "user", "content": user_message}],
+        response = await _acreate_message("bep", **_bep_request(project_context))
+        return response.content[0].text.strip()
+    except Exception as e:
+        logger.error(f"Eroare la apelul Claude pentru BEP: {e}")
+        raise RuntimeError(f"Eroare generare BEP: {e}") from e
+
+
+async def astream_llm(project_context: dict) -> AsyncIterator[str]:
+    """
+    Varianta streaming a `call_llm` (ruta "bep"): yield-uiește fragmentele
+    de text ale BEP-ului pe măsură ce sosesc de la Claude.
+    Slotul din limitator e ținut pe toată durata stream-ului.
+    """
+    client = _get_async_client()
+    try:
+        async with _limiter.slot("bep"):
+            async with client.messages.stream(**_bep_request(project_context)) as stream:
+                async for text in stream.text_stream:
+                    yield text
+    except Exception as e:
+        logger.error(f"Eroare la streaming Claude pentru BEP: {e}")
+        raise RuntimeError(f"Eroare generare BEP: {e}") from e
+
+
+async def acall_llm_chat_expert(
+    context: str, question: str, *, max_tokens: int = 2048
+) -> str:
+    """Varianta async a `call_llm_chat_expert` (ruta "chat")."""
+    try:
+        response = await _acreate_message(
+            "chat",
+            **_context_request(SYSTEM_PROMPT_CHAT_EXPERT, context, question, max_tokens),
         )
-        raw = response.content[0].text.strip()
-        stop_reason = response.stop_reason
+        return response.content[0].text.strip()
+    except Exception as e:
+        logger.error(f"Eroare la apelul Claude pentru Chat Expert: {e}")
+        raise RuntimeError(f"Eroare Chat Expert: {e}") from e
 
-        result = _extract_verifier_json(raw, stop_reason)
 
-        # Validare minimală a structurii
-        if "report_markdown" not in result:
-            result["report_markdown"] = ""
-        if "checks" not in result:
-            result["checks"] = []
-        if "summary" not in result:
-            result["summary"] = _build_summary(result["checks"])
+async def acall_llm_chat_copilot(context: str, question: str) -> str:
+    """Varianta async a `call_llm_chat_copilot` (ruta "chat")."""
+    try:
+        response = await _acreate_message(
+            "chat",
+            **_context_request(SYSTEM_PROMPT_CHAT_COPILOT, context, question, 4096),
+        )
+        return response.content[0].text.strip()
+    except Exception as e:
+        logger.error(f"Eroare la apelul Claude pentru Chat Copilot: {e}")
+        raise RuntimeError(f"Eroare Chat Copilot: {e}") from e
 
-        return result
 
+async def acall_llm_bep_verifier(verification_context: dict) -> dict:
+    """Varianta async a `call_llm_bep_verifier` (ruta "verifier")."""
+    try:
+        response = await _acreate_message(
+            "verifier", **_verifier_request(verification_context)
+        )
+        return _parse_verifier_response(response)
     except Exception as e:
         logger.error(f"Eroare la apelul Claude pentru BEP Verifier: {e}")
         raise RuntimeError(f"Eroare verificare BEP: {e}") from e
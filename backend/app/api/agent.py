@@ -34,7 +34,8 @@ from app.schemas.converters import (
     conversation_model_to_detail,
     conversation_model_to_read,
 )
-from app.services.agent_executor import AgentResult, run_agent, _sse_event
+from app.services.agent_executor import AgentResult, run_agent
+from app.services.sse import sse_event
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
@@ -181,7 +182,7 @@ async def api_agent_chat(
             )
 
         # Emit conversation_meta pentru frontend
-        yield _sse_event("conversation_meta", {
+        yield sse_event("conversation_meta", {
             "type": "conversation_meta",
             "conversation_id": conv_id,
             "title": conv.title,
@@ -9,9 +9,11 @@ Endpointuri legacy (backward-compat):
 
 Endpoint nou (project-scoped):
   POST /api/projects/{project_id}/generate-bep
+  POST /api/projects/{project_id}/generate-bep/stream   (SSE, draft incremental)
   GET  /api/projects/{project_id}/export-bep-docx
 """
 
+import asyncio
 import logging
 
 from fastapi import APIRouter, Depends, HTTPException
@@ -19,23 +21,27 @@ from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from sqlalchemy.orm import Session
 
-from app.db import get_db
+from app.db import SessionLocal, get_db
 from app.models.sql_models import UserModel
 from app.services.auth import get_current_user
 from app.schemas.project_context import ProjectContext
 from app.schemas.converters import project_model_to_read, document_model_to_read
-from app.services.bep_generator import generate_bep
+from app.services.sse import sse_event
+from app.services.bep_generator import generate_bep, stream_bep
 from app.services.bep_docx_exporter import markdown_to_docx
 from app.services.chat_expert import store_bep, get_bep_content, get_stored_projects
 from app.repositories.projects_repository import (
     get_project, save_project_context, save_generated_document,
-    get_latest_generated_document,
+    get_latest_generated_document, append_generated_document_content,
 )
 from app.services.project_status import on_context_saved, on_bep_generated
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
+# Câte caractere se acumulează din stream înainte de a fi persistate în draft
+BEP_STREAM_FLUSH_CHARS = 2000
+
 
 # ══════════════════════════════════════════════════════════════════════════════
 # Endpoint NOU — project-scoped
@@ -109,6 +115,135 @@ def api_generate_bep_for_project(
         raise HTTPException(status_code=500, detail=str(e))
 
 
+def _append_bep_draft(document_id: int, chunk: str) -> None:
+    """Persistă un fragment în draft-ul BEP (sesiune proprie, în afara request-ului)."""
+    db = SessionLocal()
+    try:
+        append_generated_document_content(db, document_id, chunk)
+        db.commit()
+    finally:
+        db.close()
+
+
+def _finalize_bep_draft(
+    document_id: int, project_id: int, user_id: int, remainder: str
+) -> dict:
+    """Adaugă ultimul fragment, promovează draft-ul la doc_type="bep" și actualizează statusul."""
+    db = SessionLocal()
+    try:
+        doc = append_generated_document_content(db, document_id, remainder)
+        doc.content_markdown = doc.content_markdown.strip()
+        doc.doc_type = "bep"
+        on_bep_generated(db, project_id)
+        project = get_project(db, project_id)
+        store_bep(project.code, doc.content_markdown)
+
+        try:
+            from app.services.notification_service import notify_bep_generated
+            notify_bep_generated(db, user_id, project_id, project.name)
+        except Exception:
+            pass  # non-critical
+
+        db.commit()
+        return {
+            "project": project_model_to_read(project).model_dump(mode="json"),
+            "bep_document": document_model_to_read(doc).model_dump(mode="json"),
+        }
+    finally:
+        db.close()
+
+
+@router.post("/projects/{project_id}/generate-bep/stream")
+def api_generate_bep_stream(
+    project_id: int,
+    project_context: ProjectContext,
+    db: Session = Depends(get_db),
+    _user: UserModel = Depends(get_current_user),
+):
+    """
+    Generează un BEP în streaming (SSE).
+
+    - Salvează ProjectContext și creează un draft (doc_type="bep_draft")
+    - Emite `text_delta` pentru fiecare fragment primit de la Claude
+    - Persistă fragmentele în draft la fiecare ~BEP_STREAM_FLUSH_CHARS caractere,
+      astfel încât o conexiune întreruptă nu pierde BEP-ul parțial
+    - La final promovează draft-ul la doc_type="bep" și emite `done`
+
+    SSE event types: bep_started, text_delta, error, done
+    """
+    project = get_project(db, project_id)
+    if not project:
+        raise HTTPException(status_code=404, detail=f"Proiectul {project_id} nu exista.")
+
+    save_project_context(db, project_id, project_context)
+    on_context_saved(db, project_id)
+    draft = save_generated_document(
+        db,
+        project_id=project_id,
+        doc_type="bep_draft",
+        title=f"BEP {project.code} {project_context.bep_version}",
+        content_markdown="",
+        version=project_context.bep_version,
+    )
+    db.commit()
+
+    draft_id = draft.id
+    user_id = _user.id
+
+    async def event_stream():
+        yield sse_event("bep_started", {
+            "type": "bep_started",
+            "document_id": draft_id,
+        })
+
+        buffer: list[str] = []
+        buffered = 0
+        finished = False
+        try:
+            async for delta in stream_bep(project_context):
+                yield sse_event("text_delta", {"type": "text_delta", "content": delta})
+                buffer.append(delta)
+                buffered += len(delta)
+                if buffered >= BEP_STREAM_FLUSH_CHARS:
+                    chunk = "".join(buffer)
+                    buffer.clear()
+                    buffered = 0
+                    await asyncio.to_thread(_append_bep_draft, draft_id, chunk)
+
+            result = await asyncio.to_thread(
+                _finalize_bep_draft, draft_id, project_id, user_id, "".join(buffer)
+            )
+            buffer.clear()
+            finished = True
+
+            logger.info(
+                f"BEP generat (stream) pentru proiectul {project_id}, document_id={draft_id}"
+            )
+            yield sse_event("done", {"type": "done", **result})
+        except Exception as e:
+            logger.error(f"Eroare generare BEP (stream) pentru proiectul {project_id}: {e}")
+            yield sse_event("error", {
+                "type": "error",
+                "message": str(e),
+                "document_id": draft_id,
+            })
+        finally:
+            # Client deconectat sau eroare: păstrăm tot ce s-a primit în draft
+            if not finished and buffer:
+                # shield: la deconectare, scrierea se termină chiar dacă stream-ul e anulat
+                await asyncio.shield(asyncio.to_thread(_append_bep_draft, draft_id, "".join(buffer)))
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "Connection": "keep-alive",
+            "X-Accel-Buffering": "no",
+        },
+    )
+
+
 @router.get("/projects/{project_id}/export-bep-docx")
 def api_export_bep_docx_for_project(
     project_id: int,
@@ -2,18 +2,20 @@
 clashes.py — Router clash management.
 """
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 
 from app.db import get_db
 from app.models.sql_models import UserModel
-from app.schemas.clash import ClashRecordCreate, ClashRecordUpdate
+from app.repositories.projects_repository import get_project
+from app.schemas.clash import ClashDetectionRequest, ClashRecordCreate, ClashRecordUpdate
 from app.services.auth import get_current_user
 from app.services.clash_manager import (
     create_clash,
     get_clash_summary,
     resolve_clash,
 )
+from app.services.job_queue import enqueue_job, job_to_dict
 
 router = APIRouter()
 
@@ -59,3 +61,29 @@ def resolve_clash_endpoint(
     result = resolve_clash(db, clash_id, resolution_note=body.resolution_note)
     db.commit()
     return result
+
+
+@router.post("/projects/{project_id}/clashes/detect", status_code=202)
+def detect_clashes_endpoint(
+    project_id: int,
+    body: ClashDetectionRequest | None = None,
+    user: UserModel = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """Pune în coadă detecția geometrică din ultimul IFC; returnează job-ul."""
+    if not get_project(db, project_id):
+        raise HTTPException(status_code=404, detail=f"Proiectul {project_id} nu exista.")
+    body = body or ClashDetectionRequest()
+    job = enqueue_job(
+        db, "detect_clashes",
+        {
+            "tolerance_m": body.tolerance_m,
+            "discipline_pairs": [list(p) for p in body.discipline_pairs or []] or None,
+            "incremental": body.incremental,
+        },
+        project_id=project_id,
+        user_id=user.id,
+        max_attempts=1,
+    )
+    db.commit()
+    return job_to_dict(job)
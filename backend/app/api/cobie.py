@@ -13,6 +13,11 @@ from app.db import get_db
 from app.models.sql_models import UserModel
 from app.schemas.cobie import CobieTemplateRequest
 from app.services.auth import get_current_user
+from app.services.upload_storage import (
+    COBIE_MAX_UPLOAD_MB,
+    UploadTooLargeError,
+    stream_upload_to_disk,
+)
 from app.services.cobie_validator import (
     generate_cobie_template,
     get_cobie_validation_history,
@@ -36,15 +41,17 @@ async def upload_and_validate_cobie(
     if not file.filename or not file.filename.lower().endswith(".xlsx"):
         raise HTTPException(status_code=400, detail="Fișierul trebuie să fie .xlsx")
 
-    os.makedirs(UPLOAD_DIR, exist_ok=True)
     timestamp = int(time.time())
     safe_name = file.filename.replace(" ", "_")
     dest_filename = f"{project_id}_{timestamp}_cobie_{safe_name}"
     dest_path = os.path.join(UPLOAD_DIR, dest_filename)
 
-    content = await file.read()
-    with open(dest_path, "wb") as f:
-        f.write(content)
+    try:
+        stored = await stream_upload_to_disk(
+            file, dest_path, max_bytes=COBIE_MAX_UPLOAD_MB * 1024 * 1024,
+        )
+    except UploadTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
 
     try:
         result = validate_cobie(
@@ -52,7 +59,7 @@ async def upload_and_validate_cobie(
             project_id=project_id,
             file_path=dest_path,
             filename=file.filename,
-            file_size_bytes=len(content),
+            file_size_bytes=stored.size_bytes,
             validation_type="full",
         )
         return result.model_dump()
@@ -2,16 +2,18 @@
 compliance.py — Router conformitate ISO 19650 completă.
 """
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException, Query
 from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 
-from app.db import get_db
+from app.db import SessionLocal, get_db
 from app.models.sql_models import UserModel
 from app.services.auth import get_current_user
 from app.services.iso_compliance_checker import check_full_compliance
 from app.services.project_health import compute_project_health
 from app.services.pdf_report_exporter import generate_compliance_pdf
+from app.services.sse import sse_event
+from app.services.iso_pipeline import generate_all_iso_artifacts, iter_iso_artifacts
 from app.repositories.projects_repository import get_project
 
 router = APIRouter()
@@ -56,3 +58,65 @@ def export_compliance_pdf(
             "Content-Disposition": f'attachment; filename="ISO19650_Raport_{project.code}.pdf"'
         },
     )
+
+
+@router.post("/projects/{project_id}/generate-iso-artifacts")
+def generate_iso_artifacts(
+    project_id: int,
+    classification_level: str = Query("standard"),
+    sensitive_areas: str | None = Query(None),
+    user: UserModel = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """Generează concurent EIR, TIDP, RACI, LOIN, handover și planul de securitate."""
+    result = generate_all_iso_artifacts(
+        db, project_id,
+        classification_level=classification_level,
+        sensitive_areas=sensitive_areas,
+    )
+    if result.get("success"):
+        db.commit()
+    else:
+        db.rollback()
+    return result
+
+
+@router.post("/projects/{project_id}/generate-iso-artifacts/stream")
+def generate_iso_artifacts_stream(
+    project_id: int,
+    classification_level: str = Query("standard"),
+    sensitive_areas: str | None = Query(None),
+    user: UserModel = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """
+    Varianta SSE: emite progresul per artefact pe măsură ce generatoarele termină.
+
+    SSE event types: pipeline_started, artifact_done, artifact_failed, done, error
+    """
+    if not get_project(db, project_id):
+        raise HTTPException(status_code=404, detail=f"Proiectul {project_id} nu exista.")
+
+    def event_stream():
+        # Sesiune proprie: sesiunea request-ului nu trăiește cât stream-ul
+        stream_db = SessionLocal()
+        try:
+            for event in iter_iso_artifacts(
+                stream_db, project_id,
+                classification_level=classification_level,
+                sensitive_areas=sensitive_areas,
+                commit=True,
+            ):
+                yield sse_event(event["type"], event)
+        finally:
+            stream_db.close()
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "Connection": "keep-alive",
+            "X-Accel-Buffering": "no",
+        },
+    )
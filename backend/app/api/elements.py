@@ -0,0 +1,73 @@
+"""
+elements.py — Router interogări pe elementele modelului IFC (store columnar).
+"""
+
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import JSONResponse
+from sqlalchemy.orm import Session
+
+from app.db import get_db
+from app.models.sql_models import UserModel
+from app.repositories.projects_repository import get_project
+from app.schemas.elements import ElementQueryRequest
+from app.services.auth import get_current_user
+from app.services.element_queries import query_project_elements
+from app.services.job_queue import enqueue_unique_job, job_to_dict
+
+router = APIRouter()
+
+
+def _enqueue_index(db: Session, project_id: int, user: UserModel, uploaded_file_id: int | None = None) -> dict:
+    # Reîncercările clientului refolosesc job-ul deja în coadă pentru același fișier
+    job = enqueue_unique_job(
+        db, "build_element_store", {"uploaded_file_id": uploaded_file_id},
+        project_id=project_id, user_id=user.id, max_attempts=1,
+    )
+    db.commit()
+    return job_to_dict(job)
+
+
+@router.post("/projects/{project_id}/elements/query")
+def query_elements(
+    project_id: int,
+    body: ElementQueryRequest,
+    user: UserModel = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """
+    Filtre și group-by pe elementele ultimului IFC. Dacă modelul nu e încă
+    indexat, pune în coadă indexarea și returnează 202 cu job-ul.
+    """
+    if not get_project(db, project_id):
+        raise HTTPException(status_code=404, detail=f"Proiectul {project_id} nu exista.")
+    result = query_project_elements(
+        db, project_id,
+        ifc_type=body.ifc_type,
+        storey=body.storey,
+        discipline=body.discipline,
+        where=[c.model_dump() for c in body.where],
+        has=body.has,
+        missing=body.missing,
+        group_by=body.group_by,
+        limit=body.limit,
+    )
+    if result.get("store_missing"):
+        return JSONResponse(
+            status_code=202,
+            content={"detail": result["error"], "job": _enqueue_index(db, project_id, user, result["uploaded_file_id"])},
+        )
+    if "error" in result:
+        raise HTTPException(status_code=400, detail=result["error"])
+    return result
+
+
+@router.post("/projects/{project_id}/elements/index", status_code=202)
+def index_elements(
+    project_id: int,
+    user: UserModel = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """Pune în coadă (re)construirea store-ului de elemente pentru ultimul IFC."""
+    if not get_project(db, project_id):
+        raise HTTPException(status_code=404, detail=f"Proiectul {project_id} nu exista.")
+    return _enqueue_index(db, project_id, user)
@@ -0,0 +1,190 @@
+"""
+jobs.py — Router coadă de job-uri de fundal.
+
+POST /projects/{id}/jobs    — pune în coadă un job (generare/verificare/export), 202
+GET  /projects/{id}/jobs    — job-urile recente ale proiectului
+GET  /jobs/{id}             — status, progres, rezultat
+GET  /jobs/{id}/events      — SSE cu schimbările de status până la final
+POST /jobs/{id}/cancel      — anulare (imediată în coadă, cooperativă în execuție)
+GET  /jobs/{id}/download    — fișierul produs (ex: PDF conformitate)
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+from pathlib import Path
+
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import FileResponse, StreamingResponse
+from pydantic import BaseModel, Field
+from sqlalchemy import desc
+from sqlalchemy.orm import Session
+
+from app.db import SessionLocal, get_db
+from app.models.sql_models import JobModel, UserModel
+from app.repositories.projects_repository import get_project
+from app.services.sse import sse_event
+from app.services.auth import get_current_user
+from app.services.job_handlers import JOB_HANDLERS
+from app.services.job_queue import (
+    JOB_TERMINAL_STATUSES,
+    cancel_job,
+    enqueue_job,
+    job_to_dict,
+)
+
+router = APIRouter()
+
+# Cât de des verifică stream-ul SSE starea job-ului în DB
+JOB_EVENTS_POLL_SECONDS = float(os.getenv("JOB_EVENTS_POLL_SECONDS", "0.5"))
+
+
+class JobCreate(BaseModel):
+    job_type: str
+    payload: dict = Field(default_factory=dict)
+    priority: int = 100
+    max_attempts: int = Field(default=3, ge=1, le=10)
+
+
+def _get_job_or_404(db: Session, job_id: int) -> JobModel:
+    job = db.get(JobModel, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail=f"Job-ul {job_id} nu exista.")
+    return job
+
+
+@router.post("/projects/{project_id}/jobs", status_code=202)
+def create_job(
+    project_id: int,
+    body: JobCreate,
+    user: UserModel = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """Pune în coadă un job pentru proiect și returnează imediat id-ul."""
+    if not get_project(db, project_id):
+        raise HTTPException(status_code=404, detail=f"Proiectul {project_id} nu exista.")
+    if body.job_type not in JOB_HANDLERS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Tip de job necunoscut: {body.job_type}. Disponibile: {', '.join(JOB_HANDLERS)}",
+        )
+
+    job = enqueue_job(
+        db, body.job_type, body.payload,
+        project_id=project_id,
+        user_id=user.id,
+        priority=body.priority,
+        max_attempts=body.max_attempts,
+    )
+    db.commit()
+    return job_to_dict(job)
+
+
+@router.get("/projects/{project_id}/jobs")
+def list_project_jobs(
+    project_id: int,
+    limit: int = 50,
+    user: UserModel = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """Job-urile recente ale proiectului (cele mai noi primele)."""
+    jobs = (
+        db.query(JobModel)
+        .filter(JobModel.project_id == project_id)
+        .order_by(desc(JobModel.created_at), desc(JobModel.id))
+        .limit(limit)
+        .all()
+    )
+    return [job_to_dict(j) for j in jobs]
+
+
+@router.get("/jobs/{job_id}")
+def get_job(
+    job_id: int,
+    user: UserModel = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """Status, progres și rezultat pentru un job."""
+    return job_to_dict(_get_job_or_404(db, job_id))
+
+
+@router.post("/jobs/{job_id}/cancel")
+def cancel_job_endpoint(
+    job_id: int,
+    user: UserModel = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """Anulează un job; fără efect dacă s-a terminat deja."""
+    job = cancel_job(db, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail=f"Job-ul {job_id} nu exista.")
+    db.commit()
+    return job_to_dict(job)
+
+
+def _read_job(job_id: int) -> dict | None:
+    db = SessionLocal()
+    try:
+        job = db.get(JobModel, job_id)
+        return job_to_dict(job) if job else None
+    finally:
+        db.close()
+
+
+@router.get("/jobs/{job_id}/events")
+def job_events(
+    job_id: int,
+    user: UserModel = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """
+    SSE: emite `status` la fiecare schimbare (status, progres, încercări)
+    și `done` când job-ul ajunge într-o stare finală.
+    """
+    _get_job_or_404(db, job_id)
+
+    async def event_stream():
+        last_key = None
+        while True:
+            snapshot = await asyncio.to_thread(_read_job, job_id)
+            if snapshot is None:
+                yield sse_event("error", {"type": "error", "message": "Job șters."})
+                return
+            if snapshot["status"] in JOB_TERMINAL_STATUSES:
+                yield sse_event("done", {"type": "done", "job": snapshot})
+                return
+            key = (snapshot["status"], snapshot["attempts"], repr(snapshot["progress"]))
+            if key != last_key:
+                last_key = key
+                yield sse_event("status", {"type": "status", "job": snapshot})
+            await asyncio.sleep(JOB_EVENTS_POLL_SECONDS)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "Connection": "keep-alive",
+            "X-Accel-Buffering": "no",
+        },
+    )
+
+
+@router.get("/jobs/{job_id}/download")
+def download_job_output(
+    job_id: int,
+    user: UserModel = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """Descarcă fișierul produs de un job finalizat."""
+    job = _get_job_or_404(db, job_id)
+    result = job.result_json or {}
+    output_path = result.get("output_path")
+    if job.status != "succeeded" or not output_path or not Path(output_path).is_file():
+        raise HTTPException(status_code=404, detail="Job-ul nu are un fișier rezultat disponibil.")
+    return FileResponse(
+        output_path,
+        media_type=result.get("media_type", "application/octet-stream"),
+        filename=result.get("filename"),
+    )
@@ -2,13 +2,16 @@
 loin.py — Router LOIN Matrix (BS EN 17412-1).
 """
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import JSONResponse
 from sqlalchemy.orm import Session
 
 from app.db import get_db
 from app.models.sql_models import LoinEntryModel, UserModel
 from app.schemas.loin import LoinEntryCreate
 from app.services.auth import get_current_user
+from app.services.job_queue import enqueue_unique_job, job_to_dict
+from app.services.loin_compliance import check_project_loin_compliance
 from app.services.loin_generator import generate_loin_matrix, get_loin_matrix
 
 router = APIRouter()
@@ -36,6 +39,31 @@ def get_loin_endpoint(
     return get_loin_matrix(db, project_id)
 
 
+@router.get("/projects/{project_id}/loin/compliance")
+def loin_compliance_endpoint(
+    project_id: int,
+    phase: str | None = None,
+    user: UserModel = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """
+    Verifică ultimul IFC față de matricea LOIN: grad de completare per tip
+    și GlobalId-urile neconforme. Pentru un model neindexat pune în coadă
+    indexarea și returnează 202 cu job-ul.
+    """
+    result = check_project_loin_compliance(db, project_id, phase=phase)
+    if result.get("store_missing"):
+        job = enqueue_unique_job(
+            db, "build_element_store", {"uploaded_file_id": result["uploaded_file_id"]},
+            project_id=project_id, user_id=user.id, max_attempts=1,
+        )
+        db.commit()
+        return JSONResponse(status_code=202, content={"detail": result["error"], "job": job_to_dict(job)})
+    if "error" in result:
+        raise HTTPException(status_code=404, detail=result["error"])
+    return result
+
+
 @router.post("/projects/{project_id}/loin/entries")
 def add_loin_entry(
     project_id: int,
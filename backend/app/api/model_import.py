@@ -1,48 +1,80 @@
 """
 model_import.py — Endpoint pentru importul fișierelor IFC.
 
-Primește un fișier IFC, îl parsează cu ifcopenshell, persistă fișierul
-pe disc și salvează metadata + summary parsat în DB.
+Primește un fișier IFC, îl persistă în blob store-ul adresat prin conținut
+și pune în coadă un job `parse_ifc`: parsarea rulează într-un proces separat
+(limite de timp și memorie, vezi services/ifc_processing.py), iar summary-ul
+e salvat în DB la final. Progresul se urmărește prin GET /jobs/{id} sau
+/jobs/{id}/events. Un fișier deja parsat (același SHA-256) nu mai e parsat:
+summary-ul existent (produs de versiunea curentă a parserului) e reutilizat
+și job-ul e returnat direct finalizat (200).
+
+Descărcarea (GET /ifc-file) folosește ETag-uri din hash, Range și variante
+gzip/brotli precalculate de job-ul compress_ifc_blob (services/ifc_delivery.py).
+Tot la import, job-ul build_viewer_geometry scrie fragmentele glTF per
+disciplină (services/viewer_geometry.py), servite prin /viewer/manifest și
+/viewer/chunks/{disciplină}.glb: viewer-ul nu mai parsează IFC-ul în browser.
 """
 
 from __future__ import annotations
 
 import os
-import time
 from pathlib import Path
 
-from fastapi import APIRouter, Depends, File, HTTPException, UploadFile
-from fastapi.responses import FileResponse
+from fastapi import APIRouter, Depends, File, HTTPException, Request, Response, UploadFile
+from fastapi.responses import FileResponse, JSONResponse
 from sqlalchemy.orm import Session
 
 from app.db import get_db
-from app.models.sql_models import UserModel
+from app.models.sql_models import UploadedFileModel, UserModel
 from app.services.auth import get_current_user
 from app.repositories.projects_repository import (
+    find_parsed_upload_by_hash,
     get_latest_uploaded_file,
     get_project,
     save_uploaded_file,
 )
-from app.schemas.model_summary import ModelSummary
-from app.services.ifc_parser import generate_model_summary_from_ifc
+from app.services.ifc_delivery import choose_variant, content_etag, etag_matches, missing_variants
+from app.services.ifc_diff import DIFF_MAX_ITEMS, diff_project_revisions
+from app.services.ifc_geometry import file_sha256
+from app.services.ifc_parser import IFC_PARSER_VERSION, use_step_scanner
+from app.services.job_queue import (
+    enqueue_job,
+    enqueue_unique_job,
+    find_active_job,
+    job_to_dict,
+    record_completed_job,
+)
+from app.services.upload_storage import (
+    IFC_MAX_UPLOAD_MB,
+    UploadTooLargeError,
+    stream_upload_to_blob_store,
+)
+from app.services.viewer_geometry import (
+    VIEWER_GEOMETRY_VERSION,
+    load_viewer_manifest,
+    viewer_chunk_path,
+)
 
 router = APIRouter()
 
-UPLOAD_DIR = Path(__file__).resolve().parent.parent.parent / "data" / "uploads"
-
 
 @router.post(
     "/projects/{project_id}/import-ifc",
-    response_model=ModelSummary,
-    summary="Import IFC → ModelSummary automat",
+    status_code=202,
+    summary="Import IFC → job de parsare (ModelSummary în rezultat)",
 )
 async def api_import_ifc(
     project_id: int,
     file: UploadFile = File(...),
     db: Session = Depends(get_db),
-    _user: UserModel = Depends(get_current_user),
-) -> ModelSummary:
-    """Primește un fișier .ifc, parsează conținutul, persistă și returnează ModelSummary."""
+    user: UserModel = Depends(get_current_user),
+):
+    """
+    Primește un fișier .ifc, îl persistă și returnează imediat job-ul de parsare.
+
+    La final, `result.summary` al job-ului conține ModelSummary.
+    """
 
     # 1. Verifică proiectul
     project = get_project(db, project_id)
@@ -57,31 +89,125 @@ async def api_import_ifc(
             detail="Fișierul trebuie să aibă extensia .ifc",
         )
 
-    # 3. Salvează persistent
-    UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
-    timestamp = int(time.time() * 1000)
-    saved_path = UPLOAD_DIR / f"{project_id}_{timestamp}_{filename}"
+    # 3. Salvează în blob store (în flux, o singură copie per conținut)
+    try:
+        stored = await stream_upload_to_blob_store(
+            file, suffix=".ifc", max_bytes=IFC_MAX_UPLOAD_MB * 1024 * 1024,
+        )
+    except UploadTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
 
-    content = await file.read()
-    saved_path.write_bytes(content)
-    file_size = len(content)
+    payload = {
+        "filename": filename,
+        "file_path": str(stored.path),
+        "file_size_bytes": stored.size_bytes,
+        "content_sha256": stored.sha256,
+    }
+
+    # Variantele comprimate pentru viewer (gzip/brotli), o singură dată per blob
+    if missing_variants(stored.path):
+        enqueue_job(
+            db, "compress_ifc_blob", {"file_path": str(stored.path)},
+            project_id=project_id,
+            user_id=user.id,
+            priority=50,
+        )
+    # Geometria glTF a viewer-ului (teselare), după parsare; nu și pentru
+    # modelele care depășesc pragul de încărcare în memorie
+    if (
+        load_viewer_manifest(stored.sha256) is None
+        and not use_step_scanner(stored.path)
+        and find_active_job(
+            db, "build_viewer_geometry",
+            project_id=project_id, payload_match={"content_sha256": stored.sha256},
+        ) is None
+    ):
+        enqueue_job(
+            db, "build_viewer_geometry",
+            {"file_path": str(stored.path), "content_sha256": stored.sha256},
+            project_id=project_id,
+            user_id=user.id,
+            priority=30,
+            max_attempts=1,
+        )
 
-    # 4. Parsează
-    summary = generate_model_summary_from_ifc(str(saved_path))
+    # 4. Același conținut parsat deja → reutilizăm summary-ul, fără job în coadă
+    existing = find_parsed_upload_by_hash(db, stored.sha256, "ifc", IFC_PARSER_VERSION)
+    if existing is not None:
+        uploaded = save_uploaded_file(
+            db,
+            project_id=project_id,
+            filename=filename,
+            file_path=str(stored.path),
+            file_type="ifc",
+            file_size_bytes=stored.size_bytes,
+            parsed_summary_json=existing.parsed_summary_json,
+            content_sha256=stored.sha256,
+            parser_version=IFC_PARSER_VERSION,
+        )
+        job = record_completed_job(
+            db, "parse_ifc", payload,
+            {
+                "success": True,
+                "uploaded_file_id": uploaded.id,
+                "summary": existing.parsed_summary_json,
+                "reused_from": existing.id,
+            },
+            project_id=project_id,
+            user_id=user.id,
+        )
+        db.commit()
+        return JSONResponse(job_to_dict(job), status_code=200)
 
-    # 5. Persistă metadata + summary în DB
-    save_uploaded_file(
-        db,
+    # 5. Parsarea (și salvarea summary-ului) rulează în coadă, în afara API-ului.
+    # O singură încercare: un fișier care depășește limitele le va depăși din nou.
+    job = enqueue_job(
+        db, "parse_ifc", payload,
         project_id=project_id,
-        filename=filename,
-        file_path=str(saved_path),
-        file_type="ifc",
-        file_size_bytes=file_size,
-        parsed_summary_json=summary.model_dump(mode="json"),
+        user_id=user.id,
+        priority=10,
+        max_attempts=1,
     )
     db.commit()
 
-    return summary
+    return job_to_dict(job)
+
+
+def _ensure_content_hash(db: Session, uploaded: UploadedFileModel) -> None:
+    if not uploaded.content_sha256:
+        # Upload anterior deduplicării: hash-ul e calculat o dată și salvat
+        uploaded.content_sha256 = file_sha256(uploaded.file_path)
+        db.commit()
+
+
+def _cached_file_response(
+    request: Request,
+    file_path: Path,
+    etag_key: str,
+    *,
+    filename: str,
+    media_type: str = "application/octet-stream",
+    allow_encoded: bool = True,
+) -> Response:
+    """
+    Fișier cu ETag puternic (If-None-Match → 304), Range (FileResponse) și
+    varianta gzip/brotli precalculată aleasă după Accept-Encoding.
+    """
+    if allow_encoded:
+        path, encoding = choose_variant(file_path, request.headers.get("accept-encoding"))
+    else:
+        path, encoding = file_path, None
+    headers = {
+        "ETag": content_etag(etag_key, encoding),
+        # Revalidare la fiecare deschidere: un model nou are alt ETag
+        "Cache-Control": "private, no-cache",
+        "Vary": "Accept-Encoding",
+    }
+    if etag_matches(request.headers.get("if-none-match"), headers["ETag"]):
+        return Response(status_code=304, headers=headers)
+    if encoding:
+        headers["Content-Encoding"] = encoding
+    return FileResponse(path=str(path), filename=filename, media_type=media_type, headers=headers)
 
 
 @router.get(
@@ -90,10 +216,16 @@ async def api_import_ifc(
 )
 def api_get_ifc_file(
     project_id: int,
+    request: Request,
     db: Session = Depends(get_db),
     _user: UserModel = Depends(get_current_user),
 ):
-    """Returnează fișierul IFC binar al proiectului (cel mai recent upload)."""
+    """
+    Returnează fișierul IFC binar al proiectului (cel mai recent upload).
+
+    ETag = hash-ul conținutului (If-None-Match → 304), Range pentru încărcare
+    progresivă și variantele gzip/brotli precalculate, după Accept-Encoding.
+    """
     project = get_project(db, project_id)
     if not project:
         raise HTTPException(status_code=404, detail="Proiectul nu a fost găsit.")
@@ -106,10 +238,97 @@ def api_get_ifc_file(
     if not file_path.exists():
         raise HTTPException(status_code=404, detail="Fișierul IFC nu a fost găsit pe disc.")
 
-    return FileResponse(
-        path=str(file_path),
-        filename=uploaded.filename,
-        media_type="application/octet-stream",
+    _ensure_content_hash(db, uploaded)
+    # Range cere octeții blob-ului necomprimat
+    return _cached_file_response(
+        request, file_path, uploaded.content_sha256,
+        filename=uploaded.filename, allow_encoded=not request.headers.get("range"),
+    )
+
+
+@router.get(
+    "/projects/{project_id}/viewer/manifest",
+    summary="Fragmentele glTF precalculate ale viewer-ului 3D",
+)
+def api_get_viewer_manifest(
+    project_id: int,
+    db: Session = Depends(get_db),
+    user: UserModel = Depends(get_current_user),
+):
+    """
+    Manifestul geometriei viewer-ului pentru ultimul IFC: fragmentele .glb per
+    disciplină, cu URL-urile lor. Dacă nu sunt încă generate, pune în coadă
+    job-ul (sau îl refolosește pe cel în curs pentru același hash) și
+    returnează 202 cu el. Modelele peste pragul de încărcare în memorie nu
+    sunt teselate: 409.
+    """
+    project = get_project(db, project_id)
+    if not project:
+        raise HTTPException(status_code=404, detail="Proiectul nu a fost găsit.")
+
+    uploaded = get_latest_uploaded_file(db, project_id, "ifc")
+    if not uploaded:
+        raise HTTPException(status_code=404, detail="Nu există fișier IFC pentru acest proiect.")
+    if not Path(uploaded.file_path).exists():
+        raise HTTPException(status_code=404, detail="Fișierul IFC nu a fost găsit pe disc.")
+
+    _ensure_content_hash(db, uploaded)
+    manifest = load_viewer_manifest(uploaded.content_sha256)
+    if manifest is None:
+        if use_step_scanner(uploaded.file_path):
+            raise HTTPException(
+                status_code=409,
+                detail="Modelul depășește pragul de încărcare în memorie: geometria viewer-ului nu se generează.",
+            )
+        job = find_active_job(
+            db, "build_viewer_geometry",
+            project_id=project_id, payload_match={"content_sha256": uploaded.content_sha256},
+        )
+        if job is None:
+            job = enqueue_job(
+                db, "build_viewer_geometry",
+                {"file_path": uploaded.file_path, "content_sha256": uploaded.content_sha256},
+                project_id=project_id, user_id=user.id, max_attempts=1,
+            )
+            db.commit()
+        return JSONResponse(
+            status_code=202,
+            content={"detail": "Geometria viewer-ului se generează.", "job": job_to_dict(job)},
+        )
+
+    return {
+        **manifest,
+        "uploaded_file_id": uploaded.id,
+        "chunks": [
+            {**chunk, "url": f"/api/projects/{project_id}/viewer/chunks/{chunk['file']}"}
+            for chunk in manifest["chunks"]
+        ],
+    }
+
+
+@router.get(
+    "/projects/{project_id}/viewer/chunks/{discipline}.glb",
+    summary="Fragment glTF (disciplină) al viewer-ului 3D",
+)
+def api_get_viewer_chunk(
+    project_id: int,
+    discipline: str,
+    request: Request,
+    db: Session = Depends(get_db),
+    _user: UserModel = Depends(get_current_user),
+):
+    """Fragmentul .glb al unei discipline din ultimul IFC (ETag, gzip/brotli)."""
+    uploaded = get_latest_uploaded_file(db, project_id, "ifc")
+    chunk = (
+        viewer_chunk_path(uploaded.content_sha256, discipline)
+        if uploaded is not None and uploaded.content_sha256 else None
+    )
+    if chunk is None:
+        raise HTTPException(status_code=404, detail="Fragmentul de geometrie nu a fost găsit.")
+
+    return _cached_file_response(
+        request, chunk, f"{uploaded.content_sha256}-{discipline}-v{VIEWER_GEOMETRY_VERSION}",
+        filename=chunk.name, media_type="model/gltf-binary",
     )
 
 
@@ -138,3 +357,47 @@ def api_get_ifc_info(
         "uploaded_at": uploaded.created_at.isoformat() if uploaded.created_at else None,
         "summary": uploaded.parsed_summary_json,
     }
+
+
+@router.get(
+    "/projects/{project_id}/ifc-diff",
+    summary="Diff între două revizii IFC",
+)
+def api_get_ifc_diff(
+    project_id: int,
+    from_file_id: int | None = None,
+    to_file_id: int | None = None,
+    max_items: int = DIFF_MAX_ITEMS,
+    db: Session = Depends(get_db),
+    user: UserModel = Depends(get_current_user),
+):
+    """
+    Elemente adăugate / șterse / modificate (după GlobalId) între două upload-uri
+    IFC; implicit ultimul față de penultimul. Dacă o revizie nu e încă indexată,
+    pune în coadă indexarea și returnează 202 cu job-urile.
+    """
+    project = get_project(db, project_id)
+    if not project:
+        raise HTTPException(status_code=404, detail="Proiectul nu a fost găsit.")
+
+    result = diff_project_revisions(
+        db, project_id,
+        from_file_id=from_file_id, to_file_id=to_file_id,
+        max_items=max(1, min(max_items, 5000)),
+    )
+    if result.get("store_missing"):
+        jobs = [
+            enqueue_unique_job(
+                db, "build_element_store", {"uploaded_file_id": file_id},
+                project_id=project_id, user_id=user.id, max_attempts=1,
+            )
+            for file_id in result["missing_uploaded_file_ids"]
+        ]
+        db.commit()
+        return JSONResponse(
+            status_code=202,
+            content={"detail": result["error"], "jobs": [job_to_dict(j) for j in jobs]},
+        )
+    if "error" in result:
+        raise HTTPException(status_code=404, detail=result["error"])
+    return result
@@ -0,0 +1,68 @@
+"""
+benchmark_vectors.py — Paritate și latență: index vectorial NumPy vs ChromaDB.
+
+Rulare:  python -m app.benchmark_vectors [--queries N] [--k 10] [--seed 0]
+
+Interogările sunt embedding-uri ale unor fragmente alese aleator din
+colecția `bim_knowledge` (fără model de embedding). Raportează recall@k al
+indexului NumPy (chroma_db/vectors) față de ChromaDB, acordul pe primul
+rezultat, latențele per interogare și timpii de încărcare. Indexul NumPy se
+(re)generează cu: python bim_ingest.py --vectors
+"""
+
+import argparse
+import json
+import logging
+import time
+
+import numpy as np
+
+from app.services.standards_search import _CHROMA_DB_PATH, _VECTOR_INDEX_PATH
+from app.services.vector_index import load_vector_index, parity_report
+
+logger = logging.getLogger(__name__)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Agent BIM — paritate index vectorial NumPy vs ChromaDB")
+    parser.add_argument("--queries", type=int, default=200, help="număr de interogări eșantionate")
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s %(levelname)s %(name)s: %(message)s",
+    )
+    import chromadb
+
+    started = time.perf_counter()
+    collection = chromadb.PersistentClient(path=_CHROMA_DB_PATH).get_collection("bim_knowledge")
+    # Prima interogare încarcă indexul HNSW în memorie
+    first = collection.get(limit=1, include=["embeddings"])["embeddings"]
+    collection.query(query_embeddings=[list(first[0])], n_results=1)
+    chroma_load_ms = (time.perf_counter() - started) * 1000
+
+    started = time.perf_counter()
+    index = load_vector_index(_VECTOR_INDEX_PATH)
+    if index is None:
+        raise SystemExit(f"Indexul NumPy lipsește din {_VECTOR_INDEX_PATH}. Rulează: python bim_ingest.py --vectors")
+    numpy_load_ms = (time.perf_counter() - started) * 1000
+
+    ids = collection.get(include=[])["ids"]
+    rng = np.random.default_rng(args.seed)
+    sample = rng.choice(len(ids), size=min(args.queries, len(ids)), replace=False)
+    embeddings = collection.get(ids=[ids[i] for i in sample], include=["embeddings"])["embeddings"]
+
+    report = parity_report(collection, index, np.asarray(embeddings), n_results=args.k)
+    report.update({
+        "documents": index.count(),
+        "numpy_dtype": index.dtype,
+        "chroma_load_ms": round(chroma_load_ms, 1),
+        "numpy_load_ms": round(numpy_load_ms, 1),
+    })
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
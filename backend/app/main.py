@@ -4,6 +4,7 @@ Punct de intrare principal. Configurare CORS, rutare, healthcheck.
 """
 
 import logging
+import os
 from contextlib import asynccontextmanager
 from pathlib import Path
 
@@ -40,8 +41,22 @@ async def lifespan(app: FastAPI):
     from app.services.standards_search import warmup
     warmup()
 
+    # Worker in-process pentru coada de job-uri (dezactivează cu
+    # JOB_WORKER_INPROCESS=false când rulează separat `python -m app.worker`)
+    worker = None
+    if os.getenv("JOB_WORKER_INPROCESS", "true").lower() in ("1", "true", "yes"):
+        from app.services.job_queue import JobWorker
+        worker = JobWorker()
+        worker.start()
+
     yield
 
+    if worker is not None:
+        worker.stop()
+
+    from app.services.ifc_processing import shutdown_pool
+    shutdown_pool()
+
 
 app = FastAPI(
     title="Agent BIM Romania API",
@@ -73,6 +88,13 @@ def healthcheck():
     return {"status": "ok", "service": "agent-bim-romania"}
 
 
+@app.get("/healthcheck/llm")
+def healthcheck_llm():
+    """Metrici limitator LLM: apeluri în curs, adâncime coadă, timpi de așteptare."""
+    from app.ai_client import get_llm_metrics
+    return get_llm_metrics()
+
+
 # ── Routere ───────────────────────────────────────────────────────────────────
 from app.api import auth  # noqa: E402
 from app.api import projects  # noqa: E402
@@ -95,6 +117,8 @@ from app.api import kpis  # noqa: E402
 from app.api import compliance  # noqa: E402
 from app.api import cobie  # noqa: E402
 from app.api import notifications  # noqa: E402
+from app.api import jobs  # noqa: E402
+from app.api import elements  # noqa: E402
 
 app.include_router(auth.router, prefix="/api", tags=["Auth"])
 app.include_router(projects_dashboard.router, prefix="/api", tags=["Projects Dashboard"])
@@ -117,3 +141,5 @@ app.include_router(kpis.router, prefix="/api", tags=["KPI Tracking"])
 app.include_router(compliance.router, prefix="/api", tags=["ISO Compliance"])
 app.include_router(cobie.router, prefix="/api", tags=["COBie Validator"])
 app.include_router(notifications.router, prefix="/api", tags=["Notifications"])
+app.include_router(jobs.router, prefix="/api", tags=["Background Jobs"])
+app.include_router(elements.router, prefix="/api", tags=["Model Elements"])
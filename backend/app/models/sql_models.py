@@ -5,7 +5,8 @@ Tabele: projects, project_contexts, generated_documents,
         agent_conversations, agent_messages, document_states,
         document_approvals, eir_documents, deliverables,
         raci_entries, loin_entries, handover_items,
-        security_classifications, clash_records, kpi_measurements.
+        security_classifications, clash_records, kpi_measurements,
+        clash_runs, cobie_validations, notifications, llm_response_cache, jobs.
 """
 
 from __future__ import annotations
@@ -137,6 +138,10 @@ class UploadedFileModel(Base):
     file_type: Mapped[str] = mapped_column(String(20), nullable=False, default="ifc")
     file_size_bytes: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
     parsed_summary_json: Mapped[Optional[dict]] = mapped_column(_JsonType, nullable=True)
+    # SHA-256 al conținutului: cheia blob-ului și a reutilizării summary-ului
+    content_sha256: Mapped[Optional[str]] = mapped_column(String(64), nullable=True)
+    # Versiunea parserului IFC care a produs summary-ul (None = necunoscută, de reindexat)
+    parser_version: Mapped[Optional[str]] = mapped_column(String(32), nullable=True)
     created_at: Mapped[datetime.datetime] = mapped_column(
         DateTime(timezone=True), server_default=func.now()
     )
@@ -145,6 +150,7 @@ class UploadedFileModel(Base):
 
     __table_args__ = (
         Index("ix_uploaded_files_project_type", "project_id", "file_type"),
+        Index("ix_uploaded_files_hash_type", "content_sha256", "file_type"),
     )
 
 
@@ -431,6 +437,14 @@ class ClashRecordModel(Base):
     status: Mapped[str] = mapped_column(String(20), nullable=False, default="open")
     assigned_to_role: Mapped[Optional[str]] = mapped_column(String(50), nullable=True)
     resolution_note: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    # "manual" | "detected" (motorul geometric din clash_detection.py)
+    source: Mapped[str] = mapped_column(String(20), nullable=False, default="manual", server_default="manual")
+    element_a_guid: Mapped[Optional[str]] = mapped_column(String(64), nullable=True)
+    element_b_guid: Mapped[Optional[str]] = mapped_column(String(64), nullable=True)
+    element_a_type: Mapped[Optional[str]] = mapped_column(String(100), nullable=True)
+    element_b_type: Mapped[Optional[str]] = mapped_column(String(100), nullable=True)
+    # {"x", "y", "z", "kind", "overlap_volume_m3"}
+    location_json: Mapped[Optional[dict]] = mapped_column(_JsonType, nullable=True)
     created_at: Mapped[datetime.datetime] = mapped_column(
         DateTime(timezone=True), server_default=func.now()
     )
@@ -442,9 +456,33 @@ class ClashRecordModel(Base):
 
     __table_args__ = (
         Index("ix_clash_records_project_status", "project_id", "status"),
+        Index("ix_clash_records_project_source", "project_id", "source"),
     )
 
 
+class ClashRunModel(Base):
+    """O rulare a detecției geometrice: revizia analizată și statistici."""
+    __tablename__ = "clash_runs"
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    project_id: Mapped[int] = mapped_column(
+        ForeignKey("projects.id", ondelete="CASCADE"), index=True
+    )
+    uploaded_file_id: Mapped[Optional[int]] = mapped_column(
+        ForeignKey("uploaded_files.id", ondelete="SET NULL"), nullable=True
+    )
+    content_sha256: Mapped[str] = mapped_column(String(64), nullable=False)
+    tolerance_m: Mapped[float] = mapped_column(Float, nullable=False)
+    discipline_pairs_json: Mapped[Optional[list]] = mapped_column(_JsonType, nullable=True)
+    mode: Mapped[str] = mapped_column(String(20), nullable=False)  # full | incremental
+    stats_json: Mapped[Optional[dict]] = mapped_column(_JsonType, nullable=True)
+    created_at: Mapped[datetime.datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now()
+    )
+
+    project: Mapped[ProjectModel] = relationship()
+
+
 class KpiMeasurementModel(Base):
     """Măsurare KPI proiect BIM."""
     __tablename__ = "kpi_measurements"
@@ -534,3 +572,77 @@ class NotificationModel(Base):
 
     user: Mapped[UserModel] = relationship()
     project: Mapped[Optional[ProjectModel]] = relationship()
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# Cache răspunsuri LLM (generatoare deterministe: EIR, RACI, LOIN, TIDP, ...)
+# ══════════════════════════════════════════════════════════════════════════════
+
+
+class LlmResponseCacheModel(Base):
+    """Răspuns Claude cache-uit, adresat prin hash-ul cererii (model, prompt-uri, max_tokens)."""
+    __tablename__ = "llm_response_cache"
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    cache_key: Mapped[str] = mapped_column(String(64), nullable=False, unique=True, index=True)
+    model: Mapped[str] = mapped_column(String(100), nullable=False)
+    response_text: Mapped[str] = mapped_column(Text, nullable=False)
+    hit_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    created_at: Mapped[datetime.datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now()
+    )
+    last_used_at: Mapped[datetime.datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False, index=True
+    )
+    expires_at: Mapped[datetime.datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False, index=True
+    )
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# Coadă de job-uri durabilă (generare/verificare în afara request-ului HTTP)
+# ══════════════════════════════════════════════════════════════════════════════
+
+
+class JobModel(Base):
+    """Job de fundal persistat în DB, preluat de un worker (in-process sau `python -m app.worker`)."""
+    __tablename__ = "jobs"
+    __table_args__ = (
+        Index("ix_jobs_claim", "status", "priority", "run_after"),
+    )
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    job_type: Mapped[str] = mapped_column(String(50), nullable=False)
+    project_id: Mapped[Optional[int]] = mapped_column(
+        ForeignKey("projects.id", ondelete="CASCADE"), nullable=True, index=True
+    )
+    user_id: Mapped[Optional[int]] = mapped_column(
+        ForeignKey("users.id", ondelete="SET NULL"), nullable=True
+    )
+    status: Mapped[str] = mapped_column(
+        String(20), nullable=False, default="queued"
+    )  # "queued" | "running" | "succeeded" | "failed" | "cancelled"
+    priority: Mapped[int] = mapped_column(Integer, nullable=False, default=100)  # mai mic = mai urgent
+    payload_json: Mapped[Optional[dict]] = mapped_column(_JsonType, nullable=True)
+    result_json: Mapped[Optional[dict]] = mapped_column(_JsonType, nullable=True)
+    progress_json: Mapped[Optional[dict]] = mapped_column(_JsonType, nullable=True)
+    error: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    attempts: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    max_attempts: Mapped[int] = mapped_column(Integer, nullable=False, default=3)
+    cancel_requested: Mapped[bool] = mapped_column(Boolean, nullable=False, default=False)
+    locked_by: Mapped[Optional[str]] = mapped_column(String(100), nullable=True)
+    run_after: Mapped[datetime.datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False
+    )
+    heartbeat_at: Mapped[Optional[datetime.datetime]] = mapped_column(
+        DateTime(timezone=True), nullable=True
+    )
+    created_at: Mapped[datetime.datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now()
+    )
+    started_at: Mapped[Optional[datetime.datetime]] = mapped_column(
+        DateTime(timezone=True), nullable=True
+    )
+    finished_at: Mapped[Optional[datetime.datetime]] = mapped_column(
+        DateTime(timezone=True), nullable=True
+    )
@@ -0,0 +1,54 @@
+"""
+reindex_ifc.py — Reindexează modelele IFC stocate după o schimbare a parserului.
+
+Rulare:  python -m app.reindex_ifc [--workers N] [--force]
+
+Reprocesează doar conținuturile al căror summary / store de elemente a fost
+produs de altă versiune a parserului (vezi services/ifc_reindex.py); --force
+le reprocesează pe toate.
+"""
+
+import argparse
+import logging
+
+from app.db import SessionLocal
+from app.main import _run_migrations
+from app.services.ifc_reindex import reindex_ifc_models
+
+logger = logging.getLogger(__name__)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Agent BIM — reindexare modele IFC")
+    parser.add_argument(
+        "--workers", type=int, default=None,
+        help="procese de parsare (implicit: nucleele, plafonate de memoria disponibilă)",
+    )
+    parser.add_argument("--force", action="store_true", help="reprocesează toate modelele")
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s %(levelname)s %(name)s: %(message)s",
+    )
+    _run_migrations()
+
+    db = SessionLocal()
+    try:
+        result = reindex_ifc_models(
+            db,
+            workers=args.workers,
+            force=args.force,
+            on_progress=lambda p: logger.info(f"{p['done']}/{p['total']} modele ({p['failed']} eșuate)"),
+        )
+    finally:
+        db.close()
+    logger.info(
+        f"Parser {result['parser_version']}: {result['reindexed']} modele reindexate "
+        f"({result['uploads_updated']} upload-uri), {result['failed']} eșuate, "
+        f"{result['missing_files']} fără fișier pe disc, în {result['duration_ms']} ms"
+    )
+
+
+if __name__ == "__main__":
+    main()
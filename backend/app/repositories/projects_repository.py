@@ -159,6 +159,17 @@ def get_latest_generated_document(
     )
 
 
+def append_generated_document_content(
+    db: Session, document_id: int, chunk: str
+) -> GeneratedDocumentModel | None:
+    """Adaugă text la finalul unui document (persistență incrementală draft)."""
+    doc = db.get(GeneratedDocumentModel, document_id)
+    if doc:
+        doc.content_markdown = (doc.content_markdown or "") + chunk
+        db.flush()
+    return doc
+
+
 def list_generated_documents(
     db: Session, project_id: int
 ) -> list[GeneratedDocumentModel]:
@@ -196,6 +207,8 @@ def save_uploaded_file(
     file_type: str = "ifc",
     file_size_bytes: int | None = None,
     parsed_summary_json: dict | None = None,
+    content_sha256: str | None = None,
+    parser_version: str | None = None,
 ) -> UploadedFileModel:
     """Salvează metadata unui fișier uploadat."""
     entry = UploadedFileModel(
@@ -205,12 +218,35 @@ def save_uploaded_file(
         file_type=file_type,
         file_size_bytes=file_size_bytes,
         parsed_summary_json=parsed_summary_json,
+        content_sha256=content_sha256,
+        parser_version=parser_version,
     )
     db.add(entry)
     db.flush()
     return entry
 
 
+def find_parsed_upload_by_hash(
+    db: Session, content_sha256: str, file_type: str = "ifc", parser_version: str | None = None
+) -> UploadedFileModel | None:
+    """
+    Cel mai recent upload (din orice proiect) cu același conținut și summary
+    parsat — cu parser_version, doar unul produs de acea versiune a parserului.
+    """
+    candidates = (
+        db.query(UploadedFileModel)
+        .filter(
+            UploadedFileModel.content_sha256 == content_sha256,
+            UploadedFileModel.file_type == file_type,
+        )
+        .order_by(UploadedFileModel.created_at.desc(), UploadedFileModel.id.desc())
+    )
+    if parser_version is not None:
+        candidates = candidates.filter(UploadedFileModel.parser_version == parser_version)
+    # None explicit se salvează ca JSON null, deci filtrăm în Python
+    return next((c for c in candidates if c.parsed_summary_json), None)
+
+
 def get_latest_uploaded_file(
     db: Session, project_id: int, file_type: str = "ifc"
 ) -> UploadedFileModel | None:
@@ -221,7 +257,37 @@ def get_latest_uploaded_file(
             UploadedFileModel.project_id == project_id,
             UploadedFileModel.file_type == file_type,
         )
-        .order_by(desc(UploadedFileModel.created_at))
+        .order_by(desc(UploadedFileModel.created_at), desc(UploadedFileModel.id))
+        .first()
+    )
+
+
+def list_uploaded_files(
+    db: Session, project_id: int, file_type: str = "ifc", limit: int = 20
+) -> list[UploadedFileModel]:
+    """Returnează ultimele N fișiere uploadate de un tip (cele mai noi primele)."""
+    return (
+        db.query(UploadedFileModel)
+        .filter(
+            UploadedFileModel.project_id == project_id,
+            UploadedFileModel.file_type == file_type,
+        )
+        .order_by(desc(UploadedFileModel.created_at), desc(UploadedFileModel.id))
+        .limit(limit)
+        .all()
+    )
+
+
+def get_uploaded_file(
+    db: Session, project_id: int, uploaded_file_id: int
+) -> UploadedFileModel | None:
+    """Returnează un fișier uploadat al proiectului după ID."""
+    return (
+        db.query(UploadedFileModel)
+        .filter(
+            UploadedFileModel.project_id == project_id,
+            UploadedFileModel.id == uploaded_file_id,
+        )
         .first()
     )
 
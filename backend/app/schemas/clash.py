@@ -34,6 +34,12 @@ class ClashRecordRead(BaseModel):
     status: str
     assigned_to_role: str | None = None
     resolution_note: str | None = None
+    source: str = "manual"
+    element_a_guid: str | None = None
+    element_b_guid: str | None = None
+    element_a_type: str | None = None
+    element_b_type: str | None = None
+    location: dict | None = None
     created_at: str
     resolved_at: str | None = None
 
@@ -45,3 +51,11 @@ class ClashSummary(BaseModel):
     resolved: int = 0
     by_severity: dict[str, int] = {}
     by_discipline_pair: list[dict] = []
+
+
+class ClashDetectionRequest(BaseModel):
+    """Parametri detecție geometrică (toleranță în metri)."""
+    tolerance_m: float | None = None
+    discipline_pairs: list[tuple[str, str]] | None = None
+    # False forțează o rulare completă, fără diff față de revizia anterioară
+    incremental: bool = True
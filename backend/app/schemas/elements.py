@@ -0,0 +1,26 @@
+"""
+elements.py — Scheme Pydantic pentru interogarea elementelor modelului IFC.
+"""
+
+from __future__ import annotations
+
+from pydantic import BaseModel, Field
+
+
+class ElementCondition(BaseModel):
+    """Condiție pe o proprietate („Pset.Prop” sau doar „Prop”)."""
+    property: str
+    op: str = "="  # =, !=, >, >=, <, <=, contains
+    value: str | float | bool | None = None
+
+
+class ElementQueryRequest(BaseModel):
+    """Filtre (combinate cu ȘI) + group-by opțional."""
+    ifc_type: str | None = None  # include subtipurile (IfcWall → IfcWallStandardCase)
+    storey: str | None = None
+    discipline: str | None = None
+    where: list[ElementCondition] = []
+    has: list[str] = []
+    missing: list[str] = []
+    group_by: str | None = None  # ifc_type, storey, discipline, name sau o proprietate
+    limit: int = Field(default=100, ge=1, le=5000)
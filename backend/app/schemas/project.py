@@ -60,7 +60,7 @@ class GeneratedDocumentRead(BaseModel):
     id: int
     project_id: int
     doc_type: Literal[
-        "bep", "lod_matrix", "eir", "checklist",
+        "bep", "bep_draft", "lod_matrix", "eir", "checklist",
         "minutes", "bep_verification_report"
     ]
     title: str
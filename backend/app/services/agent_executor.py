@@ -2,8 +2,12 @@
 agent_executor.py — Agent loop cu Claude tool_use API + SSE streaming.
 
 Flux:
-  mesaj user → Claude API cu tools → execuție tool-uri → loop
+  mesaj user → Claude API (streaming) cu tools → execuție tool-uri → loop
   → SSE events yield până la stop_reason="end_turn"
+
+Textul și argumentele tool-urilor sunt transmise token cu token; un tool
+pornește imediat ce block-ul său tool_use se închide în stream, fără a
+aștepta finalul turei.
 """
 
 from __future__ import annotations
@@ -11,15 +15,22 @@ from __future__ import annotations
 import asyncio
 import json
 import logging
+import os
 import time
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, field
 from typing import AsyncGenerator
 
 from sqlalchemy.orm import Session
 
-from app.ai_client import _get_client, MODEL
-from app.services.agent_prompts import build_system_prompt
-from app.services.agent_tools import AGENT_TOOLS, execute_tool
+from app.ai_client import _get_async_client, _limiter, MODEL
+from app.services.agent_prompts import build_system_blocks
+from app.services.agent_tools import (
+    AGENT_TOOLS,
+    READ_ONLY_TOOLS,
+    execute_tool,
+    execute_tool_isolated,
+)
 from app.repositories.projects_repository import (
     get_project,
     get_latest_project_context,
@@ -28,22 +39,41 @@ from app.repositories.projects_repository import (
     list_verification_reports,
 )
 from app.schemas.converters import project_model_to_read
+from app.services.sse import sse_event
 
 logger = logging.getLogger(__name__)
 
 MAX_AGENT_TURNS = 10  # limită de siguranță pentru loop-ul agentului
 
+# Pool dedicat pentru tool-urile read-only rulate concurent (sesiune DB proprie)
+_TOOL_POOL = ThreadPoolExecutor(
+    max_workers=int(os.getenv("AGENT_TOOL_WORKERS", "4")),
+    thread_name_prefix="agent-tool",
+)
+
+
+# Prompt caching: breakpoint pe ultimul tool → întregul bloc AGENT_TOOLS
+# (static) e servit din cache la fiecare tură.
+_CACHE_CONTROL = {"type": "ephemeral"}
+_CACHED_TOOLS: list[dict] = [
+    *AGENT_TOOLS[:-1],
+    {**AGENT_TOOLS[-1], "cache_control": _CACHE_CONTROL},
+]
+
+_USAGE_KEYS = (
+    "input_tokens",
+    "output_tokens",
+    "cache_creation_input_tokens",
+    "cache_read_input_tokens",
+)
+
 
 @dataclass
 class AgentResult:
     """Rezultatul colectat din run_agent() pentru persistență."""
     final_text: str = ""
     tool_steps: list[dict] = field(default_factory=list)
-
-
-def _sse_event(event_type: str, data: dict) -> str:
-    """Formatează un SSE event."""
-    return f"event: {event_type}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+    usage: dict = field(default_factory=dict)
 
 
 def _build_messages(
@@ -64,6 +94,24 @@ def _build_messages(
     return messages
 
 
+def _with_history_breakpoint(messages: list[dict]) -> list[dict]:
+    """
+    Copie a mesajelor cu breakpoint de cache pe ultimul block, astfel încât
+    prefixul conversației (istoric + ture anterioare) e citit din cache la tura
+    următoare. Lista originală nu e modificată, deci rămâne un singur breakpoint.
+    """
+    if not messages:
+        return messages
+    last = messages[-1]
+    content = last["content"]
+    if isinstance(content, str):
+        content = [{"type": "text", "text": content}]
+    else:
+        content = list(content)
+    content[-1] = {**content[-1], "cache_control": _CACHE_CONTROL}
+    return [*messages[:-1], {**last, "content": content}]
+
+
 def _build_context_summary(db: Session, project_id: int) -> dict | None:
     """Construiește un sumar de context pentru system prompt."""
     summary: dict = {}
@@ -127,9 +175,11 @@ async def run_agent(
     Rulează agentul BIM și yield-uiește SSE events.
 
     SSE event types:
-    - tool_call: agentul a decis să apeleze un tool
+    - tool_call_start: a început un block tool_use (nume tool, call_id)
+    - tool_input_delta: fragment JSON din argumentele tool-ului (partial_json)
+    - tool_call: argumentele sunt complete, tool-ul pornește
     - tool_result: rezultatul execuției tool-ului
-    - text_delta: text de răspuns de la agent
+    - text_delta: fragment de text de răspuns de la agent
     - error: eroare
     - done: agentul a terminat
 
@@ -151,70 +201,146 @@ async def run_agent(
         project_info = project_model_to_read(project).model_dump()
         context_summary = _build_context_summary(db, project_id)
 
-    system_prompt = build_system_prompt(project_info, context_summary)
+    system_blocks = build_system_blocks(project_info, context_summary)
 
     # 2) Construiește mesajele inițiale
     messages = _build_messages(user_message, conversation_history)
 
     # 3) Agent loop
-    client = _get_client()
+    client = _get_async_client()
     turns = 0
     all_text_parts: list[str] = []
+    usage_totals = {key: 0 for key in _USAGE_KEYS}
+
+    def _done() -> str:
+        """Event-ul final, cu raportul de token-uri (inclusiv cache read/write)."""
+        if collector is not None:
+            collector.usage = dict(usage_totals)
+        logger.info(
+            f"Agent run: {turns} ture, input={usage_totals['input_tokens']}, "
+            f"output={usage_totals['output_tokens']}, "
+            f"cache_read={usage_totals['cache_read_input_tokens']}, "
+            f"cache_write={usage_totals['cache_creation_input_tokens']}"
+        )
+        return sse_event("done", {"type": "done", "usage": dict(usage_totals)})
+
+    # Tool-urile care modifică date partajează sesiunea `db` → rulează serializat,
+    # în ordinea în care se închid block-urile tool_use din stream. Tool-urile
+    # read-only rulează concurent în _TOOL_POOL, fiecare cu sesiunea lui.
+    tool_lock = asyncio.Lock()
+    loop = asyncio.get_running_loop()
+
+    async def _run_tool(tool_name: str, tool_input: dict) -> tuple[dict, int]:
+        start_time = time.time()
+        try:
+            if tool_name in READ_ONLY_TOOLS:
+                async with tool_lock:
+                    # Tool-urile anterioare (inclusiv din ture precedente) trebuie
+                    # să fie vizibile din sesiunea nouă → commit pe sesiunea request-ului
+                    if db.in_transaction():
+                        await asyncio.to_thread(db.commit)
+                start_time = time.time()
+                result = await loop.run_in_executor(
+                    _TOOL_POOL, execute_tool_isolated, tool_name, tool_input
+                )
+            else:
+                async with tool_lock:
+                    start_time = time.time()
+                    result = await asyncio.to_thread(execute_tool, db, tool_name, tool_input)
+        except Exception as e:
+            logger.error(f"Eroare la execuția tool '{tool_name}': {e}")
+            result = {"error": f"Eroare internă: {str(e)}"}
+        return result, int((time.time() - start_time) * 1000)
 
     while turns < MAX_AGENT_TURNS:
         turns += 1
 
+        turn_text: list[str] = []
+        block_call_ids: dict[int, str] = {}
+        tool_tasks: dict[str, asyncio.Task] = {}
+
         try:
-            # Apelul Claude este sincron → rulăm în thread separat
-            response = await asyncio.to_thread(
-                client.messages.create,
-                model=MODEL,
-                max_tokens=4096,
-                system=system_prompt,
-                tools=AGENT_TOOLS,
-                messages=messages,
-            )
+            async with _limiter.slot("agent"):
+                async with client.messages.stream(
+                    model=MODEL,
+                    max_tokens=4096,
+                    system=system_blocks,
+                    tools=_CACHED_TOOLS,
+                    messages=_with_history_breakpoint(messages),
+                ) as stream:
+                    async for event in stream:
+                        if event.type == "content_block_start":
+                            block = event.content_block
+                            if block.type == "tool_use":
+                                block_call_ids[event.index] = block.id
+                                yield sse_event("tool_call_start", {
+                                    "type": "tool_call_start",
+                                    "tool_name": block.name,
+                                    "call_id": block.id,
+                                })
+
+                        elif event.type == "content_block_delta":
+                            delta = event.delta
+                            if delta.type == "text_delta":
+                                turn_text.append(delta.text)
+                                yield sse_event("text_delta", {
+                                    "type": "text_delta",
+                                    "content": delta.text,
+                                })
+                            elif delta.type == "input_json_delta" and delta.partial_json:
+                                yield sse_event("tool_input_delta", {
+                                    "type": "tool_input_delta",
+                                    "call_id": block_call_ids.get(event.index),
+                                    "partial_json": delta.partial_json,
+                                })
+
+                        elif event.type == "content_block_stop":
+                            block = event.content_block
+                            if block.type == "tool_use":
+                                # Block închis → input complet, pornim execuția imediat
+                                yield sse_event("tool_call", {
+                                    "type": "tool_call",
+                                    "tool_name": block.name,
+                                    "tool_input": block.input,
+                                    "call_id": block.id,
+                                })
+                                tool_tasks[block.id] = asyncio.create_task(
+                                    _run_tool(block.name, block.input)
+                                )
+
+                    response = await stream.get_final_message()
         except Exception as e:
             logger.error(f"Eroare la apelul Claude: {e}")
-            yield _sse_event("error", {
+            if tool_tasks:
+                await asyncio.gather(*tool_tasks.values(), return_exceptions=True)
+            yield sse_event("error", {
                 "type": "error",
                 "message": f"Eroare la comunicarea cu AI: {str(e)}",
             })
-            yield _sse_event("done", {"type": "done"})
+            yield _done()
             return
 
-        # 4) Procesăm răspunsul
+        # 4) Procesăm răspunsul complet
+        usage = getattr(response, "usage", None)
+        if usage is not None:
+            for key in _USAGE_KEYS:
+                usage_totals[key] += getattr(usage, key, None) or 0
+
         stop_reason = response.stop_reason
         assistant_content = response.content
+        tool_uses = [b for b in assistant_content if b.type == "tool_use"]
 
-        # Colectăm textul și tool_use blocks
-        text_parts = []
-        tool_uses = []
-
-        for block in assistant_content:
-            if block.type == "text":
-                text_parts.append(block.text)
-            elif block.type == "tool_use":
-                tool_uses.append(block)
-
-        # 5) Emitem text dacă există
-        if text_parts:
-            full_text = "".join(text_parts)
-            all_text_parts.append(full_text)
-            yield _sse_event("text_delta", {
-                "type": "text_delta",
-                "content": full_text,
-            })
+        if turn_text:
+            all_text_parts.append("".join(turn_text))
 
-        # 6) Dacă nu sunt tool calls, am terminat
+        # 5) Dacă nu sunt tool calls, am terminat
         if not tool_uses:
             if collector is not None:
                 collector.final_text = "\n\n".join(all_text_parts)
-            yield _sse_event("done", {"type": "done"})
+            yield _done()
             return
 
-        # 7) Procesăm fiecare tool call
-        # Adăugăm răspunsul asistentului la mesaje (pentru continuarea conversației)
+        # 6) Adăugăm răspunsul asistentului la mesaje (pentru continuarea conversației)
         messages.append({
             "role": "assistant",
             "content": [_content_block_to_dict(b) for b in assistant_content],
@@ -222,33 +348,27 @@ async def run_agent(
 
         tool_results_for_claude = []
 
+        # 7) Colectăm rezultatele tool-urilor (deja pornite în timpul stream-ului)
         for tool_use in tool_uses:
             tool_name = tool_use.name
             tool_input = tool_use.input
             call_id = tool_use.id
 
-            # Emitem evenimentul tool_call
-            yield _sse_event("tool_call", {
-                "type": "tool_call",
-                "tool_name": tool_name,
-                "tool_input": tool_input,
-                "call_id": call_id,
-            })
-
-            # Executăm tool-ul
-            start_time = time.time()
-            try:
-                result = await asyncio.to_thread(
-                    execute_tool, db, tool_name, tool_input
-                )
-            except Exception as e:
-                logger.error(f"Eroare la execuția tool '{tool_name}': {e}")
-                result = {"error": f"Eroare internă: {str(e)}"}
+            task = tool_tasks.get(call_id)
+            if task is None:
+                # Block fără content_block_stop (ex: stream trunchiat) — rulăm acum
+                yield sse_event("tool_call", {
+                    "type": "tool_call",
+                    "tool_name": tool_name,
+                    "tool_input": tool_input,
+                    "call_id": call_id,
+                })
+                task = asyncio.create_task(_run_tool(tool_name, tool_input))
 
-            duration_ms = int((time.time() - start_time) * 1000)
+            result, duration_ms = await task
 
             # Emitem evenimentul tool_result
-            yield _sse_event("tool_result", {
+            yield sse_event("tool_result", {
                 "type": "tool_result",
                 "call_id": call_id,
                 "tool_name": tool_name,
@@ -284,7 +404,7 @@ async def run_agent(
         if stop_reason == "end_turn":
             if collector is not None:
                 collector.final_text = "\n\n".join(all_text_parts)
-            yield _sse_event("done", {"type": "done"})
+            yield _done()
             return
 
         # Altfel, continuăm loop-ul (stop_reason == "tool_use")
@@ -297,11 +417,11 @@ async def run_agent(
     all_text_parts.append(limit_text)
     if collector is not None:
         collector.final_text = "\n\n".join(all_text_parts)
-    yield _sse_event("text_delta", {
+    yield sse_event("text_delta", {
         "type": "text_delta",
         "content": limit_text,
     })
-    yield _sse_event("done", {"type": "done"})
+    yield _done()
 
 
 def _content_block_to_dict(block) -> dict:
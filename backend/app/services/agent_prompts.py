@@ -101,7 +101,35 @@ def build_system_prompt(
     Returns:
         System prompt complet ca string.
     """
-    prompt = AGENT_SYSTEM_PROMPT
+    return AGENT_SYSTEM_PROMPT + build_project_context_prompt(project_info, context_summary)
+
+
+def build_system_blocks(
+    project_info: dict | None = None,
+    context_summary: dict | None = None,
+) -> list[dict]:
+    """
+    System prompt ca listă de block-uri text pentru Messages API:
+    partea statică (AGENT_SYSTEM_PROMPT) poartă un breakpoint de prompt caching,
+    contextul de proiect (variabil) vine după el, necache-uit.
+    """
+    blocks = [{
+        "type": "text",
+        "text": AGENT_SYSTEM_PROMPT,
+        "cache_control": {"type": "ephemeral"},
+    }]
+    dynamic = build_project_context_prompt(project_info, context_summary)
+    if dynamic.strip():
+        blocks.append({"type": "text", "text": dynamic.strip()})
+    return blocks
+
+
+def build_project_context_prompt(
+    project_info: dict | None = None,
+    context_summary: dict | None = None,
+) -> str:
+    """Partea dinamică a system prompt-ului: proiectul curent și starea lui."""
+    prompt = ""
 
     if project_info:
         prompt += "\n\n## Context proiect curent\n"
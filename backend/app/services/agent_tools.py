@@ -2,7 +2,7 @@
 agent_tools.py — Definirea tool-urilor agentului BIM (Anthropic tool schemas)
 și funcțiile handler care refolosesc serviciile existente.
 
-27 tool-uri (13 originale + 14 ISO 19650/COBie):
+30 tool-uri (13 originale + 15 ISO 19650/COBie + 2 interogare model):
  1. get_project_info        14. get_document_cde_status
  2. get_project_context     15. transition_document_state
  3. generate_bep            16. generate_eir
@@ -17,6 +17,9 @@ agent_tools.py — Definirea tool-urilor agentului BIM (Anthropic tool schemas)
 12. get_audit_trail         25. get_kpi_dashboard
 13. get_project_health_check 26. check_iso_compliance
                              27. validate_cobie
+                             28. generate_all_iso_artifacts
+                             29. query_model_elements
+                             30. compare_ifc_revisions
 """
 
 from __future__ import annotations
@@ -28,6 +31,7 @@ from typing import Any
 
 from sqlalchemy.orm import Session
 
+from app.db import SessionLocal
 from app.repositories.projects_repository import (
     get_project,
     get_latest_project_context,
@@ -56,6 +60,8 @@ from app.services.chat_expert import store_bep
 from app.ai_client import call_llm_bep_verifier
 from app.services.bep_docx_exporter import markdown_to_docx
 from app.services.standards_search import search_standards
+from app.services.element_queries import query_project_elements
+from app.services.ifc_diff import diff_project_revisions
 from app.services.audit import log_action
 from app.services.bep_diff import compare_bep_versions as _diff_bep
 from app.services.project_health import compute_project_health
@@ -73,6 +79,7 @@ from app.services.clash_manager import get_clash_summary as _get_clash_summary
 from app.services.kpi_tracker import get_kpi_dashboard as _get_kpi
 from app.services.iso_compliance_checker import check_full_compliance as _check_compliance
 from app.services.cobie_validator import get_latest_cobie_validation as _get_latest_cobie
+from app.services.iso_pipeline import generate_all_iso_artifacts as _generate_all_iso
 
 logger = logging.getLogger(__name__)
 
@@ -251,6 +258,94 @@ AGENT_TOOLS: list[dict] = [
             "required": ["project_id"],
         },
     },
+    {
+        "name": "query_model_elements",
+        "description": (
+            "Interoghează elementele individuale ale ultimului model IFC importat: "
+            "filtre pe tip IFC (include subtipurile), nivel, disciplină și valori "
+            "din property set-uri, cu numărare pe grupe. Exemple: pereți fără "
+            "FireRating, uși pe nivel, elemente cu LoadBearing = True. "
+            "Proprietățile se dau ca 'Pset_WallCommon.FireRating' sau doar 'FireRating'."
+        ),
+        "input_schema": {
+            "type": "object",
+            "properties": {
+                "project_id": {
+                    "type": "integer",
+                    "description": "ID-ul proiectului",
+                },
+                "ifc_type": {
+                    "type": "string",
+                    "description": "Tip IFC, ex: IfcWall, IfcDoor (opțional)",
+                },
+                "storey": {
+                    "type": "string",
+                    "description": "Numele nivelului (IfcBuildingStorey), opțional",
+                },
+                "discipline": {
+                    "type": "string",
+                    "description": "architecture, structure, mep sau other (opțional)",
+                },
+                "where": {
+                    "type": "array",
+                    "description": "Condiții pe proprietăți, combinate cu ȘI",
+                    "items": {
+                        "type": "object",
+                        "properties": {
+                            "property": {"type": "string"},
+                            "op": {
+                                "type": "string",
+                                "enum": ["=", "!=", ">", ">=", "<", "<=", "contains"],
+                            },
+                            "value": {"type": ["string", "number", "boolean"]},
+                        },
+                        "required": ["property", "value"],
+                    },
+                },
+                "missing": {
+                    "type": "array",
+                    "items": {"type": "string"},
+                    "description": "Proprietăți care trebuie să lipsească",
+                },
+                "group_by": {
+                    "type": "string",
+                    "description": "ifc_type, storey, discipline sau numele unei proprietăți",
+                },
+                "limit": {
+                    "type": "integer",
+                    "description": "Numărul maxim de elemente listate (default 50)",
+                },
+            },
+            "required": ["project_id"],
+        },
+    },
+    {
+        "name": "compare_ifc_revisions",
+        "description": (
+            "Compară două revizii IFC importate pentru proiect (implicit ultima cu "
+            "penultima): elemente adăugate, șterse și modificate după GlobalId, cu "
+            "aspectele schimbate (atribute, proprietăți, plasare) și deltele per "
+            "disciplină. Folosește-l când utilizatorul întreabă ce s-a schimbat în model."
+        ),
+        "input_schema": {
+            "type": "object",
+            "properties": {
+                "project_id": {
+                    "type": "integer",
+                    "description": "ID-ul proiectului",
+                },
+                "from_file_id": {
+                    "type": "integer",
+                    "description": "ID-ul upload-ului vechi (opțional)",
+                },
+                "to_file_id": {
+                    "type": "integer",
+                    "description": "ID-ul upload-ului nou (opțional, implicit ultimul)",
+                },
+            },
+            "required": ["project_id"],
+        },
+    },
     {
         "name": "list_document_versions",
         "description": (
@@ -592,6 +687,30 @@ AGENT_TOOLS: list[dict] = [
             "required": ["project_id"],
         },
     },
+    {
+        "name": "generate_all_iso_artifacts",
+        "description": (
+            "Generează într-un singur pas toate artefactele ISO 19650 din fișa "
+            "proiectului: EIR, TIDP, matrice RACI, matrice LOIN, checklist handover "
+            "și plan de securitate. Generatoarele rulează concurent pe același "
+            "snapshot al fișei, iar rezultatele se salvează atomic (toate sau nimic). "
+            "Folosește-l la onboarding-ul unui proiect nou, în locul apelurilor separate."
+        ),
+        "input_schema": {
+            "type": "object",
+            "properties": {
+                "project_id": {
+                    "type": "integer",
+                    "description": "ID-ul proiectului",
+                },
+                "classification_level": {
+                    "type": "string",
+                    "description": "Nivel clasificare securitate: standard, restricted, confidential (implicit standard)",
+                },
+            },
+            "required": ["project_id"],
+        },
+    },
 ]
 
 
@@ -957,6 +1076,54 @@ def handle_analyze_ifc_model(db: Session, tool_input: dict) -> dict:
     }
 
 
+def handle_query_model_elements(db: Session, tool_input: dict) -> dict:
+    """Handler pentru query_model_elements — filtre pe store-ul de elemente."""
+    project_id = tool_input["project_id"]
+    project = get_project(db, project_id)
+    if not project:
+        return {"error": f"Proiectul cu ID {project_id} nu există."}
+
+    result = query_project_elements(
+        db, project_id,
+        ifc_type=tool_input.get("ifc_type"),
+        storey=tool_input.get("storey"),
+        discipline=tool_input.get("discipline"),
+        where=tool_input.get("where"),
+        missing=tool_input.get("missing"),
+        group_by=tool_input.get("group_by"),
+        limit=min(int(tool_input.get("limit") or 50), 200),
+    )
+    if result.get("store_missing"):
+        result["error"] += (
+            " Indexarea pornește automat la importul IFC; pentru modele mai vechi "
+            "utilizatorul poate reimporta fișierul."
+        )
+    return result
+
+
+def handle_compare_ifc_revisions(db: Session, tool_input: dict) -> dict:
+    """Handler pentru compare_ifc_revisions — diff între două revizii IFC."""
+    project_id = tool_input["project_id"]
+    project = get_project(db, project_id)
+    if not project:
+        return {"error": f"Proiectul cu ID {project_id} nu există."}
+
+    result = diff_project_revisions(
+        db, project_id,
+        from_file_id=tool_input.get("from_file_id"),
+        to_file_id=tool_input.get("to_file_id"),
+        max_items=50,
+    )
+    if "error" in result:
+        return result
+    result["message"] = (
+        f"{result['from_file']['filename']} → {result['to_file']['filename']}: "
+        f"{result['added_count']} adăugate, {result['removed_count']} șterse, "
+        f"{result['modified_count']} modificate."
+    )
+    return result
+
+
 def handle_list_document_versions(db: Session, tool_input: dict) -> dict:
     """Handler pentru list_document_versions — lista versiuni BEP."""
     project_id = tool_input["project_id"]
@@ -1200,6 +1367,15 @@ def handle_validate_cobie(db: Session, tool_input: dict) -> dict:
     }
 
 
+def handle_generate_all_iso_artifacts(db: Session, tool_input: dict) -> dict:
+    """Handler pentru generate_all_iso_artifacts."""
+    project_id = tool_input["project_id"]
+    return _generate_all_iso(
+        db, project_id,
+        classification_level=tool_input.get("classification_level", "standard"),
+    )
+
+
 # ══════════════════════════════════════════════════════════════════════════════
 # Dispatcher — execută tool-ul corect pe baza numelui
 # ══════════════════════════════════════════════════════════════════════════════
@@ -1214,6 +1390,8 @@ TOOL_HANDLERS: dict[str, Any] = {
     "get_verification_history": handle_get_verification_history,
     "search_bim_standards": handle_search_bim_standards,
     "analyze_ifc_model": handle_analyze_ifc_model,
+    "query_model_elements": handle_query_model_elements,
+    "compare_ifc_revisions": handle_compare_ifc_revisions,
     "list_document_versions": handle_list_document_versions,
     "compare_bep_versions": handle_compare_bep_versions,
     "get_audit_trail": handle_get_audit_trail,
@@ -1233,9 +1411,40 @@ TOOL_HANDLERS: dict[str, Any] = {
     "get_kpi_dashboard": handle_get_kpi_dashboard,
     "check_iso_compliance": handle_check_iso_compliance,
     "validate_cobie": handle_validate_cobie,
+    "generate_all_iso_artifacts": handle_generate_all_iso_artifacts,
 }
 
 
+# Tool-uri independente de starea construită în aceeași tură: nu modifică
+# datele pe care alte tool-uri le citesc (cel mult audit log / snapshot KPI),
+# deci pot rula concurent, fiecare cu sesiunea lui. Restul (generate_bep,
+# transition_document_state, update_project_context, ...) rulează serializat
+# pe sesiunea request-ului.
+READ_ONLY_TOOLS: frozenset[str] = frozenset({
+    "get_project_info",
+    "get_project_context",
+    "get_verification_history",
+    "search_bim_standards",
+    "analyze_ifc_model",
+    "query_model_elements",
+    "compare_ifc_revisions",
+    "list_document_versions",
+    "compare_bep_versions",
+    "get_audit_trail",
+    "get_project_health_check",
+    "get_document_cde_status",
+    "get_delivery_plan",
+    "get_raci_matrix",
+    "get_loin_matrix",
+    "get_handover_status",
+    "get_security_classification",
+    "get_clash_summary",
+    "get_kpi_dashboard",
+    "check_iso_compliance",
+    "validate_cobie",
+})
+
+
 def execute_tool(db: Session, tool_name: str, tool_input: dict) -> dict:
     """
     Execută un tool și returnează rezultatul ca dict.
@@ -1263,3 +1472,20 @@ def execute_tool(db: Session, tool_name: str, tool_input: dict) -> dict:
     except Exception as e:
         logger.error(f"Eroare la execuția tool-ului '{tool_name}': {e}")
         return {"error": f"Eroare internă la execuția tool-ului: {str(e)}"}
+
+
+def execute_tool_isolated(tool_name: str, tool_input: dict) -> dict:
+    """
+    Execută un tool într-o sesiune SQLAlchemy proprie (commit/rollback/close).
+    Folosit pentru READ_ONLY_TOOLS rulate concurent în thread pool.
+    """
+    db = SessionLocal()
+    try:
+        result = execute_tool(db, tool_name, tool_input)
+        db.commit()
+        return result
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
@@ -4,9 +4,10 @@ Convertește ProjectContext în dict, apelează Claude, returnează rezultatul.
 """
 
 import logging
+from typing import AsyncIterator
 
 from app.schemas.project_context import ProjectContext
-from app.ai_client import call_llm
+from app.ai_client import astream_llm, call_llm
 
 logger = logging.getLogger(__name__)
 
@@ -36,3 +37,18 @@ def generate_bep(project_context: ProjectContext) -> dict:
         "project_code": project_context.project_code,
         "bep_version": project_context.bep_version,
     }
+
+
+def stream_bep(project_context: ProjectContext) -> AsyncIterator[str]:
+    """
+    Generează BEP-ul în streaming: returnează un async iterator de fragmente
+    Markdown, în ordinea în care sosesc de la Claude.
+    """
+    ctx_dict = project_context.model_dump(mode="json")
+
+    logger.info(
+        f"Generare BEP (stream) pentru proiectul '{project_context.project_name}' "
+        f"(cod: {project_context.project_code}, faza: {project_context.current_phase})"
+    )
+
+    return astream_llm(ctx_dict)
@@ -0,0 +1,205 @@
+"""
+bm25_index.py — Index inversat BM25 pe disc pentru fragmentele de standarde.
+
+Referințele normative („RTC 8”, „HG 907/2016”, „19650-2”) sunt tokeni exacți
+pe care embedding-urile multilingve MiniLM îi tratează slab. Indexul e
+construit de bim_ingest.py din colecția `bim_knowledge` (aceleași fragmente
+și id-uri ca în ChromaDB) și citit de standards_search, care îl combină cu
+căutarea vectorială prin reciprocal rank fusion (rrf_fuse).
+
+Format (director, de obicei chroma_db/bm25/):
+  - terms.json      vocabularul, în ordinea listelor de postări
+  - postings.npz    term_offsets (CSR), doc_ids, term_freqs, doc_lengths
+  - documents.json  id, text, source, category, page per fragment
+  - meta.json       versiunea formatului, parametrii BM25, statistici
+
+Tokenizarea (aceeași la construire și la interogare): litere mici, fără
+diacritice; „907/2016” și „19650-2” rămân tokeni întregi (plus părțile
+lor), iar numerele sunt legate și de cuvântul anterior („rtc_8”).
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import math
+import os
+import re
+import shutil
+import unicodedata
+import uuid
+from pathlib import Path
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+BM25_INDEX_VERSION = 1
+BM25_K1 = 1.5
+BM25_B = 0.75
+RRF_K = 60
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+(?:[./\-:][a-z0-9]+)*")
+_STOPWORDS = frozenset("""
+    a al ale ai cu de din in la le lui o pe pentru prin sa se si sau un una unei unui
+    este sunt care ce mai nu ca fi fost iar dar catre intre sub
+    the of and to in for on is are with by an or as at be
+""".split())
+
+
+def _fold(text: str) -> str:
+    """Litere mici, fără diacritice (ș/ş → s, ă → a)."""
+    decomposed = unicodedata.normalize("NFKD", text.lower())
+    return "".join(c for c in decomposed if not unicodedata.combining(c))
+
+
+def tokenize(text: str) -> list[str]:
+    """Tokenii BM25 ai unui text (vezi docstring-ul modulului)."""
+    words = _TOKEN_RE.findall(_fold(text))
+    tokens: list[str] = []
+    previous = None
+    for word in words:
+        if word not in _STOPWORDS:
+            tokens.append(word)
+            parts = re.split(r"[./\-:]", word)
+            if len(parts) > 1:
+                tokens.extend(p for p in parts if p and p not in _STOPWORDS)
+        if previous is not None and any(c.isdigit() for c in word) and not any(c.isdigit() for c in previous):
+            # „RTC 8”, „HG 907/2016”: numărul contează doar lângă prefixul lui
+            tokens.append(f"{previous}_{word}")
+        previous = word if word not in _STOPWORDS else None
+    return tokens
+
+
+def build_bm25_index(documents: list[dict], index_dir: str | Path) -> dict:
+    """
+    Construiește și scrie indexul pentru fragmente {id, text, source, category, page}.
+
+    Scrierea e atomică (director temporar + os.replace). Returnează meta.json.
+    """
+    index_dir = Path(index_dir)
+    postings: dict[str, dict[int, int]] = {}
+    doc_lengths = np.zeros(len(documents), dtype=np.int32)
+    for doc_id, doc in enumerate(documents):
+        tokens = tokenize(doc["text"])
+        doc_lengths[doc_id] = len(tokens)
+        for token in tokens:
+            row = postings.setdefault(token, {})
+            row[doc_id] = row.get(doc_id, 0) + 1
+
+    terms = sorted(postings)
+    counts = np.array([len(postings[t]) for t in terms], dtype=np.int64)
+    term_offsets = np.zeros(len(terms) + 1, dtype=np.int64)
+    np.cumsum(counts, out=term_offsets[1:])
+    doc_ids = np.empty(int(term_offsets[-1]), dtype=np.int32)
+    term_freqs = np.empty(int(term_offsets[-1]), dtype=np.float32)
+    for i, term in enumerate(terms):
+        row = postings[term]
+        start = term_offsets[i]
+        doc_ids[start:start + len(row)] = list(row.keys())
+        term_freqs[start:start + len(row)] = list(row.values())
+
+    meta = {
+        "version": BM25_INDEX_VERSION,
+        "k1": BM25_K1,
+        "b": BM25_B,
+        "documents": len(documents),
+        "terms": len(terms),
+        "avg_doc_length": float(doc_lengths.mean()) if len(documents) else 0.0,
+    }
+    tmp = index_dir.with_name(f".{index_dir.name}.{uuid.uuid4().hex}.tmp")
+    tmp.mkdir(parents=True)
+    try:
+        (tmp / "terms.json").write_text(json.dumps(terms, ensure_ascii=False), encoding="utf-8")
+        np.savez(
+            tmp / "postings.npz",
+            term_offsets=term_offsets, doc_ids=doc_ids,
+            term_freqs=term_freqs, doc_lengths=doc_lengths,
+        )
+        (tmp / "documents.json").write_text(json.dumps([
+            {k: doc.get(k) for k in ("id", "text", "source", "category", "page")}
+            for doc in documents
+        ], ensure_ascii=False), encoding="utf-8")
+        (tmp / "meta.json").write_text(json.dumps(meta))
+        shutil.rmtree(index_dir, ignore_errors=True)
+        os.replace(tmp, index_dir)
+    except BaseException:
+        shutil.rmtree(tmp, ignore_errors=True)
+        raise
+    return meta
+
+
+class BM25Index:
+    """Indexul BM25 încărcat în memorie; scorarea e vectorizată pe listele de postări."""
+
+    def __init__(self, index_dir: str | Path):
+        index_dir = Path(index_dir)
+        meta = json.loads((index_dir / "meta.json").read_text())
+        self.k1: float = meta["k1"]
+        self.b: float = meta["b"]
+        self.avg_doc_length: float = meta["avg_doc_length"] or 1.0
+        self.documents: list[dict] = json.loads((index_dir / "documents.json").read_text(encoding="utf-8"))
+        terms = json.loads((index_dir / "terms.json").read_text(encoding="utf-8"))
+        self._term_index = {t: i for i, t in enumerate(terms)}
+        with np.load(index_dir / "postings.npz") as data:
+            self._term_offsets = data["term_offsets"]
+            self._doc_ids = data["doc_ids"]
+            self._term_freqs = data["term_freqs"]
+            doc_lengths = data["doc_lengths"].astype(np.float32)
+        # Normalizarea după lungime e fixă per document: calculată o dată
+        self._length_norm = self.k1 * (1 - self.b + self.b * doc_lengths / self.avg_doc_length)
+
+    def __len__(self) -> int:
+        return len(self.documents)
+
+    def scores(self, query: str) -> np.ndarray:
+        """Scorul BM25 al fiecărui fragment pentru interogare."""
+        scores = np.zeros(len(self.documents), dtype=np.float32)
+        n = len(self.documents)
+        for term in set(tokenize(query)):
+            i = self._term_index.get(term)
+            if i is None:
+                continue
+            start, end = self._term_offsets[i], self._term_offsets[i + 1]
+            docs, tf = self._doc_ids[start:end], self._term_freqs[start:end]
+            idf = math.log(1 + (n - len(docs) + 0.5) / (len(docs) + 0.5))
+            scores[docs] += idf * tf * (self.k1 + 1) / (tf + self._length_norm[docs])
+        return scores
+
+    def search(self, query: str, n_results: int) -> list[tuple[dict, float]]:
+        """Primele n_results fragmente cu scor pozitiv: (document, scor), descrescător."""
+        scores = self.scores(query)
+        k = min(n_results, len(scores))
+        if k <= 0:
+            return []
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind="stable")]
+        return [(self.documents[i], float(scores[i])) for i in top if scores[i] > 0]
+
+
+def load_bm25_index(index_dir: str | Path) -> BM25Index | None:
+    """Indexul din director (None dacă lipsește sau are alt format)."""
+    meta_path = Path(index_dir) / "meta.json"
+    if not meta_path.exists():
+        return None
+    try:
+        if json.loads(meta_path.read_text()).get("version") != BM25_INDEX_VERSION:
+            return None
+        return BM25Index(index_dir)
+    except (OSError, ValueError, KeyError) as e:
+        logger.warning(f"Index BM25 invalid în {index_dir}: {e}")
+        return None
+
+
+def rrf_fuse(rankings: list[list[str]], k: int = RRF_K) -> list[tuple[str, float]]:
+    """
+    Reciprocal rank fusion: scor(d) = Σ 1 / (k + rang), pe toate clasamentele.
+
+    Returns:
+        (id, scor) descrescător după scor; la egalitate, ordinea primei apariții.
+    """
+    fused: dict[str, float] = {}
+    for ranking in rankings:
+        for rank, doc_id in enumerate(ranking, start=1):
+            fused[doc_id] = fused.get(doc_id, 0.0) + 1.0 / (k + rank)
+    return sorted(fused.items(), key=lambda item: -item[1])
@@ -6,7 +6,7 @@ Include și modul Copilot cu context complet de proiect.
 
 import logging
 
-from app.ai_client import call_llm_chat_expert, call_llm_chat_copilot
+from app.ai_client import acall_llm_chat_expert, acall_llm_chat_copilot
 
 logger = logging.getLogger(__name__)
 
@@ -72,7 +72,7 @@ async def chat_expert(project_id: str | None, message: str) -> str:
         f"context_len={len(context)}, question_len={len(message)}"
     )
 
-    return call_llm_chat_expert(context, message)
+    return await acall_llm_chat_expert(context, message)
 
 
 # ── Copilot (context complet de proiect) ────────────────────────────────────
@@ -169,4 +169,4 @@ async def chat_expert_copilot(chat_context: dict, message: str) -> str:
         f"context_len={len(context)}, question_len={len(message)}"
     )
 
-    return call_llm_chat_copilot(context, message)
+    return await acall_llm_chat_copilot(context, message)
@@ -0,0 +1,361 @@
+"""
+clash_detection.py — Detecție geometrică de clash-uri din modelul IFC.
+
+Etape:
+  1. Teselare: plasele de triunghiuri vin din ifc_geometry.py (iterator
+     multi-thread + cache pe disc); elementele fără disciplină mapată
+     (spații, mobilier) sunt ignorate.
+  2. Broad phase: AABB-urile fiecărei discipline sunt organizate într-un
+     BVH (bounding-volume hierarchy, split median pe axa cea mai lungă);
+     pentru fiecare pereche de discipline, cei doi arbori sunt parcurși
+     simultan, iar frunzele sunt comparate vectorizat (NumPy).
+  3. Narrow phase: triunghiurile din zona de suprapunere sunt testate
+     pereche cu pereche (teorema axei separatoare, vectorizat); dacă
+     suprafețele nu se intersectează, se verifică incluziunea completă
+     (ray casting). Perechile candidate sunt împărțite pe thread-uri.
+
+Toleranța (metri) cere o penetrare reală: elementele care doar se ating
+(perete așezat pe placă) nu sunt raportate.
+"""
+
+from __future__ import annotations
+
+import itertools
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+
+import numpy as np
+
+from app.services.ifc_geometry import ElementMesh
+
+logger = logging.getLogger(__name__)
+
+CLASH_TOLERANCE_M = float(os.getenv("CLASH_TOLERANCE_M", "0.01"))
+CLASH_NARROW_WORKERS = int(os.getenv("CLASH_NARROW_WORKERS", str(os.cpu_count() or 1)))
+# Sub acest volum de suprapunere (m³) clash-ul e considerat minor
+CLASH_MINOR_VOLUME_M3 = float(os.getenv("CLASH_MINOR_VOLUME_M3", "0.001"))
+
+_BVH_LEAF_SIZE = 8
+# Numărul maxim de perechi de triunghiuri comparate într-un singur pas vectorizat
+_TRI_PAIR_CHUNK = 200_000
+_EPS = 1e-9
+
+
+@dataclass
+class DetectedClash:
+    guid_a: str
+    guid_b: str
+    type_a: str
+    type_b: str
+    discipline_a: str
+    discipline_b: str
+    kind: str                      # "hard" (suprafețe intersectate) | "containment"
+    point: tuple[float, float, float]
+    overlap_volume: float          # volumul intersecției AABB, m³
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# Broad phase — BVH pe AABB
+# ══════════════════════════════════════════════════════════════════════════════
+
+@dataclass
+class _Bvh:
+    node_min: np.ndarray   # (N, 3)
+    node_max: np.ndarray   # (N, 3)
+    left: np.ndarray       # (N,) copil stânga, -1 pentru frunze
+    right: np.ndarray      # (N,)
+    start: np.ndarray      # (N,) început interval în `order` (frunze)
+    count: np.ndarray      # (N,)
+    order: np.ndarray      # indicii elementelor, grupați pe frunze
+
+
+def _build_bvh(box_min: np.ndarray, box_max: np.ndarray) -> _Bvh:
+    """BVH cu split median pe axa cea mai lungă a centroidelor."""
+    n = len(box_min)
+    order = np.arange(n)
+    centroids = (box_min + box_max) * 0.5
+
+    node_min: list[np.ndarray] = []
+    node_max: list[np.ndarray] = []
+    left: list[int] = []
+    right: list[int] = []
+    start: list[int] = []
+    count: list[int] = []
+
+    def new_node(lo: int, hi: int) -> int:
+        idx = order[lo:hi]
+        node_min.append(box_min[idx].min(axis=0))
+        node_max.append(box_max[idx].max(axis=0))
+        left.append(-1)
+        right.append(-1)
+        start.append(lo)
+        count.append(hi - lo)
+        return len(left) - 1
+
+    stack = [(new_node(0, n), 0, n)]
+    while stack:
+        node, lo, hi = stack.pop()
+        if hi - lo <= _BVH_LEAF_SIZE:
+            continue
+        idx = order[lo:hi]
+        c = centroids[idx]
+        axis = int(np.argmax(c.max(axis=0) - c.min(axis=0)))
+        mid = (hi - lo) // 2
+        order[lo:hi] = idx[np.argpartition(c[:, axis], mid)]
+        left[node] = new_node(lo, lo + mid)
+        right[node] = new_node(lo + mid, hi)
+        stack.append((left[node], lo, lo + mid))
+        stack.append((right[node], lo + mid, hi))
+
+    return _Bvh(
+        node_min=np.array(node_min), node_max=np.array(node_max),
+        left=np.array(left), right=np.array(right),
+        start=np.array(start), count=np.array(count), order=order,
+    )
+
+
+def _bvh_overlapping_pairs(
+    a: _Bvh, a_min: np.ndarray, a_max: np.ndarray,
+    b: _Bvh, b_min: np.ndarray, b_max: np.ndarray,
+    tolerance: float,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Parcurgere simultană a doi arbori: perechile (i, j) cu AABB suprapuse > toleranță."""
+    out_a: list[np.ndarray] = []
+    out_b: list[np.ndarray] = []
+    stack = [(0, 0)]
+    while stack:
+        na, nb = stack.pop()
+        if (
+            np.any(a.node_min[na] >= b.node_max[nb] - tolerance)
+            or np.any(b.node_min[nb] >= a.node_max[na] - tolerance)
+        ):
+            continue
+
+        a_leaf = a.left[na] < 0
+        b_leaf = b.left[nb] < 0
+        if a_leaf and b_leaf:
+            ia = a.order[a.start[na]:a.start[na] + a.count[na]]
+            ib = b.order[b.start[nb]:b.start[nb] + b.count[nb]]
+            hit = np.all(
+                (a_min[ia, None] < b_max[None, ib] - tolerance)
+                & (b_min[None, ib] < a_max[ia, None] - tolerance),
+                axis=2,
+            )
+            ii, jj = np.nonzero(hit)
+            if len(ii):
+                out_a.append(ia[ii])
+                out_b.append(ib[jj])
+        elif b_leaf or (
+            not a_leaf
+            and np.prod(a.node_max[na] - a.node_min[na]) >= np.prod(b.node_max[nb] - b.node_min[nb])
+        ):
+            stack.append((a.left[na], nb))
+            stack.append((a.right[na], nb))
+        else:
+            stack.append((na, b.left[nb]))
+            stack.append((na, b.right[nb]))
+
+    if not out_a:
+        empty = np.empty(0, dtype=np.int64)
+        return empty, empty
+    return np.concatenate(out_a), np.concatenate(out_b)
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# Narrow phase — triunghi/triunghi + incluziune
+# ══════════════════════════════════════════════════════════════════════════════
+
+def _triangles_intersect(t1: np.ndarray, t2: np.ndarray, tolerance: float) -> np.ndarray:
+    """
+    Test vectorizat (SAT) pentru perechi de triunghiuri (M, 3, 3).
+
+    O pereche se intersectează dacă fiecare triunghi traversează planul
+    celuilalt cu mai mult decât toleranța (contactul coplanar nu contează)
+    și nicio axă muchie×muchie nu le separă.
+    """
+    e1 = np.roll(t1, -1, axis=1) - t1   # (M, 3, 3) muchii
+    e2 = np.roll(t2, -1, axis=1) - t2
+
+    result = np.ones(len(t1), dtype=bool)
+    for tri, other, edges in ((t1, t2, e1), (t2, t1, e2)):
+        normal = np.cross(edges[:, 0], -edges[:, 2])
+        length = np.linalg.norm(normal, axis=1)
+        valid = length > _EPS
+        normal = normal / np.where(valid, length, 1.0)[:, None]
+        offset = np.einsum("mk,mk->m", normal, tri[:, 0])
+        dist = np.einsum("mk,mvk->mv", normal, other) - offset[:, None]
+        result &= valid & (dist.min(axis=1) < -tolerance) & (dist.max(axis=1) > tolerance)
+
+    axes = np.cross(e1[:, :, None, :], e2[:, None, :, :]).reshape(-1, 9, 3)
+    length = np.linalg.norm(axes, axis=2)
+    valid = length > _EPS
+    axes = axes / np.where(valid, length, 1.0)[:, :, None]
+    p1 = np.einsum("mak,mvk->mav", axes, t1)
+    p2 = np.einsum("mak,mvk->mav", axes, t2)
+    separated = (p1.max(axis=2) < p2.min(axis=2) - _EPS) | (p2.max(axis=2) < p1.min(axis=2) - _EPS)
+    return result & ~np.any(separated & valid, axis=1)
+
+
+def _triangles_in_box(triangles: np.ndarray, lo: np.ndarray, hi: np.ndarray) -> np.ndarray:
+    return np.all(triangles.max(axis=1) >= lo, axis=1) & np.all(triangles.min(axis=1) <= hi, axis=1)
+
+
+def _point_in_mesh(point: np.ndarray, triangles: np.ndarray) -> bool:
+    """Ray casting (Möller–Trumbore vectorizat): număr impar de intersecții = interior."""
+    direction = np.array([0.5773, 0.5774, 0.5775])  # direcție „generică”, evită muchiile
+    v0 = triangles[:, 0]
+    edge1 = triangles[:, 1] - v0
+    edge2 = triangles[:, 2] - v0
+    pvec = np.cross(direction, edge2)
+    det = np.einsum("mk,mk->m", edge1, pvec)
+    ok = np.abs(det) > _EPS
+    inv = np.where(ok, 1.0 / np.where(ok, det, 1.0), 0.0)
+    tvec = point - v0
+    u = np.einsum("mk,mk->m", tvec, pvec) * inv
+    qvec = np.cross(tvec, edge1)
+    v = np.einsum("k,mk->m", direction, qvec) * inv
+    t = np.einsum("mk,mk->m", edge2, qvec) * inv
+    hits = ok & (u >= 0) & (v >= 0) & (u + v <= 1) & (t > _EPS)
+    return bool(np.count_nonzero(hits) % 2)
+
+
+def _box_inside(inner: ElementMesh, outer: ElementMesh, tolerance: float) -> bool:
+    return bool(
+        np.all(inner.bbox_min >= outer.bbox_min + tolerance)
+        and np.all(inner.bbox_max <= outer.bbox_max - tolerance)
+    )
+
+
+def mesh_clash_kind(a: ElementMesh, b: ElementMesh, tolerance: float) -> str | None:
+    """Narrow phase pentru o pereche: "hard", "containment" sau None."""
+    lo = np.maximum(a.bbox_min, b.bbox_min) - tolerance
+    hi = np.minimum(a.bbox_max, b.bbox_max) + tolerance
+    ta = a.triangles
+    tb = b.triangles
+    ta = ta[_triangles_in_box(ta, lo, hi)]
+    tb = tb[_triangles_in_box(tb, lo, hi)]
+
+    if len(ta) and len(tb):
+        tb_min = tb.min(axis=1)
+        tb_max = tb.max(axis=1)
+        step = max(1, _TRI_PAIR_CHUNK // len(tb))
+        for s in range(0, len(ta), step):
+            chunk = ta[s:s + step]
+            hit = np.all(
+                (chunk.min(axis=1)[:, None] <= tb_max[None])
+                & (tb_min[None] <= chunk.max(axis=1)[:, None]),
+                axis=2,
+            )
+            ii, jj = np.nonzero(hit)
+            if len(ii) and np.any(_triangles_intersect(chunk[ii], tb[jj], tolerance)):
+                return "hard"
+
+    if _box_inside(a, b, tolerance) and _point_in_mesh(a.vertices.mean(axis=0), b.triangles):
+        return "containment"
+    if _box_inside(b, a, tolerance) and _point_in_mesh(b.vertices.mean(axis=0), a.triangles):
+        return "containment"
+    return None
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# Orchestrare
+# ══════════════════════════════════════════════════════════════════════════════
+
+def detect_clashes(
+    meshes: list[ElementMesh],
+    *,
+    tolerance: float | None = None,
+    discipline_pairs: list[tuple[str, str]] | None = None,
+    changed: set[str] | None = None,
+    workers: int | None = None,
+) -> list[DetectedClash]:
+    """
+    Broad phase (BVH per disciplină) + narrow phase pe perechile de discipline.
+
+    changed: dacă e dat, se testează doar perechile în care cel puțin un
+    element are GlobalId-ul în mulțime (re-rulare incrementală); arborii
+    elementelor modificate sunt interogați contra arborilor compleți.
+    """
+    tol = CLASH_TOLERANCE_M if tolerance is None else tolerance
+    by_discipline: dict[str, list[int]] = {}
+    for i, mesh in enumerate(meshes):
+        if mesh.discipline:
+            by_discipline.setdefault(mesh.discipline, []).append(i)
+
+    if discipline_pairs is None:
+        discipline_pairs = list(itertools.combinations(sorted(by_discipline), 2))
+
+    box_min = np.array([m.bbox_min for m in meshes]) if meshes else np.empty((0, 3))
+    box_max = np.array([m.bbox_max for m in meshes]) if meshes else np.empty((0, 3))
+    is_changed = np.array(
+        [changed is None or m.guid in changed for m in meshes], dtype=bool,
+    )
+    trees: dict[tuple[str, bool], tuple[_Bvh, np.ndarray] | None] = {}
+
+    def tree_for(discipline: str, only_changed: bool) -> tuple[_Bvh, np.ndarray] | None:
+        key = (discipline, only_changed)
+        if key not in trees:
+            idx = np.array(by_discipline[discipline])
+            if only_changed:
+                idx = idx[is_changed[idx]]
+            trees[key] = (_build_bvh(box_min[idx], box_max[idx]), idx) if len(idx) else None
+        return trees[key]
+
+    def overlapping(ta, tb) -> set[tuple[int, int]]:
+        if ta is None or tb is None:
+            return set()
+        (bvh_a, idx_a), (bvh_b, idx_b) = ta, tb
+        ia, ib = _bvh_overlapping_pairs(
+            bvh_a, box_min[idx_a], box_max[idx_a],
+            bvh_b, box_min[idx_b], box_max[idx_b],
+            tol,
+        )
+        return set(zip(idx_a[ia].tolist(), idx_b[ib].tolist()))
+
+    candidates: list[tuple[int, int]] = []
+    for da, db in discipline_pairs:
+        if da == db or da not in by_discipline or db not in by_discipline:
+            continue
+        if changed is None:
+            found = overlapping(tree_for(da, False), tree_for(db, False))
+        else:
+            found = overlapping(tree_for(da, True), tree_for(db, False))
+            found |= overlapping(tree_for(da, False), tree_for(db, True))
+        candidates.extend(sorted(found))
+
+    logger.info(f"Clash broad phase: {len(meshes)} elemente, {len(candidates)} perechi candidate")
+
+    def narrow(pair: tuple[int, int]) -> DetectedClash | None:
+        a, b = meshes[pair[0]], meshes[pair[1]]
+        kind = mesh_clash_kind(a, b, tol)
+        if kind is None:
+            return None
+        lo = np.maximum(a.bbox_min, b.bbox_min)
+        hi = np.minimum(a.bbox_max, b.bbox_max)
+        return DetectedClash(
+            guid_a=a.guid, guid_b=b.guid,
+            type_a=a.ifc_type, type_b=b.ifc_type,
+            discipline_a=a.discipline, discipline_b=b.discipline,
+            kind=kind,
+            point=tuple(float(x) for x in (lo + hi) / 2),
+            overlap_volume=float(np.prod(np.clip(hi - lo, 0, None))),
+        )
+
+    n_workers = max(1, workers or CLASH_NARROW_WORKERS)
+    if n_workers == 1 or len(candidates) < 64:
+        results = [narrow(p) for p in candidates]
+    else:
+        with ThreadPoolExecutor(max_workers=n_workers) as pool:
+            results = list(pool.map(narrow, candidates))
+    return [r for r in results if r is not None]
+
+
+def clash_severity(clash: DetectedClash) -> str:
+    """Structura implicată → high; suprapunere neglijabilă → low; altfel medium."""
+    if "structure" in (clash.discipline_a, clash.discipline_b):
+        return "high"
+    if clash.overlap_volume < CLASH_MINOR_VOLUME_M3:
+        return "low"
+    return "medium"
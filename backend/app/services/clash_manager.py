@@ -1,17 +1,35 @@
 """
 clash_manager.py — Management clash-uri între discipline.
+
+Clash-urile sunt fie înregistrate manual, fie detectate geometric din
+ultimul IFC al proiectului (run_clash_detection → clash_detection.py).
+Re-rulările sunt incrementale: se retestează doar elementele schimbate
+față de revizia rulării anterioare (vezi clash_runs).
 """
 
 from __future__ import annotations
 
 import datetime
 import logging
+import time
+from pathlib import Path
+from typing import Callable
 
-from sqlalchemy import desc
+from sqlalchemy import desc, insert
 from sqlalchemy.orm import Session
 
-from app.models.sql_models import ClashRecordModel
+from app.models.sql_models import ClashRecordModel, ClashRunModel
+from app.repositories.projects_repository import get_latest_uploaded_file
 from app.services.audit import log_action
+from app.services.clash_detection import (
+    CLASH_TOLERANCE_M,
+    DetectedClash,
+    clash_severity,
+    detect_clashes,
+)
+from app.services.ifc_geometry import file_sha256, load_geometry
+from app.services.ifc_parser import discipline_for_type
+from app.services.ifc_processing import IfcParseError, build_geometry_cache_in_pool
 
 logger = logging.getLogger(__name__)
 
@@ -69,6 +87,214 @@ def resolve_clash(
     return {"success": True}
 
 
+_CLASH_KIND_LABELS = {"hard": "intersecție", "containment": "incluziune"}
+
+
+def _pair_key(guid_a: str | None, guid_b: str | None) -> tuple[str, str]:
+    a, b = guid_a or "", guid_b or ""
+    return (a, b) if a <= b else (b, a)
+
+
+def _clash_fields(clash: DetectedClash) -> dict:
+    """Câmpurile unei înregistrări care descriu geometria clash-ului."""
+    return {
+        "discipline_a": clash.discipline_a,
+        "discipline_b": clash.discipline_b,
+        "severity": clash_severity(clash),
+        "description": (
+            f"Clash {_CLASH_KIND_LABELS[clash.kind]}: {clash.type_a} ({clash.guid_a}) "
+            f"↔ {clash.type_b} ({clash.guid_b})"
+        ),
+        "element_a_guid": clash.guid_a,
+        "element_b_guid": clash.guid_b,
+        "element_a_type": clash.type_a,
+        "element_b_type": clash.type_b,
+        "location_json": {
+            "x": round(clash.point[0], 3),
+            "y": round(clash.point[1], 3),
+            "z": round(clash.point[2], 3),
+            "kind": clash.kind,
+            "overlap_volume_m3": round(clash.overlap_volume, 6),
+        },
+    }
+
+
+def _previous_run(
+    db: Session, project_id: int, tolerance: float, pairs_json: list | None
+) -> ClashRunModel | None:
+    """Ultima rulare, dacă a folosit aceiași parametri (altfel rezultatele nu sunt comparabile)."""
+    run = (
+        db.query(ClashRunModel)
+        .filter(ClashRunModel.project_id == project_id)
+        .order_by(desc(ClashRunModel.created_at), desc(ClashRunModel.id))
+        .first()
+    )
+    if run and abs(run.tolerance_m - tolerance) < 1e-9 and run.discipline_pairs_json == pairs_json:
+        return run
+    return None
+
+
+def run_clash_detection(
+    db: Session,
+    project_id: int,
+    *,
+    tolerance: float | None = None,
+    discipline_pairs: list[tuple[str, str]] | None = None,
+    incremental: bool = True,
+    on_progress: Callable[[dict], None] | None = None,
+) -> dict:
+    """
+    Detectează clash-urile din ultimul IFC al proiectului și le reconciliază
+    cu înregistrările existente.
+
+    Incremental (implicit): dacă ultima rulare a folosit aceiași parametri și
+    geometria reviziei ei e încă în cache, revizia nouă e comparată cu ea după
+    GlobalId + hash-ul geometriei și doar elementele noi/modificate sunt
+    retestate. Perechile neatinse își păstrează înregistrarea (status,
+    responsabil, note); clash-urile care nu mai apar sunt închise automat,
+    iar cele rezolvate care apar din nou sunt redeschise. Clash-urile manuale nu sunt atinse.
+    """
+    uploaded = get_latest_uploaded_file(db, project_id, "ifc")
+    if not uploaded:
+        return {"error": "Nu există fișier IFC pentru acest proiect."}
+    if not Path(uploaded.file_path).exists():
+        return {"error": "Fișierul IFC nu a fost găsit pe disc."}
+
+    tol = CLASH_TOLERANCE_M if tolerance is None else tolerance
+    pairs_json = sorted(list(p) for p in discipline_pairs) if discipline_pairs else None
+    started = time.time()
+
+    if on_progress:
+        on_progress({"stage": "tessellating", "elapsed_s": 0})
+    sha = uploaded.content_sha256 or file_sha256(uploaded.file_path)
+    # Teselarea e refolosită din cache când modelul a mai fost analizat; altfel
+    # rulează în pool-ul ifc_processing (limite de timp și memorie)
+    geometry = load_geometry(sha)
+    if geometry is None:
+        try:
+            build_geometry_cache_in_pool(uploaded.file_path, sha, on_progress=on_progress)
+        except IfcParseError as e:
+            return {"error": str(e)}
+        except Exception as e:
+            return {"error": f"Eroare la teselarea fișierului IFC: {e}"}
+        geometry = load_geometry(sha)
+        if geometry is None:
+            return {"error": "Cache-ul de geometrie nu a putut fi încărcat după teselare."}
+    meshes = geometry.meshes(
+        lambda ifc_type: discipline_for_type(geometry.schema_name, ifc_type) is not None
+    )
+
+    # ── Diff față de revizia ultimei rulări ─────────────────────────────────
+    changed: set[str] | None = None
+    stale: set[str] = set()
+    previous = _previous_run(db, project_id, tol, pairs_json) if incremental else None
+    if previous is not None:
+        prev_geometry = geometry if previous.content_sha256 == sha else load_geometry(previous.content_sha256)
+        if prev_geometry is not None:
+            current_hashes = geometry.geometry_hashes()
+            prev_hashes = prev_geometry.geometry_hashes()
+            changed = {g for g, h in current_hashes.items() if prev_hashes.get(g) != h}
+            stale = changed | (set(prev_hashes) - set(current_hashes))
+    mode = "full" if changed is None else "incremental"
+
+    if on_progress:
+        on_progress({
+            "stage": "detecting", "mode": mode, "elements": len(meshes),
+            "changed_elements": len(meshes) if changed is None else len(changed),
+        })
+    detected = {
+        _pair_key(c.guid_a, c.guid_b): c
+        for c in detect_clashes(meshes, tolerance=tol, discipline_pairs=discipline_pairs, changed=changed)
+    }
+
+    # ── Reconciliere cu înregistrările existente ────────────────────────────
+    existing = (
+        db.query(ClashRecordModel)
+        .filter(ClashRecordModel.project_id == project_id, ClashRecordModel.source == "detected")
+        .order_by(desc(ClashRecordModel.id))
+        .all()
+    )
+    now = datetime.datetime.now(datetime.timezone.utc)
+    seen: set[tuple[str, str]] = set()
+    carried = auto_resolved = reopened = 0
+    for record in existing:
+        key = _pair_key(record.element_a_guid, record.element_b_guid)
+        if key in seen:
+            continue
+        seen.add(key)
+        retested = changed is None or key[0] in stale or key[1] in stale
+        if not retested:
+            # Ambele elemente neschimbate: clash-ul (și starea lui) rămâne
+            carried += record.status != "resolved"
+            continue
+        clash = detected.pop(key, None)
+        if clash is not None:
+            for field, value in _clash_fields(clash).items():
+                setattr(record, field, value)
+            if record.status == "resolved":
+                # Rezolvat (manual sau automat), dar apare din nou: redeschis
+                note = f"Redeschis: clash-ul apare din nou în {uploaded.filename}."
+                record.status = "open"
+                record.resolved_at = None
+                record.resolution_note = f"{record.resolution_note}\n{note}" if record.resolution_note else note
+                reopened += 1
+            else:
+                carried += 1
+        elif record.status != "resolved":
+            record.status = "resolved"
+            record.resolved_at = now
+            record.resolution_note = record.resolution_note or (
+                f"Închis automat: clash-ul nu mai apare în {uploaded.filename}."
+            )
+            auto_resolved += 1
+
+    rows = [
+        {"project_id": project_id, "status": "open", "source": "detected", **_clash_fields(c)}
+        for c in detected.values()
+    ]
+    if rows:
+        db.execute(insert(ClashRecordModel), rows)
+
+    duration_ms = int((time.time() - started) * 1000)
+    stats = {
+        "elements": len(meshes),
+        "changed_elements": len(meshes) if changed is None else len(changed),
+        "new_clashes": len(rows) + reopened,
+        "reopened": reopened,
+        "carried_forward": carried,
+        "auto_resolved": auto_resolved,
+        "duration_ms": duration_ms,
+    }
+    run = ClashRunModel(
+        project_id=project_id,
+        uploaded_file_id=uploaded.id,
+        content_sha256=sha,
+        tolerance_m=tol,
+        discipline_pairs_json=pairs_json,
+        mode=mode,
+        stats_json=stats,
+    )
+    db.add(run)
+    db.flush()
+
+    log_action(db, project_id, "detect_clashes", {
+        "run_id": run.id, "mode": mode, "uploaded_file_id": uploaded.id, **stats,
+    })
+    logger.info(
+        f"Clash detection proiect {project_id} ({mode}): {stats['changed_elements']}/{len(meshes)} "
+        f"elemente retestate, {len(rows)} noi, {reopened} redeschise, {auto_resolved} închise, în {duration_ms}ms"
+    )
+
+    return {
+        "success": True,
+        "run_id": run.id,
+        "mode": mode,
+        **stats,
+        "clashes_detected": carried + len(rows) + reopened,
+        "tolerance_m": tol,
+    }
+
+
 def get_clash_summary(db: Session, project_id: int) -> dict:
     """Returnează sumar clash-uri proiect."""
     clashes = (
@@ -108,6 +334,12 @@ def get_clash_summary(db: Session, project_id: int) -> dict:
             "status": c.status,
             "assigned_to_role": c.assigned_to_role,
             "resolution_note": c.resolution_note,
+            "source": c.source,
+            "element_a_guid": c.element_a_guid,
+            "element_b_guid": c.element_b_guid,
+            "element_a_type": c.element_a_type,
+            "element_b_type": c.element_b_type,
+            "location": c.location_json,
             "created_at": c.created_at.isoformat() if c.created_at else "",
             "resolved_at": c.resolved_at.isoformat() if c.resolved_at else None,
         })
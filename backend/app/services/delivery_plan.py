@@ -13,9 +13,9 @@ import logging
 from sqlalchemy import desc
 from sqlalchemy.orm import Session
 
-from app.ai_client import call_llm_chat_expert
 from app.models.sql_models import DeliverableModel
-from app.services.json_utils import extract_json as _extract_json
+from app.services.json_utils import extract_json as _extract_json, is_json_response
+from app.services.llm_cache import cached_call_llm_chat_expert
 from app.repositories.projects_repository import (
     get_latest_project_context,
     get_project,
@@ -43,7 +43,29 @@ def generate_tidp(db: Session, project_id: int) -> dict:
     if not disciplines:
         return {"error": "Nu sunt definite discipline în fișa proiectului."}
 
-    prompt = f"""Generează un Task Information Delivery Plan (TIDP) conform ISO 19650-2
+    prompt = build_tidp_prompt(project, ctx)
+
+    try:
+        response_text = cached_call_llm_chat_expert(
+            db,
+            context=f"Proiect: {project.name} ({project.code})",
+            question=prompt,
+            max_tokens=8192,
+            validate=is_json_response,
+        )
+
+        data = _extract_json(response_text)
+        return save_tidp(db, project_id, data, disciplines)
+    except Exception as e:
+        logger.error(f"Eroare la generare TIDP: {e}")
+        return {"error": f"Eroare la generarea TIDP: {str(e)}"}
+
+
+def build_tidp_prompt(project, ctx: dict) -> str:
+    """Construiește promptul TIDP din proiect + ProjectContext (fără apel LLM)."""
+    disciplines = ctx.get("disciplines", [])
+
+    return f"""Generează un Task Information Delivery Plan (TIDP) conform ISO 19650-2
 pentru următorul proiect:
 
 **Proiect**: {ctx.get('project_name', project.name)}
@@ -70,69 +92,61 @@ Răspunde STRICT în format JSON cu un array de livrabile:
 
 Generează cel puțin un livrabil per disciplină. Include documente de coordonare."""
 
-    try:
-        response_text = call_llm_chat_expert(
-            context=f"Proiect: {project.name} ({project.code})",
-            question=prompt,
-            max_tokens=8192,
+
+def save_tidp(db: Session, project_id: int, data: dict, disciplines: list[str]) -> dict:
+    """Înlocuiește livrabilele TIDP cu cele din răspunsul LLM (flush, fără commit)."""
+    deliverables_data = data.get("deliverables", [])
+
+    # Șterge livrabilele vechi generate automat
+    db.query(DeliverableModel).filter(
+        DeliverableModel.project_id == project_id
+    ).delete()
+
+    created = []
+    base_date = datetime.date.today()
+    for d in deliverables_data:
+        due_offset = d.get("due_offset_days", 30)
+        due_date = base_date + datetime.timedelta(days=due_offset)
+
+        entry = DeliverableModel(
+            project_id=project_id,
+            title=d.get("title", "Livrabil"),
+            discipline=d.get("discipline", disciplines[0] if disciplines else "general"),
+            format=d.get("format", "ifc4"),
+            lod=d.get("lod"),
+            responsible_role=d.get("responsible_role"),
+            due_date=due_date,
+            phase=d.get("phase"),
+            status="planned",
         )
+        db.add(entry)
+        created.append(entry)
 
-        data = _extract_json(response_text)
-        deliverables_data = data.get("deliverables", [])
-
-        # Șterge livrabilele vechi generate automat
-        db.query(DeliverableModel).filter(
-            DeliverableModel.project_id == project_id
-        ).delete()
-
-        created = []
-        base_date = datetime.date.today()
-        for d in deliverables_data:
-            due_offset = d.get("due_offset_days", 30)
-            due_date = base_date + datetime.timedelta(days=due_offset)
-
-            entry = DeliverableModel(
-                project_id=project_id,
-                title=d.get("title", "Livrabil"),
-                discipline=d.get("discipline", disciplines[0] if disciplines else "general"),
-                format=d.get("format", "ifc4"),
-                lod=d.get("lod"),
-                responsible_role=d.get("responsible_role"),
-                due_date=due_date,
-                phase=d.get("phase"),
-                status="planned",
-            )
-            db.add(entry)
-            created.append(entry)
-
-        db.flush()
-
-        log_action(db, project_id, "generate_tidp", {
-            "deliverables_count": len(created),
-            "disciplines": disciplines,
-        })
+    db.flush()
 
-        return {
-            "success": True,
-            "deliverables_count": len(created),
-            "deliverables": [
-                {
-                    "id": e.id,
-                    "title": e.title,
-                    "discipline": e.discipline,
-                    "format": e.format,
-                    "lod": e.lod,
-                    "responsible_role": e.responsible_role,
-                    "due_date": e.due_date.isoformat() if e.due_date else None,
-                    "phase": e.phase,
-                    "status": e.status,
-                }
-                for e in created
-            ],
-        }
-    except Exception as e:
-        logger.error(f"Eroare la generare TIDP: {e}")
-        return {"error": f"Eroare la generarea TIDP: {str(e)}"}
+    log_action(db, project_id, "generate_tidp", {
+        "deliverables_count": len(created),
+        "disciplines": disciplines,
+    })
+
+    return {
+        "success": True,
+        "deliverables_count": len(created),
+        "deliverables": [
+            {
+                "id": e.id,
+                "title": e.title,
+                "discipline": e.discipline,
+                "format": e.format,
+                "lod": e.lod,
+                "responsible_role": e.responsible_role,
+                "due_date": e.due_date.isoformat() if e.due_date else None,
+                "phase": e.phase,
+                "status": e.status,
+            }
+            for e in created
+        ],
+    }
 
 
 def get_delivery_plan(db: Session, project_id: int) -> dict:
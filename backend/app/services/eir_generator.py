@@ -11,9 +11,9 @@ import logging
 
 from sqlalchemy.orm import Session
 
-from app.ai_client import call_llm_chat_expert
 from app.models.sql_models import EirModel
-from app.services.json_utils import extract_json as _extract_json
+from app.services.json_utils import extract_json as _extract_json, is_json_response
+from app.services.llm_cache import cached_call_llm_chat_expert
 from app.repositories.projects_repository import (
     get_latest_project_context,
     get_project,
@@ -39,8 +39,28 @@ def generate_eir(db: Session, project_id: int, eir_type: str = "eir") -> dict:
         return {"error": "Nu există fișă BEP (ProjectContext). Completează mai întâi fișa proiectului."}
 
     ctx = ctx_entry.context_json
+    prompt = build_eir_prompt(project, ctx)
 
-    prompt = f"""Generează un document EIR (Exchange Information Requirements) conform ISO 19650-2
+    try:
+        response_text = cached_call_llm_chat_expert(
+            db,
+            context=f"Proiect: {project.name} ({project.code})",
+            question=prompt,
+            max_tokens=8192,
+            validate=is_json_response,
+        )
+
+        # Parse JSON from response
+        content_json = _extract_json(response_text)
+        return save_eir(db, project_id, content_json, eir_type)
+    except Exception as e:
+        logger.error(f"Eroare la generare EIR: {e}")
+        return {"error": f"Eroare la generarea EIR: {str(e)}"}
+
+
+def build_eir_prompt(project, ctx: dict) -> str:
+    """Construiește promptul EIR din proiect + ProjectContext (fără apel LLM)."""
+    return f"""Generează un document EIR (Exchange Information Requirements) conform ISO 19650-2
 pentru următorul proiect BIM:
 
 **Proiect**: {ctx.get('project_name', project.name)}
@@ -83,39 +103,29 @@ Răspunde STRICT în format JSON cu structura:
 
 Generează minim 8 cerințe de informare acoperind toate disciplinele."""
 
-    try:
-        response_text = call_llm_chat_expert(
-            context=f"Proiect: {project.name} ({project.code})",
-            question=prompt,
-            max_tokens=8192,
-        )
 
-        # Parse JSON from response
-        content_json = _extract_json(response_text)
-
-        eir_entry = EirModel(
-            project_id=project_id,
-            eir_type=eir_type,
-            content_json=content_json,
-            version="1.0",
-        )
-        db.add(eir_entry)
-        db.flush()
-
-        log_action(db, project_id, "generate_eir", {
-            "eir_id": eir_entry.id,
-            "eir_type": eir_type,
-            "requirements_count": len(content_json.get("information_requirements", [])),
-        })
-
-        return {
-            "success": True,
-            "eir_id": eir_entry.id,
-            "content_json": content_json,
-        }
-    except Exception as e:
-        logger.error(f"Eroare la generare EIR: {e}")
-        return {"error": f"Eroare la generarea EIR: {str(e)}"}
+def save_eir(db: Session, project_id: int, content_json: dict, eir_type: str = "eir") -> dict:
+    """Persistă un EIR generat (flush, fără commit) și scrie în audit log."""
+    eir_entry = EirModel(
+        project_id=project_id,
+        eir_type=eir_type,
+        content_json=content_json,
+        version="1.0",
+    )
+    db.add(eir_entry)
+    db.flush()
+
+    log_action(db, project_id, "generate_eir", {
+        "eir_id": eir_entry.id,
+        "eir_type": eir_type,
+        "requirements_count": len(content_json.get("information_requirements", [])),
+    })
+
+    return {
+        "success": True,
+        "eir_id": eir_entry.id,
+        "content_json": content_json,
+    }
 
 
 def get_latest_eir(db: Session, project_id: int, eir_type: str = "eir") -> EirModel | None:
@@ -0,0 +1,110 @@
+"""
+element_queries.py — Interogări pe elementele ultimului model IFC al proiectului.
+
+Legătura dintre proiect (DB) și store-ul columnar din element_store: găsește
+ultimul IFC importat, îi încarcă store-ul după hash și rulează filtrele /
+group-by-urile. Store-ul e construit la import (job-ul parse_ifc); pentru
+modelele importate înainte, build_project_element_store îl creează (job-ul
+build_element_store, opțional pentru o revizie anume).
+"""
+
+from __future__ import annotations
+
+import logging
+from typing import Callable
+
+from sqlalchemy.orm import Session
+
+from app.repositories.projects_repository import get_latest_uploaded_file, get_uploaded_file
+from app.services.element_store import (
+    QUERY_DEFAULT_LIMIT,
+    ElementQueryError,
+    load_element_store,
+)
+from app.services.ifc_geometry import file_sha256
+from app.services.ifc_parser import use_step_scanner
+from app.services.ifc_processing import IfcParseError, build_element_store_in_pool
+
+logger = logging.getLogger(__name__)
+
+_NO_IFC_ERROR = "Nu există model IFC importat pentru acest proiect."
+
+
+def query_project_elements(
+    db: Session,
+    project_id: int,
+    *,
+    ifc_type: str | None = None,
+    storey: str | None = None,
+    discipline: str | None = None,
+    where: list[dict] | None = None,
+    has: list[str] | None = None,
+    missing: list[str] | None = None,
+    group_by: str | None = None,
+    limit: int = QUERY_DEFAULT_LIMIT,
+) -> dict:
+    """
+    Filtrează elementele ultimului IFC al proiectului.
+
+    Returns:
+        dict cu count, total_elements și groups (cu group_by) sau elements;
+        {"error": ..., "store_missing": True} dacă modelul nu e încă indexat.
+    """
+    uploaded = get_latest_uploaded_file(db, project_id, "ifc")
+    if uploaded is None:
+        return {"error": _NO_IFC_ERROR}
+
+    store = load_element_store(uploaded.content_sha256) if uploaded.content_sha256 else None
+    if store is None:
+        return {
+            "error": f"Elementele modelului {uploaded.filename} nu sunt încă indexate.",
+            "store_missing": True,
+            "uploaded_file_id": uploaded.id,
+        }
+
+    try:
+        result = store.query(
+            ifc_type=ifc_type, storey=storey, discipline=discipline,
+            where=where, has=has, missing=missing,
+            group_by=group_by, limit=limit,
+        )
+    except ElementQueryError as e:
+        return {"error": str(e)}
+    return {"success": True, "uploaded_file_id": uploaded.id, "filename": uploaded.filename, **result}
+
+
+def build_project_element_store(
+    db: Session,
+    project_id: int,
+    uploaded_file_id: int | None = None,
+    on_progress: Callable[[dict], None] | None = None,
+) -> dict:
+    """
+    Construiește store-ul de elemente pentru un IFC (implicit ultimul), dacă
+    lipsește. Parsarea rulează în pool-ul ifc_processing (limite de timp și
+    memorie); modelele peste pragul de scanare STEP nu sunt indexate.
+    """
+    if uploaded_file_id is not None:
+        uploaded = get_uploaded_file(db, project_id, uploaded_file_id)
+    else:
+        uploaded = get_latest_uploaded_file(db, project_id, "ifc")
+    if uploaded is None:
+        return {"error": _NO_IFC_ERROR}
+
+    if not uploaded.content_sha256:
+        # Upload anterior deduplicării: hash-ul e calculat acum și salvat
+        uploaded.content_sha256 = file_sha256(uploaded.file_path)
+        db.flush()
+    store = load_element_store(uploaded.content_sha256)
+    if store is not None:
+        counts = {"elements": len(store), "property_keys": len(store.property_keys)}
+    elif use_step_scanner(uploaded.file_path):
+        return {"error": f"Modelul {uploaded.filename} depășește pragul de încărcare în memorie: elementele nu sunt indexate."}
+    else:
+        try:
+            counts = build_element_store_in_pool(
+                uploaded.file_path, uploaded.content_sha256, on_progress=on_progress,
+            )
+        except IfcParseError as e:
+            return {"error": str(e)}
+    return {"success": True, "uploaded_file_id": uploaded.id, **counts}
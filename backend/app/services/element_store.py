@@ -0,0 +1,494 @@
+"""
+element_store.py — Store columnar de elemente și proprietăți extras din IFC.
+
+ModelSummary păstrează doar top-N categorii; întrebările mai fine („ce
+pereți nu au FireRating”, „câte uși pe nivel”) ar cere redeschiderea IFC-ului.
+La import, fiecare IfcProduct e extras o singură dată (GlobalId, tip, nume,
+nivel, disciplină + toate valorile din property set-uri și quantity set-uri,
+inclusiv cele moștenite de la tip) într-un store columnar pe disc, adresat
+prin hash-ul fișierului: ELEMENT_STORE_DIR/<sha256>/
+  - elements_*.npy   o coloană per atribut (șirurile codificate prin dicționar)
+  - props_*.npy      tabel lung (element, cheie, valoare numerică, cod șir),
+                     sortat după cheie; key_offsets.npy dă intervalul fiecărei
+                     chei („Pset_WallCommon.FireRating”) → filtrele pe o
+                     proprietate ating doar felia ei
+  - elements_*_hash.npy  amprente per element (atribute, proprietăți,
+                     plasare) → diff între revizii fără a redeschide IFC-urile
+  - dictionaries.json, meta.json
+Coloanele sunt citite prin mmap; filtrele și group-by-urile sunt vectorizate.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import shutil
+import uuid
+from pathlib import Path
+from typing import Any
+
+import ifcopenshell
+import ifcopenshell.util.placement
+import numpy as np
+
+from app.services.ifc_parser import IFC_PARSER_VERSION, _type_ancestors, discipline_for_type
+
+logger = logging.getLogger(__name__)
+
+ELEMENT_STORE_DIR = Path(os.getenv(
+    "ELEMENT_STORE_DIR",
+    str(Path(__file__).resolve().parent.parent.parent / "data" / "element_store"),
+))
+ELEMENT_STORE_VERSION = 2
+QUERY_DEFAULT_LIMIT = 100
+
+_ELEMENT_COLUMNS = ("ifc_type", "name", "storey", "discipline")
+HASH_COLUMNS = ("attributes", "properties", "placement")
+# Atribute fără conținut comparabil între revizii
+_UNHASHED_ATTRIBUTES = frozenset({"id", "type", "GlobalId", "OwnerHistory"})
+_OPS = ("=", "!=", ">", ">=", "<", "<=", "contains")
+
+
+class ElementQueryError(ValueError):
+    """Filtru invalid (operator sau proprietate necunoscută)."""
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# Extracție
+# ══════════════════════════════════════════════════════════════════════════════
+
+def _schema_name(ifc_file: ifcopenshell.file) -> str:
+    return getattr(ifc_file, "schema_identifier", None) or ifc_file.schema
+
+
+def _plain_value(value: Any) -> Any:
+    if isinstance(value, ifcopenshell.entity_instance):
+        value = value.wrappedValue
+    if isinstance(value, (tuple, list)):
+        return ", ".join(str(_plain_value(v)) for v in value)
+    return value
+
+
+def _definition_values(definition) -> list[tuple[str, Any]]:
+    """(„Pset.Proprietate”, valoare) pentru un property set / quantity set."""
+    pset_name = getattr(definition, "Name", None) or ""
+    out: list[tuple[str, Any]] = []
+    if definition.is_a("IfcPropertySet"):
+        for prop in definition.HasProperties or ():
+            if prop.is_a("IfcPropertySingleValue"):
+                value = prop.NominalValue
+            elif prop.is_a("IfcPropertyEnumeratedValue"):
+                value = prop.EnumerationValues
+            else:
+                continue
+            if value is not None:
+                out.append((f"{pset_name}.{prop.Name}", _plain_value(value)))
+    elif definition.is_a("IfcElementQuantity"):
+        for quantity in definition.Quantities or ():
+            if quantity.is_a("IfcPhysicalSimpleQuantity") and quantity[3] is not None:
+                out.append((f"{pset_name}.{quantity.Name}", float(quantity[3])))
+    return out
+
+
+def _storey_name(structure, cache: dict[int, str]) -> str:
+    """Numele nivelului care conține structura spațială (urcând prin agregări)."""
+    key = structure.id()
+    if key not in cache:
+        node, name = structure, ""
+        while node is not None:
+            if node.is_a("IfcBuildingStorey"):
+                name = node.Name or node.LongName or f"#{node.id()}"
+                break
+            parents = getattr(node, "Decomposes", None) or ()
+            node = parents[0].RelatingObject if parents else None
+        cache[key] = name
+    return cache[key]
+
+
+def extract_elements(ifc_file: ifcopenshell.file) -> tuple[dict[str, list], dict[tuple[int, str], Any]]:
+    """
+    O trecere prin relațiile fișierului.
+
+    Returns:
+        (coloanele elementelor ca liste, {(index element, cheie): valoare})
+    """
+    schema_name = _schema_name(ifc_file)
+    products = ifc_file.by_type("IfcProduct")
+    index = {p.id(): i for i, p in enumerate(products)}
+    storey_cache: dict[int, str] = {}
+
+    columns: dict[str, list] = {
+        "guid": [p.GlobalId for p in products],
+        "ifc_type": [p.is_a() for p in products],
+        "name": [p.Name or "" for p in products],
+        "storey": [""] * len(products),
+        "discipline": [discipline_for_type(schema_name, p.is_a()) or "other" for p in products],
+    }
+
+    storeys = columns["storey"]
+    for rel in ifc_file.by_type("IfcRelContainedInSpatialStructure"):
+        name = _storey_name(rel.RelatingStructure, storey_cache)
+        for element in rel.RelatedElements:
+            i = index.get(element.id())
+            if i is not None:
+                storeys[i] = name
+    for i, p in enumerate(products):
+        if not storeys[i] and p.is_a("IfcSpatialStructureElement"):
+            storeys[i] = _storey_name(p, storey_cache)
+    # Părțile agregate (ex: IfcStairFlight în IfcStair) moștenesc nivelul părintelui
+    for rel in ifc_file.by_type("IfcRelAggregates"):
+        parent = index.get(rel.RelatingObject.id())
+        if parent is None:
+            continue
+        for child in rel.RelatedObjects:
+            c = index.get(child.id())
+            if c is not None and not storeys[c]:
+                storeys[c] = storeys[parent]
+
+    values: dict[tuple[int, str], Any] = {}
+    # Întâi proprietățile tipului, apoi cele ale instanței (care au prioritate)
+    for rel in ifc_file.by_type("IfcRelDefinesByType"):
+        definitions = getattr(rel.RelatingType, "HasPropertySets", None) or ()
+        pairs = [kv for d in definitions for kv in _definition_values(d)]
+        for obj in rel.RelatedObjects:
+            i = index.get(obj.id())
+            if i is not None:
+                for key, value in pairs:
+                    values[(i, key)] = value
+    for rel in ifc_file.by_type("IfcRelDefinesByProperties"):
+        definitions = rel.RelatingPropertyDefinition
+        if not isinstance(definitions, (tuple, list)):
+            definitions = (definitions,)
+        pairs = [kv for d in definitions for kv in _definition_values(d)]
+        for obj in rel.RelatedObjects:
+            i = index.get(obj.id())
+            if i is not None:
+                for key, value in pairs:
+                    values[(i, key)] = value
+
+    columns.update(_element_hashes(products, storeys, values))
+    return columns, values
+
+
+def _digest(*parts: Any) -> str:
+    return hashlib.blake2b(repr(parts).encode(), digest_size=8).hexdigest()
+
+
+def _element_hashes(products: list, storeys: list[str], values: dict[tuple[int, str], Any]) -> dict[str, list[str]]:
+    """Amprentele fiecărui element: atribute directe + nivel, proprietăți, plasare."""
+    per_element: list[list[tuple[str, Any]]] = [[] for _ in products]
+    for (i, key), value in values.items():
+        per_element[i].append((key, value))
+
+    hashes: dict[str, list[str]] = {f"{c}_hash": [] for c in HASH_COLUMNS}
+    for i, p in enumerate(products):
+        attributes = sorted(
+            (k, v) for k, v in p.get_info(include_identifier=False, recursive=False).items()
+            if k not in _UNHASHED_ATTRIBUTES and not isinstance(v, (ifcopenshell.entity_instance, tuple))
+        )
+        hashes["attributes_hash"].append(_digest(p.is_a(), storeys[i], attributes))
+        hashes["properties_hash"].append(_digest(sorted(per_element[i], key=lambda kv: kv[0])))
+        placement = ()
+        if getattr(p, "ObjectPlacement", None) is not None:
+            try:
+                matrix = ifcopenshell.util.placement.get_local_placement(p.ObjectPlacement)
+                placement = tuple((np.round(matrix[:3], 3) + 0.0).ravel().tolist())
+            except Exception:
+                placement = (p.ObjectPlacement.id(),)
+        hashes["placement_hash"].append(_digest(placement))
+    return hashes
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# Scriere / citire
+# ══════════════════════════════════════════════════════════════════════════════
+
+def _encode(strings: list[str]) -> tuple[list[str], np.ndarray]:
+    dictionary, codes = np.unique(np.asarray(strings, dtype=object).astype(str), return_inverse=True)
+    return dictionary.tolist(), codes.astype(np.int32)
+
+
+def _store_path(content_sha256: str) -> Path:
+    return ELEMENT_STORE_DIR / content_sha256
+
+
+def build_element_store(ifc_file: ifcopenshell.file | str | Path, content_sha256: str) -> Path:
+    """Extrage elementele și scrie store-ul (atomic) pentru hash-ul dat."""
+    if not isinstance(ifc_file, ifcopenshell.file):
+        ifc_file = ifcopenshell.open(str(ifc_file))
+    columns, values = extract_elements(ifc_file)
+
+    dictionaries: dict[str, list[str]] = {}
+    arrays: dict[str, np.ndarray] = {
+        "elements_guid": np.asarray(columns["guid"], dtype="U22"),
+    }
+    for column in _ELEMENT_COLUMNS:
+        dictionaries[column], arrays[f"elements_{column}"] = _encode(columns[column])
+    for column in HASH_COLUMNS:
+        arrays[f"elements_{column}_hash"] = np.asarray(columns[f"{column}_hash"], dtype="U16")
+
+    keys = sorted({key for _, key in values})
+    key_code = {k: c for c, k in enumerate(keys)}
+    entries = sorted(values.items(), key=lambda kv: (key_code[kv[0][1]], kv[0][0]))
+
+    str_values: dict[str, int] = {}
+    p_elem = np.empty(len(entries), dtype=np.int32)
+    p_key = np.empty(len(entries), dtype=np.int32)
+    p_num = np.full(len(entries), np.nan, dtype=np.float64)
+    p_str = np.full(len(entries), -1, dtype=np.int32)
+    for row, ((elem, key), value) in enumerate(entries):
+        p_elem[row] = elem
+        p_key[row] = key_code[key]
+        if isinstance(value, bool):
+            p_num[row] = float(value)
+            value = str(value)
+        elif isinstance(value, (int, float)):
+            p_num[row] = float(value)
+            continue
+        p_str[row] = str_values.setdefault(str(value), len(str_values))
+
+    arrays.update({
+        "props_elem": p_elem,
+        "props_key": p_key,
+        "props_num": p_num,
+        "props_str": p_str,
+        "key_offsets": np.searchsorted(p_key, np.arange(len(keys) + 1)).astype(np.int64),
+    })
+    dictionaries["key"] = keys
+    dictionaries["str"] = list(str_values)
+
+    target = _store_path(content_sha256)
+    tmp = target.with_name(f".{target.name}.{uuid.uuid4().hex}.tmp")
+    tmp.mkdir(parents=True)
+    try:
+        for name, array in arrays.items():
+            np.save(tmp / f"{name}.npy", array)
+        (tmp / "dictionaries.json").write_text(json.dumps(dictionaries, ensure_ascii=False))
+        (tmp / "meta.json").write_text(json.dumps({
+            "version": ELEMENT_STORE_VERSION,
+            # Disciplinele depind de maparea parserului: store-ul expiră odată cu ea
+            "parser_version": IFC_PARSER_VERSION,
+            "schema": _schema_name(ifc_file),
+            "elements": len(columns["guid"]),
+            "properties": len(entries),
+        }))
+        shutil.rmtree(target, ignore_errors=True)
+        os.replace(tmp, target)
+    except OSError:
+        shutil.rmtree(tmp, ignore_errors=True)
+        if not target.exists():
+            raise
+    logger.info(f"Element store {content_sha256[:12]}: {len(columns['guid'])} elemente, {len(entries)} proprietăți")
+    return target
+
+
+def load_element_store(content_sha256: str) -> ElementStore | None:
+    """Store-ul pentru un hash de fișier (None dacă lipsește, e vechi sau din alt parser)."""
+    path = _store_path(content_sha256)
+    try:
+        meta = json.loads((path / "meta.json").read_text())
+        if (meta.get("version"), meta.get("parser_version")) != (ELEMENT_STORE_VERSION, IFC_PARSER_VERSION):
+            return None
+        return ElementStore(path, meta)
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# Interogare
+# ══════════════════════════════════════════════════════════════════════════════
+
+class ElementStore:
+    """Store columnar citit prin mmap, cu filtre și group-by vectorizate."""
+
+    def __init__(self, path: Path, meta: dict):
+        self.schema_name: str = meta["schema"]
+        self.dictionaries: dict[str, list[str]] = json.loads((path / "dictionaries.json").read_text())
+
+        def load(name: str) -> np.ndarray:
+            return np.load(path / f"{name}.npy", mmap_mode="r")
+
+        self.guid = load("elements_guid")
+        self.columns = {c: load(f"elements_{c}") for c in _ELEMENT_COLUMNS}
+        self.hashes = {c: load(f"elements_{c}_hash") for c in HASH_COLUMNS}
+        self.p_elem = load("props_elem")
+        self.p_num = load("props_num")
+        self.p_str = load("props_str")
+        self.key_offsets = load("key_offsets")
+        self._key_code = {k: i for i, k in enumerate(self.dictionaries["key"])}
+        self._str_code = {s: i for i, s in enumerate(self.dictionaries["str"])}
+
+    def __len__(self) -> int:
+        return len(self.guid)
+
+    @property
+    def property_keys(self) -> list[str]:
+        return self.dictionaries["key"]
+
+    # ── Rezolvare nume ───────────────────────────────────────────────────────
+
+    def _keys_for(self, prop: str) -> list[int]:
+        """„Pset.Prop” exact, „Prop” în orice property set sau „Pset” (orice proprietate a lui)."""
+        if prop in self._key_code:
+            return [self._key_code[prop]]
+        suffix, prefix = f".{prop}", f"{prop}."
+        codes = [i for i, k in enumerate(self.dictionaries["key"]) if k.endswith(suffix)]
+        if not codes:
+            codes = [i for i, k in enumerate(self.dictionaries["key"]) if k.startswith(prefix)]
+        if not codes:
+            raise ElementQueryError(f"Proprietate inexistentă în model: {prop}")
+        return codes
+
+    def _type_codes(self, ifc_type: str) -> np.ndarray:
+        """Codurile tipurilor prezente care sunt ifc_type sau subtipuri ale lui."""
+        return np.array([
+            i for i, t in enumerate(self.dictionaries["ifc_type"])
+            if ifc_type in _type_ancestors(self.schema_name, t)
+        ], dtype=np.int32)
+
+    def _column_mask(self, column: str, value: str) -> np.ndarray:
+        dictionary = self.dictionaries[column]
+        codes = [i for i, v in enumerate(dictionary) if v.lower() == value.lower()]
+        return np.isin(self.columns[column], codes)
+
+    # ── Filtre ───────────────────────────────────────────────────────────────
+
+    def _property_mask(self, prop: str, op: str | None = None, value: Any = None) -> np.ndarray:
+        """Elementele care au proprietatea (și, dacă e dat, satisfac condiția)."""
+        if op is not None and op not in _OPS:
+            raise ElementQueryError(f"Operator necunoscut: {op}. Disponibili: {', '.join(_OPS)}")
+        mask = np.zeros(len(self), dtype=bool)
+        for code in self._keys_for(prop):
+            start, end = int(self.key_offsets[code]), int(self.key_offsets[code + 1])
+            elems = self.p_elem[start:end]
+            if op is None:
+                mask[elems] = True
+                continue
+            num = self.p_num[start:end]
+            strs = self.p_str[start:end]
+            if op == "contains":
+                needle = str(value).lower()
+                codes = [i for i, s in enumerate(self.dictionaries["str"]) if needle in s.lower()]
+                hit = np.isin(strs, codes)
+            elif isinstance(value, (int, float)) and not isinstance(value, bool):
+                hit = {
+                    "=": num == value, "!=": num != value,
+                    ">": num > value, ">=": num >= value,
+                    "<": num < value, "<=": num <= value,
+                }[op] & ~np.isnan(num)
+            elif op in ("=", "!="):
+                code = self._str_code.get(str(value), -2)
+                hit = (strs == code) if op == "=" else (strs != code)
+            else:
+                raise ElementQueryError(f"Operatorul {op} cere o valoare numerică.")
+            mask[elems[hit]] = True
+        return mask
+
+    def type_mask(self, ifc_type: str) -> np.ndarray:
+        """Mască: elementele de tipul ifc_type (inclusiv subtipuri)."""
+        return np.isin(self.columns["ifc_type"], self._type_codes(ifc_type))
+
+    def has_property(self, prop: str) -> np.ndarray:
+        """Mască: elementele care au proprietatea (toate False dacă lipsește din model)."""
+        try:
+            return self._property_mask(prop)
+        except ElementQueryError:
+            return np.zeros(len(self), dtype=bool)
+
+    def filter(
+        self,
+        *,
+        ifc_type: str | None = None,
+        storey: str | None = None,
+        discipline: str | None = None,
+        where: list[dict] | None = None,
+        has: list[str] | None = None,
+        missing: list[str] | None = None,
+    ) -> np.ndarray:
+        """Mască booleană peste elemente; condițiile se combină cu ȘI."""
+        mask = np.ones(len(self), dtype=bool)
+        if ifc_type:
+            mask &= self.type_mask(ifc_type)
+        if storey:
+            mask &= self._column_mask("storey", storey)
+        if discipline:
+            mask &= self._column_mask("discipline", discipline)
+        for prop in has or ():
+            mask &= self._property_mask(prop)
+        for prop in missing or ():
+            # O proprietate necompletată nicăieri lipsește la toate elementele
+            mask &= ~self.has_property(prop)
+        for cond in where or ():
+            mask &= self._property_mask(cond["property"], cond.get("op", "="), cond.get("value"))
+        return mask
+
+    # ── Rezultate ────────────────────────────────────────────────────────────
+
+    def group_counts(self, mask: np.ndarray, group_by: str) -> dict[str, int]:
+        """Număr de elemente per valoare a unei coloane sau a unei proprietăți."""
+        if group_by in self.columns:
+            codes = np.asarray(self.columns[group_by])[mask]
+            counts = np.bincount(codes, minlength=len(self.dictionaries[group_by]))
+            groups = {
+                self.dictionaries[group_by][i] or "(nespecificat)": int(n)
+                for i, n in enumerate(counts) if n
+            }
+        else:
+            groups: dict[str, int] = {}
+            selected = np.flatnonzero(mask)
+            covered = np.zeros(len(self), dtype=bool)
+            for code in self._keys_for(group_by):
+                start, end = int(self.key_offsets[code]), int(self.key_offsets[code + 1])
+                elems = np.asarray(self.p_elem[start:end])
+                keep = mask[elems] & ~covered[elems]
+                covered[elems[keep]] = True
+                strs = np.asarray(self.p_str[start:end])[keep]
+                nums = np.asarray(self.p_num[start:end])[keep]
+                labels = [
+                    self.dictionaries["str"][s] if s >= 0 else f"{n:g}"
+                    for s, n in zip(strs.tolist(), nums.tolist())
+                ]
+                for label in labels:
+                    groups[label] = groups.get(label, 0) + 1
+            without = int(len(selected) - covered[selected].sum())
+            if without:
+                groups["(lipsă)"] = without
+        return dict(sorted(groups.items(), key=lambda kv: kv[1], reverse=True))
+
+    def rows(self, mask: np.ndarray, limit: int = QUERY_DEFAULT_LIMIT) -> list[dict]:
+        idx = np.flatnonzero(mask)[:limit]
+        return [
+            {
+                "guid": str(self.guid[i]),
+                **{c: self.dictionaries[c][int(self.columns[c][i])] for c in _ELEMENT_COLUMNS},
+            }
+            for i in idx
+        ]
+
+    def query(
+        self,
+        *,
+        ifc_type: str | None = None,
+        storey: str | None = None,
+        discipline: str | None = None,
+        where: list[dict] | None = None,
+        has: list[str] | None = None,
+        missing: list[str] | None = None,
+        group_by: str | None = None,
+        limit: int = QUERY_DEFAULT_LIMIT,
+    ) -> dict:
+        """Filtre + group-by sau listă de elemente (primele `limit`)."""
+        mask = self.filter(
+            ifc_type=ifc_type, storey=storey, discipline=discipline,
+            where=where, has=has, missing=missing,
+        )
+        result: dict[str, Any] = {"count": int(mask.sum()), "total_elements": len(self)}
+        if group_by:
+            result["group_by"] = group_by
+            result["groups"] = self.group_counts(mask, group_by)
+        else:
+            result["elements"] = self.rows(mask, limit)
+            result["truncated"] = result["count"] > limit
+        return result
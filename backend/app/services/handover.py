@@ -10,9 +10,9 @@ import logging
 
 from sqlalchemy.orm import Session
 
-from app.ai_client import call_llm_chat_expert
 from app.models.sql_models import HandoverChecklistModel
-from app.services.json_utils import extract_json as _extract_json
+from app.services.json_utils import extract_json as _extract_json, is_json_response
+from app.services.llm_cache import cached_call_llm_chat_expert
 from app.repositories.projects_repository import (
     get_latest_project_context,
     get_project,
@@ -42,10 +42,29 @@ def generate_handover_checklist(db: Session, project_id: int) -> dict:
     if not ctx_entry:
         return {"error": "Nu există fișă BEP."}
 
-    ctx = ctx_entry.context_json
+    prompt = build_handover_prompt(project, ctx_entry.context_json)
+
+    try:
+        response_text = cached_call_llm_chat_expert(
+            db,
+            context=f"Proiect: {project.name} ({project.code})",
+            question=prompt,
+            max_tokens=8192,
+            validate=is_json_response,
+        )
+
+        data = _extract_json(response_text)
+        return save_handover_checklist(db, project_id, data)
+    except Exception as e:
+        logger.error(f"Eroare la generare handover: {e}")
+        return {"error": f"Eroare la generarea handover: {str(e)}"}
+
+
+def build_handover_prompt(project, ctx: dict) -> str:
+    """Construiește promptul checklist-ului handover (fără apel LLM)."""
     disciplines = ctx.get("disciplines", [])
 
-    prompt = f"""Generează un checklist de predare (handover) conform ISO 19650-3
+    return f"""Generează un checklist de predare (handover) conform ISO 19650-3
 pentru un proiect BIM.
 
 **Proiect**: {ctx.get('project_name', project.name)}
@@ -66,44 +85,36 @@ Răspunde STRICT în format JSON:
 
 Generează cel puțin 15 elemente acoperind toate categoriile."""
 
-    try:
-        response_text = call_llm_chat_expert(
-            context=f"Proiect: {project.name} ({project.code})",
-            question=prompt,
-            max_tokens=8192,
+
+def save_handover_checklist(db: Session, project_id: int, data: dict) -> dict:
+    """Înlocuiește checklist-ul handover cu elementele din răspunsul LLM (flush, fără commit)."""
+    items_data = data.get("items", [])
+
+    # Șterge items vechi
+    db.query(HandoverChecklistModel).filter(
+        HandoverChecklistModel.project_id == project_id
+    ).delete()
+
+    created = []
+    for item in items_data:
+        entry = HandoverChecklistModel(
+            project_id=project_id,
+            item_name=item.get("item_name", ""),
+            category=item.get("category", "documentatie"),
         )
+        db.add(entry)
+        created.append(entry)
 
-        data = _extract_json(response_text)
-        items_data = data.get("items", [])
-
-        # Șterge items vechi
-        db.query(HandoverChecklistModel).filter(
-            HandoverChecklistModel.project_id == project_id
-        ).delete()
-
-        created = []
-        for item in items_data:
-            entry = HandoverChecklistModel(
-                project_id=project_id,
-                item_name=item.get("item_name", ""),
-                category=item.get("category", "documentatie"),
-            )
-            db.add(entry)
-            created.append(entry)
-
-        db.flush()
-
-        log_action(db, project_id, "generate_handover", {
-            "items_count": len(created),
-        })
+    db.flush()
 
-        return {
-            "success": True,
-            "items_count": len(created),
-        }
-    except Exception as e:
-        logger.error(f"Eroare la generare handover: {e}")
-        return {"error": f"Eroare la generarea handover: {str(e)}"}
+    log_action(db, project_id, "generate_handover", {
+        "items_count": len(created),
+    })
+
+    return {
+        "success": True,
+        "items_count": len(created),
+    }
 
 
 def get_handover_status(db: Session, project_id: int) -> dict:
@@ -0,0 +1,155 @@
+"""
+ifc_delivery.py — Livrarea fișierului IFC către viewer (cache HTTP, compresie).
+
+Blob-urile IFC sunt adresate prin conținut, deci SHA-256 e un ETag puternic
+natural: un viewer care are deja modelul primește 304, fără transfer. Pe
+lângă blob se precalculează (job-ul compress_ifc_blob, după import) variante
+comprimate: <sha>.ifc.gz și, dacă pachetul `brotli` e instalat, <sha>.ifc.br.
+IFC-ul e text STEP și se comprimă de 5–10 ori; compresia nu se face per
+request, doar se alege varianta după Accept-Encoding.
+
+Cererile Range (încărcare progresivă) sunt servite din blob-ul necomprimat.
+"""
+
+from __future__ import annotations
+
+import gzip
+import logging
+import os
+import shutil
+import uuid
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+IFC_GZIP_LEVEL = int(os.getenv("IFC_GZIP_LEVEL", "6"))
+IFC_BROTLI_QUALITY = int(os.getenv("IFC_BROTLI_QUALITY", "5"))
+_CHUNK_BYTES = 1024 * 1024
+
+try:
+    import brotli
+except ImportError:  # opțional: fără brotli se servește doar gzip
+    brotli = None
+
+# Ordinea de preferință la egalitate de q (br comprimă mai bine)
+_SUFFIXES = {"br": ".br", "gzip": ".gz"}
+
+
+def available_encodings() -> list[str]:
+    """Codificările care pot fi precalculate în acest mediu."""
+    return [e for e in _SUFFIXES if e != "br" or brotli is not None]
+
+
+def variant_path(blob: str | Path, encoding: str) -> Path:
+    """Calea variantei comprimate de lângă blob (ex: <sha>.ifc.gz)."""
+    blob = Path(blob)
+    return blob.with_name(blob.name + _SUFFIXES[encoding])
+
+
+def missing_variants(blob: str | Path) -> list[str]:
+    """Codificările disponibile care nu au încă variantă pe disc."""
+    return [e for e in available_encodings() if not variant_path(blob, e).exists()]
+
+
+def _compress_to(blob: Path, dest: Path, encoding: str) -> None:
+    # Temporar în același director + os.replace: varianta e completă sau lipsește
+    tmp = dest.with_name(f".{dest.name}.{uuid.uuid4().hex}.part")
+    try:
+        with open(blob, "rb") as src, open(tmp, "wb") as raw:
+            if encoding == "gzip":
+                # mtime=0: aceeași variantă pentru același conținut
+                with gzip.GzipFile(fileobj=raw, mode="wb", compresslevel=IFC_GZIP_LEVEL, mtime=0) as out:
+                    shutil.copyfileobj(src, out, _CHUNK_BYTES)
+            else:
+                compressor = brotli.Compressor(quality=IFC_BROTLI_QUALITY)
+                while chunk := src.read(_CHUNK_BYTES):
+                    raw.write(compressor.process(chunk))
+                raw.write(compressor.finish())
+        os.replace(tmp, dest)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+
+
+def precompress_blob(blob: str | Path) -> dict:
+    """
+    Scrie variantele comprimate lipsă ale unui fișier servit — blob IFC sau
+    fragment glTF al viewer-ului (idempotent).
+
+    Returns:
+        dict cu dimensiunea originală și a fiecărei variante, sau {"error": ...}.
+    """
+    blob = Path(blob)
+    if not blob.exists():
+        return {"error": f"Fișierul {blob.name} nu a fost găsit pe disc."}
+
+    created = []
+    for encoding in missing_variants(blob):
+        _compress_to(blob, variant_path(blob, encoding), encoding)
+        created.append(encoding)
+    if created:
+        logger.info(f"Variante comprimate pentru {blob.name}: {', '.join(created)}")
+
+    return {
+        "success": True,
+        "size_bytes": blob.stat().st_size,
+        "created": created,
+        "variants": {
+            e: variant_path(blob, e).stat().st_size
+            for e in _SUFFIXES if variant_path(blob, e).exists()
+        },
+    }
+
+
+def _accepted(accept_encoding: str) -> dict[str, float]:
+    """Accept-Encoding → {codificare: q}."""
+    accepted: dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        name = name.strip().lower()
+        if not name:
+            continue
+        q = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key.strip().lower() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        accepted[name] = q
+    return accepted
+
+
+def choose_variant(blob: str | Path, accept_encoding: str | None) -> tuple[Path, str | None]:
+    """Varianta de servit: (cale, codificare) sau (blob, None) pentru identitate."""
+    blob = Path(blob)
+    if not accept_encoding:
+        return blob, None
+    accepted = _accepted(accept_encoding)
+    best: tuple[float, str] | None = None
+    for encoding in _SUFFIXES:
+        q = accepted.get(encoding, accepted.get("*", 0.0))
+        if q > 0 and (best is None or q > best[0]) and variant_path(blob, encoding).exists():
+            best = (q, encoding)
+    if best is None:
+        return blob, None
+    return variant_path(blob, best[1]), best[1]
+
+
+def content_etag(key: str, encoding: str | None = None) -> str:
+    """ETag puternic dintr-o cheie de conținut (hash); distinct pentru fiecare codificare."""
+    return f'"{key}-{_SUFFIXES[encoding][1:]}"' if encoding else f'"{key}"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """If-None-Match (comparație slabă, RFC 9110 §13.1.2) se potrivește cu ETag-ul?"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(
+        candidate.strip().removeprefix("W/") == opaque
+        for candidate in if_none_match.split(",")
+    )
@@ -0,0 +1,159 @@
+"""
+ifc_diff.py — Diff între două revizii IFC ale aceluiași proiect.
+
+Elementele sunt potrivite după GlobalId; modificările se detectează prin
+amprentele per element salvate în store-ul columnar la import (atribute +
+nivel, proprietăți, plasare — vezi element_store). Diff-ul compară doar
+aceste coloane (mmap, vectorizat): niciunul dintre modelele IFC nu e
+redeschis, iar memoria folosită nu depinde de complexitatea geometriei.
+
+Rezultat: elemente adăugate / șterse / modificate (cu aspectele schimbate)
+și deltele per disciplină.
+"""
+
+from __future__ import annotations
+
+import logging
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from app.models.sql_models import UploadedFileModel
+from app.repositories.projects_repository import get_uploaded_file, list_uploaded_files
+from app.services.element_store import HASH_COLUMNS, ElementStore, load_element_store
+
+logger = logging.getLogger(__name__)
+
+DIFF_MAX_ITEMS = 200
+_HISTORY_LIMIT = 500
+
+
+def _describe(store: ElementStore, indices: np.ndarray, changes: list[list[str]] | None = None) -> list[dict]:
+    items = []
+    for n, i in enumerate(indices.tolist()):
+        item = {
+            "guid": str(store.guid[i]),
+            "ifc_type": store.dictionaries["ifc_type"][int(store.columns["ifc_type"][i])],
+            "name": store.dictionaries["name"][int(store.columns["name"][i])],
+            "discipline": store.dictionaries["discipline"][int(store.columns["discipline"][i])],
+        }
+        if changes is not None:
+            item["changes"] = changes[n]
+        items.append(item)
+    return items
+
+
+def _discipline_counts(store: ElementStore, indices: np.ndarray) -> dict[str, int]:
+    codes = np.asarray(store.columns["discipline"])[indices]
+    counts = np.bincount(codes, minlength=len(store.dictionaries["discipline"]))
+    return {store.dictionaries["discipline"][c]: int(n) for c, n in enumerate(counts) if n}
+
+
+def diff_element_stores(old: ElementStore, new: ElementStore, *, max_items: int = DIFF_MAX_ITEMS) -> dict:
+    """Compară două revizii după GlobalId și amprentele per element."""
+    old_guid, new_guid = np.asarray(old.guid), np.asarray(new.guid)
+    _, old_idx, new_idx = np.intersect1d(old_guid, new_guid, assume_unique=False, return_indices=True)
+
+    in_old = np.zeros(len(old_guid), dtype=bool)
+    in_old[old_idx] = True
+    in_new = np.zeros(len(new_guid), dtype=bool)
+    in_new[new_idx] = True
+    removed = np.flatnonzero(~in_old)
+    added = np.flatnonzero(~in_new)
+
+    aspect_changed = {
+        c: np.asarray(old.hashes[c])[old_idx] != np.asarray(new.hashes[c])[new_idx]
+        for c in HASH_COLUMNS
+    }
+    any_changed = np.logical_or.reduce(list(aspect_changed.values()))
+    modified_pos = np.flatnonzero(any_changed)
+    modified = new_idx[modified_pos]
+    shown = modified_pos[:max_items]
+    changes = [[c for c in HASH_COLUMNS if aspect_changed[c][p]] for p in shown.tolist()]
+
+    by_discipline: dict[str, dict[str, int]] = {}
+    for kind, counts in (
+        ("added", _discipline_counts(new, added)),
+        ("removed", _discipline_counts(old, removed)),
+        ("modified", _discipline_counts(new, modified)),
+    ):
+        for discipline, n in counts.items():
+            by_discipline.setdefault(discipline, {"added": 0, "removed": 0, "modified": 0})[kind] = n
+
+    return {
+        "elements_before": len(old_guid),
+        "elements_after": len(new_guid),
+        "added_count": len(added),
+        "removed_count": len(removed),
+        "modified_count": len(modified),
+        "unchanged_count": len(new_idx) - len(modified),
+        "modified_by_aspect": {c: int(aspect_changed[c].sum()) for c in HASH_COLUMNS},
+        "by_discipline": by_discipline,
+        "added": _describe(new, added[:max_items]),
+        "removed": _describe(old, removed[:max_items]),
+        "modified": _describe(new, new_idx[shown], changes),
+        "truncated": max(len(added), len(removed), len(modified)) > max_items,
+    }
+
+
+def _file_info(uploaded: UploadedFileModel) -> dict:
+    return {
+        "id": uploaded.id,
+        "filename": uploaded.filename,
+        "uploaded_at": uploaded.created_at.isoformat() if uploaded.created_at else None,
+    }
+
+
+def diff_project_revisions(
+    db: Session,
+    project_id: int,
+    *,
+    from_file_id: int | None = None,
+    to_file_id: int | None = None,
+    max_items: int = DIFF_MAX_ITEMS,
+) -> dict:
+    """
+    Diff între două upload-uri IFC ale proiectului. Implicit: ultimul față
+    de penultimul; cu doar to_file_id, față de upload-ul anterior lui.
+    """
+    history = list_uploaded_files(db, project_id, "ifc", limit=_HISTORY_LIMIT)
+    if len(history) < 2 and not (from_file_id and to_file_id):
+        return {"error": "Proiectul are mai puțin de două revizii IFC importate."}
+
+    if to_file_id is not None:
+        to_file = get_uploaded_file(db, project_id, to_file_id)
+        if to_file is None:
+            return {"error": f"Fișierul IFC {to_file_id} nu există în acest proiect."}
+    else:
+        to_file = history[0]
+    if from_file_id is not None:
+        from_file = get_uploaded_file(db, project_id, from_file_id)
+        if from_file is None:
+            return {"error": f"Fișierul IFC {from_file_id} nu există în acest proiect."}
+    else:
+        position = next((n for n, f in enumerate(history) if f.id == to_file.id), None)
+        if position is None or position + 1 >= len(history):
+            return {"error": f"Nu există o revizie IFC anterioară fișierului {to_file.id}."}
+        from_file = history[position + 1]
+
+    stores = {
+        f.id: load_element_store(f.content_sha256) if f.content_sha256 else None
+        for f in (from_file, to_file)
+    }
+    missing = [file_id for file_id, store in stores.items() if store is None]
+    if missing:
+        return {
+            "error": "Elementele uneia dintre revizii nu sunt încă indexate.",
+            "store_missing": True,
+            "missing_uploaded_file_ids": missing,
+        }
+
+    result = diff_element_stores(stores[from_file.id], stores[to_file.id], max_items=max_items)
+    return {
+        "success": True,
+        "project_id": project_id,
+        "from_file": _file_info(from_file),
+        "to_file": _file_info(to_file),
+        "identical_content": from_file.content_sha256 == to_file.content_sha256,
+        **result,
+    }
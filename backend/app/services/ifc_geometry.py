@@ -0,0 +1,320 @@
+"""
+ifc_geometry.py — Teselare IFC reutilizabilă, cu cache pe disc.
+
+Orice analiză geometrică (clash-uri, cantități, bounding box-uri) e dominată
+de teselare. Serviciul rulează iteratorul de geometrie ifcopenshell pe mai
+multe thread-uri (coordonate globale, metri) și salvează plasele de
+triunghiuri ale tuturor produselor într-un cache adresat prin hash-ul
+fișierului: GEOMETRY_CACHE_DIR/<sha256>/
+  - vertices.npy  float32 (V, 3), relativ la originea elementului
+  - faces.npy     uint32  (F, 3), indici locali elementului
+  - elements.npy  index structurat: GlobalId, tip IFC, offset-uri,
+                  origine, AABB (float64) și hash-ul geometriei
+  - meta.json     schema IFC + versiunea formatului
+Elementele se regăsesc după GlobalId; o analiză repetată pe același model
+nu mai teselează nimic (fișierele sunt citite prin mmap). Hash-ul geometriei
+(plasa rotunjită la 0.1 mm) permite compararea a două revizii element cu
+element, fără o nouă teselare.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import shutil
+import uuid
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable
+
+import ifcopenshell
+import ifcopenshell.geom
+import numpy as np
+
+from app.services.ifc_parser import discipline_for_type
+
+logger = logging.getLogger(__name__)
+
+GEOMETRY_THREADS = int(os.getenv("GEOMETRY_THREADS", str(os.cpu_count() or 1)))
+GEOMETRY_CACHE_DIR = Path(os.getenv(
+    "GEOMETRY_CACHE_DIR",
+    str(Path(__file__).resolve().parent.parent.parent / "data" / "geometry_cache"),
+))
+# Crește la orice schimbare a formatului sau a setărilor de teselare
+GEOMETRY_CACHE_VERSION = 2
+
+# Produse fără volum fizic propriu, excluse din teselare
+_SKIPPED_TYPES = ("IfcOpeningElement", "IfcVirtualElement", "IfcAnnotation", "IfcGrid")
+
+_INDEX_DTYPE = np.dtype([
+    ("guid", "U22"),
+    ("ifc_type", "U64"),
+    ("v_offset", "i8"), ("v_count", "i8"),
+    ("f_offset", "i8"), ("f_count", "i8"),
+    ("origin", "f8", 3),
+    ("bbox_min", "f8", 3),
+    ("bbox_max", "f8", 3),
+    ("geom_hash", "U16"),
+])
+
+
+@dataclass
+class ElementMesh:
+    """Plasa de triunghiuri a unui element IFC, în coordonate globale (metri)."""
+    guid: str
+    ifc_type: str
+    discipline: str | None
+    vertices: np.ndarray  # (V, 3) float64
+    faces: np.ndarray     # (F, 3) int
+    bbox_min: np.ndarray  # (3,)
+    bbox_max: np.ndarray  # (3,)
+
+    @property
+    def triangles(self) -> np.ndarray:
+        """(F, 3, 3) — coordonatele vârfurilor fiecărui triunghi."""
+        return self.vertices[self.faces]
+
+    @property
+    def surface_area(self) -> float:
+        """Aria suprafeței, m²."""
+        t = self.triangles
+        return float(np.linalg.norm(np.cross(t[:, 1] - t[:, 0], t[:, 2] - t[:, 0]), axis=1).sum() / 2)
+
+    @property
+    def volume(self) -> float:
+        """Volumul (teorema divergenței; corect pentru plase închise), m³."""
+        t = self.triangles - self.bbox_min
+        return float(abs(np.einsum("mk,mk->m", t[:, 0], np.cross(t[:, 1], t[:, 2])).sum()) / 6)
+
+
+def file_sha256(file_path: str | Path) -> str:
+    """SHA-256 al unui fișier, citit în bucăți."""
+    hasher = hashlib.sha256()
+    with open(file_path, "rb") as fh:
+        while chunk := fh.read(1024 * 1024):
+            hasher.update(chunk)
+    return hasher.hexdigest()
+
+
+def geometry_hash(mesh: ElementMesh) -> str:
+    """Amprenta geometriei unui element (tip + plasă rotunjită la 0.1 mm)."""
+    hasher = hashlib.blake2b(digest_size=8)
+    hasher.update(mesh.ifc_type.encode())
+    hasher.update(np.round(mesh.vertices, 4).astype(np.float64).tobytes())
+    hasher.update(np.ascontiguousarray(mesh.faces, dtype=np.int64).tobytes())
+    return hasher.hexdigest()
+
+
+def _schema_name(ifc_file: ifcopenshell.file) -> str:
+    return getattr(ifc_file, "schema_identifier", None) or ifc_file.schema
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# Teselare
+# ══════════════════════════════════════════════════════════════════════════════
+
+def tessellate_products(
+    ifc_file: ifcopenshell.file,
+    *,
+    include: Callable[[str], bool] | None = None,
+    threads: int | None = None,
+) -> list[ElementMesh]:
+    """
+    Teselează produsele cu reprezentare (iterator ifcopenshell, multi-thread).
+
+    include: filtru opțional pe tipul IFC, aplicat înainte de teselare.
+    """
+    schema_name = _schema_name(ifc_file)
+    products = [
+        p for p in ifc_file.by_type("IfcProduct")
+        if p.Representation is not None
+        and not any(p.is_a(t) for t in _SKIPPED_TYPES)
+        and (include is None or include(p.is_a()))
+    ]
+    if not products:
+        return []
+
+    settings = ifcopenshell.geom.settings()
+    settings.set("use-world-coords", True)
+    iterator = ifcopenshell.geom.iterator(
+        settings, ifc_file, max(1, threads or GEOMETRY_THREADS), include=products,
+    )
+
+    meshes: list[ElementMesh] = []
+    if not iterator.initialize():
+        return meshes
+    while True:
+        shape = iterator.get()
+        vertices = np.asarray(shape.geometry.verts, dtype=np.float64).reshape(-1, 3)
+        faces = np.asarray(shape.geometry.faces, dtype=np.int64).reshape(-1, 3)
+        if len(faces):
+            meshes.append(ElementMesh(
+                guid=shape.guid,
+                ifc_type=shape.type,
+                discipline=discipline_for_type(schema_name, shape.type),
+                vertices=vertices,
+                faces=faces,
+                bbox_min=vertices.min(axis=0),
+                bbox_max=vertices.max(axis=0),
+            ))
+        if not iterator.next():
+            break
+    return meshes
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# Cache pe disc
+# ══════════════════════════════════════════════════════════════════════════════
+
+def _cache_path(content_sha256: str) -> Path:
+    return GEOMETRY_CACHE_DIR / content_sha256
+
+
+def _write_cache(content_sha256: str, schema_name: str, meshes: list[ElementMesh]) -> None:
+    """Scrie cache-ul într-un director temporar și îl mută atomic la final."""
+    index = np.zeros(len(meshes), dtype=_INDEX_DTYPE)
+    v_total = sum(len(m.vertices) for m in meshes)
+    f_total = sum(len(m.faces) for m in meshes)
+    vertices = np.empty((v_total, 3), dtype=np.float32)
+    faces = np.empty((f_total, 3), dtype=np.uint32)
+
+    v_off = f_off = 0
+    for i, m in enumerate(meshes):
+        nv, nf = len(m.vertices), len(m.faces)
+        # float32 relativ la origine: precizie sub-milimetrică și la coordonate georeferențiate
+        vertices[v_off:v_off + nv] = m.vertices - m.bbox_min
+        faces[f_off:f_off + nf] = m.faces
+        index[i] = (
+            m.guid, m.ifc_type, v_off, nv, f_off, nf,
+            m.bbox_min, m.bbox_min, m.bbox_max, geometry_hash(m),
+        )
+        v_off += nv
+        f_off += nf
+
+    target = _cache_path(content_sha256)
+    tmp = target.with_name(f".{target.name}.{uuid.uuid4().hex}.tmp")
+    tmp.mkdir(parents=True)
+    try:
+        np.save(tmp / "vertices.npy", vertices)
+        np.save(tmp / "faces.npy", faces)
+        np.save(tmp / "elements.npy", index)
+        (tmp / "meta.json").write_text(json.dumps({
+            "version": GEOMETRY_CACHE_VERSION,
+            "schema": schema_name,
+            "elements": len(meshes),
+        }))
+        os.replace(tmp, target)
+    except OSError:
+        # Alt proces a scris între timp același cache (același conținut)
+        shutil.rmtree(tmp, ignore_errors=True)
+        if not target.exists():
+            raise
+
+
+class GeometryCache:
+    """Cache-ul unui fișier IFC, citit prin mmap; elemente regăsite după GlobalId."""
+
+    def __init__(self, path: Path):
+        meta = json.loads((path / "meta.json").read_text())
+        self.schema_name: str = meta["schema"]
+        self._vertices = np.load(path / "vertices.npy", mmap_mode="r")
+        self._faces = np.load(path / "faces.npy", mmap_mode="r")
+        self._index = np.load(path / "elements.npy")
+        self._by_guid = {str(g): i for i, g in enumerate(self._index["guid"])}
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def __contains__(self, guid: str) -> bool:
+        return guid in self._by_guid
+
+    @property
+    def guids(self) -> list[str]:
+        return list(self._by_guid)
+
+    def ifc_types(self) -> set[str]:
+        """Tipurile IFC distincte ale elementelor teselate."""
+        return set(np.unique(self._index["ifc_type"]).tolist())
+
+    def geometry_hashes(self) -> dict[str, str]:
+        """GlobalId → hash-ul geometriei (pentru diff între revizii)."""
+        return dict(zip(self._index["guid"].tolist(), self._index["geom_hash"].tolist()))
+
+    def bboxes(self) -> tuple[np.ndarray, np.ndarray]:
+        """AABB-urile tuturor elementelor, (N, 3) min și max, fără a citi plasele."""
+        return self._index["bbox_min"], self._index["bbox_max"]
+
+    def _mesh(self, i: int) -> ElementMesh:
+        row = self._index[i]
+        v0, nv, f0, nf = int(row["v_offset"]), int(row["v_count"]), int(row["f_offset"]), int(row["f_count"])
+        ifc_type = str(row["ifc_type"])
+        return ElementMesh(
+            guid=str(row["guid"]),
+            ifc_type=ifc_type,
+            discipline=discipline_for_type(self.schema_name, ifc_type),
+            vertices=self._vertices[v0:v0 + nv].astype(np.float64) + row["origin"],
+            faces=self._faces[f0:f0 + nf].astype(np.int64),
+            bbox_min=row["bbox_min"].copy(),
+            bbox_max=row["bbox_max"].copy(),
+        )
+
+    def get(self, guid: str) -> ElementMesh | None:
+        i = self._by_guid.get(guid)
+        return self._mesh(i) if i is not None else None
+
+    def meshes(self, include: Callable[[str], bool] | None = None) -> list[ElementMesh]:
+        return [
+            self._mesh(i) for i in range(len(self._index))
+            if include is None or include(str(self._index["ifc_type"][i]))
+        ]
+
+
+def load_geometry(content_sha256: str) -> GeometryCache | None:
+    """Cache-ul existent pentru un hash de fișier (None dacă lipsește sau e vechi)."""
+    path = _cache_path(content_sha256)
+    meta_path = path / "meta.json"
+    if not meta_path.exists():
+        return None
+    try:
+        if json.loads(meta_path.read_text()).get("version") != GEOMETRY_CACHE_VERSION:
+            return None
+        return GeometryCache(path)
+    except (OSError, ValueError, KeyError) as e:
+        logger.warning(f"Cache geometrie invalid pentru {content_sha256[:12]}: {e}")
+        return None
+
+
+def get_geometry(
+    file_path: str | Path,
+    *,
+    content_sha256: str | None = None,
+    threads: int | None = None,
+) -> GeometryCache:
+    """
+    Geometria tuturor produselor din fișier: din cache dacă există,
+    altfel teselează o dată și salvează cache-ul.
+    """
+    sha = content_sha256 or file_sha256(file_path)
+    cache = load_geometry(sha)
+    if cache is not None:
+        return cache
+    # Cache dintr-o versiune veche de format: e reconstruit
+    shutil.rmtree(_cache_path(sha), ignore_errors=True)
+
+    ifc_file = ifcopenshell.open(str(file_path))
+    meshes = tessellate_products(ifc_file, threads=threads)
+    logger.info(f"Teselare {Path(file_path).name}: {len(meshes)} elemente (cache {sha[:12]})")
+    _write_cache(sha, _schema_name(ifc_file), meshes)
+    return GeometryCache(_cache_path(sha))
+
+
+def get_element_meshes(
+    file_path: str | Path,
+    *,
+    content_sha256: str | None = None,
+    include: Callable[[str], bool] | None = None,
+) -> list[ElementMesh]:
+    """Plasele elementelor (filtrate opțional după tipul IFC), prin cache."""
+    return get_geometry(file_path, content_sha256=content_sha256).meshes(include)
@@ -3,18 +3,40 @@ ifc_parser.py — Parsează un fișier IFC și generează un ModelSummary pre-po
 
 Folosește ifcopenshell pentru extracția metadatelor:
 discipline, categorii de elemente, georeferențiere, schema IFC.
+
+Extracția face o singură trecere prin indexul de tipuri al fișierului
+(`ifc_file.types()`): fiecare tip prezent e clasificat o dată prin lanțul de
+moștenire din schemă (IfcWallStandardCase → IfcWall → architecture), iar
+instanțele sunt materializate doar pentru produse și metadate — entitățile
+de geometrie, care domină fișierele mari, nu sunt atinse deloc.
+
+Peste IFC_STEP_SCAN_THRESHOLD_MB, fișierul nu mai e încărcat cu ifcopenshell:
+numărătorile și metadatele vin din scanerul STEP (ifc_step_scanner), cu
+memorie plafonată.
 """
 
 from __future__ import annotations
 
+import functools
+import hashlib
+import json
 import logging
+import os
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Callable, Iterable
 
 import ifcopenshell
+import ifcopenshell.ifcopenshell_wrapper as ifcopenshell_wrapper
 
 from app.schemas.model_summary import CategoryStats, ModelSummary
+from app.services.ifc_step_scanner import scan_step_file
 
 logger = logging.getLogger(__name__)
 
+# Peste acest prag sumarul vine din scanarea STEP (0 = mereu ifcopenshell)
+IFC_STEP_SCAN_THRESHOLD_MB = float(os.getenv("IFC_STEP_SCAN_THRESHOLD_MB", "1024"))
+
 # Mapping: IFC entity types → discipline
 _DISCIPLINE_MAP: dict[str, str] = {
     # Architecture
@@ -55,9 +77,46 @@ _SCHEMA_FORMAT_MAP: dict[str, str] = {
 
 MAX_CATEGORIES = 20
 
+# Crește la orice schimbare a logicii de extracție. Maparea disciplinelor intră
+# automat în versiune: o intrare nouă în _DISCIPLINE_MAP invalidează rezultatele
+# salvate (summary-uri, store-uri de elemente), refăcute cu `python -m app.reindex_ifc`.
+_PARSER_REVISION = 1
+IFC_PARSER_VERSION = "{}.{}".format(
+    _PARSER_REVISION,
+    hashlib.sha256(json.dumps(_DISCIPLINE_MAP, sort_keys=True).encode()).hexdigest()[:8],
+)
+
+# Tipuri de metadate colectate în aceeași trecere (prima instanță contează)
+_METADATA_TYPES: tuple[str, ...] = (
+    "IfcMapConversion",
+    "IfcProjectedCRS",
+    "IfcApplication",
+    "IfcProject",
+)
+
+
+def use_step_scanner(file_path: str | Path) -> bool:
+    """True dacă fișierul depășește pragul peste care nu e încărcat în memorie."""
+    if IFC_STEP_SCAN_THRESHOLD_MB <= 0:
+        return False
+    try:
+        return os.path.getsize(file_path) > IFC_STEP_SCAN_THRESHOLD_MB * 1024 * 1024
+    except OSError:
+        return False
+
 
 def generate_model_summary_from_ifc(file_path: str) -> ModelSummary:
     """Parsează un fișier IFC și returnează un ModelSummary pre-populat."""
+    if use_step_scanner(file_path):
+        try:
+            return summarize_with_step_scanner(file_path)
+        except Exception as exc:
+            logger.exception("Eroare la scanarea STEP: %s", file_path)
+            return ModelSummary(
+                source="ifc",
+                notes=f"Eroare la parsarea IFC: {exc}",
+            )
+
     try:
         ifc_file = ifcopenshell.open(file_path)
     except Exception as exc:
@@ -67,6 +126,11 @@ def generate_model_summary_from_ifc(file_path: str) -> ModelSummary:
             notes=f"Eroare la deschiderea fișierului IFC: {exc}",
         )
 
+    return summarize_ifc_file(ifc_file, file_path)
+
+
+def summarize_ifc_file(ifc_file: ifcopenshell.file, file_path: str = "") -> ModelSummary:
+    """ModelSummary dintr-un fișier IFC deja deschis (erorile devin notes)."""
     try:
         return _extract_summary(ifc_file)
     except Exception as exc:
@@ -77,30 +141,132 @@ def generate_model_summary_from_ifc(file_path: str) -> ModelSummary:
         )
 
 
-def _extract_summary(ifc_file: ifcopenshell.file) -> ModelSummary:
-    """Logica principală de extracție din fișierul IFC deschis."""
+@functools.lru_cache(maxsize=4096)
+def _type_ancestors(schema_name: str, type_name: str) -> tuple[str, ...]:
+    """Lanțul de moștenire al unui tip IFC (de la tipul însuși spre IfcRoot)."""
+    try:
+        decl = ifcopenshell_wrapper.schema_by_name(schema_name).declaration_by_name(type_name)
+    except Exception:
+        return (type_name,)
+    chain: list[str] = []
+    while decl is not None:
+        chain.append(decl.name())
+        supertype = getattr(decl, "supertype", None)
+        decl = supertype() if supertype else None
+    return tuple(chain)
 
-    # ── Discipline & Categorii ───────────────────────────────────────────────
-    disciplines: set[str] = set()
+
+def discipline_for_type(schema_name: str, type_name: str) -> str | None:
+    """Disciplina unui tip IFC, după cel mai specific strămoș mapat (sau None)."""
+    category = next(
+        (t for t in _type_ancestors(schema_name, type_name) if t in _DISCIPLINE_MAP), None
+    )
+    return _DISCIPLINE_MAP[category] if category else None
+
+
+def _collect_type_stats(
+    schema_name: str,
+    type_names: Iterable[str],
+    count_of: Callable[[str], int],
+    first_instance: Callable[[str], object | None],
+) -> tuple[dict[str, int], int, dict[str, object]]:
+    """
+    O singură trecere prin tipurile prezente în fișier.
+
+    count_of / first_instance: numărul de instanțe (fără subtipuri) și prima
+    instanță a unui tip — din ifcopenshell sau din scanarea STEP.
+
+    Returns:
+        (număr elemente per categorie mapată, total IfcProduct,
+         prima instanță pentru fiecare tip din _METADATA_TYPES)
+    """
     category_counts: dict[str, int] = {}
+    product_count = 0
+    metadata: dict[str, object] = {}
 
-    for ifc_type, discipline in _DISCIPLINE_MAP.items():
-        try:
-            elements = ifc_file.by_type(ifc_type)
-        except Exception:
+    for type_name in type_names:
+        ancestors = _type_ancestors(schema_name, type_name)
+
+        meta_key = next((t for t in _METADATA_TYPES if t in ancestors), None)
+        if meta_key is not None:
+            if meta_key not in metadata:
+                instance = first_instance(type_name)
+                if instance is not None:
+                    metadata[meta_key] = instance
             continue
-        count = len(elements)
-        if count > 0:
-            disciplines.add(discipline)
-            category_counts[ifc_type] = count
+
+        if "IfcProduct" not in ancestors:
+            continue
+
+        count = count_of(type_name)
+        product_count += count
+        # Cel mai specific strămoș mapat (IfcDuctSegment înaintea IfcFlowSegment)
+        category = next((t for t in ancestors if t in _DISCIPLINE_MAP), None)
+        if category is not None and count:
+            category_counts[category] = category_counts.get(category, 0) + count
+
+    return category_counts, product_count, metadata
+
+
+def _is_metadata_type(schema_name: str, type_name: str) -> bool:
+    ancestors = _type_ancestors(schema_name, type_name)
+    return any(t in ancestors for t in _METADATA_TYPES)
+
+
+def _scanned_instance(schema_name: str, type_name: str, arguments: list | None) -> object | None:
+    """Argumentele scanate ale unei instanțe, accesibile după numele atributelor."""
+    if arguments is None:
+        return None
+    try:
+        decl = ifcopenshell_wrapper.schema_by_name(schema_name).declaration_by_name(type_name)
+        names = [a.name() for a in decl.all_attributes()]
+    except Exception:
+        return None
+    return SimpleNamespace(**dict(zip(names, arguments)))
+
+
+def summarize_with_step_scanner(file_path: str | Path) -> ModelSummary:
+    """ModelSummary dintr-o scanare STEP (fără încărcarea modelului în memorie)."""
+    scan = scan_step_file(file_path, capture=_is_metadata_type)
+    schema_name = scan.schema_identifier
+    category_counts, product_count, metadata = _collect_type_stats(
+        schema_name,
+        scan.type_counts,
+        scan.type_counts.__getitem__,
+        lambda t: _scanned_instance(schema_name, t, scan.first_arguments.get(t)),
+    )
+    # IFC4X3_ADD2 → IFC4X3, ca ifcopenshell.file.schema
+    summary = _build_summary(schema_name.split("_")[0], category_counts, product_count, metadata)
+    summary.notes = f"{summary.notes}; Sumar din scanare STEP (fișier mare, model neîncărcat)"
+    return summary
+
+
+def _extract_summary(ifc_file: ifcopenshell.file) -> ModelSummary:
+    """Logica principală de extracție din fișierul IFC deschis."""
+    schema_name = getattr(ifc_file, "schema_identifier", None) or ifc_file.schema
+    category_counts, product_count, metadata = _collect_type_stats(
+        schema_name,
+        ifc_file.types(),
+        lambda t: len(ifc_file.by_type(t, include_subtypes=False)),
+        lambda t: next(iter(ifc_file.by_type(t, include_subtypes=False)), None),
+    )
+    return _build_summary(ifc_file.schema, category_counts, product_count, metadata)
+
+
+def _build_summary(
+    schema: str,
+    category_counts: dict[str, int],
+    product_count: int,
+    metadata: dict[str, object],
+) -> ModelSummary:
+    """ModelSummary din numărători și metadate (comun ifcopenshell / scanare STEP)."""
+    # ── Discipline & Categorii ───────────────────────────────────────────────
+    disciplines: set[str] = {_DISCIPLINE_MAP[name] for name in category_counts}
 
     # Verifică dacă există tipuri IFC suplimentare cu elemente (→ "other")
-    all_products = ifc_file.by_type("IfcProduct")
     mapped_count = sum(category_counts.values())
-    if len(all_products) > mapped_count:
-        remaining = len(all_products) - mapped_count
-        if remaining > 0 and not disciplines:
-            disciplines.add("other")
+    if product_count > mapped_count and not disciplines:
+        disciplines.add("other")
 
     # Categorii sortate descrescător, limitate la top N
     categories = [
@@ -111,54 +277,33 @@ def _extract_summary(ifc_file: ifcopenshell.file) -> ModelSummary:
     ][:MAX_CATEGORIES]
 
     # ── Georeferențiere ──────────────────────────────────────────────────────
-    has_georef = False
+    has_georef = "IfcMapConversion" in metadata or "IfcProjectedCRS" in metadata
     coord_system: str | None = None
 
-    try:
-        map_conversions = ifc_file.by_type("IfcMapConversion")
-        if map_conversions:
-            has_georef = True
-    except Exception:
-        pass
-
-    try:
-        projected_crs_list = ifc_file.by_type("IfcProjectedCRS")
-        if projected_crs_list:
-            has_georef = True
-            crs = projected_crs_list[0]
-            if hasattr(crs, "Name") and crs.Name:
-                coord_system = str(crs.Name)
-    except Exception:
-        pass
+    crs = metadata.get("IfcProjectedCRS")
+    if crs is not None and getattr(crs, "Name", None):
+        coord_system = str(crs.Name)
 
     # ── Schema → format ──────────────────────────────────────────────────────
-    schema = ifc_file.schema
     exchange_format = _SCHEMA_FORMAT_MAP.get(schema, "ifc4_3")
 
     # ── Notes (metadata) ─────────────────────────────────────────────────────
     notes_parts: list[str] = [f"IFC Schema: {schema}"]
 
-    try:
-        apps = ifc_file.by_type("IfcApplication")
-        if apps:
-            app = apps[0]
-            app_name = getattr(app, "ApplicationFullName", None) or ""
-            app_ver = getattr(app, "Version", None) or ""
-            if app_name:
-                notes_parts.append(
-                    f"Aplicație: {app_name} {app_ver}".strip()
-                )
-    except Exception:
-        pass
+    app = metadata.get("IfcApplication")
+    if app is not None:
+        app_name = getattr(app, "ApplicationFullName", None) or ""
+        app_ver = getattr(app, "Version", None) or ""
+        if app_name:
+            notes_parts.append(
+                f"Aplicație: {app_name} {app_ver}".strip()
+            )
 
-    try:
-        projects = ifc_file.by_type("IfcProject")
-        if projects:
-            proj_name = getattr(projects[0], "Name", None)
-            if proj_name:
-                notes_parts.append(f"Proiect IFC: {proj_name}")
-    except Exception:
-        pass
+    project = metadata.get("IfcProject")
+    if project is not None:
+        proj_name = getattr(project, "Name", None)
+        if proj_name:
+            notes_parts.append(f"Proiect IFC: {proj_name}")
 
     return ModelSummary(
         source="ifc",
@@ -0,0 +1,338 @@
+"""
+ifc_processing.py — Parsare IFC în afara procesului API (ProcessPoolExecutor).
+
+Parsarea unui IFC mare e CPU-bound și poate consuma mulți GB: rulată inline
+ar bloca event loop-ul și ar putea doborî procesul API (OOM). Aici fiecare
+parsare (și teselarea pentru clash-uri / viewer, indexarea elementelor) rulează într-un proces separat, cu:
+  - limită de memorie (RLIMIT_AS, setată în procesul copil; doar POSIX)
+  - limită de timp (la depășire procesele pool-ului sunt oprite și pool-ul
+    e recreat)
+  - reciclarea procesului după fiecare fișier (max_tasks_per_child=1), ca
+    memoria fragmentată de ifcopenshell să fie eliberată
+
+Modulul e importat și de procesele copil (start method "spawn"), deci nu
+trebuie să depindă de DB sau de restul aplicației.
+"""
+
+from __future__ import annotations
+
+import logging
+import multiprocessing
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, TimeoutError as FutureTimeoutError, wait
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable, Iterator
+
+logger = logging.getLogger(__name__)
+
+IFC_PARSE_WORKERS = int(os.getenv("IFC_PARSE_WORKERS", "2"))
+IFC_PARSE_TIMEOUT_SECONDS = float(os.getenv("IFC_PARSE_TIMEOUT_SECONDS", "900"))
+IFC_PARSE_MEMORY_MB = int(os.getenv("IFC_PARSE_MEMORY_MB", "4096"))  # 0 = fără limită
+# Cât de des se raportează progresul cât timp așteptăm procesul copil
+IFC_PARSE_PROGRESS_SECONDS = float(os.getenv("IFC_PARSE_PROGRESS_SECONDS", "5"))
+
+_pool: ProcessPoolExecutor | None = None
+_pool_lock = threading.Lock()
+
+
+class IfcParseError(RuntimeError):
+    """Parsarea IFC a depășit limitele de timp/memorie sau procesul a căzut."""
+
+
+def _limit_worker_memory(limit_bytes: int) -> None:
+    """Initializer pentru procesele copil: plafonează spațiul de adrese."""
+    if limit_bytes <= 0:
+        return
+    try:
+        import resource
+        resource.setrlimit(resource.RLIMIT_AS, (limit_bytes, limit_bytes))
+    except (ImportError, ValueError, OSError) as e:
+        logger.warning(f"Limita de memorie pentru parsarea IFC nu a putut fi setată: {e}")
+
+
+def _parse_in_worker(file_path: str, content_sha256: str | None = None) -> dict:
+    """
+    Rulează în procesul copil: ModelSummary serializat ca dict.
+
+    Cu hash-ul conținutului, același fișier deschis alimentează și store-ul
+    columnar de elemente (element_store), fără o a doua parsare.
+    """
+    import ifcopenshell
+
+    from app.services.ifc_parser import (
+        generate_model_summary_from_ifc,
+        summarize_ifc_file,
+        use_step_scanner,
+    )
+    if use_step_scanner(file_path):
+        # Model prea mare pentru a fi încărcat: doar sumarul, din scanarea STEP
+        logger.info("Fișier IFC peste pragul de scanare STEP, store de elemente omis: %s", file_path)
+        return generate_model_summary_from_ifc(file_path).model_dump(mode="json")
+
+    try:
+        ifc_file = ifcopenshell.open(file_path)
+    except Exception:
+        return generate_model_summary_from_ifc(file_path).model_dump(mode="json")
+
+    summary = summarize_ifc_file(ifc_file, file_path).model_dump(mode="json")
+    if content_sha256:
+        from app.services.element_store import build_element_store
+        try:
+            build_element_store(ifc_file, content_sha256)
+        except Exception:
+            logger.exception("Store-ul de elemente nu a putut fi construit: %s", file_path)
+    return summary
+
+
+def _viewer_geometry_in_worker(file_path: str, content_sha256: str) -> dict:
+    """Rulează în procesul copil: teselare + fragmentele glTF, manifestul ca dict."""
+    from app.services.viewer_geometry import build_viewer_geometry
+    return build_viewer_geometry(file_path, content_sha256)
+
+
+def _geometry_cache_in_worker(file_path: str, content_sha256: str) -> dict:
+    """Rulează în procesul copil: teselarea în cache-ul de geometrie (ifc_geometry)."""
+    from app.services.ifc_geometry import get_geometry
+    geometry = get_geometry(file_path, content_sha256=content_sha256)
+    return {"elements": len(geometry), "schema": geometry.schema_name}
+
+
+def _element_store_in_worker(file_path: str, content_sha256: str) -> dict:
+    """Rulează în procesul copil: store-ul de elemente pentru un IFC deja importat."""
+    from app.services.element_store import build_element_store, load_element_store
+    build_element_store(file_path, content_sha256)
+    store = load_element_store(content_sha256)
+    return {"elements": len(store), "property_keys": len(store.property_keys)}
+
+
+def _new_pool(workers: int) -> ProcessPoolExecutor:
+    return ProcessPoolExecutor(
+        max_workers=max(1, workers),
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_limit_worker_memory,
+        initargs=(IFC_PARSE_MEMORY_MB * 1024 * 1024,),
+        max_tasks_per_child=1,
+    )
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = _new_pool(IFC_PARSE_WORKERS)
+        return _pool
+
+
+def _terminate_pool(pool: ProcessPoolExecutor) -> None:
+    """Oprește forțat procesele unui pool (timeout / proces căzut)."""
+    # ProcessPoolExecutor nu poate anula un task în execuție: oprim procesele
+    for process in list((getattr(pool, "_processes", None) or {}).values()):
+        if process.is_alive():
+            process.terminate()
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _reset_pool() -> None:
+    """Oprește forțat procesele pool-ului curent (timeout / proces căzut)."""
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        _terminate_pool(pool)
+
+
+def _default_workers() -> int:
+    """Procese pentru parsarea în masă: nucleele, plafonate de memoria disponibilă."""
+    cpus = os.cpu_count() or 1
+    if IFC_PARSE_MEMORY_MB <= 0:
+        return min(cpus, IFC_PARSE_WORKERS)
+    try:
+        available = os.sysconf("SC_AVPHYS_PAGES") * os.sysconf("SC_PAGE_SIZE")
+    except (AttributeError, ValueError, OSError):
+        return min(cpus, IFC_PARSE_WORKERS)
+    # Fiecare proces poate ajunge la IFC_PARSE_MEMORY_MB
+    return max(1, min(cpus, available // (IFC_PARSE_MEMORY_MB * 1024 * 1024)))
+
+
+def shutdown_pool() -> None:
+    """Închide pool-ul la oprirea aplicației."""
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _run_in_pool(
+    fn: Callable[..., dict],
+    *args,
+    timeout: float | None,
+    on_progress: Callable[[dict], None] | None,
+    stage: str,
+) -> dict:
+    """Rulează fn(*args) în pool-ul partajat, cu limitele de timp și memorie."""
+    limit = IFC_PARSE_TIMEOUT_SECONDS if timeout is None else timeout
+    started = time.monotonic()
+    future = _get_pool().submit(fn, *args)
+
+    while True:
+        elapsed = time.monotonic() - started
+        remaining = limit - elapsed
+        if remaining <= 0:
+            _reset_pool()
+            raise IfcParseError(f"Procesarea IFC ({stage}) a depășit limita de {limit:.0f}s.")
+        try:
+            return future.result(timeout=min(IFC_PARSE_PROGRESS_SECONDS, remaining))
+        except FutureTimeoutError:
+            if on_progress is not None:
+                on_progress({"stage": stage, "elapsed_s": round(time.monotonic() - started, 1)})
+        except BrokenProcessPool as e:
+            _reset_pool()
+            raise IfcParseError(
+                f"Procesul IFC ({stage}) a fost oprit (probabil limita de "
+                f"memorie de {IFC_PARSE_MEMORY_MB} MB)."
+            ) from e
+
+
+def parse_ifc_summary(
+    file_path: str,
+    *,
+    content_sha256: str | None = None,
+    timeout: float | None = None,
+    on_progress: Callable[[dict], None] | None = None,
+) -> dict:
+    """
+    Parsează un IFC într-un proces separat și returnează ModelSummary ca dict.
+    Cu content_sha256 construiește și store-ul de elemente pentru acel hash.
+
+    Raises:
+        IfcParseError: timeout sau procesul copil oprit (ex: limita de memorie).
+    """
+    return _run_in_pool(
+        _parse_in_worker, file_path, content_sha256,
+        timeout=timeout, on_progress=on_progress, stage="parsing",
+    )
+
+
+def build_viewer_geometry_in_pool(
+    file_path: str,
+    content_sha256: str,
+    *,
+    timeout: float | None = None,
+    on_progress: Callable[[dict], None] | None = None,
+) -> dict:
+    """
+    Teselează IFC-ul și scrie fragmentele glTF ale viewer-ului într-un proces
+    separat (aceleași limite ca parsarea). Returnează manifestul.
+
+    Raises:
+        IfcParseError: timeout sau procesul copil oprit (ex: limita de memorie).
+    """
+    return _run_in_pool(
+        _viewer_geometry_in_worker, file_path, content_sha256,
+        timeout=timeout, on_progress=on_progress, stage="tessellating",
+    )
+
+
+def build_geometry_cache_in_pool(
+    file_path: str,
+    content_sha256: str,
+    *,
+    timeout: float | None = None,
+    on_progress: Callable[[dict], None] | None = None,
+) -> dict:
+    """
+    Teselează IFC-ul în cache-ul de geometrie într-un proces separat (aceleași
+    limite ca parsarea); apelantul îl citește apoi cu ifc_geometry.load_geometry.
+
+    Raises:
+        IfcParseError: timeout sau procesul copil oprit (ex: limita de memorie).
+    """
+    return _run_in_pool(
+        _geometry_cache_in_worker, file_path, content_sha256,
+        timeout=timeout, on_progress=on_progress, stage="tessellating",
+    )
+
+
+def build_element_store_in_pool(
+    file_path: str,
+    content_sha256: str,
+    *,
+    timeout: float | None = None,
+    on_progress: Callable[[dict], None] | None = None,
+) -> dict:
+    """
+    Construiește store-ul de elemente al unui IFC într-un proces separat
+    (aceleași limite ca parsarea). Returnează {elements, property_keys}.
+
+    Raises:
+        IfcParseError: timeout sau procesul copil oprit (ex: limita de memorie).
+    """
+    return _run_in_pool(
+        _element_store_in_worker, file_path, content_sha256,
+        timeout=timeout, on_progress=on_progress, stage="indexing",
+    )
+
+
+def parse_ifc_many(
+    files: list[tuple[str, str | None]],
+    *,
+    workers: int | None = None,
+    timeout: float | None = None,
+) -> Iterator[tuple[str, str | None, dict | IfcParseError]]:
+    """
+    Parsează în paralel mai multe fișiere (reindexare în masă), cu un pool
+    dedicat de `workers` procese (implicit nucleele mașinii, câte încap în
+    memoria disponibilă la IFC_PARSE_MEMORY_MB per proces).
+
+    Fiecare fișier are limita de timp IFC_PARSE_TIMEOUT_SECONDS, măsurată de
+    la trimiterea lui în pool (cel mult `workers` fișiere trimise odată). La
+    depășire, pool-ul e oprit, fișierul primește IfcParseError, iar celelalte
+    fișiere în curs sunt reluate într-un pool nou.
+
+    files: (cale, content_sha256) — cu hash, se reconstruiește și store-ul de elemente.
+    Yields: (cale, content_sha256, summary ca dict sau IfcParseError), în ordinea terminării.
+    """
+    if not files:
+        return
+    limit = IFC_PARSE_TIMEOUT_SECONDS if timeout is None else timeout
+    workers = max(1, min(len(files), workers or _default_workers()))
+    pending = deque(files)
+    running: dict[Future, tuple[str, str | None, float]] = {}
+    pool = _new_pool(workers)
+    try:
+        while pending or running:
+            while pending and len(running) < workers:
+                path, sha = pending.popleft()
+                running[pool.submit(_parse_in_worker, path, sha)] = (path, sha, time.monotonic())
+
+            next_deadline = min(started for _, _, started in running.values()) + limit
+            done, _ = wait(running, timeout=max(0.0, next_deadline - time.monotonic()), return_when=FIRST_COMPLETED)
+            broken = False
+            for future in done:
+                path, sha, _ = running.pop(future)
+                try:
+                    yield path, sha, future.result()
+                except BrokenProcessPool as e:
+                    # Un proces oprit (ex: limita de memorie) strică tot pool-ul: task-urile lui eșuează
+                    broken = True
+                    yield path, sha, IfcParseError(f"Procesul de parsare a fost oprit: {e}")
+                except Exception as e:
+                    yield path, sha, IfcParseError(str(e))
+
+            now = time.monotonic()
+            expired = [f for f, (_, _, started) in running.items() if now - started >= limit]
+            for future in expired:
+                path, sha, _ = running.pop(future)
+                yield path, sha, IfcParseError(f"Parsarea IFC a depășit limita de {limit:.0f}s.")
+            if expired or broken:
+                # Procesele nu pot fi oprite individual: pool nou, fișierele în curs reluate
+                pending.extendleft(reversed([(path, sha) for path, sha, _ in running.values()]))
+                running.clear()
+                _terminate_pool(pool)
+                pool = _new_pool(workers)
+    finally:
+        _terminate_pool(pool)
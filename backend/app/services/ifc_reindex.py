@@ -0,0 +1,104 @@
+"""
+ifc_reindex.py — Reindexarea modelelor IFC stocate după o schimbare a parserului.
+
+Summary-urile și store-urile de elemente sunt salvate cu versiunea parserului
+care le-a produs (ifc_parser.IFC_PARSER_VERSION, derivată și din maparea
+disciplinelor). Reindexarea reprocesează doar conținuturile (după SHA-256)
+ale căror upload-uri au altă versiune: fiecare fișier unic e parsat o singură
+dată, în paralel pe toate nucleele, iar rezultatul e scris pe toate
+upload-urile cu același conținut.
+
+Rulare:  python -m app.reindex_ifc [--workers N] [--force]
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import time
+from typing import Callable
+
+from sqlalchemy import or_
+from sqlalchemy.orm import Session
+
+from app.models.sql_models import UploadedFileModel
+from app.services.ifc_geometry import file_sha256
+from app.services.ifc_parser import IFC_PARSER_VERSION
+from app.services.ifc_processing import IfcParseError, parse_ifc_many
+
+logger = logging.getLogger(__name__)
+
+
+def stale_ifc_uploads(db: Session, *, force: bool = False) -> dict[str, list[UploadedFileModel]]:
+    """Upload-urile IFC de reprocesat, grupate după hash-ul conținutului."""
+    query = db.query(UploadedFileModel).filter(UploadedFileModel.file_type == "ifc")
+    if not force:
+        query = query.filter(or_(
+            UploadedFileModel.parser_version.is_(None),
+            UploadedFileModel.parser_version != IFC_PARSER_VERSION,
+        ))
+
+    groups: dict[str, list[UploadedFileModel]] = {}
+    for uploaded in query.order_by(UploadedFileModel.id):
+        if not uploaded.content_sha256:
+            if not os.path.exists(uploaded.file_path):
+                continue
+            # Upload anterior deduplicării: hash-ul e calculat acum
+            uploaded.content_sha256 = file_sha256(uploaded.file_path)
+        groups.setdefault(uploaded.content_sha256, []).append(uploaded)
+    return groups
+
+
+def reindex_ifc_models(
+    db: Session,
+    *,
+    workers: int | None = None,
+    force: bool = False,
+    on_progress: Callable[[dict], None] | None = None,
+) -> dict:
+    """
+    Reparsează conținuturile IFC cu versiune de parser veche (sau toate, cu force).
+
+    Fiecare model reprocesat e salvat (commit) imediat: o reindexare întreruptă
+    se reia de unde a rămas.
+    """
+    started = time.monotonic()
+    groups = stale_ifc_uploads(db, force=force)
+    files: list[tuple[str, str]] = []
+    missing = 0
+    for sha, uploads in groups.items():
+        path = next((u.file_path for u in uploads if os.path.exists(u.file_path)), None)
+        if path is None:
+            missing += 1
+            continue
+        files.append((path, sha))
+    db.commit()
+
+    reindexed = failed = uploads_updated = 0
+    errors: list[dict] = []
+    for done, (path, sha, result) in enumerate(parse_ifc_many(files, workers=workers), start=1):
+        if isinstance(result, IfcParseError):
+            failed += 1
+            errors.append({"content_sha256": sha, "file_path": path, "error": str(result)})
+            logger.warning(f"Reindexare eșuată pentru {path}: {result}")
+        else:
+            for uploaded in groups[sha]:
+                uploaded.parsed_summary_json = result
+                uploaded.parser_version = IFC_PARSER_VERSION
+            db.commit()
+            reindexed += 1
+            uploads_updated += len(groups[sha])
+        if on_progress is not None:
+            on_progress({"done": done, "total": len(files), "failed": failed})
+
+    return {
+        "success": failed == 0,
+        "parser_version": IFC_PARSER_VERSION,
+        "models": len(groups),
+        "reindexed": reindexed,
+        "uploads_updated": uploads_updated,
+        "failed": failed,
+        "missing_files": missing,
+        "errors": errors,
+        "duration_ms": round((time.monotonic() - started) * 1000),
+    }
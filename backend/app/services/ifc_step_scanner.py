@@ -0,0 +1,192 @@
+"""
+ifc_step_scanner.py — Scanare STEP (ISO 10303-21) cu memorie plafonată.
+
+ifcopenshell.open încarcă tot modelul în memorie (de câteva ori dimensiunea
+fișierului), limita practică pentru modelele de infrastructură de mai mulți
+GB. Pentru sumar ajung însă numărul de instanțe per tip, schema și câteva
+entități de metadate. Scanerul mapează fișierul în memorie (mmap — paginile
+sunt citite și eliberate de sistemul de operare) și parcurge secțiunea DATA
+înregistrare cu înregistrare (`#id=IFCTYPE(...);`), numărând instanțele per
+tip. Expresia regulată consumă fiecare înregistrare întreagă, inclusiv
+șirurile ei ('...', cu '' ca escape), deci un „;#1=IFCWALL(” dintr-un Name
+nu e numărat ca instanță. Doar argumentele primei instanțe a tipurilor
+cerute sunt interpretate. Memoria folosită depinde de numărul de tipuri, nu
+de dimensiunea fișierului.
+"""
+
+from __future__ import annotations
+
+import mmap
+import re
+from collections import Counter
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable
+
+# FILE_SCHEMA apare în HEADER, la începutul fișierului
+_HEADER_BYTES = 64 * 1024
+# Argumentele unei entități de metadate sunt mici; limita protejează de liste uriașe
+_MAX_ARGUMENT_BYTES = 256 * 1024
+# Dimensiunea ferestrei scanate dintr-o dată (memoria: lista de potriviri a ferestrei)
+_WINDOW_BYTES = 64 * 1024 * 1024
+
+_SCHEMA_RE = re.compile(rb"FILE_SCHEMA\s*\(\s*\(\s*'([^']+)'")
+_DATA_RE = re.compile(rb"^[ \t]*DATA[ \t]*;", re.MULTILINE)
+# O înregistrare completă: antet, apoi text și șiruri (cu '' în interior) până la „;”.
+# Cuantificatorii posesivi fac potrivirea neambiguă: o înregistrare tăiată sau
+# invalidă eșuează liniar, fără backtracking exponențial pe „''”.
+_RECORD_RE = re.compile(
+    rb"\s*#\d+\s*=\s*([A-Za-z][A-Za-z0-9_]*)\s*\("
+    rb"[^';]*+(?:'[^']*+(?:''[^']*+)*+'[^';]*+)*+;"
+)
+_ENCODED_RE = re.compile(r"\\X2\\((?:[0-9A-Fa-f]{4})+)\\X0\\|\\X\\([0-9A-Fa-f]{2})|\\S\\(.)|\\\\")
+
+
+class StepScanError(ValueError):
+    """Fișierul nu are structura unui fișier STEP IFC."""
+
+
+@dataclass
+class StepScan:
+    """Rezultatul scanării: schema, instanțe per tip, argumentele capturate."""
+    schema_identifier: str
+    type_counts: dict[str, int]
+    # tip → argumentele primei instanțe (doar pentru tipurile cerute)
+    first_arguments: dict[str, list] = field(default_factory=dict)
+
+
+def _decode_string(raw: str) -> str:
+    """Decodează escape-urile STEP: '' → ', \\X2\\…\\X0\\ (UTF-16), \\X\\hh, \\S\\c."""
+    def replace(m: re.Match) -> str:
+        if m.group(1):
+            return bytes.fromhex(m.group(1)).decode("utf-16-be", errors="replace")
+        if m.group(2):
+            return bytes.fromhex(m.group(2)).decode("latin-1")
+        if m.group(3):
+            return chr(ord(m.group(3)) + 128)
+        return "\\"
+    return _ENCODED_RE.sub(replace, raw.replace("''", "'"))
+
+
+def _token_value(token: str) -> Any:
+    if token in ("$", "*") or token.startswith("#"):
+        return None
+    if token.startswith(".") and token.endswith(".") and len(token) > 1:
+        enum = token[1:-1]
+        return {"T": True, "F": False}.get(enum, enum)
+    try:
+        return int(token)
+    except ValueError:
+        try:
+            return float(token)
+        except ValueError:
+            return token
+
+
+def parse_arguments(data: bytes) -> list:
+    """
+    Argumentele unei instanțe, din textul de după paranteza de deschidere.
+
+    Referințele (#id) și valorile lipsă devin None, listele devin liste, iar
+    valorile tipizate (IFCLABEL('x')) sunt despachetate.
+    """
+    text = data.decode("latin-1")
+    stack: list[list] = [[]]
+    typed: list[bool] = [False]
+    token = ""
+    i, n = 0, len(text)
+    while i < n:
+        c = text[i]
+        if c == "'":
+            j = i + 1
+            while j < n:
+                if text[j] == "'":
+                    if j + 1 < n and text[j + 1] == "'":
+                        j += 2
+                        continue
+                    break
+                j += 1
+            raw = text[i + 1:j].encode("latin-1").decode("utf-8", errors="replace")
+            stack[-1].append(_decode_string(raw))
+            i = j + 1
+            continue
+        if c == "(":
+            typed.append(bool(token))
+            token = ""
+            stack.append([])
+        elif c in ",)":
+            if token:
+                stack[-1].append(_token_value(token))
+                token = ""
+            if c == ")":
+                done = stack.pop()
+                if len(stack) == 0:
+                    return done
+                value = done[0] if typed.pop() and done else done
+                stack[-1].append(value)
+        elif not c.isspace():
+            token += c
+        i += 1
+    return stack[0]
+
+
+def scan_step_file(
+    file_path: str | Path,
+    *,
+    capture: Callable[[str, str], bool] | None = None,
+) -> StepScan:
+    """
+    Numără instanțele per tip dintr-un fișier IFC-SPF, fără a-l încărca.
+
+    capture(schema_identifier, TIP): pentru ce tipuri se păstrează
+    argumentele primei instanțe (ex: IfcProject, IfcApplication).
+    """
+    with open(file_path, "rb") as fh:
+        try:
+            buf = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError as e:  # fișier gol
+            raise StepScanError("Fișier IFC gol.") from e
+        with buf:
+            header = _SCHEMA_RE.search(buf[:_HEADER_BYTES])
+            if header is None:
+                raise StepScanError("Antet STEP fără FILE_SCHEMA.")
+            schema_identifier = header.group(1).decode("ascii", errors="replace").upper()
+
+            data = _DATA_RE.search(buf)
+            counts: Counter[bytes] = Counter()
+            first_arguments: dict[str, list] = {}
+            # Ferestre terminate după ultima înregistrare completă: o înregistrare
+            # tăiată de capătul ferestrei e reluată întreagă în fereastra următoare
+            start, size = (data.end() if data else 0), len(buf)
+            window_bytes = _WINDOW_BYTES
+            while start < size:
+                end = min(size, start + window_bytes)
+                names: list[bytes] = []
+                first: dict[bytes, re.Match] = {}
+                pos = start
+                for match in _RECORD_RE.finditer(buf, start, end):
+                    if match.start() != pos and end < size:
+                        break  # înregistrare incompletă la capătul ferestrei
+                    name = match.group(1)
+                    names.append(name)
+                    first.setdefault(name, match)
+                    pos = match.end()
+                if pos == start and end < size:
+                    window_bytes *= 2  # înregistrare mai mare decât fereastra
+                    continue
+                if capture is not None:
+                    for name in first.keys() - counts.keys():
+                        type_name = name.decode("ascii").upper()
+                        if capture(schema_identifier, type_name):
+                            match = first[name]
+                            args_start = buf.find(b"(", match.end(1)) + 1
+                            args_end = min(match.end(), args_start + _MAX_ARGUMENT_BYTES)
+                            first_arguments[type_name] = parse_arguments(buf[args_start:args_end])
+                counts.update(names)
+                start, window_bytes = (pos if end < size else size), _WINDOW_BYTES
+
+    return StepScan(
+        schema_identifier=schema_identifier,
+        type_counts={name.decode("ascii").upper(): n for name, n in counts.items()},
+        first_arguments=first_arguments,
+    )
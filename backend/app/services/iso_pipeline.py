@@ -0,0 +1,282 @@
+"""
+iso_pipeline.py — Generare one-shot a tuturor artefactelor ISO 19650
+(EIR, TIDP, RACI, LOIN, handover, plan securitate) dintr-un singur
+ProjectContext.
+
+Flux:
+  1. Snapshot (deep copy) al ultimului ProjectContext → toate prompturile
+     pornesc din aceeași versiune a fișei, chiar dacă ea e editată între timp.
+  2. Fan-out: cele 6 apeluri LLM rulează concurent în thread pool, fiecare
+     cu sesiunea lui pentru cache-ul de răspunsuri (llm_cache).
+  3. Persistare atomică: dacă toate au reușit, rezultatele se scriu într-un
+     singur savepoint; orice eroare → nimic nu se salvează. Răspunsurile
+     reușite rămân în cache, deci o reluare costă doar artefactul care a picat.
+
+Progresul e expus ca generator de evenimente (dict), consumat de endpoint-ul
+SSE și de tool-ul agentului `generate_all_iso_artifacts`.
+"""
+
+from __future__ import annotations
+
+import copy
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Iterator
+
+from sqlalchemy.orm import Session
+
+from app.db import SessionLocal
+from app.repositories.projects_repository import (
+    get_latest_project_context,
+    get_project,
+)
+from app.services.delivery_plan import build_tidp_prompt, save_tidp
+from app.services.eir_generator import build_eir_prompt, save_eir
+from app.services.handover import build_handover_prompt, save_handover_checklist
+from app.services.json_utils import extract_json as _extract_json, is_json_response
+from app.services.llm_cache import cached_call_llm_chat_expert
+from app.services.loin_generator import build_loin_prompt, save_loin_matrix
+from app.services.raci_generator import build_raci_prompt, save_raci_matrix
+from app.services.security_plan import build_security_prompt, save_security_plan
+
+logger = logging.getLogger(__name__)
+
+# Ordinea de persistare (și de raportare în `done`)
+ISO_ARTIFACTS: tuple[str, ...] = ("eir", "tidp", "raci", "loin", "handover", "security")
+
+ISO_ARTIFACT_LABELS: dict[str, str] = {
+    "eir": "EIR",
+    "tidp": "TIDP",
+    "raci": "Matrice RACI",
+    "loin": "Matrice LOIN",
+    "handover": "Checklist handover",
+    "security": "Plan securitate",
+}
+
+# Thread-uri pentru fan-out (implicit: câte unul per artefact)
+ISO_PIPELINE_WORKERS = int(os.getenv("ISO_PIPELINE_WORKERS", str(len(ISO_ARTIFACTS))))
+
+
+def _fetch_artifact(llm_context: str, prompt: str) -> dict:
+    """Apel LLM (cu cache) într-o sesiune proprie; returnează JSON-ul extras."""
+    db = SessionLocal()
+    try:
+        response_text = cached_call_llm_chat_expert(
+            db,
+            context=llm_context,
+            question=prompt,
+            max_tokens=8192,
+            validate=is_json_response,
+        )
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+    data = _extract_json(response_text)
+    if "raw_response" in data:
+        raise ValueError("Răspunsul LLM nu conține JSON valid.")
+    return data
+
+
+def _save_artifact(
+    db: Session,
+    artifact: str,
+    project_id: int,
+    data: dict,
+    ctx: dict,
+    classification_level: str,
+    sensitive_areas: str | None,
+) -> dict:
+    if artifact == "eir":
+        return save_eir(db, project_id, data)
+    if artifact == "tidp":
+        return save_tidp(db, project_id, data, ctx.get("disciplines", []))
+    if artifact == "raci":
+        return save_raci_matrix(db, project_id, data)
+    if artifact == "loin":
+        return save_loin_matrix(db, project_id, data)
+    if artifact == "handover":
+        return save_handover_checklist(db, project_id, data)
+    return save_security_plan(db, project_id, data, classification_level, sensitive_areas)
+
+
+def _summarize(artifact: str, result: dict) -> dict:
+    """Rezumat compact pentru evenimentul `done` (fără payload-urile complete)."""
+    if artifact == "eir":
+        return {
+            "eir_id": result.get("eir_id"),
+            "requirements_count": len(
+                result.get("content_json", {}).get("information_requirements", [])
+            ),
+        }
+    if artifact == "security":
+        return {"classification_level": result.get("classification_level")}
+    return {
+        key: value for key, value in result.items()
+        if key.endswith("_count")
+    }
+
+
+def iter_iso_artifacts(
+    db: Session,
+    project_id: int,
+    *,
+    classification_level: str = "standard",
+    sensitive_areas: str | None = None,
+    commit: bool = False,
+) -> Iterator[dict]:
+    """
+    Generează toate artefactele ISO 19650 concurent și le persistă atomic.
+
+    Yields evenimente:
+      pipeline_started  — {context_id, artifacts}
+      artifact_done     — {artifact, label, duration_ms}
+      artifact_failed   — {artifact, label, error}
+      done              — {success, committed, duration_ms, results | errors}
+      error             — precondiție nesatisfăcută (proiect/fișă lipsă)
+
+    Args:
+        commit: dacă True, face db.commit() înainte de `done`; altfel doar
+            flush (apelantul decide, ex. tura agentului).
+    """
+    project = get_project(db, project_id)
+    if not project:
+        yield {"type": "error", "message": f"Proiectul cu ID {project_id} nu există."}
+        return
+
+    ctx_entry = get_latest_project_context(db, project_id)
+    if not ctx_entry:
+        yield {
+            "type": "error",
+            "message": "Nu există fișă BEP (ProjectContext). Completează mai întâi fișa proiectului.",
+        }
+        return
+
+    context_id = ctx_entry.id
+    ctx = copy.deepcopy(ctx_entry.context_json)
+    if not ctx.get("disciplines"):
+        yield {"type": "error", "message": "Nu sunt definite discipline în fișa proiectului."}
+        return
+
+    prompts = {
+        "eir": build_eir_prompt(project, ctx),
+        "tidp": build_tidp_prompt(project, ctx),
+        "raci": build_raci_prompt(project, ctx),
+        "loin": build_loin_prompt(project, ctx),
+        "handover": build_handover_prompt(project, ctx),
+        "security": build_security_prompt(project, ctx, classification_level, sensitive_areas),
+    }
+    llm_context = f"Proiect: {project.name} ({project.code})"
+    if commit:
+        # Eliberează tranzacția de citire cât timp așteptăm LLM-ul
+        db.commit()
+
+    yield {
+        "type": "pipeline_started",
+        "project_id": project_id,
+        "context_id": context_id,
+        "artifacts": list(ISO_ARTIFACTS),
+    }
+
+    started = time.time()
+    data_by_artifact: dict[str, dict] = {}
+    errors: dict[str, str] = {}
+
+    with ThreadPoolExecutor(max_workers=max(1, ISO_PIPELINE_WORKERS)) as pool:
+        futures = {
+            pool.submit(_fetch_artifact, llm_context, prompts[artifact]): artifact
+            for artifact in ISO_ARTIFACTS
+        }
+        for future in as_completed(futures):
+            artifact = futures[future]
+            try:
+                data_by_artifact[artifact] = future.result()
+                yield {
+                    "type": "artifact_done",
+                    "artifact": artifact,
+                    "label": ISO_ARTIFACT_LABELS[artifact],
+                    "duration_ms": int((time.time() - started) * 1000),
+                }
+            except Exception as e:
+                logger.error(f"Eroare la generare {artifact} (pipeline ISO): {e}")
+                errors[artifact] = str(e)
+                yield {
+                    "type": "artifact_failed",
+                    "artifact": artifact,
+                    "label": ISO_ARTIFACT_LABELS[artifact],
+                    "error": str(e),
+                }
+
+    if errors:
+        yield {
+            "type": "done",
+            "success": False,
+            "committed": False,
+            "duration_ms": int((time.time() - started) * 1000),
+            "errors": errors,
+        }
+        return
+
+    results: dict[str, dict] = {}
+    try:
+        with db.begin_nested():
+            for artifact in ISO_ARTIFACTS:
+                result = _save_artifact(
+                    db, artifact, project_id, data_by_artifact[artifact], ctx,
+                    classification_level, sensitive_areas,
+                )
+                results[artifact] = _summarize(artifact, result)
+        if commit:
+            db.commit()
+        else:
+            db.flush()
+    except Exception as e:
+        logger.error(f"Eroare la salvarea artefactelor ISO pentru proiectul {project_id}: {e}")
+        if commit:
+            db.rollback()
+        yield {
+            "type": "done",
+            "success": False,
+            "committed": False,
+            "duration_ms": int((time.time() - started) * 1000),
+            "errors": {"persist": str(e)},
+        }
+        return
+
+    logger.info(
+        f"Artefacte ISO 19650 generate pentru proiectul {project_id} "
+        f"în {int((time.time() - started) * 1000)}ms"
+    )
+    yield {
+        "type": "done",
+        "success": True,
+        "committed": commit,
+        "duration_ms": int((time.time() - started) * 1000),
+        "context_id": context_id,
+        "results": results,
+    }
+
+
+def generate_all_iso_artifacts(
+    db: Session,
+    project_id: int,
+    *,
+    classification_level: str = "standard",
+    sensitive_areas: str | None = None,
+) -> dict:
+    """Variantă blocantă (fără streaming): returnează evenimentul final."""
+    last: dict = {}
+    for event in iter_iso_artifacts(
+        db, project_id,
+        classification_level=classification_level,
+        sensitive_areas=sensitive_areas,
+    ):
+        last = event
+    if last.get("type") == "error":
+        return {"error": last["message"]}
+    return last
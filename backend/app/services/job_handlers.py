@@ -0,0 +1,235 @@
+"""
+job_handlers.py — Handler-ele job-urilor de fundal (coada din job_queue.py).
+
+Fiecare handler primește (db, payload, ctx) și returnează un dict-rezultat.
+Un rezultat cu cheia "error" (convenția serviciilor existente) sau o excepție
+marchează încercarea ca eșuată; worker-ul face rollback și reîncearcă.
+`ctx` expune progress(dict) și is_cancelled() (vezi job_queue.JobContext).
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Callable
+
+from sqlalchemy.orm import Session
+
+from app.repositories.projects_repository import (
+    find_parsed_upload_by_hash,
+    get_project,
+    save_uploaded_file,
+)
+from app.services.agent_tools import handle_generate_bep, handle_verify_bep
+from app.services.clash_manager import run_clash_detection
+from app.services.delivery_plan import generate_tidp
+from app.services.eir_generator import generate_eir
+from app.services.element_queries import build_project_element_store
+from app.services.handover import generate_handover_checklist
+from app.services.ifc_delivery import precompress_blob
+from app.services.ifc_parser import IFC_PARSER_VERSION
+from app.services.ifc_processing import IfcParseError, build_viewer_geometry_in_pool, parse_ifc_summary
+from app.services.iso_compliance_checker import check_full_compliance
+from app.services.iso_pipeline import iter_iso_artifacts
+from app.services.loin_compliance import check_project_loin_compliance
+from app.services.loin_generator import generate_loin_matrix
+from app.services.pdf_report_exporter import generate_compliance_pdf
+from app.services.project_health import compute_project_health
+from app.services.raci_generator import generate_raci_matrix
+from app.services.security_plan import generate_security_plan
+
+if TYPE_CHECKING:
+    from app.services.job_queue import JobContext
+
+logger = logging.getLogger(__name__)
+
+# Fișierele produse de job-uri (ex: PDF conformitate), servite prin /jobs/{id}/download
+JOB_OUTPUT_DIR = Path(os.getenv(
+    "JOB_OUTPUT_DIR",
+    str(Path(__file__).resolve().parent.parent.parent / "data" / "job_outputs"),
+))
+
+
+def _project_job(generator: Callable[[Session, int], dict]) -> Callable:
+    """Adaptează un generator (db, project_id) -> dict la semnătura de handler."""
+    def handler(db: Session, payload: dict, ctx: JobContext) -> dict:
+        return generator(db, payload["project_id"])
+    handler.__doc__ = generator.__doc__
+    return handler
+
+
+def run_generate_bep(db: Session, payload: dict, ctx: JobContext) -> dict:
+    """Generează BEP din ultima fișă de proiect."""
+    return handle_generate_bep(db, {"project_id": payload["project_id"]})
+
+
+def run_verify_bep(db: Session, payload: dict, ctx: JobContext) -> dict:
+    """Verifică BEP vs model (summary IFC importat sau fișa proiectului)."""
+    return handle_verify_bep(db, {"project_id": payload["project_id"]})
+
+
+def run_generate_security_plan(db: Session, payload: dict, ctx: JobContext) -> dict:
+    """Generează planul de securitate ISO 19650-5."""
+    return generate_security_plan(
+        db, payload["project_id"],
+        classification_level=payload.get("classification_level", "standard"),
+        sensitive_areas=payload.get("sensitive_areas"),
+    )
+
+
+def run_generate_iso_artifacts(db: Session, payload: dict, ctx: JobContext) -> dict:
+    """Generează toate artefactele ISO 19650; raportează progresul per artefact."""
+    completed: list[str] = []
+    last: dict = {}
+    for event in iter_iso_artifacts(
+        db, payload["project_id"],
+        classification_level=payload.get("classification_level", "standard"),
+        sensitive_areas=payload.get("sensitive_areas"),
+    ):
+        last = event
+        if event["type"] == "artifact_done":
+            completed.append(event["artifact"])
+            ctx.progress({"completed": list(completed), "last": event["artifact"]})
+        if ctx.is_cancelled():
+            return {"error": "Job anulat."}
+
+    if last.get("type") == "error":
+        return {"error": last["message"]}
+    if not last.get("success"):
+        return {"error": "Generare incompletă.", "errors": last.get("errors", {})}
+    return last
+
+
+def run_export_compliance_pdf(db: Session, payload: dict, ctx: JobContext) -> dict:
+    """Generează raportul PDF de conformitate și îl scrie în JOB_OUTPUT_DIR."""
+    project_id = payload["project_id"]
+    project = get_project(db, project_id)
+    if not project:
+        return {"error": f"Proiectul cu ID {project_id} nu există."}
+
+    compliance_data = check_full_compliance(db, project_id)
+    ctx.progress({"stage": "compliance_checked"})
+    health_data = compute_project_health(db, project_id)
+
+    pdf_buffer = generate_compliance_pdf(
+        compliance_data=compliance_data,
+        health_data=health_data,
+        project_name=project.name,
+        project_code=project.code,
+    )
+
+    JOB_OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+    filename = f"ISO19650_Raport_{project.code}.pdf"
+    path = JOB_OUTPUT_DIR / f"job_{ctx.job_id}_{filename}"
+    path.write_bytes(pdf_buffer.getvalue())
+
+    return {
+        "success": True,
+        "filename": filename,
+        "output_path": str(path),
+        "media_type": "application/pdf",
+    }
+
+
+def run_parse_ifc(db: Session, payload: dict, ctx: JobContext) -> dict:
+    """Parsează un IFC importat într-un proces separat și salvează summary-ul."""
+    content_sha256 = payload.get("content_sha256")
+    # Un upload identic poate fi fost parsat între timp (import-uri simultane)
+    existing = (
+        find_parsed_upload_by_hash(db, content_sha256, "ifc", IFC_PARSER_VERSION)
+        if content_sha256 else None
+    )
+    if existing is not None:
+        summary = existing.parsed_summary_json
+    else:
+        ctx.progress({"stage": "parsing", "elapsed_s": 0})
+        try:
+            summary = parse_ifc_summary(
+                payload["file_path"], content_sha256=content_sha256, on_progress=ctx.progress,
+            )
+        except IfcParseError as e:
+            return {"error": str(e)}
+
+    ctx.progress({"stage": "saving"})
+    uploaded = save_uploaded_file(
+        db,
+        project_id=payload["project_id"],
+        filename=payload["filename"],
+        file_path=payload["file_path"],
+        file_type="ifc",
+        file_size_bytes=payload.get("file_size_bytes"),
+        parsed_summary_json=summary,
+        content_sha256=content_sha256,
+        parser_version=IFC_PARSER_VERSION,
+    )
+    result = {"success": True, "uploaded_file_id": uploaded.id, "summary": summary}
+
+    # Verificarea LOIN rulează pe store-ul de elemente construit la parsare
+    loin = check_project_loin_compliance(db, payload["project_id"])
+    if "error" not in loin:
+        result["loin_compliance"] = {
+            k: loin[k] for k in ("elements_checked", "compliant_elements", "compliance_rate")
+        }
+    return result
+
+
+def run_detect_clashes(db: Session, payload: dict, ctx: JobContext) -> dict:
+    """Detecție geometrică (incrementală) de clash-uri din ultimul IFC al proiectului."""
+    pairs = payload.get("discipline_pairs")
+    return run_clash_detection(
+        db, payload["project_id"],
+        tolerance=payload.get("tolerance_m"),
+        discipline_pairs=[tuple(p) for p in pairs] if pairs else None,
+        incremental=payload.get("incremental", True),
+        on_progress=ctx.progress,
+    )
+
+
+def run_build_element_store(db: Session, payload: dict, ctx: JobContext) -> dict:
+    """Indexează elementele unui IFC (implicit ultimul) în store-ul columnar."""
+    return build_project_element_store(
+        db, payload["project_id"], uploaded_file_id=payload.get("uploaded_file_id"),
+        on_progress=ctx.progress,
+    )
+
+
+def run_compress_ifc_blob(db: Session, payload: dict, ctx: JobContext) -> dict:
+    """Precalculează variantele gzip/brotli ale unui blob IFC pentru descărcare."""
+    return precompress_blob(payload["file_path"])
+
+
+def run_build_viewer_geometry(db: Session, payload: dict, ctx: JobContext) -> dict:
+    """Teselează IFC-ul (proces separat) și scrie fragmentele glTF per disciplină pentru viewer."""
+    ctx.progress({"stage": "tessellating", "elapsed_s": 0})
+    try:
+        manifest = build_viewer_geometry_in_pool(
+            payload["file_path"], payload["content_sha256"], on_progress=ctx.progress,
+        )
+    except IfcParseError as e:
+        return {"error": str(e)}
+    return {
+        "success": True,
+        "content_sha256": payload["content_sha256"],
+        "elements": manifest["elements"],
+        "chunks": [{k: c[k] for k in ("discipline", "elements", "size_bytes")} for c in manifest["chunks"]],
+    }
+
+
+JOB_HANDLERS: dict[str, Any] = {
+    "generate_bep": run_generate_bep,
+    "verify_bep": run_verify_bep,
+    "generate_eir": _project_job(generate_eir),
+    "generate_tidp": _project_job(generate_tidp),
+    "generate_raci": _project_job(generate_raci_matrix),
+    "generate_loin": _project_job(generate_loin_matrix),
+    "generate_handover": _project_job(generate_handover_checklist),
+    "generate_security_plan": run_generate_security_plan,
+    "generate_iso_artifacts": run_generate_iso_artifacts,
+    "export_compliance_pdf": run_export_compliance_pdf,
+    "parse_ifc": run_parse_ifc,
+    "detect_clashes": run_detect_clashes,
+    "build_element_store": run_build_element_store,
+    "compress_ifc_blob": run_compress_ifc_blob,
+    "build_viewer_geometry": run_build_viewer_geometry,
+}
@@ -0,0 +1,476 @@
+"""
+job_queue.py — Coadă de job-uri durabilă, persistată în tabela `jobs`.
+
+- enqueue_job(): request-ul HTTP doar inserează un rând și răspunde imediat
+- JobWorker: pool de thread-uri care preiau job-urile în ordinea
+  (priority, created_at); rulează in-process (lifespan FastAPI) sau separat
+  prin `python -m app.worker`
+- Retry cu backoff exponențial până la max_attempts
+- Anulare: job-urile din coadă se anulează imediat; cele în execuție la
+  primul is_cancelled() verificat de handler sau la final (rollback)
+- Heartbeat: job-urile "running" ale unui worker oprit brusc sunt repuse
+  în coadă după JOB_STALE_SECONDS, deci supraviețuiesc restart-urilor
+"""
+
+from __future__ import annotations
+
+import datetime
+import logging
+import os
+import socket
+import threading
+import time
+import uuid
+
+from sqlalchemy.orm import Session
+
+from app.db import SessionLocal, _is_sqlite
+from app.models.sql_models import JobModel
+from app.services.job_handlers import JOB_HANDLERS
+
+logger = logging.getLogger(__name__)
+
+JOB_WORKER_CONCURRENCY = int(os.getenv("JOB_WORKER_CONCURRENCY", "2"))
+JOB_POLL_SECONDS = float(os.getenv("JOB_POLL_SECONDS", "1.0"))
+JOB_HEARTBEAT_SECONDS = float(os.getenv("JOB_HEARTBEAT_SECONDS", "15"))
+JOB_STALE_SECONDS = float(os.getenv("JOB_STALE_SECONDS", "120"))
+JOB_RETRY_BASE_SECONDS = float(os.getenv("JOB_RETRY_BASE_SECONDS", "30"))
+
+JOB_TERMINAL_STATUSES = frozenset({"succeeded", "failed", "cancelled"})
+
+
+def _utcnow() -> datetime.datetime:
+    return datetime.datetime.now(datetime.timezone.utc)
+
+
+def _iso(dt: datetime.datetime | None) -> str | None:
+    return dt.isoformat() if dt else None
+
+
+def job_to_dict(job: JobModel) -> dict:
+    """Reprezentarea JSON a unui job (status endpoint + SSE)."""
+    return {
+        "id": job.id,
+        "job_type": job.job_type,
+        "project_id": job.project_id,
+        "status": job.status,
+        "priority": job.priority,
+        "attempts": job.attempts,
+        "max_attempts": job.max_attempts,
+        "cancel_requested": job.cancel_requested,
+        "progress": job.progress_json,
+        "result": job.result_json,
+        "error": job.error,
+        "created_at": _iso(job.created_at),
+        "started_at": _iso(job.started_at),
+        "finished_at": _iso(job.finished_at),
+    }
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# Operații pe coadă
+# ══════════════════════════════════════════════════════════════════════════════
+
+def enqueue_job(
+    db: Session,
+    job_type: str,
+    payload: dict | None = None,
+    *,
+    project_id: int | None = None,
+    user_id: int | None = None,
+    priority: int = 100,
+    max_attempts: int = 3,
+) -> JobModel:
+    """Adaugă un job în coadă (flush, fără commit). priority: mai mic = mai urgent."""
+    if job_type not in JOB_HANDLERS:
+        raise ValueError(f"Tip de job necunoscut: {job_type}")
+
+    payload = dict(payload or {})
+    if project_id is not None:
+        payload.setdefault("project_id", project_id)
+
+    job = JobModel(
+        job_type=job_type,
+        project_id=project_id,
+        user_id=user_id,
+        status="queued",
+        priority=priority,
+        payload_json=payload,
+        attempts=0,
+        max_attempts=max(1, max_attempts),
+        cancel_requested=False,
+        run_after=_utcnow(),
+    )
+    db.add(job)
+    db.flush()
+    return job
+
+
+def record_completed_job(
+    db: Session,
+    job_type: str,
+    payload: dict,
+    result: dict,
+    *,
+    project_id: int | None = None,
+    user_id: int | None = None,
+) -> JobModel:
+    """Înregistrează un job rezolvat sincron (ex: rezultat reutilizat), fără a trece prin coadă."""
+    now = _utcnow()
+    payload = dict(payload)
+    if project_id is not None:
+        payload.setdefault("project_id", project_id)
+    job = JobModel(
+        job_type=job_type,
+        project_id=project_id,
+        user_id=user_id,
+        status="succeeded",
+        priority=0,
+        payload_json=payload,
+        result_json=result,
+        attempts=0,
+        max_attempts=1,
+        cancel_requested=False,
+        run_after=now,
+        started_at=now,
+        finished_at=now,
+    )
+    db.add(job)
+    db.flush()
+    return job
+
+
+def find_active_job(
+    db: Session,
+    job_type: str,
+    *,
+    project_id: int | None = None,
+    payload_match: dict | None = None,
+) -> JobModel | None:
+    """
+    Un job din coadă sau în execuție de tipul dat, cu payload-ul conținând
+    payload_match (ex: același content_sha256). Evită job-uri duplicate când
+    clientul reîncearcă un endpoint care pune în coadă.
+    """
+    query = db.query(JobModel).filter(
+        JobModel.job_type == job_type,
+        JobModel.status.in_(("queued", "running")),
+    )
+    if project_id is not None:
+        query = query.filter(JobModel.project_id == project_id)
+    for job in query.order_by(JobModel.id):
+        payload = job.payload_json or {}
+        if all(payload.get(k) == v for k, v in (payload_match or {}).items()):
+            return job
+    return None
+
+
+def enqueue_unique_job(
+    db: Session,
+    job_type: str,
+    payload: dict,
+    *,
+    match: dict | None = None,
+    project_id: int | None = None,
+    user_id: int | None = None,
+    priority: int = 100,
+    max_attempts: int = 3,
+) -> JobModel:
+    """
+    Ca enqueue_job, dar refolosește job-ul activ de același tip din proiect
+    al cărui payload conține `match` (implicit întregul payload).
+    """
+    job = find_active_job(
+        db, job_type, project_id=project_id,
+        payload_match=payload if match is None else match,
+    )
+    if job is not None:
+        return job
+    return enqueue_job(
+        db, job_type, payload,
+        project_id=project_id, user_id=user_id, priority=priority, max_attempts=max_attempts,
+    )
+
+
+def cancel_job(db: Session, job_id: int) -> JobModel | None:
+    """Anulează un job: imediat dacă e în coadă, cooperativ dacă rulează."""
+    job = db.get(JobModel, job_id)
+    if not job:
+        return None
+    if job.status == "queued":
+        job.status = "cancelled"
+        job.finished_at = _utcnow()
+    elif job.status == "running":
+        job.cancel_requested = True
+    db.flush()
+    return job
+
+
+def claim_next_job(db: Session, worker_id: str) -> int | None:
+    """
+    Preia atomic următorul job eligibil (status queued, run_after trecut).
+
+    Pe PostgreSQL folosește SELECT ... FOR UPDATE SKIP LOCKED; pe SQLite
+    UPDATE-ul condiționat pe status garantează că un singur worker câștigă.
+    """
+    now = _utcnow()
+    query = (
+        db.query(JobModel.id)
+        .filter(JobModel.status == "queued", JobModel.run_after <= now)
+        .order_by(JobModel.priority, JobModel.created_at, JobModel.id)
+    )
+    if not _is_sqlite:
+        query = query.with_for_update(skip_locked=True)
+    row = query.first()
+    if row is None:
+        db.rollback()
+        return None
+
+    claimed = (
+        db.query(JobModel)
+        .filter(JobModel.id == row.id, JobModel.status == "queued")
+        .update({
+            JobModel.status: "running",
+            JobModel.locked_by: worker_id,
+            JobModel.attempts: JobModel.attempts + 1,
+            JobModel.started_at: now,
+            JobModel.heartbeat_at: now,
+        }, synchronize_session=False)
+    )
+    db.commit()
+    return row.id if claimed else None
+
+
+def requeue_stale_jobs(db: Session, stale_after: float | None = None) -> int:
+    """Repune în coadă job-urile "running" fără heartbeat recent (worker mort)."""
+    threshold = _utcnow() - datetime.timedelta(
+        seconds=JOB_STALE_SECONDS if stale_after is None else stale_after
+    )
+    stale = (
+        db.query(JobModel)
+        .filter(JobModel.status == "running", JobModel.heartbeat_at < threshold)
+        .all()
+    )
+    for job in stale:
+        logger.warning(f"Job {job.id} ({job.job_type}) fără heartbeat de la {job.locked_by}, repus în coadă")
+        job.locked_by = None
+        if job.cancel_requested:
+            job.status = "cancelled"
+            job.finished_at = _utcnow()
+        elif job.attempts >= job.max_attempts:
+            job.status = "failed"
+            job.error = "Worker-ul s-a oprit în timpul execuției."
+            job.finished_at = _utcnow()
+        else:
+            job.status = "queued"
+            job.run_after = _utcnow()
+    db.commit()
+    return len(stale)
+
+
+def _touch_heartbeat(job_ids: list[int]) -> None:
+    if not job_ids:
+        return
+    db = SessionLocal()
+    try:
+        db.query(JobModel).filter(JobModel.id.in_(job_ids)).update(
+            {JobModel.heartbeat_at: _utcnow()}, synchronize_session=False
+        )
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        logger.warning(f"Heartbeat job-uri eșuat: {e}")
+    finally:
+        db.close()
+
+
+class JobContext:
+    """Legătura handler → job: raportare progres și verificare anulare (sesiuni proprii)."""
+
+    def __init__(self, job_id: int):
+        self.job_id = job_id
+
+    def progress(self, data: dict) -> None:
+        db = SessionLocal()
+        try:
+            db.query(JobModel).filter(JobModel.id == self.job_id).update(
+                {JobModel.progress_json: data, JobModel.heartbeat_at: _utcnow()},
+                synchronize_session=False,
+            )
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            logger.warning(f"Progres job {self.job_id} nesalvat: {e}")
+        finally:
+            db.close()
+
+    def is_cancelled(self) -> bool:
+        db = SessionLocal()
+        try:
+            flag = (
+                db.query(JobModel.cancel_requested)
+                .filter(JobModel.id == self.job_id)
+                .scalar()
+            )
+            return bool(flag)
+        finally:
+            db.close()
+
+
+def run_job(job_id: int) -> str:
+    """
+    Execută un job deja preluat (status running) și returnează statusul final.
+
+    Handler-ul lucrează într-o sesiune proprie: commit doar la succes; la eroare
+    sau anulare totul se anulează (rollback), iar jobul e reîncercat sau închis.
+    """
+    db = SessionLocal()
+    try:
+        job = db.get(JobModel, job_id)
+        handler = JOB_HANDLERS.get(job.job_type)
+        payload = dict(job.payload_json or {})
+        ctx = JobContext(job_id)
+
+        error: str | None = None
+        result: dict | None = None
+        started = time.time()
+        try:
+            if handler is None:
+                raise ValueError(f"Tip de job necunoscut: {job.job_type}")
+            result = handler(db, payload, ctx)
+            if isinstance(result, dict) and result.get("error"):
+                error = str(result["error"])
+        except Exception as e:
+            logger.error(f"Job {job_id} ({job.job_type}) a eșuat: {e}")
+            error = str(e)
+
+        # Verificare finală pe sesiunea handler-ului (vede anularea comisă între timp)
+        cancelled = bool(
+            db.query(JobModel.cancel_requested).filter(JobModel.id == job_id).scalar()
+        )
+        if error is None and not cancelled:
+            job.status = "succeeded"
+            job.result_json = result
+            job.error = None
+            job.finished_at = _utcnow()
+            job.locked_by = None
+            db.commit()
+            logger.info(f"Job {job_id} ({job.job_type}) finalizat în {int((time.time() - started) * 1000)}ms")
+            return job.status
+
+        # Eșec sau anulare: renunțăm la tot ce a scris handler-ul
+        db.rollback()
+        job = db.get(JobModel, job_id)
+        job.locked_by = None
+        if job.cancel_requested:
+            job.status = "cancelled"
+            job.finished_at = _utcnow()
+        elif job.attempts < job.max_attempts:
+            delay = JOB_RETRY_BASE_SECONDS * (2 ** (job.attempts - 1))
+            job.status = "queued"
+            job.error = error
+            job.run_after = _utcnow() + datetime.timedelta(seconds=delay)
+            logger.info(f"Job {job_id} reîncercat peste {delay:.0f}s (încercarea {job.attempts}/{job.max_attempts})")
+        else:
+            job.status = "failed"
+            job.error = error
+            job.result_json = result
+            job.finished_at = _utcnow()
+        db.commit()
+        return job.status
+    finally:
+        db.close()
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# Worker
+# ══════════════════════════════════════════════════════════════════════════════
+
+class JobWorker:
+    """Pool de thread-uri care consumă coada `jobs`."""
+
+    def __init__(
+        self,
+        concurrency: int = JOB_WORKER_CONCURRENCY,
+        poll_interval: float = JOB_POLL_SECONDS,
+        name: str | None = None,
+    ):
+        self.concurrency = max(1, concurrency)
+        self.poll_interval = poll_interval
+        self.name = name or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+        self._stop = threading.Event()
+        self._threads: list[threading.Thread] = []
+        self._active: set[int] = set()
+        self._active_lock = threading.Lock()
+
+    def run_once(self) -> bool:
+        """Preia și execută un singur job; False dacă coada e goală."""
+        db = SessionLocal()
+        try:
+            job_id = claim_next_job(db, self.name)
+        finally:
+            db.close()
+        if job_id is None:
+            return False
+
+        with self._active_lock:
+            self._active.add(job_id)
+        try:
+            run_job(job_id)
+        except Exception as e:
+            logger.error(f"Worker {self.name}: eroare neprevăzută la job {job_id}: {e}")
+        finally:
+            with self._active_lock:
+                self._active.discard(job_id)
+        return True
+
+    def _loop(self) -> None:
+        while not self._stop.is_set():
+            try:
+                ran = self.run_once()
+            except Exception as e:
+                logger.error(f"Worker {self.name}: eroare la preluarea job-urilor: {e}")
+                ran = False
+            if not ran:
+                self._stop.wait(self.poll_interval)
+
+    def _heartbeat_loop(self) -> None:
+        while not self._stop.wait(JOB_HEARTBEAT_SECONDS):
+            with self._active_lock:
+                active = list(self._active)
+            _touch_heartbeat(active)
+            db = SessionLocal()
+            try:
+                requeue_stale_jobs(db)
+            except Exception as e:
+                db.rollback()
+                logger.warning(f"Worker {self.name}: requeue job-uri blocate eșuat: {e}")
+            finally:
+                db.close()
+
+    def start(self) -> None:
+        db = SessionLocal()
+        try:
+            requeue_stale_jobs(db)
+        finally:
+            db.close()
+
+        self._stop.clear()
+        self._threads = [
+            threading.Thread(target=self._loop, name=f"job-worker-{i}", daemon=True)
+            for i in range(self.concurrency)
+        ]
+        self._threads.append(
+            threading.Thread(target=self._heartbeat_loop, name="job-heartbeat", daemon=True)
+        )
+        for t in self._threads:
+            t.start()
+        logger.info(f"Job worker {self.name} pornit ({self.concurrency} thread-uri)")
+
+    def stop(self, timeout: float = 30.0) -> None:
+        """Oprește preluarea de job-uri noi și așteaptă job-urile în curs."""
+        self._stop.set()
+        for t in self._threads:
+            t.join(timeout)
+        self._threads = []
+        logger.info(f"Job worker {self.name} oprit")
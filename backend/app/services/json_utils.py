@@ -72,3 +72,8 @@ def extract_json(text: str) -> dict:
 
     logger.warning("Nu s-a putut parsa JSON din răspunsul LLM, returnez raw_response")
     return {"raw_response": text}
+
+
+def is_json_response(text: str) -> bool:
+    """True dacă din răspuns s-a putut extrage JSON (nu a căzut pe raw_response)."""
+    return "raw_response" not in extract_json(text)
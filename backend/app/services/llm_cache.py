@@ -0,0 +1,164 @@
+"""
+llm_cache.py — Cache persistent (DB) pentru răspunsurile Claude ale
+generatoarelor deterministe (EIR, RACI, LOIN, TIDP, handover, securitate).
+
+Cheia este hash-ul SHA-256 al cererii complete (model, system prompt cu
+context, prompt user, max_tokens): același ProjectContext → aceeași cheie →
+răspunsul vine din DB în loc de un apel LLM de ~30 s.
+Intrările expiră după LLM_CACHE_TTL_HOURS; peste LLM_CACHE_MAX_ENTRIES se
+elimină cele mai vechi după last_used_at (LRU).
+"""
+
+from __future__ import annotations
+
+import datetime
+import hashlib
+import json
+import logging
+import os
+from typing import Callable
+
+from sqlalchemy.orm import Session
+
+from app.ai_client import (
+    SYSTEM_PROMPT_CHAT_EXPERT,
+    _context_request,
+    call_llm_chat_expert,
+)
+from app.models.sql_models import LlmResponseCacheModel
+
+logger = logging.getLogger(__name__)
+
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+LLM_CACHE_TTL_HOURS = float(os.getenv("LLM_CACHE_TTL_HOURS", "168"))
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "500"))
+
+
+def _utcnow() -> datetime.datetime:
+    return datetime.datetime.now(datetime.timezone.utc)
+
+
+def _as_utc(dt: datetime.datetime) -> datetime.datetime:
+    # SQLite întoarce datetime-uri naive (stocate ca UTC)
+    return dt if dt.tzinfo else dt.replace(tzinfo=datetime.timezone.utc)
+
+
+def request_cache_key(request: dict) -> str:
+    """Hash SHA-256 stabil al unei cereri Messages API (model, system, messages, max_tokens)."""
+    canonical = json.dumps(request, ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def get_cached_response(db: Session, cache_key: str) -> str | None:
+    """Returnează răspunsul cache-uit (și îl marchează ca folosit) sau None."""
+    entry = (
+        db.query(LlmResponseCacheModel)
+        .filter(LlmResponseCacheModel.cache_key == cache_key)
+        .first()
+    )
+    if entry is None:
+        return None
+    now = _utcnow()
+    if _as_utc(entry.expires_at) <= now:
+        db.delete(entry)
+        db.flush()
+        return None
+    entry.hit_count = (entry.hit_count or 0) + 1
+    entry.last_used_at = now
+    db.flush()
+    return entry.response_text
+
+
+def store_response(db: Session, cache_key: str, model: str, response_text: str) -> None:
+    """Salvează (sau înlocuiește) un răspuns și aplică TTL + evicție LRU."""
+    now = _utcnow()
+    expires_at = now + datetime.timedelta(hours=LLM_CACHE_TTL_HOURS)
+
+    entry = (
+        db.query(LlmResponseCacheModel)
+        .filter(LlmResponseCacheModel.cache_key == cache_key)
+        .first()
+    )
+    if entry is None:
+        entry = LlmResponseCacheModel(cache_key=cache_key, model=model, hit_count=0)
+        db.add(entry)
+    entry.response_text = response_text
+    entry.last_used_at = now
+    entry.expires_at = expires_at
+    db.flush()
+
+    evict_entries(db)
+
+
+def evict_entries(db: Session, max_entries: int | None = None) -> int:
+    """Șterge intrările expirate, apoi cele mai puțin recent folosite peste limită."""
+    limit = LLM_CACHE_MAX_ENTRIES if max_entries is None else max_entries
+
+    removed = (
+        db.query(LlmResponseCacheModel)
+        .filter(LlmResponseCacheModel.expires_at <= _utcnow())
+        .delete(synchronize_session=False)
+    )
+
+    stale_ids = [
+        row.id
+        for row in (
+            db.query(LlmResponseCacheModel.id)
+            .order_by(LlmResponseCacheModel.last_used_at.desc())
+            .offset(limit)
+            .all()
+        )
+    ]
+    if stale_ids:
+        removed += (
+            db.query(LlmResponseCacheModel)
+            .filter(LlmResponseCacheModel.id.in_(stale_ids))
+            .delete(synchronize_session=False)
+        )
+    db.flush()
+    return removed
+
+
+def cached_call_llm_chat_expert(
+    db: Session,
+    context: str,
+    question: str,
+    *,
+    max_tokens: int = 2048,
+    validate: Callable[[str], bool] | None = None,
+) -> str:
+    """
+    `call_llm_chat_expert` cu cache în DB.
+
+    Args:
+        validate: dacă e dat, răspunsul e cache-uit doar când validate(text) e True
+            (ex: JSON-ul a putut fi extras), ca un răspuns stricat să nu fie servit
+            din cache până la expirare.
+    """
+    if not LLM_CACHE_ENABLED:
+        return call_llm_chat_expert(context, question, max_tokens=max_tokens)
+
+    request = _context_request(SYSTEM_PROMPT_CHAT_EXPERT, context, question, max_tokens)
+    cache_key = request_cache_key(request)
+
+    try:
+        # Savepoint: o citire eșuată nu lasă sesiunea apelantului într-o tranzacție eșuată
+        with db.begin_nested():
+            cached = get_cached_response(db, cache_key)
+    except Exception as e:
+        logger.warning(f"LLM cache indisponibil (citire): {e}")
+        cached = None
+    if cached is not None:
+        logger.info(f"LLM cache hit: {cache_key[:12]}")
+        return cached
+
+    response_text = call_llm_chat_expert(context, question, max_tokens=max_tokens)
+
+    if validate is None or validate(response_text):
+        try:
+            with db.begin_nested():
+                store_response(db, cache_key, request["model"], response_text)
+        except Exception as e:
+            logger.warning(f"LLM cache indisponibil (scriere): {e}")
+
+    return response_text
@@ -0,0 +1,210 @@
+"""
+loin_compliance.py — Verificarea automată a modelului IFC față de matricea LOIN.
+
+Pentru fiecare tip de element din matricea LOIN (LoinEntryModel), cerințele
+de informație sunt extrase din information_content (identificatori expliciți
+„Pset_WallCommon”, „Pset_WallCommon.IsExternal”, sau cuvinte care corespund
+unei proprietăți existente în model, ex. „FireRating”) și verificate pe toate
+elementele acelui tip din store-ul columnar (element_store), vectorizat:
+o mască per cerință, calculată o singură dată și refolosită între tipuri.
+
+Rezultat: grad de completare per tip × cerință, procent elemente conforme
+și GlobalId-urile elementelor neconforme.
+"""
+
+from __future__ import annotations
+
+import logging
+import re
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from app.models.sql_models import LoinEntryModel
+from app.repositories.projects_repository import get_latest_uploaded_file
+from app.services.element_store import ElementStore, load_element_store
+from app.services.ifc_parser import _type_ancestors
+
+logger = logging.getLogger(__name__)
+
+MAX_FAILING_GUIDS = 100
+
+_TOKEN_RE = re.compile(r"[A-Za-z][A-Za-z0-9_]*(?:\.[A-Za-z][A-Za-z0-9_]*)?")
+# Identificator explicit (cerință chiar dacă lipsește din model): Pset_/Qto_ sau „Pset.Prop”
+_IDENTIFIER_RE = re.compile(r"^(?:(?:Pset|Qto)_\w+|\w+\.\w+)$")
+# Tipuri folosite de matricea generată care nu sunt entități IFC concrete
+_TYPE_ALIASES = {
+    "IfcPipe": "IfcPipeSegment",
+    "IfcDuct": "IfcDuctSegment",
+    "IfcCableCarrier": "IfcCableCarrierSegment",
+}
+# Atribute directe verificate pe coloanele store-ului, nu pe property set-uri
+_ATTRIBUTE_COLUMNS = {"name": "name"}
+
+
+def _normalize(token: str) -> str:
+    return re.sub(r"[^a-z0-9]", "", token.lower())
+
+
+def _resolve_type(schema_name: str, element_type: str) -> str | None:
+    """Numele entității IFC pentru un tip din matrice (None dacă nu e recunoscut)."""
+    name = element_type.strip().split()[0] if element_type.strip() else ""
+    if name and not name.lower().startswith("ifc"):
+        name = f"Ifc{name[:1].upper()}{name[1:]}"
+    name = _TYPE_ALIASES.get(name, name)
+    # Entitățile cunoscute au lanț de moștenire până la IfcRoot
+    return name if len(_type_ancestors(schema_name, name)) > 1 else None
+
+
+def _key_index(store: ElementStore) -> dict[str, str]:
+    """Formă normalizată → nume interogabil („Pset.Prop”, „Prop” sau „Pset”)."""
+    index: dict[str, str] = {}
+    for key in store.property_keys:
+        pset, _, prop = key.partition(".")
+        index.setdefault(_normalize(key), key)
+        index.setdefault(_normalize(prop), prop)
+        index.setdefault(_normalize(pset), pset)
+    for attribute in _ATTRIBUTE_COLUMNS:
+        index[attribute] = attribute
+    return index
+
+
+def parse_loin_requirements(
+    information_content: str | None,
+    key_index: dict[str, str],
+    schema_name: str,
+) -> list[str]:
+    """
+    Cerințele verificabile dintr-un text information_content.
+
+    Un cuvânt devine cerință dacă denumește o proprietate / un property set
+    din model sau dacă e un identificator explicit Pset_/Qto_/„Pset.Prop”
+    (atunci poate lipsi din model și va avea grad de completare 0). Numele de
+    entități IFC („IfcWall”) și restul textului sunt descriptive.
+    """
+    requirements: list[str] = []
+    for token in _TOKEN_RE.findall(information_content or ""):
+        if len(token) < 3:
+            continue
+        # Entitățile cunoscute au lanț de moștenire până la IfcRoot
+        if len(_type_ancestors(schema_name, token.split(".")[0])) > 1:
+            continue
+        resolved = key_index.get(_normalize(token))
+        if resolved is None and _IDENTIFIER_RE.match(token):
+            resolved = token
+        if resolved is not None and resolved not in requirements:
+            requirements.append(resolved)
+    return requirements
+
+
+def check_loin_compliance(
+    store: ElementStore,
+    entries: list[LoinEntryModel],
+    *,
+    max_failing: int = MAX_FAILING_GUIDS,
+) -> dict:
+    """Verifică elementele din store față de intrările LOIN (fără acces la DB)."""
+    key_index = _key_index(store)
+
+    # Intrările aceluiași tip (discipline / faze diferite) se cumulează
+    by_type: dict[str, dict] = {}
+    for entry in entries:
+        group = by_type.setdefault(entry.element_type, {"phases": set(), "requirements": []})
+        group["phases"].add(entry.phase)
+        for req in parse_loin_requirements(entry.information_content, key_index, store.schema_name):
+            if req not in group["requirements"]:
+                group["requirements"].append(req)
+
+    masks: dict[str, np.ndarray] = {}
+
+    def requirement_mask(req: str) -> np.ndarray:
+        if req not in masks:
+            column = _ATTRIBUTE_COLUMNS.get(req)
+            if column is not None:
+                empty = store.dictionaries[column].index("") if "" in store.dictionaries[column] else -1
+                masks[req] = np.asarray(store.columns[column]) != empty
+            else:
+                masks[req] = store.has_property(req)
+        return masks[req]
+
+    results: list[dict] = []
+    not_in_model: list[str] = []
+    checked = compliant_total = 0
+    for element_type, group in sorted(by_type.items()):
+        ifc_type = _resolve_type(store.schema_name, element_type)
+        if ifc_type is None:
+            not_in_model.append(element_type)
+            continue
+        in_type = store.type_mask(ifc_type)
+        count = int(in_type.sum())
+        if count == 0:
+            not_in_model.append(element_type)
+            continue
+
+        compliant = in_type.copy()
+        requirements = []
+        for req in group["requirements"]:
+            has = requirement_mask(req) & in_type
+            filled = int(has.sum())
+            compliant &= has
+            requirements.append({
+                "requirement": req,
+                "filled": filled,
+                "missing": count - filled,
+                "fill_rate": round(100 * filled / count, 1),
+            })
+
+        n_compliant = int(compliant.sum())
+        failing = np.flatnonzero(in_type & ~compliant)
+        checked += count
+        compliant_total += n_compliant
+        results.append({
+            "element_type": element_type,
+            "ifc_type": ifc_type,
+            "phases": sorted(group["phases"]),
+            "elements": count,
+            "compliant_elements": n_compliant,
+            "compliance_rate": round(100 * n_compliant / count, 1),
+            "requirements": requirements,
+            "failing_guids": [str(store.guid[i]) for i in failing[:max_failing]],
+            "failing_truncated": len(failing) > max_failing,
+        })
+
+    return {
+        "elements_checked": checked,
+        "compliant_elements": compliant_total,
+        "compliance_rate": round(100 * compliant_total / checked, 1) if checked else None,
+        "element_types": results,
+        "not_in_model": not_in_model,
+    }
+
+
+def check_project_loin_compliance(db: Session, project_id: int, *, phase: str | None = None) -> dict:
+    """Verifică ultimul IFC al proiectului față de matricea LOIN curentă."""
+    query = db.query(LoinEntryModel).filter(LoinEntryModel.project_id == project_id)
+    if phase:
+        query = query.filter(LoinEntryModel.phase == phase)
+    entries = query.all()
+    if not entries:
+        return {"error": "Nu există matrice LOIN pentru acest proiect (sau pentru faza cerută)."}
+
+    uploaded = get_latest_uploaded_file(db, project_id, "ifc")
+    if uploaded is None:
+        return {"error": "Nu există model IFC importat pentru acest proiect."}
+    store = load_element_store(uploaded.content_sha256) if uploaded.content_sha256 else None
+    if store is None:
+        return {
+            "error": f"Elementele modelului {uploaded.filename} nu sunt încă indexate.",
+            "store_missing": True,
+            "uploaded_file_id": uploaded.id,
+        }
+
+    result = check_loin_compliance(store, entries)
+    return {
+        "success": True,
+        "project_id": project_id,
+        "uploaded_file_id": uploaded.id,
+        "filename": uploaded.filename,
+        "phase": phase,
+        **result,
+    }
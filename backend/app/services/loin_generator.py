@@ -9,9 +9,9 @@ import logging
 
 from sqlalchemy.orm import Session
 
-from app.ai_client import call_llm_chat_expert
 from app.models.sql_models import LoinEntryModel
-from app.services.json_utils import extract_json as _extract_json
+from app.services.json_utils import extract_json as _extract_json, is_json_response
+from app.services.llm_cache import cached_call_llm_chat_expert
 from app.repositories.projects_repository import (
     get_latest_project_context,
     get_project,
@@ -31,11 +31,30 @@ def generate_loin_matrix(db: Session, project_id: int) -> dict:
     if not ctx_entry:
         return {"error": "Nu există fișă BEP. Completează mai întâi fișa proiectului."}
 
-    ctx = ctx_entry.context_json
+    prompt = build_loin_prompt(project, ctx_entry.context_json)
+
+    try:
+        response_text = cached_call_llm_chat_expert(
+            db,
+            context=f"Proiect: {project.name} ({project.code})",
+            question=prompt,
+            max_tokens=8192,
+            validate=is_json_response,
+        )
+
+        data = _extract_json(response_text)
+        return save_loin_matrix(db, project_id, data)
+    except Exception as e:
+        logger.error(f"Eroare la generare LOIN: {e}")
+        return {"error": f"Eroare la generarea LOIN: {str(e)}"}
+
+
+def build_loin_prompt(project, ctx: dict) -> str:
+    """Construiește promptul LOIN din proiect + ProjectContext (fără apel LLM)."""
     disciplines = ctx.get("disciplines", [])
     lod = ctx.get("lod_specification", "LOD 300")
 
-    prompt = f"""Generează o matrice LOIN (Level of Information Need) conform BS EN 17412-1
+    return f"""Generează o matrice LOIN (Level of Information Need) conform BS EN 17412-1
 pentru un proiect BIM.
 
 **Proiect**: {ctx.get('project_name', project.name)}
@@ -65,50 +84,42 @@ Răspunde STRICT în format JSON:
 
 Generează cel puțin o intrare per element × disciplină relevantă."""
 
-    try:
-        response_text = call_llm_chat_expert(
-            context=f"Proiect: {project.name} ({project.code})",
-            question=prompt,
-            max_tokens=8192,
+
+def save_loin_matrix(db: Session, project_id: int, data: dict) -> dict:
+    """Înlocuiește matricea LOIN cu intrările din răspunsul LLM (flush, fără commit)."""
+    entries_data = data.get("entries", [])
+
+    # Șterge LOIN vechi
+    db.query(LoinEntryModel).filter(
+        LoinEntryModel.project_id == project_id
+    ).delete()
+
+    created = []
+    for e in entries_data:
+        entry = LoinEntryModel(
+            project_id=project_id,
+            element_type=e.get("element_type", ""),
+            discipline=e.get("discipline", ""),
+            phase=e.get("phase", "design"),
+            detail_level=e.get("detail_level"),
+            dimensionality=e.get("dimensionality"),
+            information_content=e.get("information_content"),
         )
+        db.add(entry)
+        created.append(entry)
 
-        data = _extract_json(response_text)
-        entries_data = data.get("entries", [])
-
-        # Șterge LOIN vechi
-        db.query(LoinEntryModel).filter(
-            LoinEntryModel.project_id == project_id
-        ).delete()
-
-        created = []
-        for e in entries_data:
-            entry = LoinEntryModel(
-                project_id=project_id,
-                element_type=e.get("element_type", ""),
-                discipline=e.get("discipline", ""),
-                phase=e.get("phase", "design"),
-                detail_level=e.get("detail_level"),
-                dimensionality=e.get("dimensionality"),
-                information_content=e.get("information_content"),
-            )
-            db.add(entry)
-            created.append(entry)
-
-        db.flush()
-
-        log_action(db, project_id, "generate_loin", {
-            "entries_count": len(created),
-        })
+    db.flush()
 
-        return {
-            "success": True,
-            "entries_count": len(created),
-            "element_types": list(set(e.element_type for e in created)),
-            "phases": list(set(e.phase for e in created)),
-        }
-    except Exception as e:
-        logger.error(f"Eroare la generare LOIN: {e}")
-        return {"error": f"Eroare la generarea LOIN: {str(e)}"}
+    log_action(db, project_id, "generate_loin", {
+        "entries_count": len(created),
+    })
+
+    return {
+        "success": True,
+        "entries_count": len(created),
+        "element_types": list(set(e.element_type for e in created)),
+        "phases": list(set(e.phase for e in created)),
+    }
 
 
 def get_loin_matrix(db: Session, project_id: int) -> dict:
@@ -10,9 +10,9 @@ import logging
 from sqlalchemy import desc
 from sqlalchemy.orm import Session
 
-from app.ai_client import call_llm_chat_expert
 from app.models.sql_models import RaciEntryModel
-from app.services.json_utils import extract_json as _extract_json
+from app.services.json_utils import extract_json as _extract_json, is_json_response
+from app.services.llm_cache import cached_call_llm_chat_expert
 from app.repositories.projects_repository import (
     get_latest_project_context,
     get_project,
@@ -43,7 +43,26 @@ def generate_raci_matrix(db: Session, project_id: int) -> dict:
     if not ctx_entry:
         return {"error": "Nu există fișă BEP. Completează mai întâi fișa proiectului."}
 
-    ctx = ctx_entry.context_json
+    prompt = build_raci_prompt(project, ctx_entry.context_json)
+
+    try:
+        response_text = cached_call_llm_chat_expert(
+            db,
+            context=f"Proiect: {project.name} ({project.code})",
+            question=prompt,
+            max_tokens=8192,
+            validate=is_json_response,
+        )
+
+        data = _extract_json(response_text)
+        return save_raci_matrix(db, project_id, data)
+    except Exception as e:
+        logger.error(f"Eroare la generare RACI: {e}")
+        return {"error": f"Eroare la generarea RACI: {str(e)}"}
+
+
+def build_raci_prompt(project, ctx: dict) -> str:
+    """Construiește promptul RACI din proiect + ProjectContext (fără apel LLM)."""
     team_roles = ctx.get("team_roles", [])
     disciplines = ctx.get("disciplines", [])
 
@@ -51,7 +70,7 @@ def generate_raci_matrix(db: Session, project_id: int) -> dict:
         team_roles = DEFAULT_BIM_ROLES
         logger.info("team_roles lipsă, se folosesc roluri BIM implicite.")
 
-    prompt = f"""Generează o matrice RACI (Responsible, Accountable, Consulted, Informed)
+    return f"""Generează o matrice RACI (Responsible, Accountable, Consulted, Informed)
 pentru un proiect BIM conform ISO 19650-2.
 
 **Proiect**: {ctx.get('project_name', project.name)}
@@ -86,52 +105,44 @@ Răspunde STRICT în format JSON:
 
 Fiecare task trebuie să aibă cel puțin un R (Responsible) și un A (Accountable)."""
 
-    try:
-        response_text = call_llm_chat_expert(
-            context=f"Proiect: {project.name} ({project.code})",
-            question=prompt,
-            max_tokens=8192,
+
+def save_raci_matrix(db: Session, project_id: int, data: dict) -> dict:
+    """Înlocuiește matricea RACI cu intrările din răspunsul LLM (flush, fără commit)."""
+    entries_data = data.get("entries", [])
+
+    # Șterge RACI vechi
+    db.query(RaciEntryModel).filter(
+        RaciEntryModel.project_id == project_id
+    ).delete()
+
+    created = []
+    for e in entries_data:
+        assignment = e.get("assignment", "").upper()
+        if assignment not in ("R", "A", "C", "I"):
+            continue
+        entry = RaciEntryModel(
+            project_id=project_id,
+            task_name=e.get("task_name", ""),
+            role_code=e.get("role_code", ""),
+            assignment=assignment,
+            discipline=e.get("discipline"),
+            phase=e.get("phase"),
         )
+        db.add(entry)
+        created.append(entry)
 
-        data = _extract_json(response_text)
-        entries_data = data.get("entries", [])
-
-        # Șterge RACI vechi
-        db.query(RaciEntryModel).filter(
-            RaciEntryModel.project_id == project_id
-        ).delete()
-
-        created = []
-        for e in entries_data:
-            assignment = e.get("assignment", "").upper()
-            if assignment not in ("R", "A", "C", "I"):
-                continue
-            entry = RaciEntryModel(
-                project_id=project_id,
-                task_name=e.get("task_name", ""),
-                role_code=e.get("role_code", ""),
-                assignment=assignment,
-                discipline=e.get("discipline"),
-                phase=e.get("phase"),
-            )
-            db.add(entry)
-            created.append(entry)
-
-        db.flush()
-
-        log_action(db, project_id, "generate_raci", {
-            "entries_count": len(created),
-        })
+    db.flush()
 
-        return {
-            "success": True,
-            "entries_count": len(created),
-            "tasks": list(set(e.task_name for e in created)),
-            "roles": list(set(e.role_code for e in created)),
-        }
-    except Exception as e:
-        logger.error(f"Eroare la generare RACI: {e}")
-        return {"error": f"Eroare la generarea RACI: {str(e)}"}
+    log_action(db, project_id, "generate_raci", {
+        "entries_count": len(created),
+    })
+
+    return {
+        "success": True,
+        "entries_count": len(created),
+        "tasks": list(set(e.task_name for e in created)),
+        "roles": list(set(e.role_code for e in created)),
+    }
 
 
 def get_raci_matrix(db: Session, project_id: int) -> dict:
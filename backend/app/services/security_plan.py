@@ -9,9 +9,9 @@ import logging
 
 from sqlalchemy.orm import Session
 
-from app.ai_client import call_llm_chat_expert
 from app.models.sql_models import SecurityClassificationModel
-from app.services.json_utils import extract_json as _extract_json
+from app.services.json_utils import extract_json as _extract_json, is_json_response
+from app.services.llm_cache import cached_call_llm_chat_expert
 from app.repositories.projects_repository import (
     get_latest_project_context,
     get_project,
@@ -35,7 +35,31 @@ def generate_security_plan(
     ctx_entry = get_latest_project_context(db, project_id)
     ctx = ctx_entry.context_json if ctx_entry else {}
 
-    prompt = f"""Generează un plan de securitate a informațiilor conform ISO 19650-5
+    prompt = build_security_prompt(project, ctx, classification_level, sensitive_areas)
+
+    try:
+        response_text = cached_call_llm_chat_expert(
+            db,
+            context=f"Proiect: {project.name} ({project.code})",
+            question=prompt,
+            max_tokens=8192,
+            validate=is_json_response,
+        )
+
+        plan_json = _extract_json(response_text)
+        return save_security_plan(
+            db, project_id, plan_json, classification_level, sensitive_areas
+        )
+    except Exception as e:
+        logger.error(f"Eroare la generare security plan: {e}")
+        return {"error": f"Eroare: {str(e)}"}
+
+
+def build_security_prompt(
+    project, ctx: dict, classification_level: str, sensitive_areas: str | None
+) -> str:
+    """Construiește promptul planului de securitate ISO 19650-5 (fără apel LLM)."""
+    return f"""Generează un plan de securitate a informațiilor conform ISO 19650-5
 pentru un proiect BIM.
 
 **Proiect**: {ctx.get('project_name', project.name)}
@@ -70,50 +94,47 @@ Răspunde STRICT în format JSON:
     }}
 }}"""
 
-    try:
-        response_text = call_llm_chat_expert(
-            context=f"Proiect: {project.name} ({project.code})",
-            question=prompt,
-            max_tokens=8192,
-        )
 
-        plan_json = _extract_json(response_text)
+def save_security_plan(
+    db: Session,
+    project_id: int,
+    plan_json: dict,
+    classification_level: str,
+    sensitive_areas: str | None,
+) -> dict:
+    """Upsert clasificare de securitate cu planul generat (flush, fără commit)."""
+    # Upsert security classification
+    existing = (
+        db.query(SecurityClassificationModel)
+        .filter(SecurityClassificationModel.project_id == project_id)
+        .first()
+    )
 
-        # Upsert security classification
-        existing = (
-            db.query(SecurityClassificationModel)
-            .filter(SecurityClassificationModel.project_id == project_id)
-            .first()
+    if existing:
+        existing.classification_level = classification_level
+        existing.security_plan_json = plan_json
+        existing.sensitive_areas = sensitive_areas
+        entry = existing
+    else:
+        entry = SecurityClassificationModel(
+            project_id=project_id,
+            classification_level=classification_level,
+            security_plan_json=plan_json,
+            sensitive_areas=sensitive_areas,
         )
+        db.add(entry)
 
-        if existing:
-            existing.classification_level = classification_level
-            existing.security_plan_json = plan_json
-            existing.sensitive_areas = sensitive_areas
-            entry = existing
-        else:
-            entry = SecurityClassificationModel(
-                project_id=project_id,
-                classification_level=classification_level,
-                security_plan_json=plan_json,
-                sensitive_areas=sensitive_areas,
-            )
-            db.add(entry)
-
-        db.flush()
-
-        log_action(db, project_id, "generate_security_plan", {
-            "classification_level": classification_level,
-        })
+    db.flush()
 
-        return {
-            "success": True,
-            "classification_level": classification_level,
-            "security_plan": plan_json,
-        }
-    except Exception as e:
-        logger.error(f"Eroare la generare security plan: {e}")
-        return {"error": f"Eroare: {str(e)}"}
+    log_action(db, project_id, "generate_security_plan", {
+        "classification_level": classification_level,
+    })
+
+    return {
+        "success": True,
+        "classification_level": classification_level,
+        "security_plan": plan_json,
+    }
 
 
 def get_security_classification(db: Session, project_id: int) -> dict:
@@ -0,0 +1,10 @@
+"""
+sse.py — Formatarea evenimentelor Server-Sent Events pentru endpoint-urile stream.
+"""
+
+import json
+
+
+def sse_event(event_type: str, data: dict) -> str:
+    """Formatează un SSE event."""
+    return f"event: {event_type}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
@@ -3,23 +3,55 @@ standards_search.py — Wrapper peste ChromaDB pentru căutarea în standarde BI
 
 Folosit de tool-ul agent `search_bim_standards`.
 Dacă ChromaDB nu este disponibil, returnează rezultate din cunoștințe hardcodate.
+Cu STANDARDS_VECTOR_BACKEND=numpy, căutarea vectorială folosește indexul
+NumPy din chroma_db/vectors (vector_index.py) în locul clientului ChromaDB.
+
+Embedding-urile interogărilor și seturile de rezultate sunt păstrate într-un
+cache LRU cu TTL, după textul normalizat al interogării: o întrebare repetată
+nu mai trece prin SentenceTransformer și nici prin ChromaDB.
+search_standards_batch codifică toate interogările noi într-un singur
+forward pass și face o singură interogare Chroma cu mai multe embedding-uri.
+
+Dacă bim_ingest.py a construit și indexul BM25 (chroma_db/bm25), rezultatele
+vectoriale sunt fuzionate (reciprocal rank fusion) cu cele lexicale, care
+prind referințele exacte („RTC 8”, „HG 907/2016”); vezi bm25_index.py.
 """
 
 from __future__ import annotations
 
 import logging
+import os
+import threading
+import time
+from collections import OrderedDict
 from pathlib import Path
+from typing import Any
+
+from app.services.bm25_index import BM25Index, load_bm25_index, rrf_fuse
+from app.services.vector_index import load_vector_index
 
 logger = logging.getLogger(__name__)
 
+STANDARDS_CACHE_SIZE = int(os.getenv("STANDARDS_CACHE_SIZE", "1024"))
+STANDARDS_CACHE_TTL_SECONDS = float(os.getenv("STANDARDS_CACHE_TTL_SECONDS", "3600"))
+_MAX_RESULTS = 10
+
 # Calea către directorul ChromaDB
 _CHROMA_DB_PATH = str(
     Path(__file__).resolve().parent.parent.parent.parent / "chroma_db"
 )
 
+_BM25_INDEX_PATH = Path(_CHROMA_DB_PATH) / "bm25"
+_VECTOR_INDEX_PATH = Path(_CHROMA_DB_PATH) / "vectors"
+# chroma (implicit) sau numpy: indexul vectorial exportat de bim_ingest.py (vector_index.py)
+STANDARDS_VECTOR_BACKEND = os.getenv("STANDARDS_VECTOR_BACKEND", "chroma").lower()
+# Candidați per clasament (vectorial, BM25) înainte de fuziune
+_HYBRID_CANDIDATES = int(os.getenv("STANDARDS_HYBRID_CANDIDATES", "20"))
+
 _client = None
 _collection = None
 _embed_model = None
+_bm25: BM25Index | None = None
 _initialized = False
 _initializing = False
 
@@ -28,7 +60,7 @@ _EMBED_MODEL_NAME = "paraphrase-multilingual-MiniLM-L12-v2"
 
 def _init_chroma():
     """Inițializează clientul ChromaDB (lazy, o singură dată)."""
-    global _client, _collection, _embed_model, _initialized, _initializing
+    global _client, _collection, _embed_model, _bm25, _initialized, _initializing
 
     if _initialized:
         return
@@ -38,20 +70,37 @@ def _init_chroma():
 
     _initializing = True
 
+    # Indexul BM25 (construit de bim_ingest.py) nu depinde de ChromaDB
+    _bm25 = load_bm25_index(_BM25_INDEX_PATH)
+    if _bm25 is not None:
+        logger.info(f"Index BM25 încărcat: {len(_bm25)} fragmente")
+
     try:
-        import chromadb
         from sentence_transformers import SentenceTransformer
 
         logger.info("Se încarcă modelul SentenceTransformer...")
         _embed_model = SentenceTransformer(_EMBED_MODEL_NAME)
         logger.info("Model SentenceTransformer încărcat.")
 
-        _client = chromadb.PersistentClient(path=_CHROMA_DB_PATH)
-        _collection = _client.get_collection(name="bim_knowledge")
-        logger.info(
-            f"ChromaDB inițializat: colecție 'bim_knowledge' "
-            f"cu {_collection.count()} documente"
-        )
+        if STANDARDS_VECTOR_BACKEND == "numpy":
+            # Același query() ca o colecție Chroma, fără client ChromaDB
+            _collection = load_vector_index(_VECTOR_INDEX_PATH)
+            if _collection is None:
+                logger.warning(
+                    f"Indexul vectorial NumPy lipsește din {_VECTOR_INDEX_PATH}. "
+                    "Rulează: python bim_ingest.py --vectors"
+                )
+            else:
+                logger.info(f"Index vectorial NumPy: {_collection.count()} documente ({_collection.dtype})")
+        else:
+            import chromadb
+
+            _client = chromadb.PersistentClient(path=_CHROMA_DB_PATH)
+            _collection = _client.get_collection(name="bim_knowledge")
+            logger.info(
+                f"ChromaDB inițializat: colecție 'bim_knowledge' "
+                f"cu {_collection.count()} documente"
+            )
     except ImportError:
         logger.warning(
             "chromadb sau sentence-transformers nu este instalat. "
@@ -76,48 +125,191 @@ def warmup():
     threading.Thread(target=_bg, daemon=True).start()
 
 
-def search_standards(query: str, n_results: int = 5) -> list[dict]:
+class _TTLCache:
+    """Cache LRU în memorie cu expirare (thread-safe: tool-urile rulează concurent)."""
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._data: OrderedDict[Any, tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Any) -> Any | None:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: Any, value: Any) -> None:
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl_seconds, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+_embedding_cache = _TTLCache(STANDARDS_CACHE_SIZE, STANDARDS_CACHE_TTL_SECONDS)
+_result_cache = _TTLCache(STANDARDS_CACHE_SIZE, STANDARDS_CACHE_TTL_SECONDS)
+
+
+def _normalize_query(query: str) -> str:
+    """Cheia de cache: litere mici, spații comprimate (doar cheie, nu textul codificat)."""
+    return " ".join(query.lower().split())
+
+
+def _encode_queries(keys: list[str], texts: dict[str, str]) -> list[list[float]]:
     """
-    Caută în baza de date de standarde BIM.
+    Embedding-urile interogărilor, după cheia normalizată; cele noi într-un
+    singur forward pass. Modelul primește textul original (texts[cheie], prima
+    apariție): tokenizer-ul XLM-R e sensibil la majuscule („RTC 8” ≠ „rtc 8”).
+    """
+    embeddings: dict[str, list[float]] = {}
+    missing = []
+    for key in dict.fromkeys(keys):
+        cached = _embedding_cache.get(key)
+        if cached is None:
+            missing.append(key)
+        else:
+            embeddings[key] = cached
+    if missing:
+        for key, vector in zip(missing, _embed_model.encode([texts[k] for k in missing]).tolist()):
+            _embedding_cache.set(key, vector)
+            embeddings[key] = vector
+    return [embeddings[key] for key in keys]
+
+
+def _format_results(ids: list, documents: list, metadatas: list, distances: list) -> list[tuple[str, dict]]:
+    output = []
+    for i, doc in enumerate(documents):
+        meta = metadatas[i] if i < len(metadatas) else {}
+        distance = distances[i] if i < len(distances) else 0
+        output.append((ids[i] if i < len(ids) else f"vector:{i}", {
+            "text": doc[:1000],  # limităm lungimea
+            "source": meta.get("source", "Standard BIM"),
+            "category": meta.get("category", ""),
+            "relevance_score": round(1 - distance, 3) if distance else 0,
+        }))
+    return output
+
+
+def _hybrid_results(query: str, vector_hits: list[tuple[str, dict]] | None, n_results: int) -> list[dict]:
+    """
+    Clasamentul vectorial și cel BM25 combinate prin reciprocal rank fusion.
 
-    Args:
-        query: Textul de căutare
-        n_results: Numărul maxim de rezultate
+    Fragmentele găsite doar prin BM25 au relevance_score 0 (fără similaritate
+    vectorială) și keyword_score; ordinea e dată de fused_score.
+    """
+    by_id = {doc_id: result for doc_id, result in vector_hits or []}
+    keyword_hits = _bm25.search(query, _HYBRID_CANDIDATES)
+    for doc, score in keyword_hits:
+        result = by_id.setdefault(doc["id"], {
+            "text": doc["text"][:1000],
+            "source": doc.get("source") or "Standard BIM",
+            "category": doc.get("category") or "",
+            "relevance_score": 0,
+        })
+        result["keyword_score"] = round(score, 3)
+    fused = rrf_fuse([
+        [doc_id for doc_id, _ in vector_hits or []],
+        [doc["id"] for doc, _ in keyword_hits],
+    ])
+    return [{**by_id[doc_id], "fused_score": round(score, 4)} for doc_id, score in fused[:n_results]]
+
+
+def search_standards_batch(queries: list[str], n_results: int = 5) -> list[list[dict]]:
+    """
+    Caută mai multe interogări deodată (ex: contextul RAG al unui generator).
+
+    Interogările din cache sunt servite direct; restul sunt codificate
+    împreună și trimise într-o singură interogare ChromaDB. Cu indexul BM25
+    prezent, Chroma întoarce _HYBRID_CANDIDATES candidați, fuzionați (RRF)
+    cu primii candidați BM25; fără ChromaDB, doar BM25.
 
     Returns:
-        Listă de dict-uri cu: text, source, relevance_score
+        Câte o listă de rezultate (ca search_standards) pentru fiecare interogare.
     """
-    _init_chroma()
-
-    if _collection is not None and _embed_model is not None:
+    n_results = min(n_results, _MAX_RESULTS)
+    keys = [_normalize_query(q) for q in queries]
+    texts: dict[str, str] = {}
+    for key, query in zip(keys, queries):
+        texts.setdefault(key, query)
+    output: list[list[dict] | None] = [None] * len(queries)
+    for i, key in enumerate(keys):
+        cached = _result_cache.get((key, n_results))
+        if cached is not None:
+            output[i] = [dict(r) for r in cached]
+
+    pending = list(dict.fromkeys(key for i, key in enumerate(keys) if output[i] is None))
+    if pending:
+        _init_chroma()
+    vector_hits: dict[str, list[tuple[str, dict]]] = {}
+    if pending and _collection is not None and _embed_model is not None:
         try:
-            query_embedding = _embed_model.encode([query]).tolist()
             results = _collection.query(
-                query_embeddings=query_embedding,
-                n_results=min(n_results, 10),
+                query_embeddings=_encode_queries(pending, texts),
+                n_results=max(n_results, _HYBRID_CANDIDATES) if _bm25 is not None else n_results,
             )
-
-            output = []
-            documents = results.get("documents", [[]])[0]
-            metadatas = results.get("metadatas", [[]])[0]
-            distances = results.get("distances", [[]])[0]
-
-            for i, doc in enumerate(documents):
-                meta = metadatas[i] if i < len(metadatas) else {}
-                distance = distances[i] if i < len(distances) else 0
-                output.append({
-                    "text": doc[:1000],  # limităm lungimea
-                    "source": meta.get("source", "Standard BIM"),
-                    "category": meta.get("category", ""),
-                    "relevance_score": round(1 - distance, 3) if distance else 0,
-                })
-
-            return output
+            ids = results.get("ids") or []
+            documents = results.get("documents") or []
+            metadatas = results.get("metadatas") or []
+            distances = results.get("distances") or []
+            for j, key in enumerate(pending):
+                vector_hits[key] = _format_results(
+                    ids[j] if j < len(ids) else [],
+                    documents[j] if j < len(documents) else [],
+                    metadatas[j] if j < len(metadatas) else [],
+                    distances[j] if j < len(distances) else [],
+                )
         except Exception as e:
             logger.warning(f"Eroare la căutare ChromaDB: {e}")
 
+    found: dict[str, list[dict]] = {}
+    for key in pending:
+        if _bm25 is not None:
+            found[key] = _hybrid_results(key, vector_hits.get(key), n_results)
+        elif key in vector_hits:
+            found[key] = [result for _, result in vector_hits[key]]
+        # Doar rezultatele cu căutare vectorială intră în cache (ChromaDB poate reveni)
+        if key in vector_hits:
+            _result_cache.set((key, n_results), found[key])
+    for i, key in enumerate(keys):
+        if output[i] is None and found.get(key):
+            output[i] = [dict(r) for r in found[key]]
+
     # Fallback: cunoștințe hardcodate
-    return _fallback_search(query, n_results)
+    return [
+        result if result is not None else _fallback_search(queries[i], n_results)
+        for i, result in enumerate(output)
+    ]
+
+
+def search_standards(query: str, n_results: int = 5) -> list[dict]:
+    """
+    Caută în baza de date de standarde BIM.
+
+    Args:
+        query: Textul de căutare
+        n_results: Numărul maxim de rezultate
+
+    Returns:
+        Listă de dict-uri cu: text, source, relevance_score
+    """
+    return search_standards_batch([query], n_results)[0]
 
 
 def _fallback_search(query: str, n_results: int = 5) -> list[dict]:
@@ -0,0 +1,123 @@
+"""
+upload_storage.py — Scriere în flux a fișierelor uploadate pe disc.
+
+Upload-ul e citit în bucăți și scris într-un fișier temporar din directorul
+destinație, cu hash SHA-256 calculat incremental și limită de mărime
+verificată pe parcurs. La final fișierul e redenumit atomic (os.replace):
+destinația fie nu există, fie e completă — niciodată un fișier trunchiat.
+Memoria folosită e de ordinul unei bucăți, indiferent de mărimea fișierului.
+
+Fișierele IFC ajung într-un blob store adresat prin conținut
+(BLOB_DIR/<sha[:2]>/<sha>.ifc): un model re-partajat de coordonatori e
+stocat o singură dată, oricâte upload-uri îl referă.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import os
+import uuid
+from dataclasses import dataclass
+from pathlib import Path
+
+from fastapi import UploadFile
+
+UPLOAD_CHUNK_BYTES = int(os.getenv("UPLOAD_CHUNK_BYTES", str(1024 * 1024)))
+IFC_MAX_UPLOAD_MB = int(os.getenv("IFC_MAX_UPLOAD_MB", "1024"))
+COBIE_MAX_UPLOAD_MB = int(os.getenv("COBIE_MAX_UPLOAD_MB", "100"))
+BLOB_DIR = Path(os.getenv(
+    "BLOB_DIR",
+    str(Path(__file__).resolve().parent.parent.parent / "data" / "blobs"),
+))
+
+
+class UploadTooLargeError(ValueError):
+    """Upload-ul depășește limita configurată."""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        super().__init__(
+            f"Fișierul depășește limita de {max_bytes // (1024 * 1024)} MB."
+        )
+
+
+@dataclass
+class StoredUpload:
+    path: Path
+    size_bytes: int
+    sha256: str
+    deduplicated: bool = False  # conținutul exista deja în blob store
+
+
+def _write_chunk(fh, hasher, chunk: bytes) -> None:
+    hasher.update(chunk)
+    fh.write(chunk)
+
+
+async def stream_upload_to_disk(
+    file: UploadFile,
+    dest_path: str | Path,
+    *,
+    max_bytes: int,
+) -> StoredUpload:
+    """
+    Scrie upload-ul la dest_path în bucăți de UPLOAD_CHUNK_BYTES.
+
+    Raises:
+        UploadTooLargeError: mărimea depășește max_bytes (fișierul parțial e șters).
+    """
+    dest = Path(dest_path)
+    # Verificare rapidă când clientul a trimis mărimea
+    if file.size is not None and file.size > max_bytes:
+        raise UploadTooLargeError(max_bytes)
+
+    dest.parent.mkdir(parents=True, exist_ok=True)
+    # Temporarul stă în același director → os.replace e atomic (același FS)
+    tmp = dest.with_name(f".{dest.name}.{uuid.uuid4().hex}.part")
+    hasher = hashlib.sha256()
+    size = 0
+
+    try:
+        with open(tmp, "wb") as fh:
+            while chunk := await file.read(UPLOAD_CHUNK_BYTES):
+                size += len(chunk)
+                if size > max_bytes:
+                    raise UploadTooLargeError(max_bytes)
+                # Hash + scriere în afara event loop-ului
+                await asyncio.to_thread(_write_chunk, fh, hasher, chunk)
+            await asyncio.to_thread(os.fsync, fh.fileno())
+        os.replace(tmp, dest)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+
+    return StoredUpload(path=dest, size_bytes=size, sha256=hasher.hexdigest())
+
+
+def blob_path(sha256: str, suffix: str) -> Path:
+    """Calea blob-ului pentru un hash (subdirector după primele 2 caractere)."""
+    return BLOB_DIR / sha256[:2] / f"{sha256}{suffix.lower()}"
+
+
+async def stream_upload_to_blob_store(
+    file: UploadFile,
+    *,
+    suffix: str,
+    max_bytes: int,
+) -> StoredUpload:
+    """
+    Scrie upload-ul în blob store; dacă același conținut există deja,
+    copia nouă e ștearsă și se returnează blob-ul existent.
+    """
+    staging = BLOB_DIR / "tmp" / f"{uuid.uuid4().hex}{suffix.lower()}"
+    stored = await stream_upload_to_disk(file, staging, max_bytes=max_bytes)
+
+    target = blob_path(stored.sha256, suffix)
+    if target.exists():
+        staging.unlink(missing_ok=True)
+        return StoredUpload(target, stored.size_bytes, stored.sha256, deduplicated=True)
+
+    target.parent.mkdir(parents=True, exist_ok=True)
+    os.replace(staging, target)
+    return StoredUpload(target, stored.size_bytes, stored.sha256)
@@ -0,0 +1,252 @@
+"""
+vector_index.py — Index vectorial NumPy (top-k exact, cosinus) ca alternativă la ChromaDB.
+
+Pentru corpusul de standarde (zeci de mii de fragmente de 800 de caractere)
+un PersistentClient ChromaDB doar pentru top-k cosinus înseamnă timp de
+pornire, memorie și o dependență grea. Indexul de aici e un director:
+  - vectors.npy     embedding-urile normalizate (N, D), float16 sau int8
+  - scales.npy      scara per vector (doar int8: v ≈ q * scale)
+  - metadata.sqlite fragmentele (id, text, source, category, page, ...)
+  - meta.json       versiunea formatului, dtype, dimensiune, număr
+Vectorii sunt citiți prin mmap (încărcare în milisecunde), iar căutarea e un
+produs matrice–vector pe blocuri de VECTOR_BLOCK_ROWS rânduri, cu top-k
+păstrat prin argpartition. VectorIndex.query are semnătura și rezultatul lui
+chromadb Collection.query (distanțe cosinus = 1 - similaritate): înlocuire
+directă în standards_search și bim_rag (STANDARDS_VECTOR_BACKEND /
+RAG_VECTOR_BACKEND=numpy).
+
+Modulul depinde doar de NumPy și biblioteca standard: e încărcat și de
+scripturile din rădăcina repo-ului (bim_ingest.py, bim_rag.py).
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import shutil
+import sqlite3
+import time
+import uuid
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+VECTOR_INDEX_VERSION = 1
+VECTOR_DTYPES = ("float16", "int8")
+# Rânduri per bloc: memoria temporară e VECTOR_BLOCK_ROWS × interogări × 4 octeți
+VECTOR_BLOCK_ROWS = int(os.getenv("VECTOR_BLOCK_ROWS", "16384"))
+
+_METADATA_FIELDS = ("source", "category", "page", "chunk_index")
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
+
+
+def build_vector_index(
+    ids: list[str],
+    embeddings: np.ndarray | list,
+    documents: list[str],
+    metadatas: list[dict],
+    index_dir: str | Path,
+    *,
+    dtype: str = "float16",
+) -> dict:
+    """
+    Scrie indexul pentru fragmentele date (aceleași id-uri ca în ChromaDB).
+
+    dtype: float16 (eroare ~1e-3 pe similaritate) sau int8 (cuantizare
+    simetrică per vector, jumătate din memorie). Scriere atomică.
+    """
+    if dtype not in VECTOR_DTYPES:
+        raise ValueError(f"dtype necunoscut: {dtype} (acceptate: {', '.join(VECTOR_DTYPES)})")
+    index_dir = Path(index_dir)
+    vectors = _normalize(embeddings) if len(ids) else np.zeros((0, 0), dtype=np.float32)
+
+    tmp = index_dir.with_name(f".{index_dir.name}.{uuid.uuid4().hex}.tmp")
+    tmp.mkdir(parents=True)
+    try:
+        if dtype == "int8":
+            scales = np.abs(vectors).max(axis=1) / 127 if len(vectors) else np.zeros(0)
+            quantized = np.round(vectors / np.maximum(scales, 1e-12)[:, None]).astype(np.int8)
+            np.save(tmp / "vectors.npy", quantized)
+            np.save(tmp / "scales.npy", scales.astype(np.float32))
+        else:
+            np.save(tmp / "vectors.npy", vectors.astype(np.float16))
+
+        conn = sqlite3.connect(tmp / "metadata.sqlite")
+        try:
+            conn.execute(
+                "CREATE TABLE chunks (row INTEGER PRIMARY KEY, id TEXT NOT NULL, document TEXT, "
+                "source TEXT, category TEXT, page INTEGER, chunk_index INTEGER, extra TEXT)"
+            )
+            conn.executemany(
+                "INSERT INTO chunks VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    (
+                        row, chunk_id, doc,
+                        *((meta or {}).get(f) for f in _METADATA_FIELDS),
+                        json.dumps({k: v for k, v in (meta or {}).items() if k not in _METADATA_FIELDS}),
+                    )
+                    for row, (chunk_id, doc, meta) in enumerate(zip(ids, documents, metadatas))
+                ),
+            )
+            conn.commit()
+        finally:
+            conn.close()
+
+        meta = {
+            "version": VECTOR_INDEX_VERSION,
+            "dtype": dtype,
+            "count": len(ids),
+            "dim": int(vectors.shape[1]) if len(ids) else 0,
+        }
+        (tmp / "meta.json").write_text(json.dumps(meta))
+        shutil.rmtree(index_dir, ignore_errors=True)
+        os.replace(tmp, index_dir)
+    except BaseException:
+        shutil.rmtree(tmp, ignore_errors=True)
+        raise
+    return meta
+
+
+class VectorIndex:
+    """Index citit prin mmap; query() compatibil cu chromadb Collection.query."""
+
+    def __init__(self, index_dir: str | Path):
+        self.path = Path(index_dir)
+        meta = json.loads((self.path / "meta.json").read_text())
+        self.dtype: str = meta["dtype"]
+        self.dim: int = meta["dim"]
+        self._vectors = np.load(self.path / "vectors.npy", mmap_mode="r")
+        self._scales = np.load(self.path / "scales.npy") if self.dtype == "int8" else None
+        # check_same_thread=False: tool-urile agentului caută din mai multe thread-uri
+        self._conn = sqlite3.connect(self.path / "metadata.sqlite", check_same_thread=False)
+
+    def count(self) -> int:
+        return len(self._vectors)
+
+    def similarities(self, query_embeddings: np.ndarray, n_results: int) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Top-k exact pe blocuri: (rânduri (Q, k), similarități cosinus (Q, k)),
+        descrescător după similaritate.
+        """
+        queries = _normalize(np.atleast_2d(query_embeddings))
+        total = self.count()
+        k = min(n_results, total)
+        best_rows = np.empty((len(queries), 0), dtype=np.int64)
+        best_scores = np.empty((len(queries), 0), dtype=np.float32)
+        if k <= 0:
+            return best_rows, best_scores
+
+        for start in range(0, total, VECTOR_BLOCK_ROWS):
+            block = np.asarray(self._vectors[start:start + VECTOR_BLOCK_ROWS], dtype=np.float32)
+            scores = queries @ block.T
+            if self._scales is not None:
+                scores *= self._scales[start:start + len(block)]
+            rows = np.broadcast_to(np.arange(start, start + len(block)), scores.shape)
+            # Candidații: top-k curent + blocul; argpartition păstrează doar k
+            scores = np.concatenate([best_scores, scores], axis=1)
+            rows = np.concatenate([best_rows, rows], axis=1)
+            if scores.shape[1] > k:
+                keep = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+                scores = np.take_along_axis(scores, keep, axis=1)
+                rows = np.take_along_axis(rows, keep, axis=1)
+            best_scores, best_rows = scores, rows
+
+        order = np.argsort(-best_scores, axis=1, kind="stable")
+        return np.take_along_axis(best_rows, order, axis=1), np.take_along_axis(best_scores, order, axis=1)
+
+    def _rows(self, rows: list[int]) -> dict[int, tuple]:
+        placeholders = ",".join("?" * len(rows))
+        cursor = self._conn.execute(
+            f"SELECT row, id, document, source, category, page, chunk_index, extra "
+            f"FROM chunks WHERE row IN ({placeholders})",
+            rows,
+        )
+        return {r[0]: r[1:] for r in cursor}
+
+    def query(
+        self,
+        query_embeddings: list | np.ndarray,
+        n_results: int = 10,
+        include: list[str] | None = None,
+        **_: Any,
+    ) -> dict:
+        """Ca chromadb Collection.query: ids, documents, metadatas, distances (liste per interogare)."""
+        rows, scores = self.similarities(np.asarray(query_embeddings, dtype=np.float32), n_results)
+        found = self._rows(sorted(set(rows.ravel().tolist()))) if rows.size else {}
+        result: dict[str, list] = {"ids": [], "documents": [], "metadatas": [], "distances": []}
+        for query_rows, query_scores in zip(rows.tolist(), scores.tolist()):
+            records = [found[r] for r in query_rows]
+            result["ids"].append([rec[0] for rec in records])
+            result["documents"].append([rec[1] for rec in records])
+            result["metadatas"].append([
+                {
+                    **json.loads(rec[6] or "{}"),
+                    **{f: v for f, v in zip(_METADATA_FIELDS, rec[2:6]) if v is not None},
+                }
+                for rec in records
+            ])
+            result["distances"].append([1.0 - s for s in query_scores])
+        return result
+
+    def close(self) -> None:
+        self._conn.close()
+
+
+def load_vector_index(index_dir: str | Path) -> VectorIndex | None:
+    """Indexul din director (None dacă lipsește sau are alt format)."""
+    meta_path = Path(index_dir) / "meta.json"
+    if not meta_path.exists():
+        return None
+    try:
+        if json.loads(meta_path.read_text()).get("version") != VECTOR_INDEX_VERSION:
+            return None
+        return VectorIndex(index_dir)
+    except (OSError, ValueError, KeyError, sqlite3.Error) as e:
+        logger.warning(f"Index vectorial invalid în {index_dir}: {e}")
+        return None
+
+
+def parity_report(reference: Any, candidate: Any, query_embeddings: np.ndarray, n_results: int = 10) -> dict:
+    """
+    Compară două backend-uri cu query() de tip Chroma pe aceleași interogări.
+
+    recall@k: fracțiunea din primele k id-uri ale referinței regăsite de
+    candidat; latențele sunt per interogare (câte un apel query per vector).
+    """
+    timings: dict[str, list[float]] = {"reference": [], "candidate": []}
+    recalls, top1 = [], []
+    for vector in np.asarray(query_embeddings, dtype=np.float32):
+        ids = {}
+        for name, backend in (("reference", reference), ("candidate", candidate)):
+            started = time.perf_counter()
+            ids[name] = backend.query(query_embeddings=[vector.tolist()], n_results=n_results)["ids"][0]
+            timings[name].append((time.perf_counter() - started) * 1000)
+        expected = ids["reference"]
+        if expected:
+            recalls.append(len(set(expected) & set(ids["candidate"])) / len(expected))
+            top1.append(bool(ids["candidate"]) and ids["candidate"][0] == expected[0])
+
+    def latency(values: list[float]) -> dict:
+        return {
+            "mean_ms": round(float(np.mean(values)), 3) if values else 0.0,
+            "p95_ms": round(float(np.percentile(values, 95)), 3) if values else 0.0,
+        }
+
+    return {
+        "queries": len(recalls),
+        "n_results": n_results,
+        "recall_at_k": round(float(np.mean(recalls)), 4) if recalls else 0.0,
+        "min_recall_at_k": round(float(np.min(recalls)), 4) if recalls else 0.0,
+        "top1_agreement": round(float(np.mean(top1)), 4) if top1 else 0.0,
+        "reference_latency": latency(timings["reference"]),
+        "candidate_latency": latency(timings["candidate"]),
+    }
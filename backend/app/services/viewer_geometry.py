@@ -0,0 +1,258 @@
+"""
+viewer_geometry.py — Geometrie precalculată pentru viewer-ul 3D (glTF binar).
+
+Viewer-ul (web-ifc-three) parsează altfel IFC-ul brut în browser la fiecare
+deschidere. La import, job-ul build_viewer_geometry (rulat în pool-ul
+ifc_processing, cu limitele de timp și memorie ale parsării) pornește de la
+teselarea din ifc_geometry (cache partajat cu detecția de clash-uri) și
+scrie, per disciplină, câte un fișier .glb descărcabil independent:
+  VIEWER_GEOMETRY_DIR/<sha256>/
+    - <disciplină>.glb  o plasă unită per disciplină; atributul _FEATURE_ID_0
+                        (EXT_mesh_features) dă indexul elementului, iar
+                        mesh.extras.guids[index] GlobalId-ul lui (selecție)
+    - manifest.json     fragmentele, originea modelului și versiunea
+Coordonatele sunt float32 relative la originea modelului (colțul minim al
+AABB-ului), cu axa Z a IFC rotită în Y-ul glTF. Fără normale: clientul le
+calculează plane (comportamentul implicit glTF). Fragmentele primesc și
+variante gzip/brotli (ifc_delivery), servite după Accept-Encoding.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import shutil
+import struct
+import uuid
+from pathlib import Path
+
+import numpy as np
+
+from app.services.ifc_delivery import precompress_blob
+from app.services.ifc_geometry import GeometryCache, get_geometry
+from app.services.ifc_parser import discipline_for_type
+
+logger = logging.getLogger(__name__)
+
+VIEWER_GEOMETRY_DIR = Path(os.getenv(
+    "VIEWER_GEOMETRY_DIR",
+    str(Path(__file__).resolve().parent.parent.parent / "data" / "viewer_geometry"),
+))
+# Crește la orice schimbare a formatului fragmentelor
+VIEWER_GEOMETRY_VERSION = 1
+
+# Elementele fără disciplină (mobilier, spații etc.) ajung în fragmentul "other"
+OTHER_DISCIPLINE = "other"
+_COLORS = {
+    "architecture": (0.85, 0.82, 0.76, 1.0),
+    "structure": (0.62, 0.64, 0.68, 1.0),
+    "mep": (0.25, 0.55, 0.85, 1.0),
+    OTHER_DISCIPLINE: (0.75, 0.75, 0.75, 1.0),
+}
+# Z-up (IFC) → Y-up (glTF): rotație de -90° în jurul axei X
+_Z_UP_TO_Y_UP = [-0.7071068, 0.0, 0.0, 0.7071068]
+
+_GLB_MAGIC = 0x46546C67
+_CHUNK_JSON = 0x4E4F534A
+_CHUNK_BIN = 0x004E4942
+_ARRAY_BUFFER = 34962
+_ELEMENT_ARRAY_BUFFER = 34963
+_FLOAT = 5126
+_UNSIGNED_SHORT = 5123
+_UNSIGNED_INT = 5125
+
+
+def _pad(data: bytes, fill: bytes) -> bytes:
+    return data + fill * (-len(data) % 4)
+
+
+def encode_glb(
+    positions: np.ndarray,
+    feature_ids: np.ndarray,
+    indices: np.ndarray,
+    *,
+    name: str,
+    color: tuple[float, float, float, float],
+    extras: dict,
+) -> bytes:
+    """
+    Un fișier glTF binar cu o singură plasă (triunghiuri).
+
+    positions (V, 3) float32, feature_ids (V,) float32, indices (F*3,) —
+    uint16 dacă încap, altfel uint32.
+    """
+    index_type = _UNSIGNED_SHORT if len(positions) <= 0xFFFF else _UNSIGNED_INT
+    index_bytes = indices.astype(np.uint16 if index_type == _UNSIGNED_SHORT else np.uint32).tobytes()
+    views = [
+        (positions.astype(np.float32).tobytes(), _ARRAY_BUFFER),
+        (feature_ids.astype(np.float32).tobytes(), _ARRAY_BUFFER),
+        (index_bytes, _ELEMENT_ARRAY_BUFFER),
+    ]
+    binary = b""
+    buffer_views = []
+    for data, target in views:
+        buffer_views.append({"buffer": 0, "byteOffset": len(binary), "byteLength": len(data), "target": target})
+        binary += _pad(data, b"\x00")
+
+    feature_count = len(extras.get("guids", []))
+    gltf = {
+        "asset": {"version": "2.0", "generator": "bim-backend viewer_geometry"},
+        "extensionsUsed": ["EXT_mesh_features"],
+        "scene": 0,
+        "scenes": [{"nodes": [0]}],
+        "nodes": [{"name": name, "mesh": 0, "rotation": _Z_UP_TO_Y_UP}],
+        "meshes": [{
+            "name": name,
+            "primitives": [{
+                "attributes": {"POSITION": 0, "_FEATURE_ID_0": 1},
+                "indices": 2,
+                "material": 0,
+                "mode": 4,
+                "extensions": {"EXT_mesh_features": {
+                    "featureIds": [{"featureCount": feature_count, "attribute": 0}],
+                }},
+            }],
+            "extras": extras,
+        }],
+        "materials": [{
+            "name": name,
+            "pbrMetallicRoughness": {"baseColorFactor": list(color), "metallicFactor": 0.0, "roughnessFactor": 0.9},
+            "doubleSided": True,
+        }],
+        "accessors": [
+            {
+                "bufferView": 0, "componentType": _FLOAT, "count": len(positions), "type": "VEC3",
+                "min": positions.min(axis=0).tolist() if len(positions) else [0.0] * 3,
+                "max": positions.max(axis=0).tolist() if len(positions) else [0.0] * 3,
+            },
+            {"bufferView": 1, "componentType": _FLOAT, "count": len(feature_ids), "type": "SCALAR"},
+            {"bufferView": 2, "componentType": index_type, "count": len(indices), "type": "SCALAR"},
+        ],
+        "bufferViews": buffer_views,
+        "buffers": [{"byteLength": len(binary)}],
+    }
+    json_chunk = _pad(json.dumps(gltf, separators=(",", ":")).encode("utf-8"), b" ")
+    total = 12 + 8 + len(json_chunk) + 8 + len(binary)
+    return b"".join([
+        struct.pack("<III", _GLB_MAGIC, 2, total),
+        struct.pack("<II", len(json_chunk), _CHUNK_JSON), json_chunk,
+        struct.pack("<II", len(binary), _CHUNK_BIN), binary,
+    ])
+
+
+def _discipline_chunk(geometry: GeometryCache, discipline: str, origin: np.ndarray) -> tuple[bytes, dict] | None:
+    """Fragmentul unei discipline: plasele elementelor unite într-un singur .glb."""
+    def include(ifc_type: str) -> bool:
+        return (discipline_for_type(geometry.schema_name, ifc_type) or OTHER_DISCIPLINE) == discipline
+
+    meshes = geometry.meshes(include)
+    if not meshes:
+        return None
+    positions = np.concatenate([m.vertices - origin for m in meshes]).astype(np.float32)
+    feature_ids = np.repeat(
+        np.arange(len(meshes), dtype=np.float32), [len(m.vertices) for m in meshes],
+    )
+    offsets = np.cumsum([0] + [len(m.vertices) for m in meshes[:-1]])
+    indices = np.concatenate([m.faces + off for m, off in zip(meshes, offsets)]).ravel()
+
+    extras = {
+        "discipline": discipline,
+        "guids": [m.guid for m in meshes],
+        "ifc_types": [m.ifc_type for m in meshes],
+    }
+    data = encode_glb(
+        positions, feature_ids, indices,
+        name=discipline, color=_COLORS.get(discipline, _COLORS[OTHER_DISCIPLINE]), extras=extras,
+    )
+    info = {
+        "discipline": discipline,
+        "file": f"{discipline}.glb",
+        "elements": len(meshes),
+        "triangles": len(indices) // 3,
+        "size_bytes": len(data),
+        "bbox_min": (positions.min(axis=0) + origin).tolist(),
+        "bbox_max": (positions.max(axis=0) + origin).tolist(),
+    }
+    return data, info
+
+
+def _viewer_path(content_sha256: str) -> Path:
+    return VIEWER_GEOMETRY_DIR / content_sha256
+
+
+def load_viewer_manifest(content_sha256: str) -> dict | None:
+    """Manifestul fragmentelor pentru un hash de fișier (None dacă lipsește sau e vechi)."""
+    path = _viewer_path(content_sha256) / "manifest.json"
+    if not path.exists():
+        return None
+    try:
+        manifest = json.loads(path.read_text())
+    except (OSError, ValueError) as e:
+        logger.warning(f"Manifest viewer invalid pentru {content_sha256[:12]}: {e}")
+        return None
+    return manifest if manifest.get("version") == VIEWER_GEOMETRY_VERSION else None
+
+
+def viewer_chunk_path(content_sha256: str, discipline: str) -> Path | None:
+    """Calea fragmentului .glb al unei discipline, dacă există în manifest."""
+    manifest = load_viewer_manifest(content_sha256)
+    if manifest is None or discipline not in {c["discipline"] for c in manifest["chunks"]}:
+        return None
+    return _viewer_path(content_sha256) / f"{discipline}.glb"
+
+
+def build_viewer_geometry(file_path: str | Path, content_sha256: str) -> dict:
+    """
+    Scrie fragmentele glTF per disciplină pentru un IFC (idempotent per hash).
+
+    Returns:
+        manifestul (fragmente, origine, număr de elemente).
+    """
+    manifest = load_viewer_manifest(content_sha256)
+    if manifest is not None:
+        return manifest
+
+    geometry = get_geometry(file_path, content_sha256=content_sha256)
+    bbox_min, _ = geometry.bboxes()
+    origin = bbox_min.min(axis=0) if len(bbox_min) else np.zeros(3)
+    disciplines = sorted({
+        discipline_for_type(geometry.schema_name, ifc_type) or OTHER_DISCIPLINE
+        for ifc_type in geometry.ifc_types()
+    })
+
+    target = _viewer_path(content_sha256)
+    tmp = target.with_name(f".{target.name}.{uuid.uuid4().hex}.tmp")
+    tmp.mkdir(parents=True)
+    chunks = []
+    try:
+        for discipline in disciplines:
+            chunk = _discipline_chunk(geometry, discipline, origin)
+            if chunk is None:
+                continue
+            data, info = chunk
+            (tmp / info["file"]).write_bytes(data)
+            precompress_blob(tmp / info["file"])
+            chunks.append(info)
+        manifest = {
+            "version": VIEWER_GEOMETRY_VERSION,
+            "content_sha256": content_sha256,
+            "schema": geometry.schema_name,
+            "origin": [float(x) for x in origin],
+            "up_axis": "Y",
+            "elements": sum(c["elements"] for c in chunks),
+            "chunks": chunks,
+        }
+        (tmp / "manifest.json").write_text(json.dumps(manifest))
+        shutil.rmtree(target, ignore_errors=True)  # fragmente dintr-o versiune veche
+        os.replace(tmp, target)
+    except OSError:
+        # Alt proces a scris între timp aceleași fragmente (același conținut)
+        shutil.rmtree(tmp, ignore_errors=True)
+        if load_viewer_manifest(content_sha256) is None:
+            raise
+    logger.info(
+        f"Geometrie viewer {content_sha256[:12]}: {manifest['elements']} elemente, "
+        f"{len(chunks)} fragmente"
+    )
+    return manifest
@@ -0,0 +1,45 @@
+"""
+worker.py — Worker dedicat pentru coada de job-uri.
+
+Rulare:  python -m app.worker [--concurrency N]
+
+Setează JOB_WORKER_INPROCESS=false pe API când folosești un worker separat.
+Oprire grațioasă la SIGINT/SIGTERM: job-urile în curs se termină, iar cele
+întrerupte brusc sunt repuse în coadă de următorul worker (heartbeat).
+"""
+
+import argparse
+import logging
+import signal
+import threading
+
+from app.main import _run_migrations
+from app.services.job_queue import JOB_WORKER_CONCURRENCY, JobWorker
+
+logger = logging.getLogger(__name__)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Agent BIM — worker coadă job-uri")
+    parser.add_argument("--concurrency", type=int, default=JOB_WORKER_CONCURRENCY)
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s %(levelname)s %(name)s: %(message)s",
+    )
+    _run_migrations()
+
+    stop = threading.Event()
+    signal.signal(signal.SIGINT, lambda *_: stop.set())
+    signal.signal(signal.SIGTERM, lambda *_: stop.set())
+
+    worker = JobWorker(concurrency=args.concurrency)
+    worker.start()
+    stop.wait()
+    logger.info("Semnal de oprire primit, aștept job-urile în curs...")
+    worker.stop()
+
+
+if __name__ == "__main__":
+    main()
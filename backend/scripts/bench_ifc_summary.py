@@ -0,0 +1,142 @@
+"""
+bench_ifc_summary.py — Benchmark extracție ModelSummary: varianta veche
+(un by_type per tip mapat + IfcProduct + metadate) vs. trecerea unică din
+app.services.ifc_parser.
+
+Rulare (din backend/):
+    python -m scripts.bench_ifc_summary --size-mb 200
+    python -m scripts.bench_ifc_summary --ifc /cale/model.ifc
+
+Fără --ifc generează un model sintetic IFC4 (pereți, grinzi, tubulatură,
+fiecare cu geometrie din IfcCartesianPoint/IfcPolyline) de dimensiunea cerută.
+Se măsoară doar extracția, după ifcopenshell.open (comun ambelor variante).
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import tempfile
+import time
+
+import ifcopenshell
+
+from app.services.ifc_parser import _DISCIPLINE_MAP, _extract_summary
+
+_PRODUCTS = (
+    "IFCWALLSTANDARDCASE", "IFCWALL", "IFCSLAB", "IFCBEAM", "IFCCOLUMN",
+    "IFCDUCTSEGMENT", "IFCPIPESEGMENT", "IFCFURNISHINGELEMENT",
+)
+_POINTS_PER_ELEMENT = 24
+
+
+def _guid(n: int) -> str:
+    chars = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz_$"
+    out = []
+    for _ in range(22):
+        n, r = divmod(n, 64)
+        out.append(chars[r])
+    return "".join(out)
+
+
+def write_synthetic_ifc(path: str, size_mb: int) -> int:
+    """Scrie un IFC4 sintetic de ~size_mb MB; returnează numărul de produse."""
+    target = size_mb * 1024 * 1024
+    with open(path, "w", encoding="ascii") as f:
+        f.write(
+            "ISO-10303-21;\nHEADER;\nFILE_DESCRIPTION(('ViewDefinition [CoordinationView]'),'2;1');\n"
+            "FILE_NAME('bench.ifc','2026-01-01T00:00:00',(''),(''),'','','');\n"
+            "FILE_SCHEMA(('IFC4'));\nENDSEC;\nDATA;\n"
+            "#1=IFCPROJECT('0000000000000000000001',$,'Bench',$,$,$,$,$,$);\n"
+            "#2=IFCAPPLICATION($,'1.0','Bench Writer','bench');\n"
+            "#3=IFCPROJECTEDCRS('EPSG:3844',$,$,$,$,$,$);\n"
+        )
+        eid = 10
+        products = 0
+        written = f.tell()
+        while written < target:
+            first_point = eid
+            lines = []
+            for i in range(_POINTS_PER_ELEMENT):
+                lines.append(f"#{eid}=IFCCARTESIANPOINT(({i}.25,{products % 997}.5,{i * 3}.125));\n")
+                eid += 1
+            refs = ",".join(f"#{p}" for p in range(first_point, eid))
+            lines.append(f"#{eid}=IFCPOLYLINE(({refs}));\n")
+            poly = eid
+            eid += 1
+            lines.append(f"#{eid}=IFCSHAPEREPRESENTATION($,'Body','Curve3D',(#{poly}));\n")
+            eid += 1
+            product = _PRODUCTS[products % len(_PRODUCTS)]
+            lines.append(f"#{eid}={product}('{_guid(eid)}',$,'E{products}',$,$,$,$,$,$);\n")
+            eid += 1
+            products += 1
+            chunk = "".join(lines)
+            f.write(chunk)
+            written += len(chunk)
+        f.write("ENDSEC;\nEND-ISO-10303-21;\n")
+    return products
+
+
+def legacy_extract(ifc_file: ifcopenshell.file) -> dict:
+    """Varianta anterioară: câte un by_type (cu subtipuri) per interogare."""
+    category_counts: dict[str, int] = {}
+    for ifc_type in _DISCIPLINE_MAP:
+        try:
+            count = len(ifc_file.by_type(ifc_type))
+        except Exception:
+            continue
+        if count:
+            category_counts[ifc_type] = count
+    products = len(ifc_file.by_type("IfcProduct"))
+    for meta in ("IfcMapConversion", "IfcProjectedCRS", "IfcApplication", "IfcProject"):
+        try:
+            ifc_file.by_type(meta)
+        except Exception:
+            pass
+    return {"categories": category_counts, "products": products}
+
+
+def _best_of(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--ifc", help="fișier IFC existent (altfel se generează unul sintetic)")
+    parser.add_argument("--size-mb", type=int, default=200, help="dimensiunea modelului sintetic")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    tmp_path = None
+    path = args.ifc
+    if not path:
+        fd, tmp_path = tempfile.mkstemp(suffix=".ifc")
+        os.close(fd)
+        start = time.perf_counter()
+        products = write_synthetic_ifc(tmp_path, args.size_mb)
+        print(f"Model sintetic: {args.size_mb} MB, {products} produse "
+              f"({time.perf_counter() - start:.1f}s generare)")
+        path = tmp_path
+
+    try:
+        start = time.perf_counter()
+        ifc_file = ifcopenshell.open(path)
+        print(f"ifcopenshell.open: {time.perf_counter() - start:.2f}s")
+
+        legacy = _best_of(lambda: legacy_extract(ifc_file), args.repeat)
+        single = _best_of(lambda: _extract_summary(ifc_file), args.repeat)
+        print(f"legacy (by_type per tip): {legacy * 1000:.0f} ms")
+        print(f"single-pass:             {single * 1000:.0f} ms")
+        print(f"speedup:                 {legacy / single:.1f}x")
+    finally:
+        if tmp_path:
+            os.unlink(tmp_path)
+
+
+if __name__ == "__main__":
+    main()
@@ -68,6 +68,18 @@ def setup_db():
     Base.metadata.drop_all(bind=_test_engine)
 
 
+@pytest.fixture(autouse=True)
+def ifc_process_pool():
+    """
+    Procesele pool-ului IFC (spawn) moștenesc mediul de la pornire: pool-ul e
+    închis după fiecare test, ca directoarele setate prin setenv să nu treacă
+    la testul următor.
+    """
+    yield
+    from app.services.ifc_processing import shutdown_pool
+    shutdown_pool()
+
+
 @pytest.fixture
 def client():
     """TestClient FastAPI."""
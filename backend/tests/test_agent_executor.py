@@ -0,0 +1,181 @@
+"""Tests for the streaming agent loop (Claude stream replaced by a scripted fake)."""
+
+import asyncio
+import json
+import re
+from types import SimpleNamespace as NS
+
+import app.services.agent_executor as agent_executor
+from app.services.agent_executor import AgentResult, run_agent
+
+
+class _FakeStream:
+    def __init__(self, events, final):
+        self._events = events
+        self._final = final
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def __aiter__(self):
+        async def gen():
+            for e in self._events:
+                yield e
+        return gen()
+
+    async def get_final_message(self):
+        return self._final
+
+
+class _FakeClient:
+    """Replays one scripted turn per `messages.stream` call."""
+
+    def __init__(self, turns):
+        self._turns = list(turns)
+        self.requests: list[dict] = []
+        self.messages = NS(stream=self._stream)
+
+    def _stream(self, **kwargs):
+        self.requests.append(json.loads(json.dumps(kwargs, default=str)))
+        return _FakeStream(*self._turns.pop(0))
+
+
+def _usage(read=0, write=0):
+    return NS(input_tokens=100, output_tokens=20,
+              cache_read_input_tokens=read, cache_creation_input_tokens=write)
+
+
+def _text_turn(text, stop_reason="end_turn"):
+    block = NS(type="text", text=text)
+    events = [
+        NS(type="content_block_start", index=0, content_block=NS(type="text", text="")),
+        *[
+            NS(type="content_block_delta", index=0, delta=NS(type="text_delta", text=t))
+            for t in re.findall(r"\S+\s*", text)
+        ],
+        NS(type="content_block_stop", index=0, content_block=block),
+    ]
+    return events, NS(stop_reason=stop_reason, content=[block], usage=_usage())
+
+
+def _tool_turn(calls):
+    events, blocks = [], []
+    for i, (call_id, name, tool_input) in enumerate(calls):
+        block = NS(type="tool_use", id=call_id, name=name, input=tool_input)
+        blocks.append(block)
+        events += [
+            NS(type="content_block_start", index=i,
+               content_block=NS(type="tool_use", id=call_id, name=name, input={})),
+            NS(type="content_block_delta", index=i,
+               delta=NS(type="input_json_delta", partial_json=json.dumps(tool_input))),
+            NS(type="content_block_stop", index=i, content_block=block),
+        ]
+    return events, NS(stop_reason="tool_use", content=blocks, usage=_usage())
+
+
+def _collect(gen) -> list[dict]:
+    async def run():
+        return [e async for e in gen]
+
+    events = []
+    for raw in asyncio.run(run()):
+        data = raw.split("\n")[1].removeprefix("data: ")
+        events.append(json.loads(data))
+    return events
+
+
+def test_run_agent_streams_text_and_tool_arguments(db_session, project_id, monkeypatch):
+    fake = _FakeClient([
+        _tool_turn([("call_1", "get_project_info", {"project_id": project_id})]),
+        _text_turn("Proiectul este activ."),
+    ])
+    monkeypatch.setattr(agent_executor, "_get_async_client", lambda: fake)
+
+    collector = AgentResult()
+    events = _collect(run_agent(db_session, project_id, "Ce status are?", collector=collector))
+    types = [e["type"] for e in events]
+
+    assert types[:3] == ["tool_call_start", "tool_input_delta", "tool_call"]
+    assert events[1]["call_id"] == "call_1"
+    result = next(e for e in events if e["type"] == "tool_result")
+    assert result["result"]["code"] == "TST01"
+    assert types.count("text_delta") == 3
+    assert types[-1] == "done"
+
+    assert collector.final_text == "Proiectul este activ."
+    assert collector.tool_steps[0]["status"] == "completed"
+
+    # A doua tură trimite rezultatul tool-ului înapoi la Claude
+    second = fake.requests[1]["messages"]
+    assert second[-1]["content"][0]["tool_use_id"] == "call_1"
+
+
+def test_run_agent_runs_read_only_tools_concurrently(db_session, project_id, monkeypatch):
+    import time
+
+    import app.services.agent_tools as agent_tools
+
+    sessions = []
+
+    def slow_handler(db, tool_input):
+        sessions.append(db)
+        time.sleep(0.3)
+        return {"ok": True}
+
+    monkeypatch.setitem(agent_tools.TOOL_HANDLERS, "get_clash_summary", slow_handler)
+    monkeypatch.setitem(agent_tools.TOOL_HANDLERS, "get_kpi_dashboard", slow_handler)
+    monkeypatch.setitem(agent_tools.TOOL_HANDLERS, "get_loin_matrix", slow_handler)
+
+    fake = _FakeClient([
+        _tool_turn([
+            ("c1", "get_clash_summary", {"project_id": project_id}),
+            ("c2", "get_kpi_dashboard", {"project_id": project_id}),
+            ("c3", "get_loin_matrix", {"project_id": project_id}),
+        ]),
+        _text_turn("Status complet."),
+    ])
+    monkeypatch.setattr(agent_executor, "_get_async_client", lambda: fake)
+
+    start = time.time()
+    events = _collect(run_agent(db_session, project_id, "Status complet"))
+    elapsed = time.time() - start
+
+    results = [e for e in events if e["type"] == "tool_result"]
+    assert [r["call_id"] for r in results] == ["c1", "c2", "c3"]
+    assert elapsed < 0.8
+    # Fiecare tool read-only primește o sesiune proprie, nu sesiunea request-ului
+    assert len({id(s) for s in sessions}) == 3
+    assert all(s is not db_session for s in sessions)
+
+
+def test_run_agent_marks_cache_breakpoints_and_reports_usage(db_session, project_id, monkeypatch):
+    tool_events, tool_final = _tool_turn([("c1", "get_project_info", {"project_id": project_id})])
+    tool_final.usage = _usage(write=5000)
+    text_events, text_final = _text_turn("Gata.")
+    text_final.usage = _usage(read=5200)
+    fake = _FakeClient([(tool_events, tool_final), (text_events, text_final)])
+    monkeypatch.setattr(agent_executor, "_get_async_client", lambda: fake)
+
+    collector = AgentResult()
+    events = _collect(run_agent(db_session, project_id, "Info", collector=collector))
+
+    for req in fake.requests:
+        assert req["tools"][-1]["cache_control"] == {"type": "ephemeral"}
+        assert "cache_control" not in req["tools"][0]
+        assert req["system"][0]["cache_control"] == {"type": "ephemeral"}
+        assert "cache_control" not in req["system"][-1]
+        assert req["messages"][-1]["content"][-1]["cache_control"] == {"type": "ephemeral"}
+        breakpoints = sum(
+            1 for m in req["messages"] if isinstance(m["content"], list)
+            for b in m["content"] if "cache_control" in b
+        )
+        assert breakpoints == 1
+
+    usage = events[-1]["usage"]
+    assert usage["cache_creation_input_tokens"] == 5000
+    assert usage["cache_read_input_tokens"] == 5200
+    assert usage["input_tokens"] == 200
+    assert collector.usage == usage
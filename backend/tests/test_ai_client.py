@@ -0,0 +1,68 @@
+"""Tests for the async LLM concurrency limiter in app.ai_client."""
+
+import asyncio
+
+from app.ai_client import LlmLimiter, _parse_route_budgets
+
+
+def test_parse_route_budgets_overrides_defaults():
+    budgets = _parse_route_budgets("bep=1, chat=10,bogus=x,=3")
+    assert budgets["bep"] == 1
+    assert budgets["chat"] == 10
+    assert "bogus" not in budgets
+    assert budgets["verifier"] == 2
+
+
+def test_limiter_enforces_route_budget():
+    limiter = LlmLimiter(max_concurrency=8, route_budgets={"bep": 2})
+    peak = {"bep": 0}
+    current = {"bep": 0}
+
+    async def call():
+        async with limiter.slot("bep"):
+            current["bep"] += 1
+            peak["bep"] = max(peak["bep"], current["bep"])
+            await asyncio.sleep(0.01)
+            current["bep"] -= 1
+
+    async def main():
+        await asyncio.gather(*(call() for _ in range(6)))
+
+    asyncio.run(main())
+    assert peak["bep"] == 2
+    metrics = limiter.metrics()
+    assert metrics["routes"]["bep"]["completed"] == 6
+    assert metrics["in_flight"] == 0
+    assert metrics["queue_depth"] == 0
+
+
+def test_limiter_reports_queue_depth():
+    limiter = LlmLimiter(max_concurrency=1, route_budgets={})
+    snapshots = []
+
+    async def main():
+        release = asyncio.Event()
+
+        async def holder():
+            async with limiter.slot("chat"):
+                await release.wait()
+
+        async def waiter():
+            async with limiter.slot("agent"):
+                pass
+
+        tasks = [asyncio.create_task(holder()), asyncio.create_task(waiter())]
+        await asyncio.sleep(0.01)
+        snapshots.append(limiter.metrics())
+        release.set()
+        await asyncio.gather(*tasks)
+
+    asyncio.run(main())
+    assert snapshots[0]["in_flight"] == 1
+    assert snapshots[0]["queue_depth"] == 1
+
+
+def test_llm_metrics_endpoint(client):
+    res = client.get("/healthcheck/llm")
+    assert res.status_code == 200
+    assert "queue_depth" in res.json()
@@ -0,0 +1,70 @@
+"""Tests for the SSE BEP streaming endpoint (LLM stream mocked)."""
+
+import json
+
+import app.api.bep as bep_api
+from app.models.sql_models import GeneratedDocumentModel
+
+_CONTEXT = {
+    "project_name": "Test Project",
+    "project_code": "TST01",
+    "project_type": "building",
+    "client_name": "Test Client",
+}
+
+
+def _parse_events(body: str) -> list[tuple[str, dict]]:
+    events = []
+    for block in body.strip().split("\n\n"):
+        lines = block.split("\n")
+        event = lines[0].removeprefix("event: ")
+        data = json.loads(lines[1].removeprefix("data: "))
+        events.append((event, data))
+    return events
+
+
+def test_generate_bep_stream_persists_document(client, auth_headers, project_id, db_session, monkeypatch):
+    async def fake_stream(_ctx):
+        for part in ["# BEP\n", "## 1. Informații generale\n", "text"]:
+            yield part
+
+    monkeypatch.setattr(bep_api, "stream_bep", fake_stream)
+    monkeypatch.setattr(bep_api, "BEP_STREAM_FLUSH_CHARS", 5)
+
+    res = client.post(
+        f"/api/projects/{project_id}/generate-bep/stream",
+        json=_CONTEXT, headers=auth_headers,
+    )
+    assert res.status_code == 200
+    events = _parse_events(res.text)
+    names = [e for e, _ in events]
+    assert names[0] == "bep_started"
+    assert names.count("text_delta") == 3
+    assert names[-1] == "done"
+
+    done = events[-1][1]
+    assert done["bep_document"]["doc_type"] == "bep"
+    assert done["project"]["status"] == "bep_generated"
+
+    doc = db_session.get(GeneratedDocumentModel, events[0][1]["document_id"])
+    assert doc.doc_type == "bep"
+    assert doc.content_markdown == "# BEP\n## 1. Informații generale\ntext"
+
+
+def test_generate_bep_stream_keeps_partial_draft_on_error(client, auth_headers, project_id, db_session, monkeypatch):
+    async def failing_stream(_ctx):
+        yield "# BEP parțial\n"
+        raise RuntimeError("conexiune pierdută")
+
+    monkeypatch.setattr(bep_api, "stream_bep", failing_stream)
+
+    res = client.post(
+        f"/api/projects/{project_id}/generate-bep/stream",
+        json=_CONTEXT, headers=auth_headers,
+    )
+    events = _parse_events(res.text)
+    assert events[-1][0] == "error"
+
+    doc = db_session.get(GeneratedDocumentModel, events[0][1]["document_id"])
+    assert doc.doc_type == "bep_draft"
+    assert doc.content_markdown == "# BEP parțial\n"
@@ -0,0 +1,38 @@
+"""Tests for the on-disk BM25 index and rank fusion (app.services.bm25_index)."""
+
+from app.services.bm25_index import build_bm25_index, load_bm25_index, rrf_fuse, tokenize
+
+CHUNKS = [
+    {"id": "rtc8", "text": "Conform RTC 8, proiectarea construcțiilor urmează referențialul tehnic.", "source": "RTC8.pdf"},
+    {"id": "rtc9", "text": "RTC 9 tratează execuția lucrărilor; vezi și etapa 8 din plan.", "source": "RTC9.pdf"},
+    {"id": "hg", "text": "HG 907/2016 stabilește etapele de elaborare a documentațiilor tehnico-economice.", "source": "HG.pdf"},
+    {"id": "iso", "text": "SR EN ISO 19650-2 descrie faza de livrare și planul de execuție BIM.", "source": "ISO.pdf"},
+    {"id": "cde", "text": "Mediul comun de date (CDE) are zonele WIP, Shared, Published, Archived.", "source": "CDE.pdf"},
+]
+
+
+def test_tokenize_keeps_references_and_folds_diacritics():
+    tokens = tokenize("Conform HG 907/2016 și ISO 19650-2, RTC 8 — construcțiilor")
+    assert {"907/2016", "907", "2016", "hg_907/2016", "19650-2", "19650", "rtc_8", "constructiilor"} <= set(tokens)
+    assert "si" not in tokens
+
+
+def test_exact_references_rank_first(tmp_path):
+    meta = build_bm25_index(CHUNKS, tmp_path / "bm25")
+    assert (meta["documents"], meta["version"]) == (5, 1)
+    index = load_bm25_index(tmp_path / "bm25")
+
+    assert index.search("RTC 8", 3)[0][0]["id"] == "rtc8"
+    assert index.search("hg 907/2016", 3)[0][0]["id"] == "hg"
+    assert index.search("19650-2", 3)[0][0]["id"] == "iso"
+    assert index.search("Construcțiilor", 5)[0][0]["source"] == "RTC8.pdf"
+    # Doar fragmentele cu cel puțin un termen comun
+    assert [d["id"] for d, _ in index.search("zonele CDE", 5)] == ["cde"]
+    assert index.search("inexistent", 5) == []
+    assert load_bm25_index(tmp_path / "lipsa") is None
+
+
+def test_rrf_fuse_rewards_agreement():
+    fused = rrf_fuse([["a", "b", "c"], ["c", "d", "a"]], k=60)
+    assert [doc_id for doc_id, _ in fused] == ["a", "c", "b", "d"]
+    assert fused[0][1] == 1 / 61 + 1 / 63
@@ -0,0 +1,243 @@
+"""Tests for geometric clash detection (BVH broad phase + mesh narrow phase)."""
+
+import ifcopenshell
+import ifcopenshell.api
+import numpy as np
+import pytest
+
+import app.services.ifc_geometry as ifc_geometry
+from app.models.sql_models import ClashRecordModel
+from app.repositories.projects_repository import save_uploaded_file
+from app.services.clash_detection import (
+    _build_bvh,
+    _bvh_overlapping_pairs,
+    detect_clashes,
+)
+from app.services.clash_manager import get_clash_summary, run_clash_detection
+from app.services.ifc_geometry import ElementMesh
+
+@pytest.fixture(autouse=True)
+def geometry_cache_env(tmp_path, monkeypatch):
+    # Teselarea rulează în procesul copil (spawn), care citește directorul din mediu
+    monkeypatch.setenv("GEOMETRY_CACHE_DIR", str(tmp_path / "geometry"))
+
+
+_CUBE_V = np.array(
+    [[0, 0, 0], [1, 0, 0], [1, 1, 0], [0, 1, 0], [0, 0, 1], [1, 0, 1], [1, 1, 1], [0, 1, 1]],
+    dtype=float,
+)
+_CUBE_F = np.array([
+    [0, 2, 1], [0, 3, 2], [4, 5, 6], [4, 6, 7], [0, 1, 5], [0, 5, 4],
+    [1, 2, 6], [1, 6, 5], [2, 3, 7], [2, 7, 6], [3, 0, 4], [3, 4, 7],
+])
+
+
+def _box_mesh(guid, discipline, origin, size):
+    v = _CUBE_V * np.asarray(size, dtype=float) + np.asarray(origin, dtype=float)
+    return ElementMesh(guid, "IfcBuildingElementProxy", discipline, v, _CUBE_F, v.min(0), v.max(0))
+
+
+def test_bvh_pairs_match_brute_force():
+    rng = np.random.default_rng(1)
+    a_min = rng.uniform(0, 50, (300, 3))
+    a_max = a_min + rng.uniform(0.1, 3, (300, 3))
+    b_min = rng.uniform(0, 50, (200, 3))
+    b_max = b_min + rng.uniform(0.1, 3, (200, 3))
+
+    ia, ib = _bvh_overlapping_pairs(
+        _build_bvh(a_min, a_max), a_min, a_max,
+        _build_bvh(b_min, b_max), b_min, b_max,
+        0.0,
+    )
+
+    brute = np.all((a_min[:, None] < b_max[None]) & (b_min[None] < a_max[:, None]), axis=2)
+    assert set(zip(ia.tolist(), ib.tolist())) == set(zip(*np.nonzero(brute)))
+
+
+def test_narrow_phase_hard_touching_and_containment():
+    meshes = [
+        _box_mesh("wall", "architecture", (0, 0, 0), (5, 0.3, 3)),
+        _box_mesh("duct", "mep", (1, -1, 1), (0.4, 3, 0.4)),           # traversează peretele
+        _box_mesh("beam", "structure", (0, 0, 3), (5, 0.3, 0.5)),      # doar atinge peretele
+        _box_mesh("pipe", "mep", (3, 0.1, 1), (0.1, 0.1, 0.1)),        # complet în perete
+        _box_mesh("near", "structure", (0.5, 0.35, 0), (0.2, 0.2, 3)),  # AABB disjuncte
+    ]
+
+    found = {(c.guid_a, c.guid_b): c.kind for c in detect_clashes(meshes, tolerance=0.001)}
+
+    assert found == {("wall", "duct"): "hard", ("wall", "pipe"): "containment"}
+
+
+def _ifc_with_clash(path):
+    f = ifcopenshell.file(schema="IFC4")
+    ifcopenshell.api.run("root.create_entity", f, ifc_class="IfcProject", name="P")
+    ifcopenshell.api.run("unit.assign_unit", f)
+    model = ifcopenshell.api.run("context.add_context", f, context_type="Model")
+    body = ifcopenshell.api.run(
+        "context.add_context", f, context_type="Model", context_identifier="Body",
+        target_view="MODEL_VIEW", parent=model,
+    )
+
+    def element(ifc_class, origin, length, thickness, height):
+        e = ifcopenshell.api.run("root.create_entity", f, ifc_class=ifc_class)
+        rep = ifcopenshell.api.run(
+            "geometry.add_wall_representation", f, context=body,
+            length=length, height=height, thickness=thickness,
+        )
+        ifcopenshell.api.run("geometry.assign_representation", f, product=e, representation=rep)
+        matrix = np.eye(4)
+        matrix[:3, 3] = origin
+        ifcopenshell.api.run("geometry.edit_object_placement", f, product=e, matrix=matrix, is_si=True)
+        return e
+
+    wall = element("IfcWall", (0, 0, 0), 5, 0.3, 3)
+    duct = element("IfcDuctSegment", (1, -1, 1), 0.4, 3, 0.4)
+    element("IfcSlab", (0, -1, -0.2), 5, 2, 0.2)  # sub perete, doar contact
+    f.write(str(path))
+    return wall.GlobalId, duct.GlobalId
+
+
+def test_run_clash_detection_bulk_inserts_and_replaces_open(db_session, project_id, tmp_path, monkeypatch):
+    monkeypatch.setattr(ifc_geometry, "GEOMETRY_CACHE_DIR", tmp_path / "geometry")
+    wall_guid, duct_guid = _ifc_with_clash(tmp_path / "model.ifc")
+    save_uploaded_file(
+        db_session, project_id=project_id, filename="model.ifc",
+        file_path=str(tmp_path / "model.ifc"),
+    )
+
+    result = run_clash_detection(db_session, project_id)
+    assert result["success"] is True
+    assert result["elements"] == 3
+    assert result["clashes_detected"] == 1
+
+    result = run_clash_detection(db_session, project_id)
+    assert result["clashes_detected"] == 1
+    db_session.commit()
+
+    records = db_session.query(ClashRecordModel).filter_by(project_id=project_id).all()
+    assert len(records) == 1
+    assert {records[0].element_a_guid, records[0].element_b_guid} == {wall_guid, duct_guid}
+    assert records[0].source == "detected"
+
+    summary = get_clash_summary(db_session, project_id)
+    assert summary["open"] == 1
+    assert summary["clashes"][0]["location"]["kind"] == "hard"
+
+
+def test_run_clash_detection_without_ifc(db_session, project_id):
+    assert "error" in run_clash_detection(db_session, project_id)
+
+
+def test_tessellation_timeout_returns_error(db_session, project_id, tmp_path, monkeypatch):
+    import app.services.ifc_processing as ifc_processing
+
+    monkeypatch.setattr(ifc_geometry, "GEOMETRY_CACHE_DIR", tmp_path / "geometry")
+    monkeypatch.setattr(ifc_processing, "IFC_PARSE_TIMEOUT_SECONDS", 0.01)
+    _ifc_with_clash(tmp_path / "model.ifc")
+    save_uploaded_file(db_session, project_id=project_id, filename="model.ifc", file_path=str(tmp_path / "model.ifc"))
+
+    result = run_clash_detection(db_session, project_id)
+    assert "limita" in result["error"]
+    assert db_session.query(ClashRecordModel).count() == 0
+
+
+def _write_revision(path, elements):
+    """elements: (GlobalId, clasă IFC, origine, lungime, grosime, înălțime)."""
+    f = ifcopenshell.file(schema="IFC4")
+    ifcopenshell.api.run("root.create_entity", f, ifc_class="IfcProject", name="P")
+    ifcopenshell.api.run("unit.assign_unit", f)
+    model = ifcopenshell.api.run("context.add_context", f, context_type="Model")
+    body = ifcopenshell.api.run(
+        "context.add_context", f, context_type="Model", context_identifier="Body",
+        target_view="MODEL_VIEW", parent=model,
+    )
+    for guid, ifc_class, origin, length, thickness, height in elements:
+        e = ifcopenshell.api.run("root.create_entity", f, ifc_class=ifc_class)
+        e.GlobalId = guid
+        rep = ifcopenshell.api.run(
+            "geometry.add_wall_representation", f, context=body,
+            length=length, height=height, thickness=thickness,
+        )
+        ifcopenshell.api.run("geometry.assign_representation", f, product=e, representation=rep)
+        matrix = np.eye(4)
+        matrix[:3, 3] = origin
+        ifcopenshell.api.run("geometry.edit_object_placement", f, product=e, matrix=matrix, is_si=True)
+    f.write(str(path))
+
+
+def test_incremental_rerun_carries_forward_and_retests_changes(db_session, project_id, tmp_path, monkeypatch):
+    monkeypatch.setattr(ifc_geometry, "GEOMETRY_CACHE_DIR", tmp_path / "geometry")
+    wall = ("0WALL0000000000000000A", "IfcWall", (0, 0, 0), 5, 0.3, 3)
+    duct = ("0DUCT0000000000000000A", "IfcDuctSegment", (1, -1, 1), 0.4, 3, 0.4)
+    pipe = ("0PIPE0000000000000000A", "IfcPipeSegment", (3, -1, 2), 0.2, 3, 0.2)
+    beams = [
+        (f"0BEAM00000000000000{i:03d}", "IfcBeam", (20 + 2 * i, 0, 0), 1, 0.2, 0.3)
+        for i in range(20)
+    ]
+
+    rev1 = tmp_path / "rev1.ifc"
+    _write_revision(rev1, [wall, duct, pipe, *beams])
+    save_uploaded_file(db_session, project_id=project_id, filename="rev1.ifc", file_path=str(rev1))
+    first = run_clash_detection(db_session, project_id)
+    assert first["mode"] == "full"
+    assert first["new_clashes"] == 2
+
+    duct_clash = db_session.query(ClashRecordModel).filter_by(element_b_guid=duct[0]).one()
+    duct_clash.assigned_to_role = "MEP Lead"
+    duct_clash.resolution_note = "Se reorientează traseul"
+    db_session.flush()
+
+    # Revizia 2: conducta scoasă din perete, grindă nouă care îl traversează
+    rev2 = tmp_path / "rev2.ifc"
+    moved_pipe = (pipe[0], pipe[1], (3, 2, 2), *pipe[3:])
+    new_beam = ("0BEAMNEW00000000000000", "IfcBeam", (2, -1, 2.5), 0.3, 3, 0.3)
+    _write_revision(rev2, [wall, duct, moved_pipe, *beams, new_beam])
+    save_uploaded_file(db_session, project_id=project_id, filename="rev2.ifc", file_path=str(rev2))
+    second = run_clash_detection(db_session, project_id)
+    db_session.commit()
+
+    assert second["mode"] == "incremental"
+    assert second["changed_elements"] == 2
+    assert second["new_clashes"] == 1
+    assert second["carried_forward"] == 1
+    assert second["auto_resolved"] == 1
+
+    db_session.refresh(duct_clash)
+    assert duct_clash.status == "open"
+    assert duct_clash.assigned_to_role == "MEP Lead"
+    assert duct_clash.resolution_note == "Se reorientează traseul"
+
+    pipe_clash = db_session.query(ClashRecordModel).filter_by(element_b_guid=pipe[0]).one()
+    assert pipe_clash.status == "resolved"
+    new_clash = db_session.query(ClashRecordModel).filter(
+        ClashRecordModel.element_b_guid == new_beam[0]
+    ).one()
+    assert new_clash.severity == "high"
+
+
+def test_resolved_clash_reopens_when_detected_again(db_session, project_id, tmp_path, monkeypatch):
+    monkeypatch.setattr(ifc_geometry, "GEOMETRY_CACHE_DIR", tmp_path / "geometry")
+    wall = ("0WALL0000000000000000A", "IfcWall", (0, 0, 0), 5, 0.3, 3)
+    duct = ("0DUCT0000000000000000A", "IfcDuctSegment", (1, -1, 1), 0.4, 3, 0.4)
+    moved_duct = (duct[0], duct[1], (1, 2, 1), *duct[3:])
+
+    for revision, elements in (("rev1", [wall, duct]), ("rev2", [wall, moved_duct]), ("rev3", [wall, duct])):
+        path = tmp_path / f"{revision}.ifc"
+        _write_revision(path, elements)
+        save_uploaded_file(db_session, project_id=project_id, filename=f"{revision}.ifc", file_path=str(path))
+        result = run_clash_detection(db_session, project_id)
+        if revision == "rev1":
+            assert result["new_clashes"] == 1
+        elif revision == "rev2":
+            assert result["auto_resolved"] == 1
+            assert result["clashes_detected"] == 0
+
+    assert result["mode"] == "incremental"
+    assert (result["new_clashes"], result["reopened"], result["clashes_detected"]) == (1, 1, 1)
+    db_session.commit()
+
+    record = db_session.query(ClashRecordModel).filter_by(project_id=project_id).one()
+    assert record.status == "open"
+    assert record.resolved_at is None
+    assert "rev3.ifc" in record.resolution_note
+    assert get_clash_summary(db_session, project_id)["open"] == 1
@@ -0,0 +1,124 @@
+"""Tests for the columnar element/property store (app.services.element_store)."""
+
+import ifcopenshell
+import ifcopenshell.api
+import pytest
+
+import app.services.element_store as element_store
+from app.repositories.projects_repository import save_uploaded_file
+from app.services.element_store import ElementQueryError, build_element_store, load_element_store
+from app.services.job_queue import JobWorker
+
+
+@pytest.fixture
+def store_dir(tmp_path, monkeypatch):
+    path = tmp_path / "elements"
+    # Indexarea din job rulează în procesul copil (spawn), care citește mediul
+    monkeypatch.setenv("ELEMENT_STORE_DIR", str(path))
+    monkeypatch.setattr(element_store, "ELEMENT_STORE_DIR", path)
+    return path
+
+
+def _ifc_with_properties(path):
+    """Două niveluri: 3 pereți (unul fără FireRating), o ușă, o coloană."""
+    f = ifcopenshell.file(schema="IFC4")
+    run = ifcopenshell.api.run
+    project = run("root.create_entity", f, ifc_class="IfcProject", name="P")
+    site = run("root.create_entity", f, ifc_class="IfcSite", name="Site")
+    building = run("root.create_entity", f, ifc_class="IfcBuilding", name="B")
+    parter = run("root.create_entity", f, ifc_class="IfcBuildingStorey", name="Parter")
+    etaj = run("root.create_entity", f, ifc_class="IfcBuildingStorey", name="Etaj 1")
+    run("aggregate.assign_object", f, products=[site], relating_object=project)
+    run("aggregate.assign_object", f, products=[building], relating_object=site)
+    run("aggregate.assign_object", f, products=[parter, etaj], relating_object=building)
+
+    wall_type = run("root.create_entity", f, ifc_class="IfcWallType", name="WT")
+    pset = run("pset.add_pset", f, product=wall_type, name="Pset_WallCommon")
+    run("pset.edit_pset", f, pset=pset, properties={"IsExternal": True, "FireRating": "EI30"})
+
+    def element(ifc_class, storey, name, props=None, quantities=None):
+        e = run("root.create_entity", f, ifc_class=ifc_class, name=name)
+        run("spatial.assign_container", f, products=[e], relating_structure=storey)
+        for pset_name, values in (props or {}).items():
+            p = run("pset.add_pset", f, product=e, name=pset_name)
+            run("pset.edit_pset", f, pset=p, properties=values)
+        if quantities:
+            q = run("pset.add_qto", f, product=e, name="Qto_WallBaseQuantities")
+            run("pset.edit_qto", f, qto=q, properties=quantities)
+        return e
+
+    w1 = element("IfcWall", parter, "W1", {"Pset_WallCommon": {"FireRating": "EI60"}}, {"Length": 5.0})
+    w2 = element("IfcWall", parter, "W2", {"Pset_WallCommon": {"LoadBearing": True}}, {"Length": 2.5})
+    w3 = element("IfcWall", etaj, "W3", {"Pset_WallCommon": {"FireRating": "EI90"}}, {"Length": 8.0})
+    run("type.assign_type", f, related_objects=[w1, w2], relating_type=wall_type)
+    element("IfcDoor", parter, "D1", {"Pset_DoorCommon": {"FireRating": "EI30"}})
+    element("IfcColumn", etaj, "C1", {"Pset_ColumnCommon": {"LoadBearing": True}})
+    f.write(str(path))
+    return {"W1": w1.GlobalId, "W2": w2.GlobalId, "W3": w3.GlobalId}
+
+
+def test_store_roundtrip_filters_and_group_by(tmp_path, store_dir):
+    model = tmp_path / "model.ifc"
+    guids = _ifc_with_properties(model)
+    build_element_store(model, "abc123")
+
+    store = load_element_store("abc123")
+    walls = store.query(ifc_type="IfcWall")
+    assert walls["count"] == 3
+    assert {e["guid"] for e in walls["elements"]} == set(guids.values())
+
+    # Proprietatea instanței are prioritate față de cea a tipului
+    w1 = store.query(ifc_type="IfcWall", where=[{"property": "FireRating", "value": "EI60"}])
+    assert [e["name"] for e in w1["elements"]] == ["W1"]
+    # W2 moștenește FireRating de la tip
+    inherited = store.query(where=[{"property": "Pset_WallCommon.FireRating", "value": "EI30"}])
+    assert [e["name"] for e in inherited["elements"]] == ["W2"]
+
+    assert store.query(ifc_type="IfcWall", storey="parter")["count"] == 2
+    assert store.query(where=[{"property": "Length", "op": ">=", "value": 5}])["count"] == 2
+    assert store.query(where=[{"property": "FireRating", "op": "contains", "value": "ei3"}])["count"] == 2
+    assert store.query(ifc_type="IfcBuildingElement", missing=["IsExternal"])["count"] == 3
+
+    by_storey = store.query(ifc_type="IfcBuildingElement", group_by="storey")["groups"]
+    assert by_storey == {"Parter": 3, "Etaj 1": 2}
+    by_rating = store.query(ifc_type="IfcWall", group_by="FireRating")["groups"]
+    assert by_rating == {"EI60": 1, "EI30": 1, "EI90": 1}
+    by_discipline = store.query(group_by="discipline", has=["LoadBearing"])["groups"]
+    assert by_discipline == {"architecture": 1, "structure": 1}
+
+    with pytest.raises(ElementQueryError):
+        store.query(where=[{"property": "NuExista", "value": 1}])
+    with pytest.raises(ElementQueryError):
+        store.query(has=["NuExista"])
+    # Proprietate pe care n-o are niciun element: toate elementele tipului o „lipsesc”
+    assert store.query(ifc_type="IfcWall", missing=["AcousticRating"])["count"] == 3
+    with pytest.raises(ElementQueryError):
+        store.query(where=[{"property": "FireRating", "op": ">", "value": "EI30"}])
+
+
+def test_query_endpoint_indexes_missing_store(
+    client, auth_headers, db_session, project_id, tmp_path, store_dir,
+):
+    model = tmp_path / "model.ifc"
+    _ifc_with_properties(model)
+    save_uploaded_file(db_session, project_id=project_id, filename="model.ifc", file_path=str(model))
+    db_session.commit()
+
+    body = {"ifc_type": "IfcWall", "missing": ["FireRating"]}
+    res = client.post(f"/api/projects/{project_id}/elements/query", json=body, headers=auth_headers)
+    assert res.status_code == 202
+    job = res.json()["job"]
+    assert job["job_type"] == "build_element_store"
+    # Reîncercarea clientului refolosește job-ul din coadă
+    res = client.post(f"/api/projects/{project_id}/elements/query", json=body, headers=auth_headers)
+    assert res.json()["job"]["id"] == job["id"]
+
+    worker = JobWorker(concurrency=1, poll_interval=0.01, name="test")
+    assert worker.run_once() is True
+    assert worker.run_once() is False
+
+    res = client.post(f"/api/projects/{project_id}/elements/query", json=body, headers=auth_headers)
+    assert res.status_code == 200
+    data = res.json()
+    assert data["count"] == 0
+    assert data["total_elements"] >= 5
@@ -0,0 +1,80 @@
+"""Tests for the IFC revision diff (app.services.ifc_diff)."""
+
+import ifcopenshell
+import ifcopenshell.api
+import pytest
+
+import app.services.element_store as element_store
+from app.repositories.projects_repository import save_uploaded_file
+from app.services.element_store import build_element_store, load_element_store
+from app.services.ifc_diff import diff_element_stores
+from app.services.ifc_geometry import file_sha256
+from tests.test_clash_detection import _write_revision
+
+WALL = ("0WALL0000000000000000A", "IfcWall", (0, 0, 0), 5, 0.3, 3)
+DUCT = ("0DUCT0000000000000000A", "IfcDuctSegment", (1, -1, 1), 0.4, 3, 0.4)
+PIPE = ("0PIPE0000000000000000A", "IfcPipeSegment", (3, -1, 2), 0.2, 3, 0.2)
+BEAM = ("0BEAM0000000000000000A", "IfcBeam", (0, 0, 3), 5, 0.3, 0.4)
+COLUMN = ("0COLUMN00000000000000A", "IfcColumn", (6, 0, 0), 0.3, 0.3, 3)
+
+
+@pytest.fixture(autouse=True)
+def store_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(element_store, "ELEMENT_STORE_DIR", tmp_path / "elements")
+
+
+def _revisions(tmp_path):
+    rev1 = tmp_path / "rev1.ifc"
+    _write_revision(rev1, [WALL, DUCT, PIPE, BEAM])
+
+    # Revizia 2: conducta mutată, țeava ștearsă, stâlp nou, FireRating pe grindă
+    rev2 = tmp_path / "rev2.ifc"
+    _write_revision(rev2, [WALL, (DUCT[0], DUCT[1], (2, -1, 1), *DUCT[3:]), BEAM, COLUMN])
+    f = ifcopenshell.open(str(rev2))
+    beam = f.by_guid(BEAM[0])
+    pset = ifcopenshell.api.run("pset.add_pset", f, product=beam, name="Pset_BeamCommon")
+    ifcopenshell.api.run("pset.edit_pset", f, pset=pset, properties={"FireRating": "R60"})
+    f.write(str(rev2))
+
+    shas = []
+    for path in (rev1, rev2):
+        shas.append(file_sha256(path))
+        build_element_store(path, shas[-1])
+    return rev1, rev2, shas
+
+
+def test_diff_by_guid_and_element_hashes(tmp_path):
+    _, _, (sha1, sha2) = _revisions(tmp_path)
+
+    diff = diff_element_stores(load_element_store(sha1), load_element_store(sha2))
+
+    assert [e["guid"] for e in diff["added"]] == [COLUMN[0]]
+    assert [e["guid"] for e in diff["removed"]] == [PIPE[0]]
+    modified = {e["guid"]: e["changes"] for e in diff["modified"]}
+    assert modified == {DUCT[0]: ["placement"], BEAM[0]: ["properties"]}
+    assert diff["unchanged_count"] == 1
+    assert diff["by_discipline"]["mep"] == {"added": 0, "removed": 1, "modified": 1}
+    assert diff["by_discipline"]["structure"] == {"added": 1, "removed": 0, "modified": 1}
+
+    same = diff_element_stores(load_element_store(sha2), load_element_store(sha2))
+    assert same["added_count"] == same["removed_count"] == same["modified_count"] == 0
+
+
+def test_diff_endpoint_defaults_to_last_two_uploads(client, auth_headers, db_session, project_id, tmp_path):
+    rev1, rev2, (sha1, sha2) = _revisions(tmp_path)
+    first = save_uploaded_file(
+        db_session, project_id=project_id, filename="rev1.ifc", file_path=str(rev1), content_sha256=sha1,
+    )
+    save_uploaded_file(
+        db_session, project_id=project_id, filename="rev2.ifc", file_path=str(rev2), content_sha256=sha2,
+    )
+    db_session.commit()
+
+    res = client.get(f"/api/projects/{project_id}/ifc-diff", headers=auth_headers)
+    assert res.status_code == 200
+    data = res.json()
+    assert data["from_file"]["id"] == first.id
+    assert (data["added_count"], data["removed_count"], data["modified_count"]) == (1, 1, 2)
+
+    res = client.get(f"/api/projects/{project_id}/ifc-diff?to_file_id={first.id}", headers=auth_headers)
+    assert res.status_code == 404
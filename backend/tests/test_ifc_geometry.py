@@ -0,0 +1,56 @@
+"""Tests for the cached IFC tessellation service (app.services.ifc_geometry)."""
+
+import numpy as np
+import pytest
+
+import app.services.ifc_geometry as ifc_geometry
+from app.services.ifc_geometry import file_sha256, get_element_meshes, get_geometry
+from tests.test_clash_detection import _ifc_with_clash
+
+
+@pytest.fixture
+def cache_dir(tmp_path, monkeypatch):
+    path = tmp_path / "geometry"
+    monkeypatch.setattr(ifc_geometry, "GEOMETRY_CACHE_DIR", path)
+    return path
+
+
+def test_second_analysis_skips_tessellation(tmp_path, cache_dir, monkeypatch):
+    model = tmp_path / "model.ifc"
+    wall_guid, duct_guid = _ifc_with_clash(model)
+
+    first = get_geometry(model)
+    assert len(first) == 3
+    assert (cache_dir / file_sha256(model) / "meta.json").exists()
+
+    def fail(*args, **kwargs):
+        raise AssertionError("teselare repetată")
+
+    monkeypatch.setattr(ifc_geometry, "tessellate_products", fail)
+    second = get_geometry(model)
+
+    wall = second.get(wall_guid)
+    assert wall.ifc_type == "IfcWall"
+    assert wall.discipline == "architecture"
+    np.testing.assert_allclose(wall.bbox_min, [0, 0, 0], atol=1e-9)
+    np.testing.assert_allclose(wall.bbox_max, [5, 0.3, 3], atol=1e-9)
+    np.testing.assert_allclose(wall.vertices, first.get(wall_guid).vertices, atol=1e-5)
+    assert wall.volume == pytest.approx(4.5, rel=1e-4)
+    assert wall.surface_area == pytest.approx(2 * (5 * 0.3 + 5 * 3 + 0.3 * 3), rel=1e-4)
+
+    ducts = get_element_meshes(model, include=lambda t: t == "IfcDuctSegment")
+    assert [m.guid for m in ducts] == [duct_guid]
+
+
+def test_cache_keeps_precision_for_georeferenced_coordinates(cache_dir):
+    sha = "0" * 64
+    v = np.array([[0, 0, 0], [1, 0, 0], [0, 1, 0], [0, 0, 1]], dtype=float) + [512_345.678, 4_812_345.123, 80.0]
+    mesh = ifc_geometry.ElementMesh(
+        "g" * 22, "IfcWall", "architecture", v,
+        np.array([[0, 1, 2], [0, 1, 3], [0, 2, 3], [1, 2, 3]]), v.min(0), v.max(0),
+    )
+    ifc_geometry._write_cache(sha, "IFC4", [mesh])
+
+    cached = ifc_geometry.load_geometry(sha).get("g" * 22)
+
+    np.testing.assert_allclose(cached.vertices, v, atol=1e-6, rtol=0)
@@ -0,0 +1,117 @@
+"""Tests for single-pass IFC summarization (app.services.ifc_parser)."""
+
+import ifcopenshell
+import ifcopenshell.guid
+
+from app.services.ifc_parser import _extract_summary, generate_model_summary_from_ifc
+
+
+def _model(schema="IFC4"):
+    f = ifcopenshell.file(schema=schema)
+    f.createIfcProject(ifcopenshell.guid.new(), Name="Bloc A")
+    f.createIfcApplication(ApplicationFullName="Revit", Version="2025")
+    return f
+
+
+def test_subtypes_count_toward_mapped_category():
+    f = _model()
+    for _ in range(3):
+        f.createIfcWallStandardCase(ifcopenshell.guid.new())
+    f.createIfcWall(ifcopenshell.guid.new())
+    f.createIfcDuctSegment(ifcopenshell.guid.new())
+    f.createIfcColumn(ifcopenshell.guid.new())
+
+    summary = _extract_summary(f)
+
+    counts = {c.name: c.element_count for c in summary.categories}
+    assert counts == {"IfcWall": 4, "IfcDuctSegment": 1, "IfcColumn": 1}
+    assert summary.disciplines_present == ["architecture", "mep", "structure"]
+    assert "Aplicație: Revit 2025" in summary.notes
+    assert "Proiect IFC: Bloc A" in summary.notes
+    assert summary.has_georeference is False
+
+
+def test_georeference_and_unmapped_products():
+    f = _model()
+    f.createIfcProjectedCRS(Name="EPSG:3844")
+    f.createIfcFurniture(ifcopenshell.guid.new())
+
+    summary = _extract_summary(f)
+
+    assert summary.has_georeference is True
+    assert summary.coordinate_system == "EPSG:3844"
+    assert summary.disciplines_present == ["other"]
+    assert summary.categories == []
+
+
+def test_round_trip_from_file(tmp_path):
+    f = _model("IFC2X3")
+    f.createIfcBeam(ifcopenshell.guid.new())
+    path = tmp_path / "model.ifc"
+    f.write(str(path))
+
+    summary = generate_model_summary_from_ifc(str(path))
+
+    assert summary.exchange_formats_available == ["ifc2x3"]
+    assert [c.name for c in summary.categories] == ["IfcBeam"]
+
+
+def test_step_scanner_matches_full_parse(tmp_path, monkeypatch):
+    import app.services.ifc_parser as ifc_parser
+
+    f = _model()
+    f.by_type("IfcProject")[0].Name = "Bloc Ș 'Nord'"
+    f.createIfcProjectedCRS(Name="EPSG:3844")
+    for _ in range(3):
+        f.createIfcWallStandardCase(ifcopenshell.guid.new())
+    f.createIfcDuctSegment(ifcopenshell.guid.new(), Name="#9=IFCWALL(")
+    f.createIfcFurniture(ifcopenshell.guid.new())
+    path = tmp_path / "model.ifc"
+    f.write(str(path))
+
+    monkeypatch.setattr(ifc_parser, "IFC_STEP_SCAN_THRESHOLD_MB", 0)
+    full = generate_model_summary_from_ifc(str(path))
+    monkeypatch.setattr(ifc_parser, "IFC_STEP_SCAN_THRESHOLD_MB", 1e-6)
+    scanned = generate_model_summary_from_ifc(str(path))
+
+    assert "scanare STEP" in scanned.notes
+    assert "Proiect IFC: Bloc Ș 'Nord'" in scanned.notes
+    assert scanned.model_dump(exclude={"notes"}) == full.model_dump(exclude={"notes"})
+    assert scanned.notes.startswith(full.notes)
+
+
+def test_step_scanner_windows_split_at_instance_boundaries(tmp_path, monkeypatch):
+    import app.services.ifc_step_scanner as ifc_step_scanner
+
+    f = _model()
+    for _ in range(50):
+        f.createIfcColumn(ifcopenshell.guid.new(), Name="C;#1=IFCWALL(")
+    path = tmp_path / "model.ifc"
+    f.write(str(path))
+
+    expected = ifc_step_scanner.scan_step_file(path).type_counts
+    monkeypatch.setattr(ifc_step_scanner, "_WINDOW_BYTES", 100)
+    assert ifc_step_scanner.scan_step_file(path).type_counts == expected
+    assert expected["IFCCOLUMN"] == 50
+    # „;#1=IFCWALL(” e în interiorul șirului Name, nu o instanță
+    assert "IFCWALL" not in expected
+
+
+def test_step_scanner_fails_fast_on_truncated_record(tmp_path):
+    import time
+
+    from app.services.ifc_step_scanner import scan_step_file
+
+    f = _model()
+    path = tmp_path / "model.ifc"
+    f.write(str(path))
+    text = path.read_text()
+    # Înregistrare cu multe '' și fără „;” final (trunchiată / invalidă)
+    broken = "#999=IFCWALL('" + "a''" * 40 + "',$,$)\n"
+    path.write_text(text.replace("ENDSEC;\nEND-ISO", broken + "ENDSEC;\nEND-ISO", 1))
+    assert broken in path.read_text()
+
+    started = time.monotonic()
+    counts = scan_step_file(path).type_counts
+    assert time.monotonic() - started < 1.0
+    assert counts["IFCPROJECT"] == 1
@@ -0,0 +1,175 @@
+"""Tests for out-of-process IFC parsing via the parse_ifc job and the IFC download."""
+
+import ifcopenshell
+import ifcopenshell.guid
+import pytest
+
+import gzip
+
+import app.services.ifc_geometry as ifc_geometry
+import app.services.job_queue as job_queue
+import app.services.upload_storage as upload_storage
+import app.services.viewer_geometry as viewer_geometry
+from app.models.sql_models import UploadedFileModel
+from app.repositories.projects_repository import save_uploaded_file
+from app.services.ifc_delivery import precompress_blob
+from app.services.ifc_geometry import file_sha256
+from app.services.ifc_parser import IFC_PARSER_VERSION
+from app.services.ifc_processing import IfcParseError, parse_ifc_many, parse_ifc_summary
+from app.services.ifc_reindex import reindex_ifc_models
+
+
+def _write_ifc(path):
+    f = ifcopenshell.file(schema="IFC4")
+    f.createIfcProject(ifcopenshell.guid.new(), Name="Bloc A")
+    f.createIfcWall(ifcopenshell.guid.new())
+    f.createIfcColumn(ifcopenshell.guid.new())
+    f.write(str(path))
+
+
+def test_import_returns_job_and_worker_saves_summary(client, auth_headers, project_id, tmp_path, monkeypatch):
+    monkeypatch.setattr(upload_storage, "BLOB_DIR", tmp_path / "blobs")
+    # Procesul copil (spawn) citește configurarea din mediu
+    monkeypatch.setenv("ELEMENT_STORE_DIR", str(tmp_path / "elements"))
+    monkeypatch.setenv("GEOMETRY_CACHE_DIR", str(tmp_path / "geometry"))
+    monkeypatch.setenv("VIEWER_GEOMETRY_DIR", str(tmp_path / "viewer"))
+    monkeypatch.setattr(ifc_geometry, "GEOMETRY_CACHE_DIR", tmp_path / "geometry")
+    monkeypatch.setattr(viewer_geometry, "VIEWER_GEOMETRY_DIR", tmp_path / "viewer")
+    source = tmp_path / "model.ifc"
+    _write_ifc(source)
+
+    with open(source, "rb") as fh:
+        res = client.post(
+            f"/api/projects/{project_id}/import-ifc",
+            files={"file": ("model.ifc", fh, "application/octet-stream")},
+            headers=auth_headers,
+        )
+    assert res.status_code == 202
+    job = res.json()
+    assert job["job_type"] == "parse_ifc"
+    assert job["status"] == "queued"
+
+    worker = job_queue.JobWorker(concurrency=1, poll_interval=0.01, name="test-worker")
+    assert worker.run_once() is True
+
+    job = client.get(f"/api/jobs/{job['id']}", headers=auth_headers).json()
+    assert job["status"] == "succeeded"
+    summary = job["result"]["summary"]
+    assert summary["disciplines_present"] == ["architecture", "structure"]
+    # Același proces de parsare a construit și store-ul de elemente
+    assert len(list((tmp_path / "elements").glob("*/meta.json"))) == 1
+    # Apoi, cu prioritate mai mică, geometria viewer-ului și variantele comprimate
+    assert worker.run_once() is True
+    assert len(list((tmp_path / "viewer").glob("*/manifest.json"))) == 1
+    assert worker.run_once() is True
+    assert len(list((tmp_path / "blobs").glob("*/*.ifc.gz"))) == 1
+
+    info = client.get(f"/api/projects/{project_id}/ifc-info", headers=auth_headers).json()
+    assert info["filename"] == "model.ifc"
+    assert info["summary"] == summary
+
+    # Re-upload identic: summary reutilizat imediat, blob stocat o singură dată
+    with open(source, "rb") as fh:
+        res = client.post(
+            f"/api/projects/{project_id}/import-ifc",
+            files={"file": ("copie.ifc", fh, "application/octet-stream")},
+            headers=auth_headers,
+        )
+    assert res.status_code == 200
+    again = res.json()
+    assert again["status"] == "succeeded"
+    assert again["result"]["summary"] == summary
+    assert again["result"]["reused_from"] == job["result"]["uploaded_file_id"]
+    assert len(list((tmp_path / "blobs").glob("*/*.ifc"))) == 1
+    assert worker.run_once() is False
+
+
+def test_parse_timeout_raises(tmp_path):
+    path = tmp_path / "model.ifc"
+    _write_ifc(path)
+
+    with pytest.raises(IfcParseError):
+        parse_ifc_summary(str(path), timeout=0.01)
+
+    # Pool-ul e recreat după timeout
+    assert parse_ifc_summary(str(path))["source"] == "ifc"
+
+
+def test_parse_many_applies_per_file_timeout(tmp_path):
+    paths = [tmp_path / f"m{i}.ifc" for i in range(3)]
+    for path in paths:
+        _write_ifc(path)
+    files = [(str(p), None) for p in paths]
+
+    results = list(parse_ifc_many(files, workers=2, timeout=0.01))
+    assert sorted(path for path, _, _ in results) == sorted(p for p, _ in files)
+    assert all(isinstance(r, IfcParseError) for _, _, r in results)
+
+    results = list(parse_ifc_many(files, workers=2))
+    assert all(r["source"] == "ifc" for _, _, r in results)
+
+
+def test_reindex_only_reprocesses_stale_parser_versions(db_session, project_id, tmp_path, monkeypatch):
+    monkeypatch.setenv("ELEMENT_STORE_DIR", str(tmp_path / "elements"))
+    first, second = tmp_path / "a.ifc", tmp_path / "b.ifc"
+    _write_ifc(first)
+    _write_ifc(second)
+    # Două upload-uri cu același conținut, unul fără hash (anterior deduplicării)
+    for name, path, sha in (("a.ifc", first, None), ("a2.ifc", first, None), ("b.ifc", second, None)):
+        save_uploaded_file(
+            db_session, project_id=project_id, filename=name, file_path=str(path),
+            parsed_summary_json={"source": "ifc", "notes": "vechi"}, content_sha256=sha,
+        )
+    save_uploaded_file(
+        db_session, project_id=project_id, filename="c.ifc", file_path=str(tmp_path / "lipsa.ifc"),
+        content_sha256="f" * 64, parser_version="0.old",
+    )
+    db_session.commit()
+
+    result = reindex_ifc_models(db_session, workers=2)
+
+    assert (result["models"], result["reindexed"], result["uploads_updated"]) == (3, 2, 3)
+    assert result["missing_files"] == 1
+    uploads = db_session.query(UploadedFileModel).filter(UploadedFileModel.filename != "c.ifc").all()
+    assert {u.parser_version for u in uploads} == {IFC_PARSER_VERSION}
+    assert all(u.parsed_summary_json["disciplines_present"] == ["architecture", "structure"] for u in uploads)
+    assert len(list((tmp_path / "elements").glob("*/meta.json"))) == 2
+
+    again = reindex_ifc_models(db_session, workers=2)
+    assert (again["models"], again["reindexed"]) == (1, 0)
+
+
+def test_ifc_download_etag_range_and_gzip_variant(client, auth_headers, db_session, project_id, tmp_path):
+    source = tmp_path / "model.ifc"
+    _write_ifc(source)
+    sha = file_sha256(source)
+    save_uploaded_file(db_session, project_id=project_id, filename="model.ifc", file_path=str(source))
+    db_session.commit()
+    url = f"/api/projects/{project_id}/ifc-file"
+    raw = source.read_bytes()
+
+    # Fără variante: blob-ul, cu ETag din hash (calculat și salvat pentru upload-ul vechi)
+    res = client.get(url, headers={**auth_headers, "Accept-Encoding": "gzip"})
+    assert res.status_code == 200
+    assert res.headers["etag"] == f'"{sha}"'
+    assert "content-encoding" not in res.headers
+    assert res.content == raw
+
+    res = client.get(url, headers={**auth_headers, "If-None-Match": f'"{sha}"'})
+    assert res.status_code == 304
+    assert res.content == b""
+
+    res = client.get(url, headers={**auth_headers, "Range": "bytes=0-9"})
+    assert res.status_code == 206
+    assert res.content == raw[:10]
+
+    assert precompress_blob(source)["created"][-1] == "gzip"
+    res = client.get(url, headers={**auth_headers, "Accept-Encoding": "gzip"})
+    assert res.headers["content-encoding"] == "gzip"
+    assert res.headers["etag"] == f'"{sha}-gz"'
+    assert gzip.decompress((tmp_path / "model.ifc.gz").read_bytes()) == raw
+    assert res.content == raw  # clientul decomprimă transparent
+    # Range ignoră varianta comprimată
+    res = client.get(url, headers={**auth_headers, "Accept-Encoding": "gzip", "Range": "bytes=5-9"})
+    assert (res.status_code, res.content) == (206, raw[5:10])
+    assert precompress_blob(source)["created"] == []
@@ -0,0 +1,102 @@
+"""Tests for the one-shot ISO 19650 artifact pipeline (LLM calls mocked)."""
+
+import json
+import threading
+
+import app.services.iso_pipeline as iso_pipeline
+from app.models.sql_models import (
+    DeliverableModel,
+    EirModel,
+    HandoverChecklistModel,
+    LoinEntryModel,
+    ProjectContextModel,
+    RaciEntryModel,
+    SecurityClassificationModel,
+)
+
+_RESPONSES = {
+    "EIR": {"information_requirements": [{"category": "geometry", "requirement": "IFC4"}]},
+    "TIDP": {"deliverables": [{"title": "Model ARH", "discipline": "arhitectura"}]},
+    "RACI": {"entries": [{"task_name": "BEP", "role_code": "BIM_MGR", "assignment": "A"}]},
+    "LOIN": {"entries": [{"element_type": "IfcWall", "discipline": "arhitectura"}]},
+    "handover": {"items": [{"item_name": "Model as-built", "category": "modele_as_built"}]},
+    "ISO 19650-5": {"security_triage": {"sensitivity_level": "standard"}},
+}
+
+
+def _parse_events(body: str) -> list[tuple[str, dict]]:
+    events = []
+    for block in body.strip().split("\n\n"):
+        lines = block.split("\n")
+        events.append((lines[0].removeprefix("event: "), json.loads(lines[1].removeprefix("data: "))))
+    return events
+
+
+def _seed_context(db_session, project_id):
+    db_session.add(ProjectContextModel(
+        project_id=project_id,
+        context_json={"project_name": "Test Project", "disciplines": ["arhitectura", "structura"]},
+    ))
+    db_session.commit()
+
+
+def _fake_llm(monkeypatch, fail_on: str | None = None):
+    # Toate cele 6 apeluri trebuie să fie în zbor simultan ca bariera să cedeze
+    barrier = threading.Barrier(len(iso_pipeline.ISO_ARTIFACTS), timeout=5)
+
+    def fake(_db, *, context, question, max_tokens, validate):
+        barrier.wait()
+        key = next(k for k in _RESPONSES if k in question.split("\n")[0])
+        if key == fail_on:
+            raise RuntimeError("LLM indisponibil")
+        return json.dumps(_RESPONSES[key])
+
+    monkeypatch.setattr(iso_pipeline, "cached_call_llm_chat_expert", fake)
+
+
+def test_pipeline_generates_all_artifacts_concurrently(client, auth_headers, project_id, db_session, monkeypatch):
+    _seed_context(db_session, project_id)
+    _fake_llm(monkeypatch)
+
+    res = client.post(
+        f"/api/projects/{project_id}/generate-iso-artifacts/stream", headers=auth_headers,
+    )
+    assert res.status_code == 200
+    events = _parse_events(res.text)
+    names = [e for e, _ in events]
+    assert names[0] == "pipeline_started"
+    assert names.count("artifact_done") == 6
+    done = events[-1][1]
+    assert done["success"] is True and done["committed"] is True
+    assert set(done["results"]) == set(iso_pipeline.ISO_ARTIFACTS)
+
+    for model in (EirModel, DeliverableModel, RaciEntryModel, LoinEntryModel,
+                  HandoverChecklistModel, SecurityClassificationModel):
+        assert db_session.query(model).filter_by(project_id=project_id).count() == 1
+
+
+def test_pipeline_failure_persists_nothing(client, auth_headers, project_id, db_session, monkeypatch):
+    _seed_context(db_session, project_id)
+    _fake_llm(monkeypatch, fail_on="LOIN")
+
+    res = client.post(
+        f"/api/projects/{project_id}/generate-iso-artifacts/stream", headers=auth_headers,
+    )
+    events = _parse_events(res.text)
+    failed = [d for e, d in events if e == "artifact_failed"]
+    assert [d["artifact"] for d in failed] == ["loin"]
+    done = events[-1][1]
+    assert done["success"] is False and done["committed"] is False
+    assert "loin" in done["errors"]
+
+    for model in (EirModel, DeliverableModel, RaciEntryModel, LoinEntryModel,
+                  HandoverChecklistModel, SecurityClassificationModel):
+        assert db_session.query(model).filter_by(project_id=project_id).count() == 0
+
+
+def test_pipeline_requires_project_context(client, auth_headers, project_id):
+    res = client.post(
+        f"/api/projects/{project_id}/generate-iso-artifacts", headers=auth_headers,
+    )
+    assert res.status_code == 200
+    assert "error" in res.json()
@@ -0,0 +1,115 @@
+"""Tests for the DB-backed background job queue (handlers mocked)."""
+
+import datetime
+import json
+
+import app.services.job_queue as job_queue
+from app.services.job_handlers import JOB_HANDLERS
+from app.models.sql_models import JobModel, KpiMeasurementModel
+
+
+def _worker():
+    return job_queue.JobWorker(concurrency=1, poll_interval=0.01, name="test-worker")
+
+
+def test_enqueue_returns_immediately_and_worker_runs_job(client, auth_headers, project_id, monkeypatch):
+    monkeypatch.setitem(JOB_HANDLERS, "generate_eir", lambda db, payload, ctx: {
+        "success": True, "project_id": payload["project_id"],
+    })
+
+    res = client.post(
+        f"/api/projects/{project_id}/jobs",
+        json={"job_type": "generate_eir"}, headers=auth_headers,
+    )
+    assert res.status_code == 202
+    job = res.json()
+    assert job["status"] == "queued"
+
+    assert _worker().run_once() is True
+
+    res = client.get(f"/api/jobs/{job['id']}", headers=auth_headers)
+    assert res.json()["status"] == "succeeded"
+    assert res.json()["result"] == {"success": True, "project_id": project_id}
+
+    res = client.get(f"/api/jobs/{job['id']}/events", headers=auth_headers)
+    event, data = res.text.strip().split("\n")
+    assert event == "event: done"
+    assert json.loads(data.removeprefix("data: "))["job"]["status"] == "succeeded"
+
+
+def test_unknown_job_type_rejected(client, auth_headers, project_id):
+    res = client.post(
+        f"/api/projects/{project_id}/jobs",
+        json={"job_type": "nope"}, headers=auth_headers,
+    )
+    assert res.status_code == 400
+
+
+def test_jobs_run_in_priority_order(db_session, project_id, monkeypatch):
+    order = []
+    monkeypatch.setitem(JOB_HANDLERS, "generate_raci", lambda db, p, ctx: order.append(p["tag"]) or {})
+
+    job_queue.enqueue_job(db_session, "generate_raci", {"tag": "low"}, project_id=project_id, priority=200)
+    job_queue.enqueue_job(db_session, "generate_raci", {"tag": "high"}, project_id=project_id, priority=10)
+    db_session.commit()
+
+    worker = _worker()
+    while worker.run_once():
+        pass
+    assert order == ["high", "low"]
+
+
+def test_failed_attempt_rolls_back_and_retries(db_session, project_id, monkeypatch):
+    monkeypatch.setattr(job_queue, "JOB_RETRY_BASE_SECONDS", 0)
+    calls = []
+
+    def flaky(db, payload, ctx):
+        calls.append(1)
+        db.add(KpiMeasurementModel(
+            project_id=payload["project_id"], kpi_name="x", category="test",
+            value=1.0, measurement_date=datetime.date.today(),
+        ))
+        db.flush()
+        if len(calls) == 1:
+            raise RuntimeError("LLM timeout")
+        return {"success": True}
+
+    monkeypatch.setitem(JOB_HANDLERS, "generate_loin", flaky)
+    job = job_queue.enqueue_job(db_session, "generate_loin", project_id=project_id, max_attempts=2)
+    db_session.commit()
+
+    worker = _worker()
+    assert worker.run_once() is True
+    db_session.expire_all()
+    job = db_session.get(JobModel, job.id)
+    assert job.status == "queued" and job.attempts == 1 and "LLM timeout" in job.error
+    assert db_session.query(KpiMeasurementModel).count() == 0
+
+    assert worker.run_once() is True
+    db_session.expire_all()
+    assert db_session.get(JobModel, job.id).status == "succeeded"
+    assert db_session.query(KpiMeasurementModel).count() == 1
+
+
+def test_cancel_queued_job(client, auth_headers, project_id):
+    res = client.post(
+        f"/api/projects/{project_id}/jobs",
+        json={"job_type": "generate_tidp"}, headers=auth_headers,
+    )
+    job_id = res.json()["id"]
+
+    res = client.post(f"/api/jobs/{job_id}/cancel", headers=auth_headers)
+    assert res.json()["status"] == "cancelled"
+    assert _worker().run_once() is False
+
+
+def test_stale_running_job_is_requeued(db_session, project_id):
+    job = job_queue.enqueue_job(db_session, "generate_handover", project_id=project_id)
+    job.status = "running"
+    job.attempts = 1
+    job.heartbeat_at = datetime.datetime.now(datetime.timezone.utc) - datetime.timedelta(hours=1)
+    db_session.commit()
+
+    assert job_queue.requeue_stale_jobs(db_session, stale_after=60) == 1
+    db_session.expire_all()
+    assert db_session.get(JobModel, job.id).status == "queued"
@@ -0,0 +1,84 @@
+"""Tests for the DB-backed LLM response cache (app.services.llm_cache)."""
+
+import datetime
+
+from sqlalchemy import text
+
+from app.models.sql_models import LlmResponseCacheModel
+from app.services import llm_cache
+from app.services.json_utils import is_json_response
+
+
+def _fake_llm(monkeypatch, responses):
+    calls = []
+
+    def fake(context, question, *, max_tokens=2048):
+        calls.append((context, question, max_tokens))
+        return responses[len(calls) - 1]
+
+    monkeypatch.setattr(llm_cache, "call_llm_chat_expert", fake)
+    return calls
+
+
+def test_identical_request_is_served_from_cache(db_session, monkeypatch):
+    calls = _fake_llm(monkeypatch, ['{"a": 1}', '{"a": 2}'])
+
+    first = llm_cache.cached_call_llm_chat_expert(db_session, "ctx", "q", max_tokens=100)
+    second = llm_cache.cached_call_llm_chat_expert(db_session, "ctx", "q", max_tokens=100)
+    third = llm_cache.cached_call_llm_chat_expert(db_session, "ctx", "q", max_tokens=200)
+
+    assert first == second == '{"a": 1}'
+    assert third == '{"a": 2}'
+    assert len(calls) == 2
+    entry = db_session.query(LlmResponseCacheModel).filter_by(response_text='{"a": 1}').one()
+    assert entry.hit_count == 1
+
+
+def test_invalid_response_is_not_cached(db_session, monkeypatch):
+    calls = _fake_llm(monkeypatch, ["nu e json", '{"ok": true}', '{"ok": false}'])
+
+    for _ in range(3):
+        llm_cache.cached_call_llm_chat_expert(
+            db_session, "ctx", "q", validate=is_json_response,
+        )
+
+    assert len(calls) == 2
+    assert db_session.query(LlmResponseCacheModel).count() == 1
+
+
+def test_expired_entry_triggers_new_call(db_session, monkeypatch):
+    calls = _fake_llm(monkeypatch, ["v1", "v2"])
+
+    llm_cache.cached_call_llm_chat_expert(db_session, "ctx", "q")
+    entry = db_session.query(LlmResponseCacheModel).one()
+    entry.expires_at = datetime.datetime.now(datetime.timezone.utc) - datetime.timedelta(seconds=1)
+    db_session.flush()
+
+    assert llm_cache.cached_call_llm_chat_expert(db_session, "ctx", "q") == "v2"
+    assert len(calls) == 2
+
+
+def test_lru_eviction_keeps_most_recent(db_session, monkeypatch):
+    monkeypatch.setattr(llm_cache, "LLM_CACHE_MAX_ENTRIES", 2)
+    _fake_llm(monkeypatch, ["r1", "r2", "r3"])
+
+    for question in ("q1", "q2", "q3"):
+        llm_cache.cached_call_llm_chat_expert(db_session, "ctx", question)
+
+    remaining = {e.response_text for e in db_session.query(LlmResponseCacheModel).all()}
+    assert remaining == {"r2", "r3"}
+
+
+def test_failed_cache_read_keeps_session_usable(db_session, monkeypatch):
+    calls = _fake_llm(monkeypatch, ['{"a": 1}'])
+    llm_cache.store_response(db_session, "alt", "model", "neatins")
+
+    def broken_read(db, cache_key):
+        db.execute(text("SELECT * FROM tabela_inexistenta"))
+
+    monkeypatch.setattr(llm_cache, "get_cached_response", broken_read)
+    assert llm_cache.cached_call_llm_chat_expert(db_session, "ctx", "q") == '{"a": 1}'
+
+    assert len(calls) == 1
+    # Doar citirea e anulată: lucrul anterior al sesiunii și scrierea în cache rămân
+    assert {e.response_text for e in db_session.query(LlmResponseCacheModel)} == {"neatins", '{"a": 1}'}
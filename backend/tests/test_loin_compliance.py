@@ -0,0 +1,98 @@
+"""Tests for the vectorized LOIN compliance check (app.services.loin_compliance)."""
+
+import pytest
+
+import app.services.element_store as element_store
+from app.models.sql_models import LoinEntryModel
+from app.repositories.projects_repository import save_uploaded_file
+from app.services.element_store import build_element_store, load_element_store
+from app.services.loin_compliance import _key_index, check_loin_compliance, parse_loin_requirements
+from tests.test_element_store import _ifc_with_properties
+
+
+@pytest.fixture(autouse=True)
+def store_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(element_store, "ELEMENT_STORE_DIR", tmp_path / "elements")
+
+
+def _entry(element_type, information_content, phase="design"):
+    return LoinEntryModel(
+        project_id=1, element_type=element_type, discipline="architecture",
+        phase=phase, information_content=information_content,
+    )
+
+
+def test_requirements_parsed_from_free_text(tmp_path):
+    model = tmp_path / "model.ifc"
+    _ifc_with_properties(model)
+    build_element_store(model, "loin")
+    index = _key_index(load_element_store("loin"))
+
+    text = "Nume, material, rezistență la foc (fire rating → FireRating), IsExternal, AcousticRating"
+    assert parse_loin_requirements(text, index, "IFC4") == ["FireRating", "IsExternal"]
+    assert parse_loin_requirements("Pset_WallCommon; Name", index, "IFC4") == ["Pset_WallCommon", "name"]
+    assert parse_loin_requirements("Pset_DoorCommon.FireExit", index, "IFC4") == ["Pset_DoorCommon.FireExit"]
+
+
+def test_ifc_entity_and_product_names_are_not_requirements(tmp_path):
+    model = tmp_path / "model.ifc"
+    _ifc_with_properties(model)
+    build_element_store(model, "loin")
+    store = load_element_store("loin")
+    text = "IfcWall / IfcDuctSegment modelate în ArchiCAD: FireRating, IfcWall.Name"
+
+    assert parse_loin_requirements(text, _key_index(store), store.schema_name) == ["FireRating"]
+    walls = check_loin_compliance(store, [_entry("IfcWall", text)])["element_types"][0]
+    assert [r["requirement"] for r in walls["requirements"]] == ["FireRating"]
+    assert walls["compliance_rate"] == 100.0
+
+
+def test_fill_rates_and_failing_guids(tmp_path):
+    model = tmp_path / "model.ifc"
+    guids = _ifc_with_properties(model)
+    build_element_store(model, "loin")
+    store = load_element_store("loin")
+
+    result = check_loin_compliance(store, [
+        _entry("IfcWall", "FireRating, LoadBearing"),
+        _entry("IfcWall", "Length", phase="construction"),
+        _entry("IfcDoor", "FireRating"),
+        _entry("IfcWindow", "FireRating"),
+    ])
+
+    doors, walls = result["element_types"]
+    assert walls["phases"] == ["construction", "design"]
+    assert walls["elements"] == 3
+    assert {r["requirement"]: r["fill_rate"] for r in walls["requirements"]} == {
+        "FireRating": 100.0, "LoadBearing": 33.3, "Length": 100.0,
+    }
+    assert walls["compliant_elements"] == 1
+    assert set(walls["failing_guids"]) == {guids["W1"], guids["W3"]}
+    assert doors["compliance_rate"] == 100.0
+    assert result["not_in_model"] == ["IfcWindow"]
+    assert result["elements_checked"] == 4
+    assert result["compliant_elements"] == 2
+
+
+def test_compliance_endpoint(client, auth_headers, db_session, project_id, tmp_path):
+    model = tmp_path / "model.ifc"
+    _ifc_with_properties(model)
+    build_element_store(model, "loin")
+    save_uploaded_file(
+        db_session, project_id=project_id, filename="model.ifc",
+        file_path=str(model), content_sha256="loin",
+    )
+    db_session.add(LoinEntryModel(
+        project_id=project_id, element_type="IfcColumn", discipline="structure",
+        phase="design", information_content="LoadBearing, FireRating",
+    ))
+    db_session.commit()
+
+    res = client.get(f"/api/projects/{project_id}/loin/compliance", headers=auth_headers)
+    assert res.status_code == 200
+    column = res.json()["element_types"][0]
+    assert column["ifc_type"] == "IfcColumn"
+    assert column["compliance_rate"] == 0.0
+
+    res = client.get(f"/api/projects/{project_id}/loin/compliance?phase=handover", headers=auth_headers)
+    assert res.status_code == 404
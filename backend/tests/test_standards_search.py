@@ -0,0 +1,104 @@
+"""Tests for the query cache and batched retrieval in app.services.standards_search."""
+
+import numpy as np
+import pytest
+
+import app.services.standards_search as standards_search
+from app.services.bm25_index import build_bm25_index, load_bm25_index
+from app.services.standards_search import _TTLCache, search_standards, search_standards_batch
+
+
+class _Encoder:
+    def __init__(self):
+        self.calls = []
+
+    def encode(self, texts):
+        self.calls.append(list(texts))
+        return np.array([[float(len(t)), 1.0] for t in texts])
+
+
+class _Collection:
+    def __init__(self):
+        self.calls = []
+
+    def query(self, query_embeddings, n_results):
+        self.calls.append(len(query_embeddings))
+        return {
+            "ids": [[f"id{int(e[0])}"] for e in query_embeddings],
+            "documents": [[f"doc {int(e[0])}"] for e in query_embeddings],
+            "metadatas": [[{"source": "ISO 19650-2"}] for _ in query_embeddings],
+            "distances": [[0.25] for _ in query_embeddings],
+        }
+
+
+@pytest.fixture
+def chroma(monkeypatch):
+    encoder, collection = _Encoder(), _Collection()
+    monkeypatch.setattr(standards_search, "_initialized", True)
+    monkeypatch.setattr(standards_search, "_embed_model", encoder)
+    monkeypatch.setattr(standards_search, "_collection", collection)
+    monkeypatch.setattr(standards_search, "_bm25", None)
+    monkeypatch.setattr(standards_search, "_embedding_cache", _TTLCache(16, 60))
+    monkeypatch.setattr(standards_search, "_result_cache", _TTLCache(16, 60))
+    return encoder, collection
+
+
+def test_batch_encodes_once_and_issues_one_query(chroma):
+    encoder, collection = chroma
+
+    results = search_standards_batch(["CDE", "plan BEP", "  cde "], n_results=3)
+
+    # Interogările duplicate (după normalizare) sunt codificate o singură dată,
+    # cu textul original al primei apariții (modelul e sensibil la majuscule)
+    assert encoder.calls == [["CDE", "plan BEP"]]
+    assert collection.calls == [2]
+    assert [r[0]["text"] for r in results] == ["doc 3", "doc 8", "doc 3"]
+    assert results[0][0]["relevance_score"] == 0.75
+
+
+def test_repeated_queries_are_served_from_cache(chroma):
+    encoder, collection = chroma
+    first = search_standards("Clash detection", n_results=3)
+
+    first[0]["text"] = "modificat de apelant"
+    again = search_standards("clash   DETECTION", n_results=3)
+    mixed = search_standards_batch(["clash detection", "LOIN"], n_results=3)
+
+    assert again[0]["text"] == "doc 15"
+    assert mixed[0] == again
+    assert encoder.calls == [["Clash detection"], ["LOIN"]]
+    assert collection.calls == [1, 1]
+
+
+def test_hybrid_fuses_vector_and_bm25_rankings(chroma, tmp_path, monkeypatch):
+    build_bm25_index([
+        {"id": "id8", "text": "Planul BEP și responsabilitățile", "source": "BEP.pdf"},
+        {"id": "rtc8", "text": "RTC 8 privind proiectarea construcțiilor", "source": "RTC8.pdf", "page": 3},
+    ], tmp_path / "bm25")
+    monkeypatch.setattr(standards_search, "_bm25", load_bm25_index(tmp_path / "bm25"))
+
+    # Vectorial: „id8” pentru „plan bep”, „id5” pentru „rtc 8”; lexical: „rtc8”
+    results = search_standards_batch(["plan BEP", "RTC 8"], n_results=2)
+
+    assert [r["source"] for r in results[0]] == ["ISO 19650-2"]
+    assert results[0][0]["keyword_score"] > 0  # găsit de ambele clasamente
+    # Fragmentul RTC 8 intră în rezultate doar prin clasamentul BM25
+    assert [r["source"] for r in results[1]] == ["ISO 19650-2", "RTC8.pdf"]
+    assert results[1][1]["relevance_score"] == 0
+    assert results[1][1]["keyword_score"] > 0
+    assert results[1][0]["fused_score"] == results[1][1]["fused_score"]
+
+
+def test_ttl_cache_expires_and_evicts_lru(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(standards_search.time, "monotonic", lambda: now[0])
+    cache = _TTLCache(max_entries=2, ttl_seconds=10)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)  # "b" e cel mai vechi folosit
+    assert (cache.get("b"), cache.get("a"), cache.get("c")) == (None, 1, 3)
+
+    now[0] += 11
+    assert cache.get("a") is None
+    assert len(cache) == 1
@@ -0,0 +1,53 @@
+"""Tests for streaming uploads to disk (app.services.upload_storage)."""
+
+import asyncio
+import hashlib
+import io
+
+import pytest
+from fastapi import UploadFile
+
+import app.api.model_import as model_import
+import app.services.upload_storage as upload_storage
+from app.services.upload_storage import UploadTooLargeError, stream_upload_to_disk
+
+
+def _upload(data: bytes) -> UploadFile:
+    return UploadFile(file=io.BytesIO(data), filename="model.ifc")
+
+
+def test_stream_writes_file_and_hash(tmp_path, monkeypatch):
+    monkeypatch.setattr(upload_storage, "UPLOAD_CHUNK_BYTES", 7)
+    data = b"ISO-10303-21;" * 100
+    dest = tmp_path / "sub" / "model.ifc"
+
+    stored = asyncio.run(stream_upload_to_disk(_upload(data), dest, max_bytes=10_000))
+
+    assert dest.read_bytes() == data
+    assert stored.size_bytes == len(data)
+    assert stored.sha256 == hashlib.sha256(data).hexdigest()
+    assert list(dest.parent.iterdir()) == [dest]
+
+
+def test_stream_over_limit_leaves_nothing(tmp_path, monkeypatch):
+    monkeypatch.setattr(upload_storage, "UPLOAD_CHUNK_BYTES", 16)
+    dest = tmp_path / "model.ifc"
+
+    with pytest.raises(UploadTooLargeError):
+        asyncio.run(stream_upload_to_disk(_upload(b"x" * 100), dest, max_bytes=50))
+
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_import_ifc_over_limit_returns_413(client, auth_headers, project_id, tmp_path, monkeypatch):
+    monkeypatch.setattr(upload_storage, "BLOB_DIR", tmp_path)
+    monkeypatch.setattr(model_import, "IFC_MAX_UPLOAD_MB", 0)
+
+    res = client.post(
+        f"/api/projects/{project_id}/import-ifc",
+        files={"file": ("model.ifc", b"ISO-10303-21;", "application/octet-stream")},
+        headers=auth_headers,
+    )
+
+    assert res.status_code == 413
+    assert list(tmp_path.rglob("*.ifc")) == []
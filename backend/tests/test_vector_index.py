@@ -0,0 +1,70 @@
+"""Tests for the NumPy vector index (app.services.vector_index)."""
+
+import numpy as np
+import pytest
+
+import app.services.vector_index as vector_index
+from app.services.vector_index import build_vector_index, load_vector_index, parity_report
+
+
+class _ExactSearch:
+    """Referința: top-k cosinus exact în float32 (ca o colecție Chroma ideală)."""
+
+    def __init__(self, ids, embeddings):
+        self.ids = ids
+        self.vectors = embeddings / np.linalg.norm(embeddings, axis=1, keepdims=True)
+
+    def query(self, query_embeddings, n_results):
+        q = np.asarray(query_embeddings, dtype=np.float32)
+        q /= np.linalg.norm(q, axis=1, keepdims=True)
+        order = np.argsort(-(q @ self.vectors.T), axis=1)[:, :n_results]
+        return {"ids": [[self.ids[i] for i in row] for row in order]}
+
+
+def _corpus(n=500, dim=32, seed=0):
+    rng = np.random.default_rng(seed)
+    embeddings = rng.normal(size=(n, dim)).astype(np.float32)
+    ids = [f"chunk{i}" for i in range(n)]
+    docs = [f"fragment {i}" for i in range(n)]
+    metas = [{"source": f"doc{i % 7}.pdf", "page": i % 13, "category": "ISO 19650", "lang": "ro"} for i in range(n)]
+    return ids, embeddings, docs, metas
+
+
+def test_query_matches_chroma_result_shape(tmp_path):
+    ids, embeddings, docs, metas = _corpus()
+    meta = build_vector_index(ids, embeddings, docs, metas, tmp_path / "vectors")
+    assert (meta["count"], meta["dim"], meta["dtype"]) == (500, 32, "float16")
+    index = load_vector_index(tmp_path / "vectors")
+
+    result = index.query(query_embeddings=[embeddings[42].tolist(), embeddings[7].tolist()], n_results=3,
+                         include=["documents", "metadatas", "distances"])
+
+    assert [r[0] for r in result["ids"]] == ["chunk42", "chunk7"]
+    assert result["documents"][0][0] == "fragment 42"
+    assert result["metadatas"][0][0] == {"source": "doc0.pdf", "page": 3, "category": "ISO 19650", "lang": "ro"}
+    assert result["distances"][0][0] == pytest.approx(0.0, abs=1e-3)
+    assert result["distances"][0] == sorted(result["distances"][0])
+    assert index.count() == 500
+    assert load_vector_index(tmp_path / "lipsa") is None
+
+
+@pytest.mark.parametrize("dtype, min_recall", [("float16", 0.99), ("int8", 0.9)])
+def test_blocked_topk_parity_with_exact_search(tmp_path, monkeypatch, dtype, min_recall):
+    # Blocuri mici: top-k e combinat peste mai multe blocuri
+    monkeypatch.setattr(vector_index, "VECTOR_BLOCK_ROWS", 64)
+    ids, embeddings, docs, metas = _corpus()
+    build_vector_index(ids, embeddings, docs, metas, tmp_path / dtype, dtype=dtype)
+    index = load_vector_index(tmp_path / dtype)
+    queries = np.random.default_rng(1).normal(size=(40, 32))
+
+    report = parity_report(_ExactSearch(ids, embeddings), index, queries, n_results=10)
+
+    assert report["queries"] == 40
+    assert report["recall_at_k"] >= min_recall
+    assert report["candidate_latency"]["mean_ms"] > 0
+
+
+def test_unknown_dtype_is_rejected(tmp_path):
+    ids, embeddings, docs, metas = _corpus(n=3)
+    with pytest.raises(ValueError):
+        build_vector_index(ids, embeddings, docs, metas, tmp_path / "v", dtype="float64")
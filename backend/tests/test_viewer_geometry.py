@@ -0,0 +1,121 @@
+"""Tests for the precomputed viewer geometry (app.services.viewer_geometry)."""
+
+import json
+import struct
+
+import numpy as np
+import pytest
+
+import app.services.ifc_geometry as ifc_geometry
+import app.services.ifc_parser as ifc_parser
+import app.services.job_queue as job_queue
+import app.services.viewer_geometry as viewer_geometry
+from app.repositories.projects_repository import save_uploaded_file
+from app.services.ifc_geometry import file_sha256
+from app.services.viewer_geometry import build_viewer_geometry, encode_glb
+from tests.test_clash_detection import _write_revision
+
+WALL = ("0WALL0000000000000000A", "IfcWall", (100, 200, 0), 5, 0.3, 3)
+BEAM = ("0BEAM0000000000000000A", "IfcBeam", (100, 200, 3), 5, 0.3, 0.4)
+DUCT = ("0DUCT0000000000000000A", "IfcDuctSegment", (101, 199, 1), 0.4, 3, 0.4)
+
+
+@pytest.fixture(autouse=True)
+def geometry_dirs(tmp_path, monkeypatch):
+    # Procesul copil (spawn) al job-ului citește configurarea din mediu
+    monkeypatch.setenv("GEOMETRY_CACHE_DIR", str(tmp_path / "geometry"))
+    monkeypatch.setenv("VIEWER_GEOMETRY_DIR", str(tmp_path / "viewer"))
+    monkeypatch.setattr(ifc_geometry, "GEOMETRY_CACHE_DIR", tmp_path / "geometry")
+    monkeypatch.setattr(viewer_geometry, "VIEWER_GEOMETRY_DIR", tmp_path / "viewer")
+
+
+def _read_glb(data: bytes) -> tuple[dict, bytes]:
+    magic, version, total = struct.unpack_from("<III", data)
+    assert (magic, version, total) == (0x46546C67, 2, len(data))
+    json_len, _ = struct.unpack_from("<II", data, 12)
+    gltf = json.loads(data[20:20 + json_len])
+    bin_len, _ = struct.unpack_from("<II", data, 20 + json_len)
+    return gltf, data[28 + json_len:28 + json_len + bin_len]
+
+
+def test_encode_glb_layout():
+    positions = np.array([[0, 0, 0], [1, 0, 0], [0, 1, 0]], dtype=np.float32)
+    data = encode_glb(
+        positions, np.zeros(3, dtype=np.float32), np.array([0, 1, 2]),
+        name="mep", color=(1, 0, 0, 1), extras={"guids": ["X"]},
+    )
+    assert len(data) % 4 == 0
+    gltf, binary = _read_glb(data)
+    position, _, indices = gltf["accessors"]
+    assert (position["min"], position["max"]) == ([0, 0, 0], [1, 1, 0])
+    assert indices["componentType"] == 5123  # uint16 pentru plase mici
+    view = gltf["bufferViews"][2]
+    assert np.frombuffer(binary, np.uint16, 3, view["byteOffset"]).tolist() == [0, 1, 2]
+
+
+def test_build_viewer_geometry_chunks_per_discipline(tmp_path):
+    path = tmp_path / "model.ifc"
+    _write_revision(path, [WALL, BEAM, DUCT])
+    sha = file_sha256(path)
+
+    manifest = build_viewer_geometry(path, sha)
+
+    assert [c["discipline"] for c in manifest["chunks"]] == ["architecture", "mep", "structure"]
+    assert manifest["elements"] == 3
+    assert manifest["origin"] == pytest.approx([100, 199, 0])
+    mep = (tmp_path / "viewer" / sha / "mep.glb").read_bytes()
+    gltf, binary = _read_glb(mep)
+    assert gltf["meshes"][0]["extras"]["guids"] == [DUCT[0]]
+    # Coordonate relative la originea modelului
+    position = gltf["accessors"][0]
+    assert position["min"] == pytest.approx([1, 0, 1], abs=1e-4)
+    assert (tmp_path / "viewer" / sha / "mep.glb.gz").exists()
+    # A doua oară: manifestul existent, fără o nouă teselare
+    assert build_viewer_geometry(path, sha) == manifest
+
+
+def test_viewer_endpoints_enqueue_then_serve_chunks(client, auth_headers, db_session, project_id, tmp_path):
+    path = tmp_path / "model.ifc"
+    _write_revision(path, [WALL, DUCT])
+    save_uploaded_file(db_session, project_id=project_id, filename="model.ifc", file_path=str(path))
+    db_session.commit()
+    url = f"/api/projects/{project_id}/viewer"
+
+    res = client.get(f"{url}/manifest", headers=auth_headers)
+    assert res.status_code == 202
+    job = res.json()["job"]
+    assert job["job_type"] == "build_viewer_geometry"
+    # Polling-ul refolosește job-ul din coadă, nu pune altă teselare
+    assert client.get(f"{url}/manifest", headers=auth_headers).json()["job"]["id"] == job["id"]
+    worker = job_queue.JobWorker(concurrency=1, poll_interval=0.01, name="test-worker")
+    assert worker.run_once() is True
+    assert worker.run_once() is False
+
+    manifest = client.get(f"{url}/manifest", headers=auth_headers).json()
+    chunk = next(c for c in manifest["chunks"] if c["discipline"] == "mep")
+    assert chunk["url"] == f"{url}/chunks/mep.glb"
+
+    res = client.get(chunk["url"], headers={**auth_headers, "Accept-Encoding": "gzip"})
+    assert res.status_code == 200
+    assert res.headers["content-type"] == "model/gltf-binary"
+    assert res.headers["content-encoding"] == "gzip"
+    assert _read_glb(res.content)[0]["meshes"][0]["extras"]["guids"] == [DUCT[0]]
+
+    res = client.get(chunk["url"], headers={**auth_headers, "If-None-Match": res.headers["etag"], "Accept-Encoding": "gzip"})
+    assert res.status_code == 304
+    assert client.get(f"{url}/chunks/structure.glb", headers=auth_headers).status_code == 404
+
+
+def test_viewer_manifest_refuses_models_over_scan_threshold(
+    client, auth_headers, db_session, project_id, tmp_path, monkeypatch
+):
+    path = tmp_path / "model.ifc"
+    _write_revision(path, [WALL])
+    save_uploaded_file(db_session, project_id=project_id, filename="model.ifc", file_path=str(path))
+    db_session.commit()
+    monkeypatch.setattr(ifc_parser, "IFC_STEP_SCAN_THRESHOLD_MB", 0.001)
+
+    res = client.get(f"/api/projects/{project_id}/viewer/manifest", headers=auth_headers)
+    assert res.status_code == 409
+    worker = job_queue.JobWorker(concurrency=1, poll_interval=0.01, name="test-worker")
+    assert worker.run_once() is False
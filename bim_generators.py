@@ -11,6 +11,8 @@ import os
 import re
 import datetime
 import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 import json
@@ -44,22 +46,21 @@ def get_ai():
 
 # ── RAG helper ─────────────────────────────────────────────────────────────────
 try:
-    from bim_rag import query_rag as _query_rag
+    from bim_rag import query_rag_batch as _query_rag_batch
     _RAG_OK = True
 except Exception:
     _RAG_OK = False
-    def _query_rag(q, n=5):
-        return {"context": "", "sources": [], "rag_used": False}
+    def _query_rag_batch(qs, n=5):
+        return [{"context": "", "sources": [], "rag_used": False} for _ in qs]
 
 
 def get_project_context(project: str, queries: list, n: int = 5) -> str:
-    """Extrage context RAG pentru un proiect și o lista de interogari."""
-    parts = []
-    for q in queries:
-        full_q = f"{q} {project}" if project else q
-        r = _query_rag(full_q, n=n)
-        if r.get("rag_used") and r.get("context"):
-            parts.append(r["context"])
+    """Extrage context RAG pentru un proiect și o lista de interogari (un singur apel batch)."""
+    full_queries = [f"{q} {project}" if project else q for q in queries]
+    parts = [
+        r["context"] for r in _query_rag_batch(full_queries, n=n)
+        if r.get("rag_used") and r.get("context")
+    ]
     return "\n\n---\n\n".join(parts)
 
 
@@ -431,9 +432,10 @@ def gen_requirements(project: str) -> str:
     found_any = False
     all_frags = []
 
-    for topic, query in queries_map.items():
-        full_q = f"{query} {project}" if project else query
-        r = _query_rag(full_q, n=5)
+    full_queries = [f"{query} {project}" if project else query for query in queries_map.values()]
+    rag_results = _query_rag_batch(full_queries, n=5)
+
+    for topic, r in zip(queries_map, rag_results):
         if not r.get("rag_used") or not r.get("context"):
             continue
 
@@ -1123,8 +1125,14 @@ Client: "{client}". Contractor: "{contractor}". Tip: "{work_type}".""",
 
 
 # ── Job management (pentru generare async) ────────────────────────────────────
+# Pool mărginit în loc de thread-uri daemon nelimitate; job-urile terminate
+# sunt păstrate JOBS_RETENTION_SECONDS, apoi eliminate din _jobs.
+JOBS_MAX_WORKERS = int(os.getenv("BIM_JOBS_MAX_WORKERS", "2"))
+JOBS_RETENTION_SECONDS = int(os.getenv("BIM_JOBS_RETENTION_SECONDS", "3600"))
+
 _jobs: dict = {}
 _jobs_lock = threading.Lock()
+_jobs_pool = ThreadPoolExecutor(max_workers=JOBS_MAX_WORKERS, thread_name_prefix="bim-gen")
 
 GENERATORS = {
     "bep":          gen_bep,
@@ -1147,14 +1155,28 @@ DOC_LABELS = {
 }
 
 
+def _prune_jobs() -> None:
+    """Elimină job-urile terminate mai vechi de JOBS_RETENTION_SECONDS (apelat sub _jobs_lock)."""
+    cutoff = time.time() - JOBS_RETENTION_SECONDS
+    expired = [
+        jid for jid, job in _jobs.items()
+        if job["status"] in ("done", "error") and job.get("finished_at", 0) < cutoff
+    ]
+    for jid in expired:
+        del _jobs[jid]
+
+
 def start_generation(doc_type: str, project: str, params: dict = None) -> str:
     """Porneste generarea asincron. Returneaza job_id."""
     import uuid
     job_id = str(uuid.uuid4())[:8]
     with _jobs_lock:
-        _jobs[job_id] = {"status": "running", "file": None, "error": None}
+        _prune_jobs()
+        _jobs[job_id] = {"status": "queued", "file": None, "error": None}
 
     def _run():
+        with _jobs_lock:
+            _jobs[job_id]["status"] = "running"
         try:
             if doc_type == "bep_parametric" and params:
                 path = gen_bep_parametric(params)
@@ -1164,12 +1186,14 @@ def start_generation(doc_type: str, project: str, params: dict = None) -> str:
             with _jobs_lock:
                 _jobs[job_id]["status"] = "done"
                 _jobs[job_id]["file"]   = Path(path).name
+                _jobs[job_id]["finished_at"] = time.time()
         except Exception as e:
             with _jobs_lock:
                 _jobs[job_id]["status"] = "error"
                 _jobs[job_id]["error"]  = str(e)
+                _jobs[job_id]["finished_at"] = time.time()
 
-    threading.Thread(target=_run, daemon=True).start()
+    _jobs_pool.submit(_run)
     return job_id
 
 
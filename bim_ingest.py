@@ -3,11 +3,17 @@ bim_ingest.py — Indexare documente BIM în ChromaDB
 Rulează O SINGURĂ DATĂ (sau ori de câte ori se adaugă documente noi).
 
 Utilizare:
-    python bim_ingest.py
+    python bim_ingest.py            # ingestie + index BM25
+    python bim_ingest.py --bm25     # doar reconstruirea indexului BM25
+    python bim_ingest.py --vectors  # doar exportul indexului vectorial NumPy
 
 Procesează toate PDF și DOCX din folderul BIM/, le împarte în
 fragmente de 800 caractere (overlap 150) și le stochează în ChromaDB
-cu metadate {source, category, page, chunk_index}.
+cu metadate {source, category, page, chunk_index}. La final reconstruiește
+din toată colecția indexul inversat BM25 (chroma_db/bm25), folosit de
+backend pentru căutarea hibridă (backend/app/services/bm25_index.py), și
+indexul vectorial NumPy (chroma_db/vectors), alternativa la ChromaDB la
+căutare (backend/app/services/vector_index.py).
 """
 
 import os
@@ -26,6 +32,11 @@ if sys.stderr.encoding and sys.stderr.encoding.lower() != "utf-8":
 import chromadb
 from chromadb.config import Settings
 
+# Indexul BM25 e citit de backend: aceeași tokenizare la construire și la căutare
+sys.path.insert(0, str(Path(__file__).resolve().parent / "backend"))
+from app.services.bm25_index import build_bm25_index
+from app.services.vector_index import build_vector_index
+
 # ── Categorii de documente ─────────────────────────────────────────────────────
 CATEGORY_RULES = [
     (r"19650",            "ISO 19650"),
@@ -54,6 +65,9 @@ CHUNK_SIZE    = 800
 CHUNK_OVERLAP = 150
 MAX_FILE_MB   = 50
 MIN_PAGE_CHARS = 100   # pagini cu mai puțin de N caractere → considerate imagine-only
+BM25_DIR      = Path(CHROMA_DIR) / "bm25"
+VECTORS_DIR   = Path(CHROMA_DIR) / "vectors"
+VECTOR_DTYPE  = os.environ.get("VECTOR_INDEX_DTYPE", "float16")   # float16 | int8
 
 
 def detect_category(filename: str) -> str:
@@ -128,7 +142,63 @@ def collect_files():
     return pdfs + docxs
 
 
+def export_collection(collection, embeddings: bool = False) -> dict:
+    """Toate fragmentele colecției (id, text, metadate și opțional embedding-uri), pe pagini."""
+    include = ["documents", "metadatas"] + (["embeddings"] if embeddings else [])
+    out = {"ids": [], "documents": [], "metadatas": [], "embeddings": []}
+    page_size = 5000
+    offset = 0
+    while True:
+        batch = collection.get(include=include, limit=page_size, offset=offset)
+        out["ids"].extend(batch["ids"])
+        out["documents"].extend(d or "" for d in batch["documents"])
+        out["metadatas"].extend(m or {} for m in batch["metadatas"])
+        if embeddings:
+            out["embeddings"].extend(batch["embeddings"])
+        if len(batch["ids"]) < page_size:
+            break
+        offset += page_size
+    return out
+
+
+def rebuild_bm25(collection) -> dict:
+    """Reconstruiește indexul BM25 din toate fragmentele colecției (aceleași id-uri)."""
+    data = export_collection(collection)
+    documents = [
+        {
+            "id":       chunk_id,
+            "text":     doc,
+            "source":   meta.get("source"),
+            "category": meta.get("category"),
+            "page":     meta.get("page"),
+        }
+        for chunk_id, doc, meta in zip(data["ids"], data["documents"], data["metadatas"])
+    ]
+    return build_bm25_index(documents, BM25_DIR)
+
+
+def rebuild_vectors(collection) -> dict:
+    """Exportă embedding-urile colecției în indexul NumPy (backend-ul vectorial alternativ)."""
+    data = export_collection(collection, embeddings=True)
+    return build_vector_index(
+        data["ids"], data["embeddings"], data["documents"], data["metadatas"],
+        VECTORS_DIR, dtype=VECTOR_DTYPE,
+    )
+
+
 def main():
+    flags = set(sys.argv[1:])
+    if flags & {"--bm25", "--vectors"}:
+        client = chromadb.PersistentClient(path=CHROMA_DIR)
+        collection = client.get_collection(COLLECTION)
+        if "--bm25" in flags:
+            meta = rebuild_bm25(collection)
+            print(f"✓ Index BM25: {meta['documents']} chunks, {meta['terms']} termeni → {BM25_DIR}")
+        if "--vectors" in flags:
+            meta = rebuild_vectors(collection)
+            print(f"✓ Index vectorial NumPy: {meta['count']} chunks ({meta['dtype']}) → {VECTORS_DIR}")
+        return
+
     if not BIM_FOLDER.exists():
         print(f"✗ Folderul '{BIM_FOLDER}' nu există. Plasează documentele BIM acolo și re-rulează.")
         return
@@ -217,6 +287,10 @@ def main():
             total_chunks += len(ids)
             print(f"    + {len(ids)} chunks noi")
 
+    # ── Index BM25 (căutare hibridă) + index vectorial NumPy ──────
+    bm25_meta = rebuild_bm25(collection)
+    vectors_meta = rebuild_vectors(collection)
+
     elapsed = time.time() - t0
     final_count = collection.count()
 
@@ -225,6 +299,8 @@ def main():
     print(f" Chunks adăugate acum : {total_chunks}")
     print(f" Total chunks în DB   : {final_count}")
     print(f" Fișiere sărite       : {skipped}")
+    print(f" Index BM25           : {bm25_meta['terms']} termeni")
+    print(f" Index vectorial NumPy: {vectors_meta['count']} vectori ({vectors_meta['dtype']})")
     print("=" * 60)
 
     if final_count > 0:
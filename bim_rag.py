@@ -7,7 +7,12 @@ ca bim_ingest.py, astfel incat spatiile vectoriale sunt identice.
 Interfata publica:
     init_rag()                     -> apelat la startup Flask
     query_rag(question, n=5)       -> dict {context, sources, rag_used}
+    query_rag_batch(questions, n)  -> list[dict] (un forward pass, o interogare Chroma)
     get_rag_stats()                -> dict {ready, chunk_count, model}
+
+Cu RAG_VECTOR_BACKEND=numpy, cautarea foloseste indexul vectorial NumPy
+exportat de bim_ingest.py (chroma_db/vectors) in locul clientului ChromaDB;
+query() are aceeasi semnatura (backend/app/services/vector_index.py).
 """
 
 import os
@@ -19,6 +24,9 @@ CHROMA_DIR  = "chroma_db"
 COLLECTION  = "bim_knowledge"
 EMBED_MODEL = "paraphrase-multilingual-MiniLM-L12-v2"
 N_RESULTS   = 5
+VECTORS_DIR = os.path.join(CHROMA_DIR, "vectors")
+# chroma (implicit) sau numpy
+VECTOR_BACKEND = os.environ.get("RAG_VECTOR_BACKEND", "chroma").lower()
 
 # Starea globala a motorului RAG
 _rag_state = {
@@ -47,27 +55,36 @@ def init_rag() -> bool:
         return False
 
     try:
-        import chromadb
         from sentence_transformers import SentenceTransformer
 
-        client = chromadb.PersistentClient(path=CHROMA_DIR)
+        if VECTOR_BACKEND == "numpy":
+            collection = _load_numpy_index()
+            if collection is None:
+                _rag_state["error"] = f"Indexul '{VECTORS_DIR}' lipseste. Ruleaza: python bim_ingest.py --vectors"
+                logger.warning(_rag_state["error"])
+                return False
+        else:
+            import chromadb
 
-        # Verificam ca exista colectia
-        existing = [c.name for c in client.list_collections()]
-        if COLLECTION not in existing:
-            _rag_state["error"] = f"Colectia '{COLLECTION}' nu exista. Ruleaza: python bim_ingest.py"
-            logger.warning(_rag_state["error"])
-            return False
+            client = chromadb.PersistentClient(path=CHROMA_DIR)
+
+            # Verificam ca exista colectia
+            existing = [c.name for c in client.list_collections()]
+            if COLLECTION not in existing:
+                _rag_state["error"] = f"Colectia '{COLLECTION}' nu exista. Ruleaza: python bim_ingest.py"
+                logger.warning(_rag_state["error"])
+                return False
+
+            # Fara embedding_function — embedurile sunt precomputate (ca la ingestie)
+            collection = client.get_collection(COLLECTION)
 
-        # Fara embedding_function — embedurile sunt precomputate (ca la ingestie)
-        collection = client.get_collection(COLLECTION)
         count = collection.count()
         if count == 0:
             _rag_state["error"] = "Colectia este goala. Ruleaza: python bim_ingest.py"
             logger.warning(_rag_state["error"])
             return False
 
-        logger.info(f"ChromaDB conectat — {count} chunks")
+        logger.info(f"Index vectorial ({VECTOR_BACKEND}) conectat — {count} chunks")
 
         # Incarcam acelasi model folosit la ingestie
         logger.info(f"Se incarca modelul de embedding: {EMBED_MODEL}")
@@ -108,61 +125,82 @@ def query_rag(question: str, n: int = N_RESULTS) -> dict:
     if not _rag_state["ready"]:
         return {"context": "", "sources": [], "rag_used": False}
 
+    return query_rag_batch([question], n=n)[0]
+
+
+def query_rag_batch(questions: list, n: int = N_RESULTS) -> list:
+    """
+    Ca query_rag, pentru mai multe intrebari deodata: embedding-urile sunt
+    calculate intr-un singur forward pass, iar ChromaDB primeste o singura
+    interogare cu toate embedding-urile.
+
+    Returneaza cate un dict {context, sources, rag_used} per intrebare.
+    """
+    empty = {"context": "", "sources": [], "rag_used": False}
+    if not _rag_state["ready"] or not questions:
+        return [dict(empty) for _ in questions]
+
     try:
         collection = _rag_state["collection"]
         embedder   = _rag_state["embedder"]
 
-        query_embedding = embedder.encode(question).tolist()
+        query_embeddings = embedder.encode(list(questions)).tolist()
 
         results = collection.query(
-            query_embeddings=[query_embedding],
+            query_embeddings=query_embeddings,
             n_results=min(n, _rag_state["chunk_count"]),
             include=["documents", "metadatas", "distances"],
         )
 
-        documents = results["documents"][0]
-        metadatas = results["metadatas"][0]
-        distances = results["distances"][0]
+        return [
+            _build_context(docs, metas, dists)
+            for docs, metas, dists in zip(
+                results["documents"], results["metadatas"], results["distances"]
+            )
+        ]
 
-        if not documents:
-            return {"context": "", "sources": [], "rag_used": False}
+    except Exception as e:
+        logger.error(f"Eroare query RAG: {e}")
+        return [dict(empty) for _ in questions]
 
-        # Construim contextul si lista de surse
-        context_parts = []
-        sources = []
-        seen_sources = set()
 
-        for doc, meta, dist in zip(documents, metadatas, distances):
-            source    = meta.get("source", "Necunoscut")
-            page      = meta.get("page", 1)
-            category  = meta.get("category", "General BIM")
-            # Distanta cosinus -> scor relevanta (0-1, mai mare = mai relevant)
-            relevance = round(max(0.0, 1.0 - dist), 3)
+def _build_context(documents: list, metadatas: list, distances: list) -> dict:
+    """Contextul si sursele pentru rezultatele unei singure intrebari."""
+    if not documents:
+        return {"context": "", "sources": [], "rag_used": False}
 
-            title = _short_title(source)
+    # Construim contextul si lista de surse
+    context_parts = []
+    sources = []
+    seen_sources = set()
 
-            context_parts.append(
-                f"[Sursa: {title}, Pag. {page}]\n{doc}"
-            )
+    for doc, meta, dist in zip(documents, metadatas, distances):
+        source    = meta.get("source", "Necunoscut")
+        page      = meta.get("page", 1)
+        category  = meta.get("category", "General BIM")
+        # Distanta cosinus -> scor relevanta (0-1, mai mare = mai relevant)
+        relevance = round(max(0.0, 1.0 - dist), 3)
 
-            # Deduplicam sursele in panoul lateral
-            source_key = f"{source}:{page}"
-            if source_key not in seen_sources:
-                seen_sources.add(source_key)
-                sources.append({
-                    "title":     title,
-                    "source":    source,
-                    "page":      page,
-                    "category":  category,
-                    "relevance": relevance,
-                })
-
-        context = "\n\n---\n\n".join(context_parts)
-        return {"context": context, "sources": sources, "rag_used": True}
+        title = _short_title(source)
 
-    except Exception as e:
-        logger.error(f"Eroare query RAG: {e}")
-        return {"context": "", "sources": [], "rag_used": False}
+        context_parts.append(
+            f"[Sursa: {title}, Pag. {page}]\n{doc}"
+        )
+
+        # Deduplicam sursele in panoul lateral
+        source_key = f"{source}:{page}"
+        if source_key not in seen_sources:
+            seen_sources.add(source_key)
+            sources.append({
+                "title":     title,
+                "source":    source,
+                "page":      page,
+                "category":  category,
+                "relevance": relevance,
+            })
+
+    context = "\n\n---\n\n".join(context_parts)
+    return {"context": context, "sources": sources, "rag_used": True}
 
 
 def get_rag_stats() -> dict:
@@ -176,6 +214,20 @@ def get_rag_stats() -> dict:
 
 
 # ── Utilitar intern ────────────────────────────────────────────────────────────
+def _load_numpy_index():
+    """
+    Incarca indexul NumPy cu modulul din backend. Fisierul e incarcat direct
+    (nu ca pachet `app`), ca sa nu intre in conflict cu app.py din radacina.
+    """
+    import importlib.util
+
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "backend", "app", "services", "vector_index.py")
+    spec = importlib.util.spec_from_file_location("bim_vector_index", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module.load_vector_index(VECTORS_DIR)
+
+
 def _short_title(source: str) -> str:
     """Extrage un titlu lizibil din calea fisierului."""
     basename = os.path.basename(source)
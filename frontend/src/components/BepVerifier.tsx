@@ -157,7 +157,19 @@ export default function BepVerifier({ bepContext, projectId }: Props) {
         throw new Error(err.detail || `Eroare server: ${res.status}`);
       }
 
-      const data = await res.json();
+      // Importul returnează un job de parsare; așteptăm rezultatul
+      let job = await res.json();
+      while (job.status === "queued" || job.status === "running") {
+        await new Promise((resolve) => setTimeout(resolve, 1000));
+        const jobRes = await authFetch(`/api/jobs/${job.id}`);
+        if (!jobRes.ok) throw new Error(`Eroare server: ${jobRes.status}`);
+        job = await jobRes.json();
+      }
+      if (job.status !== "succeeded") {
+        throw new Error(job.error || "Parsarea fisierului IFC a esuat");
+      }
+
+      const data = job.result.summary;
       setSource(data.source);
       setDisciplines(data.disciplines_present);
       setFormats(data.exchange_formats_available);
@@ -1,9 +1,16 @@
 import { useState, useEffect, useRef, useCallback } from "react";
 import * as THREE from "three";
 import { OrbitControls } from "three/examples/jsm/controls/OrbitControls.js";
+import { GLTFLoader } from "three/examples/jsm/loaders/GLTFLoader.js";
 import { IFCLoader } from "web-ifc-three";
 import { IFCSPACE } from "web-ifc";
 import { useAuth } from "../contexts/AuthProvider";
+import {
+  FEATURE_ID_ATTRIBUTE,
+  pickFeature,
+  type PickedElement,
+  type ViewerManifest,
+} from "../types/viewerManifest";
 
 interface IfcInfo {
   filename: string;
@@ -25,6 +32,8 @@ export default function IfcViewer({ projectId }: Props) {
   const [wireframe, setWireframe] = useState(false);
   const [elementCount, setElementCount] = useState(0);
   const [modelLoaded, setModelLoaded] = useState(false);
+  const [notice, setNotice] = useState<string | null>(null);
+  const [selected, setSelected] = useState<PickedElement | null>(null);
 
   const containerRef = useRef<HTMLDivElement>(null);
   const sceneRef = useRef<THREE.Scene | null>(null);
@@ -100,8 +109,41 @@ export default function IfcViewer({ projectId }: Props) {
     };
     window.addEventListener("resize", onResize);
 
+    // Selectie: click (fara drag) -> raycast -> _FEATURE_ID_0 -> GlobalId
+    const raycaster = new THREE.Raycaster();
+    const pointer = new THREE.Vector2();
+    let downX = 0;
+    let downY = 0;
+    const onPointerDown = (e: PointerEvent) => {
+      downX = e.clientX;
+      downY = e.clientY;
+    };
+    const onPointerUp = (e: PointerEvent) => {
+      const model = modelRef.current;
+      if (!model || Math.hypot(e.clientX - downX, e.clientY - downY) > 4) return;
+      const rect = renderer.domElement.getBoundingClientRect();
+      pointer.set(
+        ((e.clientX - rect.left) / rect.width) * 2 - 1,
+        -((e.clientY - rect.top) / rect.height) * 2 + 1,
+      );
+      raycaster.setFromCamera(pointer, camera);
+      const hit = raycaster.intersectObject(model, true)[0];
+      if (!hit || !hit.face || !(hit.object instanceof THREE.Mesh)) {
+        setSelected(null);
+        return;
+      }
+      const attr = hit.object.geometry.getAttribute(FEATURE_ID_ATTRIBUTE);
+      setSelected(
+        pickFeature(attr ? attr.getX(hit.face.a) : null, hit.object.userData),
+      );
+    };
+    renderer.domElement.addEventListener("pointerdown", onPointerDown);
+    renderer.domElement.addEventListener("pointerup", onPointerUp);
+
     return () => {
       window.removeEventListener("resize", onResize);
+      renderer.domElement.removeEventListener("pointerdown", onPointerDown);
+      renderer.domElement.removeEventListener("pointerup", onPointerUp);
       cancelAnimationFrame(animFrameRef.current);
       controls.dispose();
       renderer.dispose();
@@ -128,6 +170,8 @@ export default function IfcViewer({ projectId }: Props) {
     setError(null);
     setModelLoaded(false);
     setElementCount(0);
+    setNotice(null);
+    setSelected(null);
 
     // Remove previous model from scene
     if (modelRef.current && sceneRef.current) {
@@ -173,65 +217,128 @@ export default function IfcViewer({ projectId }: Props) {
     controls.update();
   }, []);
 
-  // Load IFC model
-  const loadModel = useCallback(async () => {
-    if (!projectId || !sceneRef.current) return;
+  // Replace the model in the scene
+  const setModel = useCallback((model: THREE.Object3D) => {
+    if (modelRef.current) {
+      sceneRef.current!.remove(modelRef.current);
+    }
+    sceneRef.current!.add(model);
+    modelRef.current = model;
+    setSelected(null);
+  }, []);
 
-    setLoading(true);
-    setError(null);
+  // Load precomputed glTF chunks (one .glb per discipline), streamed into the scene
+  const loadChunks = useCallback(
+    async (manifest: ViewerManifest) => {
+      // Pozitiile sunt relative la manifest.origin (precizie float32), deja Y-up
+      const group = new THREE.Group();
+      group.name = manifest.content_sha256;
+      setModel(group);
+
+      const loader = new GLTFLoader();
+      let loaded = 0;
+      await Promise.all(
+        manifest.chunks.map(async (chunk) => {
+          const response = await authFetch(chunk.url);
+          if (!response.ok) {
+            throw new Error(`Eroare descărcare ${chunk.discipline}: HTTP ${response.status}`);
+          }
+          const gltf = await loader.parseAsync(await response.arrayBuffer(), "");
+          // Proiectul a fost schimbat sau modelul reincarcat intre timp
+          if (modelRef.current !== group) return;
+          gltf.scene.name = chunk.discipline;
+          group.add(gltf.scene);
+          loaded += chunk.elements;
+          setElementCount(loaded);
+          setModelLoaded(true);
+          if (group.children.length === 1) zoomToFit();
+        }),
+      );
+      if (modelRef.current === group) zoomToFit();
+    },
+    [authFetch, setModel, zoomToFit],
+  );
 
-    try {
-      const response = await authFetch(`/api/projects/${projectId}/ifc-file`);
-      if (!response.ok) {
-        throw new Error(
-          response.status === 404
-            ? "Fișierul IFC nu a fost găsit."
-            : `Eroare descărcare: HTTP ${response.status}`,
-        );
-      }
+  // Fallback: download the IFC and parse it in the browser (web-ifc-three)
+  const loadIfcFile = useCallback(async () => {
+    const response = await authFetch(`/api/projects/${projectId}/ifc-file`);
+    if (!response.ok) {
+      throw new Error(
+        response.status === 404
+          ? "Fișierul IFC nu a fost găsit."
+          : `Eroare descărcare: HTTP ${response.status}`,
+      );
+    }
 
-      const buffer = await response.arrayBuffer();
+    const buffer = await response.arrayBuffer();
 
-      const loader = new IFCLoader();
-      await loader.ifcManager.setWasmPath(
-        "https://cdn.jsdelivr.net/npm/web-ifc@0.0.36/",
-        true,
-      );
+    const loader = new IFCLoader();
+    await loader.ifcManager.setWasmPath(
+      "https://cdn.jsdelivr.net/npm/web-ifc@0.0.36/",
+      true,
+    );
 
-      // Optimize: skip rendering IFCSPACE elements
-      loader.ifcManager.parser.setupOptionalCategories({
-        [IFCSPACE]: false,
-      });
+    // Optimize: skip rendering IFCSPACE elements
+    loader.ifcManager.parser.setupOptionalCategories({
+      [IFCSPACE]: false,
+    });
 
-      await loader.ifcManager.applyWebIfcConfig({
-        USE_FAST_BOOLS: true,
-      });
+    await loader.ifcManager.applyWebIfcConfig({
+      USE_FAST_BOOLS: true,
+    });
 
-      const model = await loader.ifcManager.parse(new Uint8Array(buffer));
+    const model = await loader.ifcManager.parse(new Uint8Array(buffer));
+    setModel(model);
 
-      // Remove previous model
-      if (modelRef.current) {
-        sceneRef.current!.remove(modelRef.current);
-      }
+    // Count meshes
+    let count = 0;
+    model.traverse((child) => {
+      if (child instanceof THREE.Mesh) count++;
+    });
+    setElementCount(count);
+    setModelLoaded(true);
 
-      sceneRef.current!.add(model);
-      modelRef.current = model;
+    zoomToFit();
+  }, [projectId, authFetch, setModel, zoomToFit]);
 
-      // Count meshes
-      let count = 0;
-      model.traverse((child) => {
-        if (child instanceof THREE.Mesh) count++;
-      });
-      setElementCount(count);
-      setModelLoaded(true);
+  // Load model: precomputed glTF chunks if ready, otherwise the IFC file
+  const loadModel = useCallback(async () => {
+    if (!projectId || !sceneRef.current) return;
 
-      zoomToFit();
+    setLoading(true);
+    setError(null);
+    setNotice(null);
+
+    try {
+      let manifest: ViewerManifest | null = null;
+      try {
+        const res = await authFetch(`/api/projects/${projectId}/viewer/manifest`);
+        if (res.status === 200) {
+          manifest = await res.json();
+        } else if (res.status === 202) {
+          setNotice(
+            "Geometria precalculata se genereaza pe server; modelul se incarca din fisierul IFC.",
+          );
+        }
+      } catch (err) {
+        console.warn("Viewer manifest not available:", err);
+      }
+
+      if (manifest && manifest.chunks.length > 0) {
+        try {
+          await loadChunks(manifest);
+          return;
+        } catch (err) {
+          console.warn("glTF chunks failed, falling back to IFC:", err);
+        }
+      }
+      await loadIfcFile();
     } catch (err) {
       setError(err instanceof Error ? err.message : "Eroare la încărcarea modelului IFC.");
     } finally {
       setLoading(false);
     }
-  }, [projectId, zoomToFit]);
+  }, [projectId, authFetch, loadChunks, loadIfcFile]);
 
   // Toggle wireframe
   const toggleWireframe = useCallback(() => {
@@ -301,9 +408,22 @@ export default function IfcViewer({ projectId }: Props) {
               <span className="viewer-info-value">{elementCount}</span>
             </div>
           )}
+          {selected && (
+            <div className="viewer-info-item">
+              <span className="viewer-info-label">Selectat:</span>
+              <span className="viewer-info-value">
+                {selected.ifcType ? `${selected.ifcType} ` : ""}
+                {selected.guid}
+              </span>
+            </div>
+          )}
         </div>
       )}
 
+      {notice && (
+        <div className="viewer-alert viewer-alert-info">{notice}</div>
+      )}
+
       {projectId && !ifcInfo && !error && (
         <div className="viewer-alert viewer-alert-info">
           Nu exista fisier IFC uploadat pentru acest proiect. Importa un fisier
@@ -296,15 +296,34 @@ function processEvent(
   currentText: string
 ) {
   switch (event.type) {
-    case "tool_call":
+    case "tool_call_start":
       toolSteps.push({
         call_id: event.call_id,
         tool_name: event.tool_name,
-        tool_input: event.tool_input,
+        tool_input: {},
         status: "running",
       });
       break;
 
+    case "tool_input_delta":
+      // Argumentele complete sosesc în tool_call
+      break;
+
+    case "tool_call": {
+      const started = toolSteps.find((s) => s.call_id === event.call_id);
+      if (started) {
+        started.tool_input = event.tool_input;
+      } else {
+        toolSteps.push({
+          call_id: event.call_id,
+          tool_name: event.tool_name,
+          tool_input: event.tool_input,
+          status: "running",
+        });
+      }
+      break;
+    }
+
     case "tool_result": {
       const step = toolSteps.find((s) => s.call_id === event.call_id);
       if (step) {
@@ -0,0 +1,33 @@
+import { describe, it, expect } from "vitest";
+import { pickFeature } from "../types/viewerManifest";
+
+const extras = {
+  guids: ["2O2Fr$t4X7Zf8NOew3FLOH", "1hOSvn6df7F8_7GcBWlR72"],
+  ifc_types: ["IfcWall", "IfcSlab"],
+};
+
+describe("pickFeature", () => {
+  it("maps the feature id to the element GlobalId and type", () => {
+    expect(pickFeature(1, extras)).toEqual({
+      guid: "1hOSvn6df7F8_7GcBWlR72",
+      ifcType: "IfcSlab",
+    });
+  });
+
+  it("rounds float32 feature ids", () => {
+    expect(pickFeature(0.9999999, extras)?.guid).toBe("1hOSvn6df7F8_7GcBWlR72");
+  });
+
+  it("returns null ifcType when types are absent", () => {
+    expect(pickFeature(0, { guids: extras.guids })).toEqual({
+      guid: "2O2Fr$t4X7Zf8NOew3FLOH",
+      ifcType: null,
+    });
+  });
+
+  it("returns null for missing attribute, extras or out-of-range ids", () => {
+    expect(pickFeature(null, extras)).toBeNull();
+    expect(pickFeature(0, {})).toBeNull();
+    expect(pickFeature(7, extras)).toBeNull();
+  });
+});
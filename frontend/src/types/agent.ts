@@ -10,6 +10,20 @@ export interface ToolCallEvent {
   call_id: string;
 }
 
+/** SSE event: a început un block tool_use (argumentele urmează în stream) */
+export interface ToolCallStartEvent {
+  type: "tool_call_start";
+  tool_name: string;
+  call_id: string;
+}
+
+/** SSE event: fragment JSON din argumentele unui tool */
+export interface ToolInputDeltaEvent {
+  type: "tool_input_delta";
+  call_id: string | null;
+  partial_json: string;
+}
+
 /** SSE event: rezultatul execuției unui tool */
 export interface ToolResultEvent {
   type: "tool_result";
@@ -34,6 +48,12 @@ export interface ErrorEvent {
 /** SSE event: agentul a terminat */
 export interface DoneEvent {
   type: "done";
+  usage?: {
+    input_tokens: number;
+    output_tokens: number;
+    cache_creation_input_tokens: number;
+    cache_read_input_tokens: number;
+  };
 }
 
 /** SSE event: metadata conversație (id, titlu) */
@@ -45,6 +65,8 @@ export interface ConversationMetaEvent {
 }
 
 export type AgentSSEEvent =
+  | ToolCallStartEvent
+  | ToolInputDeltaEvent
   | ToolCallEvent
   | ToolResultEvent
   | TextDeltaEvent
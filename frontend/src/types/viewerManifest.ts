@@ -0,0 +1,50 @@
+/** Manifestul geometriei precalculate a viewer-ului (GET /viewer/manifest) */
+
+export interface ViewerChunk {
+  discipline: string;
+  file: string;
+  url: string;
+  elements: number;
+  size_bytes: number;
+}
+
+export interface ViewerManifest {
+  version: number;
+  content_sha256: string;
+  schema: string;
+  origin: [number, number, number];
+  up_axis: string;
+  elements: number;
+  chunks: ViewerChunk[];
+  uploaded_file_id: number;
+}
+
+export interface PickedElement {
+  guid: string;
+  ifcType: string | null;
+}
+
+/** Numele atributului _FEATURE_ID_0 dupa GLTFLoader (nume necunoscute -> lowercase) */
+export const FEATURE_ID_ATTRIBUTE = "_feature_id_0";
+
+/**
+ * Elementul IFC al unui varf din plasa unita: valoarea _FEATURE_ID_0 a
+ * varfului e indexul elementului, iar extras.guids / extras.ifc_types
+ * (userData dupa GLTFLoader) dau GlobalId-ul si tipul lui.
+ */
+export function pickFeature(
+  featureId: number | null | undefined,
+  extras: Record<string, unknown> | null | undefined,
+): PickedElement | null {
+  if (featureId == null || !Number.isFinite(featureId)) return null;
+  const guids = extras?.guids;
+  if (!Array.isArray(guids)) return null;
+
+  const index = Math.round(featureId);
+  const guid = guids[index];
+  if (typeof guid !== "string") return null;
+
+  const types = extras?.ifc_types;
+  const ifcType = Array.isArray(types) && typeof types[index] === "string" ? types[index] : null;
+  return { guid, ifcType };
+}